@@ -0,0 +1,115 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Times the tabledata join, group-by and selection operations.
+
+Tables with numpy columns go through the vectorized code paths; the same
+tables stored as Python lists (only run for the smaller sizes, see --lists)
+go through the row-at-a-time ones. Usage:
+
+    python benchmark_tabledata.py [--lists MAX_ROWS] [ROWS ...]
+"""
+
+from __future__ import division
+
+import os
+import sys
+import time
+
+# put the vistrails code on the python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+
+from vistrails.packages.tabledata.common import TableObject
+from vistrails.packages.tabledata.operations import JoinedTables, \
+    AggregatedTable, SelectFromTable
+
+
+def make_tables(rows, as_lists):
+    rng = numpy.random.RandomState(42)
+    left = [rng.randint(0, rows, rows), rng.rand(rows)]
+    right = [numpy.arange(0, rows, 10), rng.rand((rows + 9) // 10)]
+    group = [rng.randint(0, 1000, rows), rng.rand(rows)]
+    if as_lists:
+        left, right, group = [[c.tolist() for c in t]
+                              for t in (left, right, group)]
+    return (TableObject(left, rows, ['key', 'a']),
+            TableObject(right, len(right[0]), ['key', 'b']),
+            TableObject(group, rows, ['group', 'value']))
+
+
+def timed(func):
+    start = time.time()
+    func()
+    return time.time() - start
+
+
+def run(rows, as_lists):
+    left, right, group = make_tables(rows, as_lists)
+
+    def join():
+        joined = JoinedTables(left, right, 0, 0)
+        joined.get_column(3)
+
+    def aggregate():
+        AggregatedTable(group, 'average', 1, 0).get_column(1)
+
+    def select():
+        SelectFromTable.select(left, 1, '<', 0.5)
+
+    return [timed(join), timed(aggregate), timed(select)]
+
+
+def main(args):
+    max_list_rows = 1000000
+    if args[:1] == ['--lists']:
+        max_list_rows = int(args[1])
+        args = args[2:]
+    sizes = [int(a) for a in args] or [100000, 1000000, 10000000]
+
+    print "%10s %8s %10s %10s %10s" % ("rows", "columns", "join", "group-by",
+                                       "select")
+    for rows in sizes:
+        for as_lists in (False, True):
+            if as_lists and rows > max_list_rows:
+                continue
+            times = run(rows, as_lists)
+            print "%10d %8s %9.3fs %9.3fs %9.3fs" % (
+                    (rows, "lists" if as_lists else "numpy") + tuple(times))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
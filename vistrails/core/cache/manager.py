@@ -0,0 +1,323 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Keeps the persistent pipeline of the cached interpreter within budget.
+
+Results of the modules executed by the
+:class:`~vistrails.core.interpreter.cached.CachedInterpreter` stay in its
+persistent pipeline so that later executions can reuse them. The
+:class:`CacheManager` keeps track of how often each of these modules is
+reused, how long it took to compute and how much memory its outputs use, and
+selects modules to evict when the configured budgets are exceeded.
+"""
+
+from __future__ import division
+
+import heapq
+import sys
+import unittest
+
+from vistrails.core.data_structures.graph import Graph
+
+
+def estimate_size(value, _depth=0):
+    """estimate_size(value: object) -> int
+
+    Approximates the memory used by a value, in bytes.
+
+    Arrays exposing `nbytes` (e.g. numpy) report their buffer size;
+    containers are looked into (up to two levels), sampling the first
+    elements of large ones.
+    """
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, (int, long)):
+        return nbytes
+    try:
+        size = sys.getsizeof(value)
+    except TypeError:
+        size = 0
+    if _depth >= 2:
+        return size
+    if isinstance(value, dict):
+        length = len(value)
+        sample = []
+        for k, v in value.iteritems():
+            if len(sample) >= 100:
+                break
+            sample.append(estimate_size(k, _depth + 1) +
+                          estimate_size(v, _depth + 1))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        length = len(value)
+        sample = []
+        for v in value:
+            if len(sample) >= 100:
+                break
+            sample.append(estimate_size(v, _depth + 1))
+    else:
+        return size
+    if sample:
+        size += sum(sample) * length // len(sample)
+    return size
+
+
+def module_size(obj):
+    """module_size(obj: vistrails_module.Module) -> int
+
+    Approximates the memory used by the outputs of a module.
+    """
+    return sum(estimate_size(value)
+               for port, value in obj.outputPorts.iteritems()
+               if port != 'self')
+
+
+class CacheEntry(object):
+    __slots__ = ['cost', 'size', 'last_used', 'priority']
+
+    def __init__(self, cost, size):
+        self.cost = cost
+        self.size = size
+        self.last_used = 0
+        self.priority = 0.0
+
+
+class CacheManager(object):
+    """Bookkeeping and eviction policy for the persistent pipeline.
+
+    Entries are keyed by persistent module id. Two policies are available:
+
+    'lru'
+        evicts the modules that were used least recently;
+    'cost'
+        GreedyDual-Size: evicts first the modules that are cheap to
+        recompute for the memory they hold, aging entries so that modules
+        that are not reused eventually go.
+
+    Only modules with no cached dependents are evicted, so that removing
+    one never drops results a cached downstream module relies on. Evicting
+    all the dependents of a module makes it a candidate in turn.
+    """
+    POLICIES = ('lru', 'cost')
+
+    def __init__(self, max_entries=0, max_memory=0, policy='lru'):
+        self.set_limits(max_entries, max_memory, policy)
+        self.clear()
+
+    def set_limits(self, max_entries=0, max_memory=0, policy='lru'):
+        """set_limits(max_entries: int, max_memory: int, policy: str)
+
+        Sets the budgets; max_memory is in bytes, 0 means unbounded.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError("Unknown cache policy %r" % policy)
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.policy = policy
+
+    def clear(self):
+        self._entries = {}
+        self._clock = 0
+        self._inflation = 0.0
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _touch(self, entry):
+        self._clock += 1
+        entry.last_used = self._clock
+        entry.priority = self._inflation + entry.cost / max(entry.size, 1)
+
+    def record_computed(self, module_id, cost, size):
+        """record_computed(module_id: int, cost: float, size: int)
+
+        Records that a module was computed (a cache miss), taking `cost`
+        seconds and holding `size` bytes.
+        """
+        self.forget(module_id)
+        entry = self._entries[module_id] = CacheEntry(cost, size)
+        self.memory += size
+        self._touch(entry)
+        self.misses += 1
+
+    def record_hit(self, module_id):
+        """record_hit(module_id: int)
+
+        Records that a cached module was reused.
+        """
+        entry = self._entries.get(module_id)
+        if entry is None:
+            entry = self._entries[module_id] = CacheEntry(0.0, 0)
+        self._touch(entry)
+        self.hits += 1
+
+    def forget(self, module_id):
+        """forget(module_id: int)
+
+        Drops the entry for a module that left the persistent pipeline.
+        """
+        entry = self._entries.pop(module_id, None)
+        if entry is not None:
+            self.memory -= entry.size
+
+    def _key(self, module_id):
+        entry = self._entries.get(module_id)
+        if entry is None:
+            return (-1, module_id)
+        if self.policy == 'lru':
+            return (entry.last_used, module_id)
+        else:
+            return (entry.priority, module_id)
+
+    def _over_budget(self, nb_entries, memory):
+        return ((self.max_entries and nb_entries > self.max_entries) or
+                (self.max_memory and memory > self.max_memory))
+
+    def select_victims(self, graph, protected=()):
+        """select_victims(graph: Graph, protected: set) -> list
+
+        Returns the ids of the modules to remove from the persistent
+        pipeline (whose graph is given) to get back within budget. Modules
+        in `protected` (typically those of the workflow that just ran) and
+        their upstream are kept.
+        """
+        nb_entries = len(graph.vertices)
+        memory = self.memory
+        if not self._over_budget(nb_entries, memory):
+            return []
+
+        out_degree = {}
+        heap = []
+        for v in graph.vertices:
+            out_degree[v] = graph.out_degree(v)
+            if out_degree[v] == 0 and v not in protected:
+                heap.append(self._key(v))
+        heapq.heapify(heap)
+
+        victims = []
+        while heap and self._over_budget(nb_entries, memory):
+            priority, v = heapq.heappop(heap)
+            victims.append(v)
+            entry = self._entries.get(v)
+            if entry is not None:
+                memory -= entry.size
+                if self.policy == 'cost':
+                    self._inflation = max(self._inflation, priority)
+            nb_entries -= 1
+            for frm, _ in graph.edges_to(v):
+                out_degree[frm] -= 1
+                if out_degree[frm] == 0 and frm not in protected:
+                    heapq.heappush(heap, self._key(frm))
+        self.evictions += len(victims)
+        return victims
+
+    def stats(self):
+        """stats() -> dict
+
+        Returns the counters and current usage of the cache.
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'memory': self.memory}
+
+
+##############################################################################
+
+class TestCacheManager(unittest.TestCase):
+    @staticmethod
+    def make_graph():
+        # 0 -> 1 -> 2, 0 -> 3
+        g = Graph()
+        for i in xrange(4):
+            g.add_vertex(i)
+        g.add_edge(0, 1)
+        g.add_edge(1, 2)
+        g.add_edge(0, 3)
+        return g
+
+    def test_unbounded(self):
+        m = CacheManager()
+        for i in xrange(4):
+            m.record_computed(i, 1.0, 1000)
+        self.assertEqual(m.select_victims(self.make_graph()), [])
+        self.assertEqual(m.stats()['memory'], 4000)
+
+    def test_lru(self):
+        m = CacheManager(max_entries=3)
+        for i in xrange(4):
+            m.record_computed(i, 1.0, 10)
+        m.record_hit(2)
+        # 3 was used before 2
+        self.assertEqual(m.select_victims(self.make_graph()), [3])
+        self.assertEqual(m.stats()['evictions'], 1)
+
+    def test_dependents(self):
+        m = CacheManager(max_entries=1)
+        for i in xrange(4):
+            m.record_computed(i, 1.0, 10)
+        # 1 can only go after 2, and 0 after both 1 and 3
+        victims = m.select_victims(self.make_graph())
+        self.assertEqual(victims, [2, 1, 3])
+
+    def test_protected(self):
+        m = CacheManager(max_entries=1)
+        for i in xrange(4):
+            m.record_computed(i, 1.0, 10)
+        victims = m.select_victims(self.make_graph(), protected=set([2]))
+        self.assertEqual(victims, [3])
+
+    def test_cost(self):
+        m = CacheManager(max_memory=2500, policy='cost')
+        m.record_computed(0, 1.0, 1000)
+        m.record_computed(2, 0.01, 1000)
+        m.record_computed(3, 5.0, 1000)
+        g = Graph()
+        for i in (0, 2, 3):
+            g.add_vertex(i)
+        # 2 is cheap to recompute
+        self.assertEqual(m.select_victims(g), [2])
+        m.forget(2)
+        self.assertEqual(m.stats()['memory'], 2000)
+
+    def test_estimate_size(self):
+        self.assertGreater(estimate_size('a' * 10000), 10000)
+        self.assertGreater(estimate_size(['a' * 100] * 1000), 100000)
+        try:
+            import numpy
+        except ImportError:
+            pass
+        else:
+            self.assertEqual(estimate_size(numpy.zeros((100,), 'f8')), 800)
@@ -0,0 +1,223 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""On-disk store for the outputs of cached modules.
+
+Outputs are keyed by the module's subpipeline signature (see
+:meth:`~vistrails.core.vistrail.pipeline.Pipeline.subpipeline_signature`),
+which only depends on the module, its parameters and its upstream. They can
+thus be reused by later runs or by other processes sharing the directory.
+"""
+
+from __future__ import division
+
+import cPickle as pickle
+import os
+import shutil
+import tempfile
+import unittest
+
+from vistrails.core import debug
+
+
+class UnstorableOutput(Exception):
+    """The outputs of a module can't be written to the disk cache.
+    """
+
+
+class OutputPickler(object):
+    """Default serializer for module outputs, following the pickle interface.
+
+    Outputs referencing VisTrails modules or paths are refused: these point
+    to objects (e.g. temporary files) that won't exist when the outputs are
+    restored.
+    """
+    @staticmethod
+    def _persistent_id(obj):
+        from vistrails.core.modules.basic_modules import PathObject
+        from vistrails.core.modules.vistrails_module import Module
+        if isinstance(obj, (Module, PathObject)):
+            raise UnstorableOutput("outputs reference a %s" %
+                                   type(obj).__name__)
+        return None
+
+    @classmethod
+    def dumps(cls, outputs):
+        f = tempfile.SpooledTemporaryFile()
+        pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = cls._persistent_id
+        try:
+            pickler.dump(outputs)
+        except UnstorableOutput:
+            raise
+        except Exception, e:
+            # Pickling runs arbitrary __reduce__/__getstate__ code
+            debug.warning("Couldn't pickle outputs", e)
+            raise UnstorableOutput(str(e))
+        f.seek(0)
+        return f.read()
+
+    @staticmethod
+    def loads(data):
+        return pickle.loads(data)
+
+
+class DiskCacheStore(object):
+    """Stores serialized module outputs in a directory.
+
+    Files are written atomically (to a temporary file which is then renamed)
+    so several processes can share the same directory.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, signature):
+        return os.path.join(self.directory, signature[:2], signature)
+
+    def has(self, signature):
+        return os.path.isfile(self._path(signature))
+
+    def get(self, signature, serializer=OutputPickler):
+        """get(signature: str, serializer) -> dict or None
+
+        Returns the outputs stored for that signature, or None.
+        """
+        try:
+            with open(self._path(signature), 'rb') as f:
+                data = f.read()
+        except IOError:
+            return None
+        try:
+            return serializer.loads(data)
+        except Exception, e:
+            debug.warning("Couldn't read cached outputs %s" % signature, e)
+            return None
+
+    def put(self, signature, outputs, serializer=OutputPickler):
+        """put(signature: str, outputs: dict, serializer) -> bool
+
+        Stores the outputs for that signature. Returns False if they can't
+        be serialized or written, in which case they are simply not cached.
+        """
+        try:
+            data = serializer.dumps(outputs)
+        except UnstorableOutput, e:
+            debug.log("Not storing outputs %s: %s" % (signature, e))
+            return False
+        except Exception, e:
+            debug.warning("Couldn't serialize outputs %s" % signature, e)
+            return False
+        path = self._path(signature)
+        dirname = os.path.dirname(path)
+        tmp = None
+        try:
+            if not os.path.isdir(dirname):
+                try:
+                    os.makedirs(dirname)
+                except OSError:
+                    # Created concurrently
+                    if not os.path.isdir(dirname):
+                        raise
+            fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if os.path.exists(path):
+                # Already written by another process
+                os.remove(tmp)
+            else:
+                os.rename(tmp, path)
+        except (IOError, OSError), e:
+            debug.warning("Couldn't write cached outputs %s" % signature, e)
+            if tmp is not None and os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return False
+        return True
+
+
+##############################################################################
+
+class TestDiskCacheStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vt_diskcache_')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_roundtrip(self):
+        store = DiskCacheStore(self.directory)
+        self.assertFalse(store.has('abcdef'))
+        self.assertIsNone(store.get('abcdef'))
+        self.assertTrue(store.put('abcdef', {'value': [1, 2.5, 'three']}))
+        self.assertTrue(store.has('abcdef'))
+        other = DiskCacheStore(self.directory)
+        self.assertEqual(other.get('abcdef'), {'value': [1, 2.5, 'three']})
+
+    def test_unstorable(self):
+        from vistrails.core.modules.basic_modules import PathObject
+        store = DiskCacheStore(self.directory)
+        self.assertFalse(store.put('abcdef',
+                                   {'value': [PathObject('/tmp/file')]}))
+        self.assertFalse(store.put('abcdef', {'value': lambda: 4}))
+        self.assertFalse(store.has('abcdef'))
+
+    def test_errors(self):
+        class Broken(object):
+            def __reduce__(self):
+                raise ValueError("can't pickle this")
+        store = DiskCacheStore(self.directory)
+        self.assertFalse(store.put('abcdef', {'value': Broken()}))
+        self.assertFalse(store.has('abcdef'))
+
+        # The cache directory can't be created
+        with open(os.path.join(self.directory, 'ab'), 'wb'):
+            pass
+        self.assertFalse(store.put('abcdef', {'value': 4}))
+        self.assertFalse(store.has('abcdef'))
+
+    def test_serializer(self):
+        class Upper(object):
+            @staticmethod
+            def dumps(outputs):
+                return outputs['value'].upper()
+
+            @staticmethod
+            def loads(data):
+                return {'value': data}
+        store = DiskCacheStore(self.directory)
+        store.put('abcdef', {'value': 'text'}, Upper)
+        self.assertEqual(store.get('abcdef', Upper), {'value': 'TEXT'})
@@ -66,6 +66,9 @@ autoConnect: Automatically connect dragged in modules
 autoSave: Automatically save backup vistrails every two minutes
 batch: Run in batch mode instead of interactive mode
 cache: Cache previous results so they may be used in future computations
+cacheMaxMemory: Maximum memory used by cached results (MB)
+cacheMaxModules: Maximum number of cached modules
+cachePolicy: Which cached results to evict first
 customVersionColors: Allow setting custom colors for versions
 dataDir: Default data directory
 db: The name for the database to load the vistrail from
@@ -73,11 +76,17 @@ dbDefault: Save vistrails in a database by default
 debugLevel: How much information should VisTrails log
 defaultFileType: Default file type/extension for vistrails (.vt or .xml)
 detachHistoryView: Show the version tree in a separate window
+diskCacheDir: Directory where results of modules are cached across runs
+diskCacheMinTime: Minimum compute time of results written to the disk cache
 dotVistrails: User configuration directory
 enablePackagesSilently: Automatically enable packages when needed
 errorLog: Write errors to a log file
 NoExecute: Do not execute specified workflows
 executionLog: Track execution provenance when running workflows
+executionLogBuffer: Size of the queue of events written to the log in background
+executionLogDatabase: SQLite database where executions are also recorded
+executionLogLoops: How much of the iterations of loops gets logged
+executionThreads: Number of threads used to run independent modules
 fileDir: Default vistrail directory
 fixedCustomVersionColorSaturation: Don't vary custom color with age
 fixedSpreadsheetCells: Draw spreadsheet cells at a fixed size
@@ -90,6 +99,8 @@ installBundlesWithPip: Use pip to install missing Python dependencies
 isInServerMode: Indicates whether VisTrails is being run as a server
 jobAutorun: Run jobs automatically when they finish
 jobCheckInterval: How often to check for jobs (in seconds)
+jobCheckMaxInterval: Longest time between two checks of a running job (in seconds)
+jobJournalDir: Directory where job state changes are recorded as they happen
 jobList: List running workflows
 jobInfo: List jobs in running workflow
 loadPackages: Whether to load the packages enabled in the configuration file
@@ -105,7 +116,10 @@ outputVersionTree: Output the version tree as an image
 packageDir: System packages directory
 parameterExploration: Run parameter exploration instead of workflow
 parameters: List of parameters to use when running workflow
+pipelineCacheMinVisits: Visits before an untagged version's workflow is cached
+pipelineCacheSize: Maximum size of the cached workflows used to switch versions
 port: The port for the database to load the vistrail from
+registrySnapshot: Registry snapshot file, to start without initializing packages
 reportUsage: Report anonymous usage statistics to the developers
 enableUsage: Enable sending anonymous usage statistics
 disableUsage: Disable sending anonymous usage statistics
@@ -146,6 +160,7 @@ upgrades: Attempt to automatically upgrade old workflows
 useMacBrushedMetalStyle: Use a brushed metal interface (MacOS X only)
 user: The username for the database to the load vistrail from
 userPackageDir: Local packages directory
+versionCheckpointInterval: Number of versions between workflow checkpoints
 viewOnLoad: Whether to show pipeline or history view when opening vistrail
 webRepositoryURL: Web repository URL
 webRepositoryUser: Web repository username
@@ -169,6 +184,23 @@ cache: Boolean
 
     Cache previous results so they may be used in future computations.
 
+cacheMaxMemory: Integer
+
+    The approximate amount of memory (in megabytes) the outputs of
+    cached modules may use before some of them are evicted. 0 means
+    no limit.
+
+cacheMaxModules: Integer
+
+    The number of modules that may be kept in the cache before some of
+    them are evicted. 0 means no limit.
+
+cachePolicy: String
+
+    How cached results are evicted when over budget: "lru" removes
+    the least recently used modules first, "cost" removes first the
+    modules that are cheapest to recompute for the memory they use.
+
 customVersionColors: Boolean
 
     Allow setting custom colors for versions, and display these colors in the
@@ -200,6 +232,19 @@ detachHistoryView: Boolean
 
     Show the version tree in a separate window.
 
+diskCacheDir: Path
+
+    If set, the outputs of cacheable modules are written to this
+    directory after they are computed, keyed by the signature of their
+    upstream pipeline, and are restored from it instead of running the
+    modules again, in later sessions or by other processes sharing
+    the directory.
+
+diskCacheMinTime: Float
+
+    Only the outputs of modules that took at least this many seconds
+    to compute are written to the disk cache.
+
 dotVistrails: Path
 
     The location to look for VisTrails user configurations and
@@ -222,6 +267,31 @@ executionLog: Boolean
 
     Track execution provenance when running workflows.
 
+executionLogBuffer: Integer
+
+    If greater than 0, the execution events of the modules are queued
+    in a buffer of that size and written to the log by a background
+    thread, in batches.
+
+executionLogDatabase: Path
+
+    If set, each workflow execution is also recorded in this SQLite
+    database, along with an index of its module executions by module
+    id, signature, version and time.
+
+executionLogLoops: String
+
+    Either 'all', to log each iteration of loops along with the modules
+    it runs, or 'summary', to only log the number of iterations on the
+    looping module.
+
+executionThreads: Integer
+
+    If greater than 1, the interpreter computes independent branches
+    of a workflow concurrently on that many threads. Only modules
+    flagged as thread-safe are run on the worker threads. Values of 0
+    or 1 execute the workflow serially.
+
 fileDir: Path
 
     The location that VisTrails uses as a default directory for
@@ -273,6 +343,18 @@ jobCheckInterval: Integer:
 
     How often to check for jobs (in seconds, default=600).
 
+jobCheckMaxInterval: Integer
+
+    A job that is still running after a check is checked again after
+    twice the previous delay, starting from jobCheckInterval, until this
+    limit is reached (in seconds, default=3600).
+
+jobJournalDir: Path
+
+    If set, changes to the jobs of each vistrail are appended to a file in
+    this directory as they happen, instead of only being saved with the
+    vistrail.
+
 jobList: Boolean
 
     List running workflows.
@@ -363,6 +445,19 @@ parameters: String
 
     List of parameters to use when running workflow.
 
+pipelineCacheMinVisits: Integer
+
+    The workflows of tagged versions are kept in memory to speed up
+    switching to nearby versions. Untagged versions are also kept once
+    they have been visited this many times, if rebuilding them costs
+    more than copying them. 0 only caches tagged versions.
+
+pipelineCacheSize: Integer
+
+    The total size, in modules, connections, functions and parameters,
+    of the workflows kept in memory to speed up version switching. The
+    least recently used ones are dropped first. 0 means no limit.
+
 port: Integer
 
     The port for the database to load the vistrail from.
@@ -375,6 +470,14 @@ recentVistrailList: String
 
     Storage for recent vistrails. Users should not edit.
 
+registrySnapshot: Path
+
+    If specified, VisTrails saves the module registry to this file after
+    initializing packages. On the next start without the GUI, packages
+    that did not change since are not initialized; their modules are
+    read from the file, and a package is initialized when one of its
+    modules is first used.
+
 reportUsage: Integer
 
     Report anonymous usage statistics to the developers
@@ -567,6 +670,14 @@ userPackageDir: Boolean
     The location for user-installed packages (defaults to
     ~/.vistrails/userpackages).
 
+versionCheckpointInterval: Integer
+
+    When a workflow is materialized from a vistrail, its current state
+    is recorded every this many versions along the way, so that later
+    versions can be built from the closest checkpoint instead of
+    replaying every action from the root. Checkpoints are saved in .vt
+    files. 0 disables adding new checkpoints.
+
 viewOnLoad: String
 
     Whether to show pipeline or history view when opening vistrail.
@@ -698,8 +809,26 @@ base_config = {
     [ConfigField('autoSave', True, bool, ConfigType.ON_OFF),
      ConfigField('dbDefault', False, bool, ConfigType.ON_OFF),
      ConfigField('cache', True, bool, ConfigType.ON_OFF),
+     ConfigField('cacheMaxModules', 0, int, depends_on='cache'),
+     ConfigField('cacheMaxMemory', 0, int, depends_on='cache'),
+     ConfigField('cachePolicy', 'lru', str, depends_on='cache',
+                 widget_type="combo",
+                 widget_options={"allowed_values": ["lru", "cost"],
+                                 "remap": {"lru": "Least Recently Used",
+                                           "cost": "Cost-Aware"}}),
+     ConfigField('diskCacheDir', None, ConfigPath, depends_on='cache'),
+     ConfigField('diskCacheMinTime', 1.0, float, depends_on='cache'),
      ConfigField('stopOnError', True, bool, ConfigType.ON_OFF),
      ConfigField('executionLog', True, bool, ConfigType.ON_OFF),
+     ConfigField('executionLogBuffer', 0, int, depends_on='executionLog'),
+     ConfigField('executionLogDatabase', None, ConfigPath,
+                 depends_on='executionLog'),
+     ConfigField('executionLogLoops', 'all', str, depends_on='executionLog',
+                 widget_type="combo",
+                 widget_options={"allowed_values": ["all", "summary"],
+                                 "remap": {"all": "Every Iteration",
+                                           "summary": "Summary Only"}}),
+     ConfigField('executionThreads', 0, int),
      ConfigField('errorLog', True, bool, ConfigType.ON_OFF),
      ConfigField('defaultFileType', system.vistrails_default_file_type(), str,
                  widget_type="combo",
@@ -784,7 +913,11 @@ base_config = {
      ConfigField('temporaryDir', None,  ConfigPath)],
     "Advanced":
     [ConfigField('singleInstance', True, bool, ConfigType.ON_OFF),
-     ConfigField('staticRegistry', None, ConfigPath)],
+     ConfigField('staticRegistry', None, ConfigPath),
+     ConfigField('registrySnapshot', None, ConfigPath),
+     ConfigField('pipelineCacheSize', 100000, int),
+     ConfigField('pipelineCacheMinVisits', 2, int),
+     ConfigField('versionCheckpointInterval', 100, int)],
     "Web Sharing":
     [ConfigField('webRepositoryURL', "http://www.crowdlabs.org", ConfigURL),
      ConfigField('webRepositoryUser', None, str)],
@@ -801,6 +934,8 @@ base_config = {
      ConfigField('lastShownNews', '', str, ConfigType.INTERNAL)],
     "Jobs":
     [ConfigField('jobCheckInterval', 600, int),
+     ConfigField('jobCheckMaxInterval', 3600, int),
+     ConfigField('jobJournalDir', None, ConfigPath),
      ConfigField('jobAutorun', False, bool),
      ConfigField('jobList', False, bool, ConfigType.COMMAND_LINE_FLAG),
      ConfigField('jobInfo', False, bool, ConfigType.COMMAND_LINE_FLAG)],
@@ -73,7 +73,13 @@ def run_and_get_results(w_list, parameters='',
     params = []
     result = []
     for locator, workflow in w_list:
-        (v, abstractions , thumbnails, mashups)  = load_vistrail(locator)
+        if (not update_vistrail and workflow is not None and
+                isinstance(locator, ZIPFileLocator)):
+            # the vistrail won't be saved, only read what this version needs
+            (v, abstractions , thumbnails, mashups) = \
+                load_vistrail(locator, versions=[workflow])
+        else:
+            (v, abstractions , thumbnails, mashups)  = load_vistrail(locator)
         controller = VistrailController(v, locator, abstractions, thumbnails,
                                         mashups, auto_save=update_vistrail)
         if isinstance(workflow, basestring):
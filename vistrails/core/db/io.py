@@ -65,7 +65,15 @@ def save_workflow(workflow, filename):
 def save_vistrail_to_xml(vistrail, filename):
     vistrails.db.services.io.save_vistrail_to_xml(vistrail, filename)
 
-def load_vistrail(locator, is_abstraction=False):
+def load_vistrail(locator, is_abstraction=False, versions=None):
+    """load_vistrail(locator, is_abstraction: bool, versions: list)
+         -> (Vistrail, list, list, list)
+
+    If versions is given, only the actions needed to run these versions
+    (tag names or version ids) are loaded; this is only supported by
+    ZIPFileLocator and the resulting vistrail cannot be saved.
+
+    """
     from vistrails.core.vistrail.vistrail import Vistrail
 
     abstraction_files = []
@@ -75,7 +83,10 @@ def load_vistrail(locator, is_abstraction=False):
     if locator is None:
         vistrail = Vistrail()
     else:
-        res = locator.load()
+        if versions is not None:
+            res = locator.load(versions=versions)
+        else:
+            res = locator.load()
         if type(res) == type(SaveBundle(None)):
             vistrail = res.vistrail
             abstraction_files.extend(res.abstractions)
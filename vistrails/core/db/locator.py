@@ -479,11 +479,11 @@ class ZIPFileLocator(_ZIPFileLocator, CoreLocator):
     def __init__(self, filename, **kwargs):
         _ZIPFileLocator.__init__(self, filename, **kwargs)
 
-    def load(self, klass=None):
+    def load(self, klass=None, versions=None):
         from vistrails.core.vistrail.vistrail import Vistrail
         if klass is None:
             klass = Vistrail
-        save_bundle = _ZIPFileLocator.load(self, klass.vtType)
+        save_bundle = _ZIPFileLocator.load(self, klass.vtType, versions)
         for obj in save_bundle.get_db_objs():
             klass = self.get_convert_klass(obj.vtType)
             klass.convert(obj)
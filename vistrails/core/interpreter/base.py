@@ -98,8 +98,9 @@ class BaseInterpreter(object):
         for alias in aliases:
             try:
                 info = pipeline.aliases[alias]
-                param = pipeline.db_get_object(info[0],info[1])
+                param = pipeline.own_object(info[0],info[1])
                 param.strValue = str(aliases[alias])
+                pipeline.invalidate_function_signature(info[3])
             except KeyError:
                 pass
                     
@@ -116,8 +117,9 @@ class BaseInterpreter(object):
         if customParams:
             for (vttype, oId, strval) in customParams:
                 try:
-                    param = pipeline.db_get_object(vttype,oId)
+                    param = pipeline.own_object(vttype,oId)
                     param.strValue = str(strval)
+                    pipeline.invalidate_parameter_signature(oId)
                 except Exception, e:
                     debug.debug("Problem when updating params", e)
 
@@ -128,9 +130,11 @@ class BaseInterpreter(object):
                 if vistrail_var is None: # assume set in parameter exploration
                     continue
                 strValue = vistrail_var.value
+                m = pipeline.own_module(m.id)
                 for func in m.functions:
                     if func.name == 'value':
                         func.params[0].strValue = strValue
+                pipeline.invalidate_module_signature(m.id)
 
     def set_done_summon_hook(self, hook):
         """ set_done_summon_hook(hook: function(pipeline, objects)) -> None
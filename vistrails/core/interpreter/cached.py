@@ -38,23 +38,30 @@ from __future__ import division
 
 import base64
 import copy
+import functools
 import gc
 import cPickle as pickle
-
+import threading
 import time
 
+from vistrails.core.cache.manager import CacheManager, module_size
+from vistrails.core.cache.store import DiskCacheStore, OutputPickler
 from vistrails.core.common import InstanceObject, VistrailsInternalError
+from vistrails.core.configuration import get_vistrails_configuration
 from vistrails.core.data_structures.bijectivedict import Bidict
 from vistrails.core import debug
 import vistrails.core.interpreter.base
 from vistrails.core.interpreter.base import AbortExecution
+from vistrails.core.interpreter.scheduler import ParallelScheduler
+from vistrails.core.log.buffered import BufferedLogController, LogWriter
 from vistrails.core.log.controller import DummyLogController
 from vistrails.core.modules.basic_modules import identifier as basic_pkg, \
                                                  Generator
 from vistrails.core.modules.module_registry import get_module_registry
-from vistrails.core.modules.vistrails_module import ModuleBreakpoint, \
-    ModuleConnector, ModuleError, ModuleErrors, ModuleHadError, \
-    ModuleSuspended, ModuleWasSuspended
+from vistrails.core.modules.vistrails_module import Module, \
+    ModuleBreakpoint, ModuleConnector, ModuleError, ModuleErrors, \
+    ModuleHadError, ModuleSuspended, ModuleWasSuspended
+from vistrails.core.packagemanager import get_package_manager
 from vistrails.core.reportusage import record_usage
 from vistrails.core.utils import DummyView
 import vistrails.core.system
@@ -63,23 +70,55 @@ import vistrails.core.vistrail.pipeline
 
 ###############################################################################
 
+def synchronized(method):
+    """Makes a method hold the object's `lock` while it runs.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def pulls_whole_upstream(module):
+    """Whether updating that module updates every module upstream of it.
+
+    Modules overriding update() or update_upstream() (If, Map, ...) might
+    only update some of their upstream, or do it later from compute().
+    """
+    cls = type(module)
+    return (cls.update.im_func is Module.update.im_func and
+            cls.update_upstream.im_func is Module.update_upstream.im_func)
+
+
 class ViewUpdatingLogController(object):
+    """Forwards the events from the modules to the view and the logger.
+
+    Modules might be updated from several threads (see
+    :class:`~vistrails.core.interpreter.scheduler.ParallelScheduler`), so all
+    the calls are serialized on a lock.
+    """
     class Loop(object):
-        def __init__(self, logger, view):
+        def __init__(self, logger, view, lock):
             self.log = logger
             self.view = view
+            self.lock = lock
 
+        @synchronized
         def end_loop_execution(self):
             self.log.finish_loop_execution()
 
+        @synchronized
         def begin_iteration(self, looped_obj, iteration):
             self.log.start_iteration(looped_obj, iteration)
 
+        @synchronized
         def end_iteration(self, looped_obj):
             self.log.finish_iteration(looped_obj)
 
     def __init__(self, logger, view, remap_id, ids,
                  module_executed_hook=[]):
+        self.lock = threading.RLock()
         self.log = logger
         self.view = view
         self.remap_id = remap_id
@@ -91,20 +130,32 @@ class ViewUpdatingLogController(object):
         self.executed = {}
         self.suspended = {}
         self.cached = {}
+        self.compute_times = {}
+        self._compute_start = {}
 
+    @synchronized
     def signalSuccess(self, obj):
         self.executed[obj.id] = True
+        start = self._compute_start.get(obj.id)
+        if start is not None:
+            self.compute_times[obj.id] = time.time() - start
         for callable_ in self.module_executed_hook:
             callable_(obj.id)
 
+    @synchronized
     def signalError(self, obj, error):
         self.errors[obj.id] = error
 
+    @synchronized
     def begin_update(self, obj):
         i = self.remap_id(obj.id)
         self.view.set_module_active(i)
 
+    @synchronized
     def begin_compute(self, obj):
+        # Loop iterations share the id of the looping module, only the
+        # outermost start time is kept
+        self._compute_start.setdefault(obj.id, time.time())
         i = self.remap_id(obj.id)
         self.view.set_module_computing(i)
 
@@ -113,14 +164,16 @@ class ViewUpdatingLogController(object):
 
         self.log.start_execution(obj, i, module_name)
 
+    @synchronized
     def update_progress(self, obj, progress=0.0):
         i = self.remap_id(obj.id)
         self.view.set_module_progress(i, progress)
 
+    @synchronized
     def begin_loop_execution(self, obj, total_iterations=None):
         return ViewUpdatingLogController.Loop(
                 self.log.start_loop_execution(obj, total_iterations),
-                self.view)
+                self.view, self.lock)
 
     def _handle_suspended(self, obj, error):
         """ _handle_suspended(obj: VistrailsModule, error: ModuleSuspended
@@ -138,6 +191,7 @@ class ViewUpdatingLogController(object):
         error.name = name
         jm.addParent(error)
 
+    @synchronized
     def end_update(self, obj, error=None, errorTrace=None,
             was_suspended=False):
         try:
@@ -170,6 +224,7 @@ class ViewUpdatingLogController(object):
         self.log.finish_execution(obj, msg, errorTrace,
                                   was_suspended)
 
+    @synchronized
     def update_cached(self, obj):
         self.cached[obj.id] = True
         i = self.remap_id(obj.id)
@@ -182,16 +237,20 @@ class ViewUpdatingLogController(object):
         self.view.set_module_not_executed(i)
         self.log.finish_execution(obj, '')
 
+    @synchronized
     def set_computing(self, obj):
         i = self.remap_id(obj.id)
         self.view.set_module_computing(i)
 
+    @synchronized
     def annotate(self, obj, d):
         self.log.insert_module_annotations(obj, d)
 
+    @synchronized
     def add_machine(self, machine):
         return self.log.add_machine(machine)
 
+    @synchronized
     def add_exec(self, exec_):
         return self.log.add_exec(exec_)
 
@@ -215,13 +274,19 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         self._objects = {}
         self.filePool = self._file_pool
         self._streams = []
+        self._scheduling = False
+        self._cache_manager = CacheManager()
+        self._disk_cache = None
+        self._finalizers = []
 
     def clear(self):
+        self.run_finalizers()
         self._file_pool.cleanup()
         self._persistent_pipeline.clear()
         for obj in self._objects.itervalues():
             obj.clear()
         self._objects = {}
+        self._cache_manager.clear()
 
     def __del__(self):
         self.clear()
@@ -240,6 +305,113 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         for v in dependencies:
             self._persistent_pipeline.delete_module(v)
             del self._objects[v]
+            self._cache_manager.forget(v)
+
+    def enforce_cache_limits(self, protected=()):
+        """enforce_cache_limits(protected: set of persistent module ids)
+
+        Evicts modules from the persistent pipeline until it fits the
+        'cacheMaxModules' and 'cacheMaxMemory' budgets, according to
+        'cachePolicy'. Modules in `protected` and their upstream are kept.
+        """
+        conf = get_vistrails_configuration()
+        self._cache_manager.set_limits(
+                getattr(conf, 'cacheMaxModules', 0),
+                getattr(conf, 'cacheMaxMemory', 0) * 1024 * 1024,
+                getattr(conf, 'cachePolicy', 'lru'))
+        victims = self._cache_manager.select_victims(
+                self._persistent_pipeline.graph, protected)
+        self.clean_modules(victims)
+
+    def get_cache_stats(self):
+        """get_cache_stats() -> dict
+
+        Returns the hit, miss and eviction counters of the persistent
+        pipeline, along with its number of entries and estimated memory
+        usage (in bytes).
+        """
+        return self._cache_manager.stats()
+
+    def get_disk_cache(self):
+        """get_disk_cache() -> DiskCacheStore
+
+        Returns the store for the 'diskCacheDir' option, or None if the disk
+        cache is disabled.
+        """
+        directory = vistrails.core.system.get_vistrails_directory(
+                'diskCacheDir')
+        if not directory:
+            return None
+        if (self._disk_cache is None or
+                self._disk_cache.directory != directory):
+            self._disk_cache = DiskCacheStore(directory)
+        return self._disk_cache
+
+    def restore_from_disk_cache(self, store, pipeline, tmp_id_to_module_map,
+                                sinks):
+        """restore_from_disk_cache(store: DiskCacheStore, pipeline: Pipeline,
+                                   tmp_id_to_module_map: dict, sinks: list)
+                -> (set, set)
+
+        Walks the pipeline upstream from the sinks, loading the outputs of
+        modules that are found in the store. These are then up-to-date and
+        their upstream doesn't need to run.
+
+        Returns the ids of the modules that still need to be updated, and
+        the persistent ids of the modules that can't be stored because they
+        depend on non-cacheable modules.
+        """
+        graph = pipeline.graph
+        unstable = set()
+        for i in graph.vertices_topological_sort():
+            obj = tmp_id_to_module_map[i]
+            if (not obj.is_cacheable() or
+                    any(tmp_id_to_module_map[frm].id in unstable
+                        for frm, _ in graph.edges_to(i))):
+                unstable.add(obj.id)
+
+        reg = get_module_registry()
+        needed = set()
+        to_visit = list(sinks)
+        while to_visit:
+            i = to_visit.pop()
+            if i in needed:
+                continue
+            needed.add(i)
+            obj = tmp_id_to_module_map[i]
+            if not obj.upToDate and obj.id not in unstable:
+                serializer = (reg.get_descriptor(obj.__class__).serializer or
+                              OutputPickler)
+                outputs = store.get(obj.signature, serializer)
+                if outputs is not None:
+                    for port, value in outputs.iteritems():
+                        obj.set_output(port, value)
+                    # Inputs are not needed anymore, dropping them so that
+                    # later executions don't update the upstream either
+                    obj.inputPorts = {}
+                    obj.upToDate = True
+                    continue
+            to_visit.extend(frm for frm, _ in graph.edges_to(i))
+        return needed, unstable
+
+    def store_to_disk_cache(self, store, obj, compute_time):
+        """store_to_disk_cache(store: DiskCacheStore, obj: Module,
+                               compute_time: float) -> None
+
+        Writes the outputs of a module that was just computed to the store,
+        if it took long enough.
+        """
+        min_time = getattr(get_vistrails_configuration(), 'diskCacheMinTime',
+                           0.0)
+        if compute_time < min_time or store.has(obj.signature):
+            return
+        reg = get_module_registry()
+        serializer = (reg.get_descriptor(obj.__class__).serializer or
+                      OutputPickler)
+        outputs = dict((port, value)
+                       for port, value in obj.outputPorts.iteritems()
+                       if port != 'self')
+        store.put(obj.signature, outputs, serializer)
 
     def clean_non_cacheable_modules(self):
         """clean_non_cacheable_modules() -> None
@@ -438,6 +610,45 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         return (tmp_id_to_module_map, tmp_to_persistent_module_map.inverse,
                 module_added_set, conn_added_set, to_delete, errors)
 
+    def update_module(self, obj, logging_obj):
+        """update_module(obj: Module, logging_obj: ViewUpdatingLogController)
+                -> bool or None
+
+        Updates a module and its upstream, reporting errors to the logger.
+
+        Returns None if the module is done (or was suspended), else a boolean
+        indicating whether the execution should be aborted even if
+        stopOnError is not set.
+        """
+        try:
+            obj.update()
+            return None
+        except ModuleWasSuspended:
+            return None
+        except ModuleHadError:
+            return False
+        except AbortExecution:
+            return True
+        except ModuleSuspended, ms:
+            ms.module.logging.end_update(ms.module, ms,
+                                         was_suspended=True)
+            return None
+        except ModuleErrors, mes:
+            abort = False
+            for me in mes.module_errors:
+                me.module.logging.end_update(me.module, me)
+                logging_obj.signalError(me.module, me)
+                abort = abort or me.abort
+            return abort
+        except ModuleError, me:
+            me.module.logging.end_update(me.module, me, me.errorTrace)
+            logging_obj.signalError(me.module, me)
+            return me.abort
+        except ModuleBreakpoint, mb:
+            mb.module.logging.end_update(mb.module)
+            logging_obj.signalError(mb.module, mb)
+            return True
+
     def execute_pipeline(self, pipeline, tmp_id_to_module_map, 
                          persistent_to_tmp_id_map, **kwargs):
         def fetch(name, default):
@@ -513,47 +724,77 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         # Note that we accept any module in 'sinks', even if it's not actually
         # a sink in the graph
         if sinks is not None:
-            persistent_sinks = [tmp_id_to_module_map[sink]
-                                for sink in sinks
-                                if sink in tmp_id_to_module_map]
+            sinks = [sink for sink in sinks if sink in tmp_id_to_module_map]
         else:
-            persistent_sinks = [tmp_id_to_module_map[sink]
-                                for sink in pipeline.graph.sinks()]
+            sinks = pipeline.graph.sinks()
 
         self._streams.append(Generator.generators)
         Generator.generators = []
 
-        # Update new sinks
-        for obj in persistent_sinks:
-            abort = False
+        disk_cache = self.get_disk_cache()
+        if disk_cache is not None:
+            needed, unstable = self.restore_from_disk_cache(
+                    disk_cache, pipeline, tmp_id_to_module_map, sinks)
+
+        nb_threads = getattr(get_vistrails_configuration(),
+                             'executionThreads', 0)
+        if nb_threads > 1 and not self._scheduling:
+            # Update every module upstream of the sinks, dispatching
+            # independent branches to the worker threads
+            reg = get_module_registry()
+            graph = pipeline.graph
+            # Modules that choose what to update upstream (If, Map, ...)
+            # pull it themselves; only schedule what update() would
+            scheduled = set()
+            lazy = set()
+            to_visit = list(sinks)
+            while to_visit:
+                i = to_visit.pop()
+                if i in scheduled:
+                    continue
+                scheduled.add(i)
+                if pulls_whole_upstream(tmp_id_to_module_map[i]):
+                    to_visit.extend(frm for frm, _ in graph.edges_to(i))
+                else:
+                    lazy.add(i)
+            def is_thread_safe(i):
+                obj = tmp_id_to_module_map[i]
+                if obj.upToDate or i in lazy:
+                    # Cached, no point in sending it to a thread; or
+                    # updating modules upstream on the calling thread
+                    return False
+                return reg.get_descriptor(obj.__class__).is_thread_safe
+            def run(i):
+                return self.update_module(tmp_id_to_module_map[i],
+                                          logging_obj)
+            inverse = graph.inverse_immutable()
+            order = inverse.vertices_topological_sort(sinks)
+            order.reverse()
+            order = [i for i in order if i in scheduled]
+            if disk_cache is not None:
+                # Upstream of modules restored from disk isn't needed
+                order = [i for i in order if i in needed]
+            upstream = dict((i, [frm for frm, _ in graph.edges_to(i)])
+                            for i in order)
+            for i in lazy:
+                # Whatever the module pulls must not be running on a
+                # worker thread at the same time
+                upstream[i] = list(inverse.bfs(i))
+            self._scheduling = True
             try:
-                obj.update()
-                continue
-            except ModuleWasSuspended:
-                continue
-            except ModuleHadError:
-                pass
-            except AbortExecution:
-                break
-            except ModuleSuspended, ms:
-                ms.module.logging.end_update(ms.module, ms,
-                                             was_suspended=True)
-                continue
-            except ModuleErrors, mes:
-                for me in mes.module_errors:
-                    me.module.logging.end_update(me.module, me)
-                    logging_obj.signalError(me.module, me)
-                    abort = abort or me.abort
-            except ModuleError, me:
-                me.module.logging.end_update(me.module, me, me.errorTrace)
-                logging_obj.signalError(me.module, me)
-                abort = me.abort
-            except ModuleBreakpoint, mb:
-                mb.module.logging.end_update(mb.module)
-                logging_obj.signalError(mb.module, mb)
-                abort = True
-            if stop_on_error or abort:
-                break
+                ParallelScheduler(nb_threads).execute(
+                        order, upstream, run, is_thread_safe, stop_on_error)
+            finally:
+                self._scheduling = False
+        else:
+            # Update new sinks
+            for sink in sinks:
+                abort = self.update_module(tmp_id_to_module_map[sink],
+                                           logging_obj)
+                if abort is None:
+                    continue
+                if stop_on_error or abort:
+                    break
 
         if Generator.generators:
             record_usage(generators=len(Generator.generators))
@@ -593,6 +834,18 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
 
         Generator.generators = self._streams.pop()
 
+        # Update the cache bookkeeping
+        for i in set(obj.id for obj in tmp_id_to_module_map.itervalues()):
+            if i in logging_obj.executed:
+                compute_time = logging_obj.compute_times.get(i, 0.0)
+                self._cache_manager.record_computed(
+                        i, compute_time, module_size(self._objects[i]))
+                if disk_cache is not None and i not in unstable:
+                    self.store_to_disk_cache(disk_cache, self._objects[i],
+                                             compute_time)
+            elif i in logging_obj.cached:
+                self._cache_manager.record_hit(i)
+
         if self.done_update_hook:
             self.done_update_hook(self._persistent_pipeline, self._objects)
                 
@@ -634,6 +887,27 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
 
         return (to_delete, objs, errs, execs, suspends, caches, parameter_changes)
 
+    def add_finalizer(self, finalizer):
+        """add_finalizer(finalizer: callable) -> None
+
+        Registers a function to call once the current call to execute() is
+        over, whether it succeeded, failed or was stopped. Modules use this
+        to release resources that downstream modules were meant to take
+        over. Finishing a group's pipeline doesn't run them, since the
+        downstream modules might be outside of the group.
+        """
+        self._finalizers.append(finalizer)
+
+    def run_finalizers(self):
+        finalizers, self._finalizers = self._finalizers, []
+        for finalizer in finalizers:
+            try:
+                finalizer()
+            except Exception, e:
+                debug.unexpected_exception(e)
+                debug.critical("Exception running finalizer: %s" % e,
+                               debug.format_exc())
+
     def finalize_pipeline(self, pipeline, to_delete, objs, errs, execs,
                           suspended, cached, **kwargs):
         def fetch(name, default):
@@ -746,21 +1020,34 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         logger = logger.start_workflow_execution(
                 parent_exec,
                 vistrail, pipeline, current_version)
+        buffer_size = getattr(get_vistrails_configuration(),
+                              'executionLogBuffer', 0)
+        if buffer_size > 0 and logger is not DummyLogController:
+            logger = BufferedLogController(LogWriter(buffer_size), logger)
         new_kwargs['logger'] = logger
         self.annotate_workflow_execution(logger, reason, aliases, params)
 
-        res = self.setup_pipeline(pipeline, **new_kwargs)
-        modules_added = res[2]
-        conns_added = res[3]
-        to_delete = res[4]
-        errors = res[5]
-        if len(errors) == 0:
-            res = self.execute_pipeline(pipeline, *(res[:2]), **new_kwargs)
-        else:
-            res = (to_delete, res[0], errors, {}, {}, {}, [])
-            for (i, error) in errors.iteritems():
-                view.set_module_error(i, error.msg, error.errorTrace)
-        self.finalize_pipeline(pipeline, *(res[:-1]), **new_kwargs)
+        # Finalizers registered during this execution (and not by an
+        # execution this one is nested in, or a group's pipeline)
+        outer_finalizers, self._finalizers = self._finalizers, []
+        try:
+            res = self.setup_pipeline(pipeline, **new_kwargs)
+            modules_added = res[2]
+            conns_added = res[3]
+            to_delete = res[4]
+            errors = res[5]
+            if len(errors) == 0:
+                res = self.execute_pipeline(pipeline, *(res[:2]),
+                                            **new_kwargs)
+            else:
+                res = (to_delete, res[0], errors, {}, {}, {}, [])
+                for (i, error) in errors.iteritems():
+                    view.set_module_error(i, error.msg, error.errorTrace)
+            self.finalize_pipeline(pipeline, *(res[:-1]), **new_kwargs)
+        finally:
+            self.run_finalizers()
+            self._finalizers = outer_finalizers
+        self.enforce_cache_limits(set(obj.id for obj in res[1].itervalues()))
         time_end = time.time()
 
         result = InstanceObject(objects=res[1],
@@ -810,7 +1097,14 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         connection_id_map = Bidict()
         modules_added = set()
         connections_added = set()
-        pipeline.refresh_signatures()
+        # Packages read from the registry snapshot can register custom
+        # hashers when they get initialized, which has to happen first
+        for module in pipeline.modules.itervalues():
+            descriptor = module.module_descriptor
+            if descriptor.deferred:
+                get_package_manager().initialize_deferred_package(
+                        descriptor.deferred_package)
+        pipeline.compute_signatures()
         # we must traverse vertices in topological sort order
         verts = pipeline.graph.vertices_topological_sort()
         for new_module_id in verts:
@@ -859,7 +1153,7 @@ class CachedInterpreter(vistrails.core.interpreter.base.BaseInterpreter):
         object_map = {}
         module_id_map = {}
         connection_id_map = {}
-        pipeline.refresh_signatures()
+        pipeline.compute_signatures()
         # we must traverse vertices in topological sort order
         verts = pipeline.graph.vertices_topological_sort()
         for module_id in verts:
@@ -958,6 +1252,222 @@ class TestCachedInterpreter(unittest.TestCase):
         finally:
             StandardOutput.compute = old_compute
 
+    def test_cache_limits(self):
+        from vistrails.core.modules.basic_modules import StandardOutput
+        old_compute = StandardOutput.compute
+        StandardOutput.compute = lambda s: None
+
+        conf = get_vistrails_configuration()
+        old_max = getattr(conf, 'cacheMaxModules', 0)
+        try:
+            from vistrails.core.db.locator import XMLFileLocator
+            from vistrails.core.vistrail.controller import VistrailController
+            from vistrails.core.db.io import load_vistrail
+
+            locator = XMLFileLocator(
+                    vistrails.core.system.vistrails_root_directory() +
+                    '/tests/resources/dummy.xml')
+            v = load_vistrail(locator)[0]
+            controller = VistrailController(v, locator)
+            n = v.get_version_number('int chain')
+            controller.change_selected_version(n)
+            controller.flush_delayed_actions()
+            pipeline = controller.current_pipeline
+            interpreter = CachedInterpreter()
+
+            interpreter.execute(pipeline, locator=v,
+                                current_version=n, view=DummyView())
+            stats = interpreter.get_cache_stats()
+            nb_modules = stats['entries']
+            self.assertGreater(nb_modules, 1)
+            self.assertEqual((stats['hits'], stats['misses']),
+                             (0, nb_modules))
+
+            interpreter.execute(pipeline, locator=v,
+                                current_version=n, view=DummyView())
+            stats = interpreter.get_cache_stats()
+            # StandardOutput is not cacheable and runs again
+            self.assertEqual((stats['hits'], stats['misses']),
+                             (nb_modules - 1, nb_modules + 1))
+
+            conf.cacheMaxModules = 1
+            interpreter.enforce_cache_limits()
+            stats = interpreter.get_cache_stats()
+            self.assertEqual(stats['entries'], 1)
+            self.assertEqual(stats['evictions'], nb_modules - 1)
+            self.assertEqual(len(interpreter._objects), 1)
+        finally:
+            conf.cacheMaxModules = old_max
+            StandardOutput.compute = old_compute
+
+    def test_disk_cache(self):
+        import shutil
+        import tempfile
+        from vistrails.tests.utils import execute, intercept_result
+        from vistrails.packages.pythonCalc.init import PythonCalc
+
+        computed = []
+        old_compute = PythonCalc.compute
+        def compute(self):
+            computed.append(self)
+            old_compute(self)
+        PythonCalc.compute = compute
+
+        conf = get_vistrails_configuration()
+        old_dir = conf.diskCacheDir if conf.has('diskCacheDir') else None
+        old_time = getattr(conf, 'diskCacheMinTime', 1.0)
+        conf.diskCacheDir = tempfile.mkdtemp(prefix='vt_diskcache_')
+        conf.diskCacheMinTime = 0.0
+        try:
+            def run():
+                with intercept_result(PythonCalc, 'value') as results:
+                    self.assertFalse(execute([
+                            ('PythonCalc', 'org.vistrails.vistrails.pythoncalc',
+                             [('value1', [('Float', '2')]),
+                              ('value2', [('Float', '3')]),
+                              ('op', [('String', '*')])]),
+                            ('PythonCalc', 'org.vistrails.vistrails.pythoncalc',
+                             [('value2', [('Float', '1')]),
+                              ('op', [('String', '+')])]),
+                        ],
+                        [(0, 'value', 1, 'value1')]))
+                return results
+            self.assertEqual(run(), [6.0, 7.0])
+            self.assertEqual(len(computed), 2)
+            # The non-cached interpreter starts from scratch, but the last
+            # module is restored from disk and its upstream doesn't run
+            # (its output port only gets enabled, with None)
+            self.assertEqual(run(), [None, 7.0])
+            self.assertEqual(len(computed), 2)
+        finally:
+            shutil.rmtree(conf.diskCacheDir)
+            conf.diskCacheDir = old_dir
+            conf.diskCacheMinTime = old_time
+            PythonCalc.compute = old_compute
+
+    def test_parallel(self):
+        """Runs independent branches on worker threads."""
+        from vistrails.tests.utils import execute, intercept_result
+        from vistrails.packages.pythonCalc.init import PythonCalc
+
+        conf = get_vistrails_configuration()
+        old_threads = getattr(conf, 'executionThreads', 0)
+        conf.executionThreads = 4
+        try:
+            # Four branches of two PythonCalc each, summed by a third layer
+            modules = []
+            connections = []
+            for i in xrange(4):
+                modules.append(('PythonCalc',
+                                'org.vistrails.vistrails.pythoncalc', [
+                                    ('value1', [('Float', str(i))]),
+                                    ('value2', [('Float', '10')]),
+                                    ('op', [('String', '*')])]))
+                modules.append(('PythonCalc',
+                                'org.vistrails.vistrails.pythoncalc', [
+                                    ('value2', [('Float', '1')]),
+                                    ('op', [('String', '+')])]))
+                connections.append((2 * i, 'value', 2 * i + 1, 'value1'))
+            for i in xrange(2):
+                modules.append(('PythonCalc',
+                                'org.vistrails.vistrails.pythoncalc', [
+                                    ('op', [('String', '+')])]))
+                connections.append((4 * i + 1, 'value', 8 + i, 'value1'))
+                connections.append((4 * i + 3, 'value', 8 + i, 'value2'))
+            with intercept_result(PythonCalc, 'value') as results:
+                self.assertFalse(execute(modules, connections))
+            self.assertEqual(sorted(results),
+                             [0.0, 1.0, 10.0, 11.0, 12.0,
+                              20.0, 21.0, 30.0, 31.0, 52.0])
+        finally:
+            conf.executionThreads = old_threads
+
+    def test_finalizers(self):
+        """Finalizers run at the end of execute(), not of a group.
+        """
+        import urllib2
+        from vistrails.core.modules.basic_modules import PythonSource
+        from vistrails.tests.utils import execute, intercept_results
+
+        source = ("finalized = []\n"
+                  "self.interpreter.add_finalizer(\n"
+                  "    lambda: finalized.append(True))\n"
+                  "# What Group.compute() does once its pipeline is done\n"
+                  "self.interpreter.finalize_pipeline(\n"
+                  "    None, [], {}, {}, {}, {}, {}, reset_computed=False)\n"
+                  "in_group = bool(finalized)\n")
+        with intercept_results(PythonSource, 'in_group',
+                               PythonSource, 'finalized') as (in_group,
+                                                              finalized):
+            self.assertFalse(execute([
+                    ('PythonSource', 'org.vistrails.vistrails.basic', [
+                        ('source', [('String', urllib2.quote(source))]),
+                    ]),
+                ],
+                add_port_specs=[
+                    (0, 'output', 'in_group',
+                     'org.vistrails.vistrails.basic:Boolean'),
+                    (0, 'output', 'finalized',
+                     'org.vistrails.vistrails.basic:List'),
+                ]))
+        self.assertEqual(in_group, [False])
+        self.assertEqual(finalized, [[True]])
+
+    def test_parallel_lazy_upstream(self):
+        """Modules choosing what to update upstream are respected.
+        """
+        from vistrails.packages.controlflow.conditional import If
+        from vistrails.packages.controlflow.fold import FoldWithModule
+        from vistrails.tests.utils import execute, intercept_result
+
+        conf = get_vistrails_configuration()
+        old_threads = getattr(conf, 'executionThreads', 0)
+        conf.executionThreads = 4
+        try:
+            for val in (True, False):
+                with intercept_result(If, 'Result') as results:
+                    interp_dict = execute([
+                            ('If', 'org.vistrails.vistrails.control_flow', [
+                                ('FalseOutputPorts', [('List', "['value']")]),
+                                ('TrueOutputPorts', [('List', "['value']")]),
+                                ('Condition', [('Boolean', str(val))]),
+                            ]),
+                            ('Integer', 'org.vistrails.vistrails.basic', [
+                                ('value', [('Integer', '42')]),
+                            ]),
+                            ('Integer', 'org.vistrails.vistrails.basic', [
+                                ('value', [('Integer', '28')]),
+                            ]),
+                        ],
+                        [
+                            (1, 'self', 0, 'TruePort'),
+                            (2, 'self', 0, 'FalsePort'),
+                        ],
+                        full_results=True)
+                self.assertFalse(interp_dict.errors)
+                self.assertEqual(results, [42 if val else 28])
+                self.assertEqual(interp_dict.executed,
+                                 {0: True, 1: val, 2: not val})
+
+            with intercept_result(FoldWithModule, 'Result') as results:
+                self.assertFalse(execute([
+                        ('PythonCalc', 'org.vistrails.vistrails.pythoncalc', [
+                            ('value2', [('Float', '1.0')]),
+                            ('op', [('String', '+')]),
+                        ]),
+                        ('Map', 'org.vistrails.vistrails.control_flow', [
+                            ('InputPort', [('List', "['value1']")]),
+                            ('OutputPort', [('String', 'value')]),
+                            ('InputList', [('List', '[1.0, 2.0, 3.0]')]),
+                        ]),
+                    ],
+                    [
+                        (0, 'self', 1, 'FunctionPort'),
+                    ]))
+            self.assertEqual(results, [[2.0, 3.0, 4.0]])
+        finally:
+            conf.executionThreads = old_threads
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,336 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Dispatches the modules of a pipeline to a pool of threads.
+
+The interpreter normally updates the sinks one after the other, each module
+pulling its upstream recursively. When the 'executionThreads' option is set,
+:class:`ParallelScheduler` is used instead: it walks the pipeline in
+topological order and runs every module whose upstream is done on a worker
+thread, so that independent branches are computed concurrently.
+
+Only modules flagged as ``thread_safe`` in their
+:class:`~vistrails.core.modules.config.ModuleSettings` are sent to the workers;
+the others are run by the calling thread, one at a time.
+
+:func:`map_iterations` is used to run the iterations of a module looping over
+lists on a pool of threads (see ModuleControlParam.LOOP_PARALLEL_KEY).
+"""
+
+from __future__ import division
+
+from collections import deque
+import Queue
+import sys
+import threading
+
+from vistrails.core import debug
+
+
+class ParallelScheduler(object):
+    """Runs tasks organized as a DAG on a pool of threads.
+
+    Tasks are identified by ids; a task is started once all of its upstream
+    tasks have finished (whatever their outcome). The `run` callable executes
+    one task and returns None if it went fine, or a boolean indicating
+    whether the whole execution should be aborted if it failed.
+    """
+    def __init__(self, nb_threads):
+        self.nb_threads = nb_threads
+
+    def execute(self, order, upstream, run, is_thread_safe,
+                stop_on_error=True):
+        """execute(order: list, upstream: dict, run: callable,
+                   is_thread_safe: callable, stop_on_error: bool) -> bool
+
+        `order` lists the ids of the tasks to run, in topological order;
+        `upstream` maps each of them to the ids it depends on (ids that are
+        not in `order` are ignored).
+
+        Returns True if the execution was stopped early because of an error.
+        """
+        waiting_on = {}
+        downstream = dict((i, []) for i in order)
+        ready = deque()
+        for i in order:
+            deps = set(d for d in upstream.get(i, ()) if d in downstream)
+            for d in deps:
+                downstream[d].append(i)
+            if deps:
+                waiting_on[i] = deps
+            else:
+                ready.append(i)
+
+        nb_threads = min(self.nb_threads,
+                         sum(1 for i in order if is_thread_safe(i)))
+        tasks = Queue.Queue()
+        results = Queue.Queue()
+
+        def worker():
+            while True:
+                i = tasks.get()
+                if i is None:
+                    return
+                try:
+                    res = run(i)
+                except Exception, e:
+                    # run() is expected to handle module errors itself
+                    debug.unexpected_exception(e)
+                    debug.critical("Exception in worker thread: %s" % e,
+                                   debug.format_exc())
+                    res = True
+                results.put((i, res))
+
+        threads = []
+        for n in xrange(nb_threads):
+            t = threading.Thread(target=worker,
+                                 name='vistrails-scheduler-%d' % n)
+            t.daemon = True
+            t.start()
+            threads.append(t)
+
+        local = deque()
+        running = 0
+        stopped = False
+        try:
+            while True:
+                while ready and not stopped:
+                    i = ready.popleft()
+                    if nb_threads and is_thread_safe(i):
+                        tasks.put(i)
+                        running += 1
+                    else:
+                        local.append(i)
+                if local and not stopped:
+                    i = local.popleft()
+                    res = run(i)
+                elif running:
+                    i, res = results.get()
+                    running -= 1
+                else:
+                    break
+                if res is not None and (stop_on_error or res):
+                    stopped = True
+                for d in downstream[i]:
+                    deps = waiting_on[d]
+                    deps.discard(i)
+                    if not deps:
+                        del waiting_on[d]
+                        ready.append(d)
+        finally:
+            for t in threads:
+                tasks.put(None)
+            if sys.exc_info()[0] is None:
+                for t in threads:
+                    t.join()
+        return stopped
+
+
+def map_iterations(function, nb_items, nb_threads, chunk_size=None,
+                   progress=None):
+    """map_iterations(function: callable, nb_items: int, nb_threads: int,
+                      chunk_size: int, progress: callable) -> list
+
+    Calls `function(i)` for each i in ``xrange(nb_items)`` on a pool of
+    threads and returns the results in order.
+
+    Consecutive items are handed to the threads in chunks of `chunk_size`, so
+    that short iterations don't spend most of their time on the queues; by
+    default, each thread gets about 4 chunks. `progress` is called with the
+    number of items done so far, from the calling thread.
+
+    If a call raises, no new items are started, and the exception is raised
+    again once the running ones are done.
+    """
+    if chunk_size is None:
+        chunk_size = max(1, nb_items // (nb_threads * 4))
+    chunks = Queue.Queue()
+    for start in xrange(0, nb_items, chunk_size):
+        chunks.put(xrange(start, min(start + chunk_size, nb_items)))
+    nb_threads = min(nb_threads, chunks.qsize())
+
+    results = [None] * nb_items
+    done = Queue.Queue()
+    errors = []
+
+    def worker():
+        while not errors:
+            try:
+                chunk = chunks.get_nowait()
+            except Queue.Empty:
+                break
+            try:
+                for i in chunk:
+                    results[i] = function(i)
+                    done.put(True)
+            except Exception:
+                errors.append(sys.exc_info())
+                break
+        done.put(None)
+
+    for n in xrange(nb_threads):
+        t = threading.Thread(target=worker,
+                             name='vistrails-iteration-%d' % n)
+        t.daemon = True
+        t.start()
+
+    nb_done = 0
+    running = nb_threads
+    while running:
+        if done.get():
+            nb_done += 1
+            if progress is not None:
+                progress(nb_done)
+        else:
+            running -= 1
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+    return results
+
+###############################################################################
+
+import unittest
+
+
+class TestParallelScheduler(unittest.TestCase):
+    def make_run(self, log, failing=(), lock=None):
+        lock = lock or threading.Lock()
+        def run(i):
+            with lock:
+                log.append(i)
+            if i in failing:
+                return failing[i]
+            return None
+        return run
+
+    def test_order(self):
+        # 1 -> 3, 2 -> 3, 3 -> 4, 1 -> 5
+        upstream = {3: [1, 2], 4: [3], 5: [1]}
+        log = []
+        stopped = ParallelScheduler(4).execute(
+                [1, 2, 3, 4, 5], upstream, self.make_run(log),
+                lambda i: True)
+        self.assertFalse(stopped)
+        self.assertEqual(sorted(log), [1, 2, 3, 4, 5])
+        for i, deps in upstream.iteritems():
+            for d in deps:
+                self.assertLess(log.index(d), log.index(i))
+
+    def test_concurrent(self):
+        # Both branches have to be running at the same time for this to end
+        barrier = threading.Event()
+        started = []
+        def run(i):
+            started.append(i)
+            if len(started) == 2:
+                barrier.set()
+            if not barrier.wait(5):
+                return True
+            return None
+        stopped = ParallelScheduler(2).execute([1, 2], {}, run,
+                                               lambda i: True)
+        self.assertFalse(stopped)
+
+    def test_not_thread_safe(self):
+        main = threading.current_thread()
+        threads = {}
+        def run(i):
+            threads[i] = threading.current_thread()
+        ParallelScheduler(2).execute([1, 2, 3], {3: [1, 2]}, run,
+                                     lambda i: i != 2)
+        self.assertIs(threads[2], main)
+        self.assertIsNot(threads[1], main)
+
+    def test_stop_on_error(self):
+        log = []
+        stopped = ParallelScheduler(2).execute(
+                [1, 2, 3], {2: [1], 3: [2]},
+                self.make_run(log, {1: False}), lambda i: True)
+        self.assertTrue(stopped)
+        self.assertEqual(log, [1])
+
+    def test_continue_on_error(self):
+        log = []
+        stopped = ParallelScheduler(2).execute(
+                [1, 2, 3], {2: [1]},
+                self.make_run(log, {1: False}), lambda i: True,
+                stop_on_error=False)
+        self.assertFalse(stopped)
+        self.assertEqual(sorted(log), [1, 2, 3])
+
+    def test_abort(self):
+        log = []
+        stopped = ParallelScheduler(2).execute(
+                [1, 2], {2: [1]},
+                self.make_run(log, {1: True}), lambda i: True,
+                stop_on_error=False)
+        self.assertTrue(stopped)
+        self.assertEqual(log, [1])
+
+
+class TestMapIterations(unittest.TestCase):
+    def test_order(self):
+        for chunk_size in (None, 1, 3, 100):
+            self.assertEqual(
+                    map_iterations(lambda i: i * 2, 50, 4, chunk_size),
+                    range(0, 100, 2))
+        self.assertEqual(map_iterations(lambda i: i, 0, 4), [])
+
+    def test_concurrent(self):
+        barrier = threading.Event()
+        started = []
+        def function(i):
+            started.append(i)
+            if len(started) == 2:
+                barrier.set()
+            return barrier.wait(5)
+        self.assertEqual(map_iterations(function, 2, 2), [True, True])
+
+    def test_progress(self):
+        progress = []
+        map_iterations(lambda i: i, 10, 3, progress=progress.append)
+        self.assertEqual(progress, range(1, 11))
+
+    def test_error(self):
+        calls = []
+        def function(i):
+            calls.append(i)
+            if i == 0:
+                raise ValueError("failed")
+            return i
+        with self.assertRaises(ValueError):
+            map_iterations(function, 100, 2, chunk_size=50)
+        # The other chunk might have been started
+        self.assertLessEqual(len(calls), 51)
@@ -0,0 +1,296 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Log controller recording the execution events from a background thread.
+
+Building the log objects for each module execution happens in the update
+path of the modules, which is expensive for workflows running many short
+modules, such as long implicit loops. When the 'executionLogBuffer' option is
+set, the interpreter wraps the log controller in a
+:class:`BufferedLogController`: the events are only timestamped and queued,
+and a :class:`LogWriter` thread applies them to the actual controller in
+batches. The queue is bounded, so that a slow writer holds back the execution
+instead of using up memory.
+
+Calls that return information from the log first wait for the queue to be
+empty.
+"""
+
+from __future__ import division
+
+import Queue
+import threading
+
+from vistrails.core import debug
+import vistrails.core.system
+
+
+class LogWriter(object):
+    """Applies queued log events on a background thread.
+    """
+    BATCH_SIZE = 256
+
+    def __init__(self, size):
+        self.events = Queue.Queue(size)
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run,
+                                       name='vistrails-log-writer')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, event):
+        """Queues an event, waiting if the buffer is full.
+
+        An event is a tuple (controller, method_name, args, kwargs, result):
+        the method is called on the target of the BufferedLogController, and
+        if result is not None, it is a BufferedLogController that gets the
+        return value as its target.
+        """
+        self.events.put(event)
+
+    def _run(self):
+        while True:
+            batch = [self.events.get()]
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self.events.get_nowait())
+            except Queue.Empty:
+                pass
+            stop = False
+            with self.lock:
+                for event in batch:
+                    if event is None:
+                        stop = True
+                    else:
+                        self._apply(*event)
+            for event in batch:
+                self.events.task_done()
+            if stop:
+                return
+
+    def _apply(self, controller, name, args, kwargs, result):
+        try:
+            value = getattr(controller._target, name)(*args, **kwargs)
+        except Exception, e:
+            debug.critical("Error writing execution log: %s" % e,
+                           debug.format_exc())
+        else:
+            if result is not None:
+                result._target = value
+
+    def flush(self):
+        """Waits until all the queued events have been applied.
+        """
+        self.events.join()
+
+    def close(self):
+        """Applies the remaining events and stops the thread.
+        """
+        self.events.put(None)
+        self.thread.join()
+
+
+class BufferedLogController(object):
+    """Log controller queuing events to a LogWriter.
+
+    This wraps a LogWorkflowController, or the LogLoopController or
+    LogWorkflowController it returns (in which case the target is only known
+    once the writer gets to that event).
+    """
+    def __init__(self, writer, target=None):
+        self._writer = writer
+        self._target = target
+
+    def _post(self, name, *args, **kwargs):
+        self._writer.put((self, name, args, kwargs, None))
+
+    def _post_timed(self, name, *args, **kwargs):
+        kwargs['ts'] = vistrails.core.system.current_time()
+        self._writer.put((self, name, args, kwargs, None))
+
+    def _call(self, name, *args, **kwargs):
+        self._writer.flush()
+        with self._writer.lock:
+            return getattr(self._target, name)(*args, **kwargs)
+
+    def _chain(self, name, *args, **kwargs):
+        result = BufferedLogController(self._writer)
+        self._writer.put((self, name, args, kwargs, result))
+        return result
+
+    # LogWorkflowController
+
+    def start_execution(self, module, module_id, module_name, cached=0):
+        self._post_timed('start_execution', module, module_id, module_name,
+                         cached)
+
+    def finish_execution(self, module, error, errorTrace=None,
+                         suspended=False):
+        self._post_timed('finish_execution', module, error, errorTrace,
+                         suspended)
+
+    def start_loop_execution(self, loop_module, total_iterations=None):
+        return self._chain('start_loop_execution', loop_module,
+                           total_iterations,
+                           ts=vistrails.core.system.current_time())
+
+    def recursing(self, parent_exec):
+        return self._chain('recursing', parent_exec)
+
+    def insert_module_annotations(self, module, a_dict):
+        self._post('insert_module_annotations', module, dict(a_dict))
+
+    def insert_workflow_exec_annotations(self, a_dict):
+        return self._call('insert_workflow_exec_annotations', a_dict)
+
+    def get_iteration_from_module(self, module):
+        return self._call('get_iteration_from_module', module)
+
+    def add_machine(self, machine):
+        return self._call('add_machine', machine)
+
+    def add_exec(self, exec_):
+        return self._call('add_exec', exec_)
+
+    def finish_workflow_execution(self, errors, suspended=False):
+        self._writer.close()
+        return self._target.finish_workflow_execution(errors,
+                                                      suspended=suspended)
+
+    # LogLoopController
+
+    def start_iteration(self, looped_module, iteration):
+        self._post_timed('start_iteration', looped_module, iteration)
+
+    def finish_iteration(self, looped_module):
+        self._post_timed('finish_iteration', looped_module)
+
+    def finish_loop_execution(self):
+        self._post_timed('finish_loop_execution')
+
+    def __getattr__(self, name):
+        # Other attributes are read from the target, once it is up to date
+        if name.startswith('_'):
+            raise AttributeError(name)
+        self._writer.flush()
+        return getattr(self._target, name)
+
+###############################################################################
+
+import unittest
+
+
+class TestBufferedLog(unittest.TestCase):
+    def run_loop(self, buffer_size=0, loops='all'):
+        """Runs a PythonCalc looping over a list, returns its log.
+        """
+        from vistrails.core.configuration import get_vistrails_configuration
+        from vistrails.core.log.controller import LogController
+        from vistrails.core.log.log import Log
+        from vistrails.tests.utils import execute
+
+        conf = get_vistrails_configuration()
+        old_buffer = getattr(conf, 'executionLogBuffer', 0)
+        old_loops = getattr(conf, 'executionLogLoops', 'all')
+        conf.executionLogBuffer = buffer_size
+        conf.executionLogLoops = loops
+        try:
+            log = Log()
+            self.assertFalse(execute([
+                    ('List', 'org.vistrails.vistrails.basic', [
+                        ('value', [('List', '[1.0, 2.0, 3.0, 4.0, 5.0]')]),
+                    ]),
+                    ('PythonCalc', 'org.vistrails.vistrails.pythoncalc', [
+                        ('value2', [('Float', '1.0')]),
+                        ('op', [('String', '+')]),
+                    ]),
+                ],
+                [
+                    (0, 'value', 1, 'value1'),
+                ],
+                logger=LogController(log)))
+        finally:
+            conf.executionLogBuffer = old_buffer
+            conf.executionLogLoops = old_loops
+        workflow_exec, = log.workflow_execs
+        self.assertEqual(workflow_exec.completed, 1)
+        return workflow_exec
+
+    @staticmethod
+    def describe(workflow_exec):
+        """Returns the structure of the log, without ids or timestamps.
+        """
+        def items(execs):
+            result = []
+            for item in execs:
+                if item.vtType == 'module_exec':
+                    result.append((item.module_name, item.completed,
+                                   [a.key for a in item.annotations],
+                                   items(item.loop_execs)))
+                elif item.vtType == 'loop_exec':
+                    result.append([(i.iteration, items(i.item_execs))
+                                   for i in item.loop_iterations])
+            return result
+        return items(workflow_exec.item_execs)
+
+    def test_buffered(self):
+        """The buffered log has the same structure as the synchronous one.
+        """
+        expected = self.describe(self.run_loop())
+        workflow_exec = self.run_loop(buffer_size=4)
+        self.assertEqual(self.describe(workflow_exec), expected)
+        looping, = [i for i in workflow_exec.item_execs
+                    if i.module_name == 'PythonCalc']
+        iterations = looping.loop_execs[0].loop_iterations
+        self.assertEqual(len(iterations), 5)
+        for iteration in iterations:
+            module_exec, = iteration.item_execs
+            self.assertTrue(looping.ts_start <= iteration.ts_start <=
+                            module_exec.ts_start <= module_exec.ts_end <=
+                            iteration.ts_end <= looping.ts_end)
+
+    def test_summary(self):
+        """Loops are only logged as a count in summary mode.
+        """
+        for buffer_size in (0, 4):
+            workflow_exec = self.run_loop(buffer_size, loops='summary')
+            looping, = [i for i in workflow_exec.item_execs
+                        if i.module_name == 'PythonCalc']
+            self.assertEqual(looping.completed, 1)
+            loop_exec, = looping.loop_execs
+            self.assertEqual(loop_exec.loop_iterations, [])
+            annotation, = looping.annotations
+            self.assertEqual((annotation.key, annotation.value),
+                             ('loop_iterations', '5'))
@@ -37,8 +37,10 @@
 from __future__ import division
 
 import copy
+import threading
 
 from vistrails.core import debug
+from vistrails.core.configuration import get_vistrails_configuration
 from vistrails.core.log.workflow_exec import WorkflowExec
 from vistrails.core.log.module_exec import ModuleExec
 from vistrails.core.log.loop_exec import LoopExec, LoopIteration
@@ -49,6 +51,31 @@ from vistrails.core.vistrail.annotation import Annotation
 from vistrails.core.vistrail.pipeline import Pipeline
 from vistrails.core.vistrail.vistrail import Vistrail
 import vistrails.core.system
+from vistrails.db import VistrailsDBException
+from vistrails.db.services.log_store import LogStore
+
+
+_log_store = None
+_log_store_lock = threading.Lock()
+
+
+def get_log_store():
+    """get_log_store() -> LogStore
+
+    Returns the store for the 'executionLogDatabase' option, or None if it
+    is not set.
+    """
+    global _log_store
+    filename = vistrails.core.system.get_vistrails_directory(
+            'executionLogDatabase')
+    with _log_store_lock:
+        if not filename:
+            return None
+        if _log_store is None or _log_store.filename != filename:
+            if _log_store is not None:
+                _log_store.close()
+            _log_store = LogStore(filename)
+        return _log_store
 
 
 @apply
@@ -96,6 +123,7 @@ class LogController(object):
         self.module_execs = {}      # vistrails_module -> *Exec
         self.parent_execs = {}      # vistrails_module -> *Exec
         self.children_execs = {}    # vistrails_module -> [*Exec]
+        self.summarized = {}        # vistrails_module -> iteration
         if machine is not None:
             self.machine = machine
         else:
@@ -103,18 +131,20 @@ class LogController(object):
             self.machine.id = self.log.id_scope.getNewId(Machine.vtType)
 
     def _create_module_exec(self, module, module_id, module_name,
-                            cached):
+                            cached, ts=None):
         m_exec_id = self.log.id_scope.getNewId(ModuleExec.vtType)
         module_exec = ModuleExec(id=m_exec_id,
                                  machine_id=self.machine.id,
                                  module_id=module_id,
                                  module_name=module_name,
                                  cached=cached,
-                                 ts_start=vistrails.core.system.current_time(),
+                                 ts_start=ts or
+                                          vistrails.core.system.current_time(),
                                  completed=0)
         return module_exec
 
-    def _create_group_exec(self, group, module_id, group_name, cached):
+    def _create_group_exec(self, group, module_id, group_name, cached,
+                           ts=None):
         g_exec_id = self.log.id_scope.getNewId(GroupExec.vtType)
         if isinstance(group, Abstraction):
             group_type = 'SubWorkflow'
@@ -126,14 +156,16 @@ class LogController(object):
                                group_name=group_name,
                                group_type=group_type,
                                cached=cached,
-                               ts_start=vistrails.core.system.current_time(),
+                               ts_start=ts or
+                                        vistrails.core.system.current_time(),
                                completed=0)
         return group_exec
 
-    def _create_loop_exec(self):
+    def _create_loop_exec(self, ts=None):
         l_exec_id = self.log.id_scope.getNewId(LoopExec.vtType)
         loop_exec = LoopExec(id=l_exec_id,
-                             ts_start=vistrails.core.system.current_time())
+                             ts_start=ts or
+                                      vistrails.core.system.current_time())
         return loop_exec
 
     def start_workflow_execution(self, parent_exec,
@@ -146,43 +178,70 @@ class LogController(object):
 
 
 class LogLoopController(object):
-    def __init__(self, controller, loop_exec, loop_module):
+    """Logs the iterations of a loop.
+
+    If `summary` is set, iterations are only counted: no LoopIteration is
+    created, and nothing is logged for the modules executed as part of an
+    iteration. The counts are added as annotations on the execution of the
+    looping module.
+    """
+    def __init__(self, controller, loop_exec, loop_module, summary=False):
         self.controller = controller
         self.loop_exec = loop_exec
         self.loop_module = loop_module
+        self.summary = summary
+        self.iterations = 0
 
-    def _create_loop_iteration(self, iteration):
+    def _create_loop_iteration(self, iteration, ts=None):
         l_iteration_id = self.controller.log.id_scope.getNewId(
                 LoopIteration.vtType)
         loop_iteration = LoopIteration(id=l_iteration_id,
-                                       ts_start=vistrails.core.system.current_time(),
+                                       ts_start=ts or
+                                           vistrails.core.system.current_time(),
                                        iteration=iteration)
         return loop_iteration
 
-    def finish_loop_execution(self):
+    def finish_loop_execution(self, ts=None):
         """Signals that we are done looping.
         """
-        self.loop_exec.ts_end = vistrails.core.system.current_time()
+        self.loop_exec.ts_end = ts or vistrails.core.system.current_time()
         try:
             execs = self.controller.children_execs[id(self.loop_module)]
             execs.discard(self.loop_exec)
         except KeyError:
             pass
-
-    def start_iteration(self, looped_module, iteration):
+        if self.summary:
+            module_exec = self.controller.module_execs.get(
+                    id(self.loop_module))
+            if module_exec is not None:
+                a_id = self.controller.log.id_scope.getNewId(
+                        Annotation.vtType)
+                module_exec.add_annotation(Annotation(
+                        id=a_id,
+                        key='loop_iterations',
+                        value=str(self.iterations)))
+
+    def start_iteration(self, looped_module, iteration, ts=None):
         """Signals that we are executing a module as an iteration of the loop.
         """
-        loop_iteration = self._create_loop_iteration(iteration)
+        if self.summary:
+            self.controller.summarized[id(looped_module)] = iteration
+            return
+        loop_iteration = self._create_loop_iteration(iteration, ts)
         self.loop_exec.add_loop_iteration(loop_iteration)
         self.controller.parent_execs[id(looped_module)] = loop_iteration
 
-    def finish_iteration(self, looped_module):
+    def finish_iteration(self, looped_module, ts=None):
         """Signals that the iteration is done.
         """
+        if self.summary:
+            self.controller.summarized.pop(id(looped_module), None)
+            self.iterations += 1
+            return
         loop_iteration = self.controller.parent_execs.get(id(looped_module))
         assert loop_iteration is not None
 
-        loop_iteration.ts_end = vistrails.core.system.current_time()
+        loop_iteration.ts_end = ts or vistrails.core.system.current_time()
         loop_iteration.completed = 1
 
 
@@ -219,6 +278,8 @@ class LogWorkflowController(LogController):
 
         This returns a new log controller object for that execution context.
         """
+        if id(parent_exec) in self.summarized:
+            return DummyLogController
         if id(parent_exec) in self.module_execs:
             parent_exec = self.module_execs[id(parent_exec)]
         return LogWorkflowController(self.log, self.machine, parent_exec,
@@ -230,20 +291,28 @@ class LogWorkflowController(LogController):
         Else returns None. Used by the interpreter to know what failed when
         getting an exception from a module.
         """
+        if id(module) in self.summarized:
+            return self.summarized[id(module)]
         try:
             return self.parent_execs[id(module)].iteration
         except KeyError:
             return None
 
-    def start_execution(self, module, module_id, module_name, cached=0):
+    def start_execution(self, module, module_id, module_name, cached=0,
+                        ts=None):
         """Signals the start of the execution of a module (before compute).
         """
+        if id(module) in self.summarized:
+            # Iteration of a loop only logged as a summary
+            return
         if isinstance(module, Group):
             module_exec = self._create_group_exec(module, module_id,
-                                                 module_name, cached)
+                                                 module_name, cached, ts)
         else:
             module_exec = self._create_module_exec(module, module_id,
-                                                   module_name, cached)
+                                                   module_name, cached, ts)
+        # Not part of the log schema, but indexed by LogStore
+        module_exec.signature = getattr(module, 'signature', None)
         if id(module) in self.module_execs is not None:
             debug.warning(
                     "%s#start_execution(module=%r, module_id=%r, "
@@ -259,10 +328,13 @@ class LogWorkflowController(LogController):
                 return
         assert False
 
-    def start_loop_execution(self, loop_module, total_iterations=None):
+    def start_loop_execution(self, loop_module, total_iterations=None,
+                             ts=None):
         """Starts a loop.
         """
-        loop_exec = self._create_loop_exec()
+        if id(loop_module) in self.summarized:
+            return DummyLogController
+        loop_exec = self._create_loop_exec(ts)
         for parent_exec in (self.module_execs.get(id(loop_module)),
                             self.parent_exec):
             if parent_exec is not None:
@@ -274,9 +346,12 @@ class LogWorkflowController(LogController):
         else:
             self.workflow_exec.add_item_exec(loop_exec)
         self.children_execs.setdefault(id(loop_module), set()).add(loop_exec)
-        return LogLoopController(self, loop_exec, loop_module)
+        summary = getattr(get_vistrails_configuration(), 'executionLogLoops',
+                          'all') == 'summary'
+        return LogLoopController(self, loop_exec, loop_module, summary)
 
-    def finish_execution(self, module, error, errorTrace=None, suspended=False):
+    def finish_execution(self, module, error, errorTrace=None, suspended=False,
+                         ts=None):
         """Signals the end of the execution of a module.
 
         Called by a module after succeeded of suspended, or called by the
@@ -287,7 +362,8 @@ class LogWorkflowController(LogController):
             # The module can finish execution without starting (if it was
             # suspended, etc...)
             return
-        module_exec.ts_end = vistrails.core.system.current_time()
+        ts = ts or vistrails.core.system.current_time()
+        module_exec.ts_end = ts
         if suspended:
             module_exec.completed = -2
             module_exec.error = error
@@ -304,7 +380,7 @@ class LogWorkflowController(LogController):
             module_exec.completed = 1
 
         for child in self.children_execs.pop(id(module), ()):
-            child.ts_end = vistrails.core.system.current_time()
+            child.ts_end = ts
             if suspended:
                 child.completed = -2
                 child.error = error
@@ -317,6 +393,8 @@ class LogWorkflowController(LogController):
     def insert_module_annotations(self, module, a_dict):
         """Adds an annotation on the execution object for this module.
         """
+        if id(module) in self.summarized:
+            return
         for k, v in a_dict.iteritems():
             a_id = self.log.id_scope.getNewId(Annotation.vtType)
             annotation = Annotation(id=a_id,
@@ -367,6 +445,10 @@ class LogWorkflowExecController(LogWorkflowController):
             session = vistrail.current_session
         else:
             session = None
+        if vistrail is not None and vistrail.locator is not None:
+            self.vistrail_name = vistrail.locator.name
+        else:
+            self.vistrail_name = None
         workflow_exec = WorkflowExec(
                 id=wf_exec_id,
                 user=vistrails.core.system.current_user(),
@@ -393,3 +475,10 @@ class LogWorkflowExecController(LogWorkflowController):
             self.workflow_exec.completed = -1
         else:
             self.workflow_exec.completed = 1
+
+        try:
+            store = get_log_store()
+            if store is not None:
+                store.add_workflow_exec(self.workflow_exec, self.vistrail_name)
+        except VistrailsDBException, e:
+            debug.warning("Couldn't record execution in log database", e)
@@ -283,7 +283,7 @@ class MashupController(object):
         to_remove = self.vtPipeline.aliases.values()
         for (type, oId, parentType, parentId, mid) in to_remove:
             self.vtPipeline.remove_alias(type, oId, parentType, parentId, mid)
-            parameter = self.vtPipeline.db_get_object(type,oId)
+            parameter = self.vtPipeline.own_object(type,oId)
             parameter.alias = ''
             
         #now we populate the pipeline according to the aliases in the mashup 
@@ -293,8 +293,8 @@ class MashupController(object):
                                       alias.component.vtparent_type, 
                                       alias.component.vtparent_id,
                                       alias.component.vtmid)
-            parameter = self.vtPipeline.db_get_object(alias.component.vttype,
-                                                      alias.component.vtid)
+            parameter = self.vtPipeline.own_object(alias.component.vttype,
+                                                   alias.component.vtid)
             parameter.alias = alias.name
         
     def getMashupName(self, version=-1):
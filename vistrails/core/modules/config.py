@@ -303,6 +303,21 @@ _documentation = \
       specified namespace instead of the 'namespace' attribute of the
       descriptor.
 
+   ModuleSettings.thread_safe: Boolean
+
+      If True, the module's compute() method may be called from a
+      worker thread, concurrently with other modules, when the
+      'executionThreads' option is set. Modules that are not
+      thread-safe are always run from the thread that started the
+      execution.
+
+   ModuleSettings.serializer: Object
+
+      An object with ``dumps(outputs)`` and ``loads(data)`` methods
+      (like the pickle module) used to write the module's outputs to
+      the disk cache and read them back. If None, outputs are pickled,
+      unless they reference modules or paths.
+
    Port.name: String
 
       The name of the of the port
@@ -477,7 +492,9 @@ ModuleSettings = namedtuple('ModuleSettings',
                            (('is_root', False),),
                            (('ghost_package', None),),
                            (('ghost_package_version', None),),
-                           (('ghost_namespace', None),),])
+                           (('ghost_namespace', None),),
+                           (('thread_safe', False),),
+                           (('serializer', None),)])
 
 Port = namedtuple('Port', 
                      [("name",),
@@ -64,7 +64,9 @@ class ModuleDescriptor(DBModuleDescriptor):
     module in the system. It holds information about a module, such as its
     name, package identifier and ports.
 
-    :attribute module: reference to the python class that defines the module
+    :attribute module: reference to the python class that defines the module;
+        for a descriptor read from the registry snapshot, accessing it
+        initializes the package first
     :attribute name: name of the module
     :attribute identifier: identifier of the package that module belongs to
     :attribute input_ports: dictionary of names of input ports to the types
@@ -79,6 +81,10 @@ class ModuleDescriptor(DBModuleDescriptor):
         ports in the GUI
 
     :attribute _is_abstract: whether module is abstract
+    :attribute is_thread_safe: whether the module can be computed from a
+        worker thread
+    :attribute serializer: object used to store the outputs of the module in
+        the disk cache, or None to use pickle
     :attribute _configuration_widget: reference to the Qt class that provides a
         custom configuration widget for the class.  Note that this can be a
         tuple (path, name) that will be loaded only when needed via __import__
@@ -91,6 +97,10 @@ class ModuleDescriptor(DBModuleDescriptor):
     :attribute _widget_item: stores a reference to the ModuleTreeWidgetItem so
         that when ports are added to modules things get correctly updated.
 
+    :attribute deferred_package: the Package to initialize to get the module
+        class, if this descriptor was read from the registry snapshot
+        (see :meth:`ModuleRegistry.add_deferred_package`)
+
     :attribute _input_port_cache, _output_port_cache, _port_caches:
         Dictionaries for fast port spec lookup, created because port spec
         lookups are sometimes part of hot code paths and need to go as fast as
@@ -99,6 +109,8 @@ class ModuleDescriptor(DBModuleDescriptor):
 
     ##########################################################################
 
+    deferred_package = None
+
     def __init__(self, *args, **kwargs):
         self.children = []
         if 'module' in kwargs:
@@ -144,6 +156,8 @@ class ModuleDescriptor(DBModuleDescriptor):
             self._widget_item = None
             self.is_hidden = False
             self.namespace_hidden = False
+            self.is_thread_safe = False
+            self.serializer = None
             self._widget_classes = {}
             self.children = []
             # The ghost attributes represent the original values
@@ -158,7 +172,8 @@ class ModuleDescriptor(DBModuleDescriptor):
             self.children = copy.copy(other.children)
             
             self._base_descriptor = other._base_descriptor
-            self.module = other.module
+            self._module = other._module
+            self.deferred_package = other.deferred_package
             self._port_count = other._port_count
             self._abstraction_refs = self._abstraction_refs
             self._is_abstract = other._is_abstract
@@ -172,6 +187,8 @@ class ModuleDescriptor(DBModuleDescriptor):
             self._widget_classes = dict((k,copy.copy(v)) for k, v in \
                                          other._widget_classes.iteritems())
             self.namespace_hidden = other.namespace_hidden
+            self.is_thread_safe = other.is_thread_safe
+            self.serializer = other.serializer
             self.ghost_identifier = other.ghost_identifier
             self.ghost_package_version = other.ghost_package_version
             self.ghost_namespace = other.ghost_namespace
@@ -218,6 +235,22 @@ class ModuleDescriptor(DBModuleDescriptor):
     version = DBModuleDescriptor.db_version
     base_descriptor_id = DBModuleDescriptor.db_base_descriptor_id
     port_specs_list = DBModuleDescriptor.db_portSpecs
+
+    def _get_module(self):
+        if self.deferred:
+            from vistrails.core.packagemanager import get_package_manager
+            get_package_manager().initialize_deferred_package(
+                    self.deferred_package)
+        return self._module
+    def _set_module(self, module):
+        self._module = module
+    module = property(_get_module, _set_module)
+
+    def _get_deferred(self):
+        return (self._module is None and
+                self.deferred_package is not None and
+                self.deferred_package.deferred)
+    deferred = property(_get_deferred)
     
     def _get_base_descriptor(self):
         if self._base_descriptor is None and self.base_descriptor_id >= 0:
@@ -560,7 +560,7 @@ class ModuleRegistry(DBRegistry):
                 self.descriptors_by_id[descriptor.id] = descriptor
                 k = (descriptor.identifier, descriptor.name,
                      descriptor.namespace, pkg.version, descriptor.version)
-                if descriptor.module is not None:
+                if not descriptor.deferred and descriptor.module is not None:
                     self._module_key_map[descriptor.module] = k
         for descriptor in self.descriptors_by_id.itervalues():
             if descriptor.base_descriptor_id in self.descriptors_by_id:
@@ -932,6 +932,29 @@ class ModuleRegistry(DBRegistry):
                                             package_version, version)
         return descriptor
 
+    def update_deferred_descriptor(self, descriptor, module):
+        """Sets the module of a descriptor added from the registry snapshot.
+
+        The port specs from the snapshot are dropped, the package adds them
+        again as it would for a new descriptor.
+        """
+        for spec in list(descriptor.port_specs_list):
+            descriptor.delete_port_spec(spec)
+        descriptor.module = module
+        descriptor.deferred_package = None
+
+        if issubclass(module,
+                vistrails.core.modules.vistrails_module.Converter):
+            self._conversions = dict()
+            self._converters.add(descriptor)
+
+        self._module_key_map[module] = (descriptor.identifier,
+                                        descriptor.name,
+                                        descriptor.namespace,
+                                        descriptor.package_version,
+                                        descriptor.version)
+        return descriptor
+
     def convert_port_val(self, val, sig=None, cls=None):
         basic_pkg = get_vistrails_basic_pkg_id()
         if sig is None and cls is None:
@@ -1167,8 +1190,17 @@ class ModuleRegistry(DBRegistry):
                                          "not specified.")
 
         package = self.package_versions[(identifier, package_version)]
+
+        # A descriptor added from the registry snapshot gets its module now
+        # that the package is being initialized
+        placeholder = package.descriptor_versions.get(
+                (name, namespace or '', version or ''))
+        if placeholder is not None and (placeholder.deferred_package is None or
+                                        placeholder.module is not None):
+            placeholder = None
+
         desc_key = (name, namespace, version)
-        if desc_key in package.descriptor_versions:
+        if placeholder is None and desc_key in package.descriptor_versions:
             raise ModuleAlreadyExists(identifier, name)
 
         # We allow multiple inheritance as long as only one of the superclasses
@@ -1191,13 +1223,17 @@ class ModuleRegistry(DBRegistry):
             if identifier != 'local.abstractions':
                 raise DuplicateModule(self.get_descriptor(module), identifier,
                                       name, namespace)
-        elif self.has_descriptor_with_name(identifier, name, namespace,
-                                           package_version, version):
+        elif placeholder is None and \
+                self.has_descriptor_with_name(identifier, name, namespace,
+                                              package_version, version):
             raise DuplicateIdentifier(identifier, name, namespace,
                                       package_version, version)
-        descriptor = self.update_registry(base_descriptor, module, identifier,
-                                          name, namespace, package_version,
-                                          version)
+        if placeholder is not None:
+            descriptor = self.update_deferred_descriptor(placeholder, module)
+        else:
+            descriptor = self.update_registry(base_descriptor, module,
+                                              identifier, name, namespace,
+                                              package_version, version)
         if settings.is_root:
             self.root_descriptor = descriptor
 
@@ -1206,6 +1242,8 @@ class ModuleRegistry(DBRegistry):
         # descriptor.set_configuration_widget(configureWidget)
         descriptor.is_hidden = settings.hide_descriptor
         descriptor.namespace_hidden = settings.hide_namespace
+        descriptor.is_thread_safe = settings.thread_safe
+        descriptor.serializer = settings.serializer
 
         if settings.signature:
             descriptor.set_hasher_callable(settings.signature)
@@ -1647,7 +1685,7 @@ class ModuleRegistry(DBRegistry):
             # allow all modules to auto_add_ports!
             added_descriptors = set()
             for descriptor in package.descriptor_list:
-                if hasattr(descriptor, 'module'):
+                if descriptor.module is not None:
                     self.auto_add_ports(descriptor.module)
                     added_descriptors.add(descriptor)
             # Perform auto-initialization of abstractions
@@ -1659,7 +1697,7 @@ class ModuleRegistry(DBRegistry):
                     self.auto_add_subworkflow(subworkflow)
             for descriptor in package.descriptor_list:
                 if descriptor not in added_descriptors:
-                    if hasattr(descriptor, 'module'):
+                    if descriptor.module is not None:
                         self.auto_add_ports(descriptor.module)
                         added_descriptors.add(descriptor)
         except MissingRequirement:
@@ -1674,6 +1712,74 @@ class ModuleRegistry(DBRegistry):
         debug.splashMessage("Initializing " + package.codepath + '... done.')
         package._initialized = True
 
+    def add_deferred_package(self, package, snapshot):
+        """Adds the modules of a package from a registry snapshot.
+
+        The descriptors get their port specs from the snapshot but no module
+        class; the package is initialized when one of them is first needed.
+
+        :type snapshot:
+            :class:`~vistrails.core.modules.registry_snapshot.RegistrySnapshot`
+        """
+        if (package.identifier, package.version) not in self.package_versions:
+            self.add_package(package)
+
+        # Add the base descriptors first
+        snapshot_descriptors = snapshot.get_descriptors(package.identifier)
+        by_id = dict((d.db_id, d) for d in snapshot_descriptors)
+        ordered = []
+        visited = set()
+        def visit(snapshot_desc):
+            if snapshot_desc.db_id in visited:
+                return
+            visited.add(snapshot_desc.db_id)
+            base_id = snapshot_desc.db_base_descriptor_id
+            if base_id in by_id:
+                visit(by_id[base_id])
+            ordered.append(snapshot_desc)
+        for snapshot_desc in snapshot_descriptors:
+            visit(snapshot_desc)
+
+        descriptors = {}
+        for snapshot_desc in ordered:
+            base_id = snapshot_desc.db_base_descriptor_id
+            if base_id in descriptors:
+                base_descriptor = descriptors[base_id]
+            elif base_id is not None and base_id >= 0:
+                base = snapshot.get_descriptor(base_id)
+                base_descriptor = self.get_descriptor_by_name(
+                        base.db_package, base.db_name, base.db_namespace,
+                        base.db_package_version, base.db_version)
+            else:
+                base_descriptor = None
+            descriptor_id = self.idScope.getNewId(ModuleDescriptor.vtType)
+            descriptor = ModuleDescriptor(
+                    id=descriptor_id,
+                    package=package.identifier,
+                    base_descriptor=base_descriptor,
+                    name=snapshot_desc.db_name,
+                    namespace=snapshot_desc.db_namespace or None,
+                    package_version=package.version,
+                    version=snapshot_desc.db_version)
+            descriptor.deferred_package = package
+            self.add_descriptor(descriptor, package)
+            descriptors[snapshot_desc.db_id] = descriptor
+
+        # Port specs can reference any of the descriptors
+        converter_desc = self.get_descriptor(
+                vistrails.core.modules.vistrails_module.Converter)
+        for snapshot_desc in ordered:
+            descriptor = descriptors[snapshot_desc.db_id]
+            for snapshot_spec in snapshot_desc.db_portSpecs:
+                spec = snapshot_spec.do_copy(new_ids=True,
+                                             id_scope=self.idScope,
+                                             id_remap={})
+                PortSpec.convert(spec)
+                self.add_port_spec(descriptor, spec)
+            if self.is_descriptor_subclass(descriptor, converter_desc):
+                self._conversions = dict()
+                self._converters.add(descriptor)
+
     def delete_module(self, identifier, module_name, namespace=None):
         """Removes a module from the registry.
         """
@@ -1693,7 +1799,7 @@ class ModuleRegistry(DBRegistry):
             self.signals.emit_deleted_abstraction(descriptor)
         package = self.packages[descriptor.identifier]
         self.delete_descriptor(descriptor, package)
-        if descriptor.module is not None:
+        if not descriptor.deferred and descriptor.module is not None:
             del self._module_key_map[descriptor.module]
 
     def remove_package(self, package):
@@ -1944,7 +2050,7 @@ class ModuleRegistry(DBRegistry):
         one for the root Module. It will thus not return mixins (which
         themselves don't subclass Module).
         """
-        if descriptor.module is None:
+        if descriptor.deferred or descriptor.module is None:
             descriptors = [descriptor]
             base_id = descriptor.base_descriptor_id
             while base_id >= 0:
@@ -2063,7 +2169,8 @@ class ModuleRegistry(DBRegistry):
     def is_descriptor_subclass(self, sub, super):
         """Checks whether a descriptor subclasses another.
         """
-        if sub.module is not None and super.module is not None:
+        if (not sub.deferred and not super.deferred and
+                sub.module is not None and super.module is not None):
             return issubclass(sub.module, super.module)
 
         # otherwise, use descriptors themselves
@@ -140,6 +140,8 @@ class Package(DBPackage):
             self._init_module = None
             self._loaded = False
             self._initialized = False
+            self.deferred = False
+            self.deferred_hooks = set()
             self._abs_pkg_upgrades = {}
             self.package_dir = None
             self.prefix = None
@@ -152,6 +154,8 @@ class Package(DBPackage):
             self._init_module = other._init_module
             self._loaded = other._loaded
             self._initialized = other._initialized
+            self.deferred = other.deferred
+            self.deferred_hooks = set(other.deferred_hooks)
             self._abs_pkg_upgrades = copy.copy(other._abs_pkg_upgrades)
             self.package_dir = other.package_dir
             self.prefix = other.prefix
@@ -227,6 +231,9 @@ class Package(DBPackage):
     module = property(_get_module)
 
     def _get_init_module(self):
+        if self.deferred:
+            from vistrails.core.packagemanager import get_package_manager
+            get_package_manager().initialize_deferred_package(self)
         return self._init_module
     init_module = property(_get_init_module)
 
@@ -443,7 +450,7 @@ class Package(DBPackage):
                                      'configuration', 'package_dependencies',
                                      'package_requirements',
                                      'can_handle_identifier',
-                                     'can_handle_vt_file']
+                                     'can_handle_vt_file', 'snapshot_key']
                 for attr in module_attributes:
                     if (hasattr(self._module, attr) and
                             not hasattr(self._init_module, attr)):
@@ -491,17 +498,34 @@ class Package(DBPackage):
         else:
             self.description = "(No description available)"
 
+    # Names looked up on the init module by the methods below; they are
+    # recorded in the registry snapshot so that a deferred package can
+    # answer without being initialized
+    hook_names = ['handle_all_errors', 'handle_module_upgrade_request',
+                  'handle_missing_module', 'can_handle_identifier',
+                  'can_handle_vt_file', 'context_menu', 'contextMenuName',
+                  'callContextMenu', 'loadVistrailFileHook',
+                  'saveVistrailFileHook']
+
+    def has_hook(self, name):
+        if self.deferred:
+            return name in self.deferred_hooks
+        return hasattr(self._init_module, name)
+
+    def get_hooks(self):
+        return [name for name in self.hook_names if self.has_hook(name)]
+
     def can_handle_all_errors(self):
-        return hasattr(self._init_module, 'handle_all_errors')
+        return self.has_hook('handle_all_errors')
 
     def can_handle_upgrades(self):
-        return hasattr(self._init_module, 'handle_module_upgrade_request')
+        return self.has_hook('handle_module_upgrade_request')
 
     def can_handle_identifier(self, identifier):
         """ Asks package if it can handle this package
         """
         try:
-            return (hasattr(self.init_module, 'can_handle_identifier') and
+            return (self.has_hook('can_handle_identifier') and
                     self.init_module.can_handle_identifier(identifier))
         except Exception, e:
             debug.unexpected_exception(e)
@@ -515,7 +539,7 @@ class Package(DBPackage):
         """ Asks package if it can handle a file inside a zipped vt file
         """
         try:
-            return (hasattr(self.init_module, 'can_handle_vt_file') and
+            return (self.has_hook('can_handle_vt_file') and
                     self.init_module.can_handle_vt_file(name))
         except Exception, e:
             debug.unexpected_exception(e)
@@ -526,13 +550,13 @@ class Package(DBPackage):
             return False
 
     def can_handle_missing_modules(self):
-        return hasattr(self._init_module, 'handle_missing_module')
+        return self.has_hook('handle_missing_module')
 
     def handle_all_errors(self, *args, **kwargs):
-        return self._init_module.handle_all_errors(*args, **kwargs)
+        return self.init_module.handle_all_errors(*args, **kwargs)
 
     def handle_module_upgrade_request(self, *args, **kwargs):
-        return self._init_module.handle_module_upgrade_request(*args, **kwargs)
+        return self.init_module.handle_module_upgrade_request(*args, **kwargs)
         
     def handle_missing_module(self, *args, **kwargs):
         """report_missing_module(name, namespace):
@@ -541,7 +565,7 @@ class Package(DBPackage):
         present, to allow the package to dynamically add a missing
         module.
         """
-        return self._init_module.handle_missing_module(*args, **kwargs)
+        return self.init_module.handle_missing_module(*args, **kwargs)
 
     def add_abs_upgrade(self, new_desc, name, namespace, module_version):
         key = (name, namespace)
@@ -569,10 +593,10 @@ class Package(DBPackage):
         return None
 
     def has_context_menu(self):
-        if hasattr(self._init_module, 'context_menu'):
+        if self.has_hook('context_menu'):
             return True
-        name = hasattr(self._init_module, 'contextMenuName')
-        callback = hasattr(self._init_module, 'callContextMenu')
+        name = self.has_hook('contextMenuName')
+        callback = self.has_hook('callContextMenu')
         if name and callback:
             return True
         elif name or callback:
@@ -585,19 +609,19 @@ class Package(DBPackage):
         return False
 
     def context_menu(self, signature):
-        if hasattr(self._init_module, 'context_menu'):
-            return self._init_module.context_menu(signature)
-        elif hasattr(self._init_module, 'contextMenuName'):
+        if self.has_hook('context_menu'):
+            return self.init_module.context_menu(signature)
+        elif self.has_hook('contextMenuName'):
             if signature is None:
                 signature = self.name
             def callMenu():
-                self._init_module.callContextMenu(signature)
-            return [(self._init_module.contextMenuName(signature), callMenu)]
+                self.init_module.callContextMenu(signature)
+            return [(self.init_module.contextMenuName(signature), callMenu)]
 
     def loadVistrailFileHook(self, vistrail, tmp_dir):
-        if hasattr(self._init_module, 'loadVistrailFileHook'):
+        if self.has_hook('loadVistrailFileHook'):
             try:
-                self._init_module.loadVistrailFileHook(vistrail, tmp_dir)
+                self.init_module.loadVistrailFileHook(vistrail, tmp_dir)
             except Exception, e:
                 debug.unexpected_exception(e)
                 debug.critical("Got exception in %s's loadVistrailFileHook(): "
@@ -606,9 +630,9 @@ class Package(DBPackage):
                                            traceback.format_exc()))
 
     def saveVistrailFileHook(self, vistrail, tmp_dir):
-        if hasattr(self._init_module, 'saveVistrailFileHook'):
+        if self.has_hook('saveVistrailFileHook'):
             try:
-                self._init_module.saveVistrailFileHook(vistrail, tmp_dir)
+                self.init_module.saveVistrailFileHook(vistrail, tmp_dir)
             except Exception, e:
                 debug.unexpected_exception(e)
                 debug.critical("Got exception in %s's saveVistrailFileHook(): "
@@ -683,6 +707,21 @@ class Package(DBPackage):
             deps.extend(self._module._dependencies)
         return deps
 
+    def snapshot_key(self):
+        """snapshot_key() -> object
+
+        Returns what the package's modules depend on besides its own files,
+        from the snapshot_key() function of its __init__ module. The
+        registry snapshot of the package is only used while this doesn't
+        change; the value must be serializable to JSON.
+
+        """
+        try:
+            callable_ = self._module.snapshot_key
+        except AttributeError:
+            return None
+        return callable_()
+
     def initialized(self):
         return self._initialized
 
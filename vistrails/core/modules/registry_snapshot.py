@@ -0,0 +1,312 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+from __future__ import division
+
+"""Snapshot of the module registry, used to start without initializing
+packages.
+
+The registry is saved to XML along with a key for each package, made from
+its version, the modification times of its files, its configuration and
+dependencies, and what its snapshot_key() hook returns. When VisTrails
+starts again, a package whose key didn't change gets its descriptors and
+port specs from the snapshot, and is only initialized when one of its
+modules is needed (see :meth:`PackageManager.initialize_deferred_package`).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vistrails.core import debug
+from vistrails.core.system import vistrails_version
+import vistrails.db.services.io
+
+
+def configuration_key(configuration):
+    """configuration_key(configuration: ConfigurationObject) -> list
+
+    Returns the values of a package's configuration as a sorted list.
+
+    """
+    from vistrails.core.configuration import ConfigurationObject
+
+    values = []
+    for name in sorted(configuration.keys()):
+        value = configuration.get(name)
+        if isinstance(value, ConfigurationObject):
+            value = configuration_key(value)
+        else:
+            value = repr(value)
+        values.append([name, value])
+    return values
+
+
+def package_key(package):
+    """package_key(package: Package) -> dict
+
+    Returns what has to match for the snapshot of a package to be used.
+
+    Packages that create modules from something outside their directory
+    (user files, installed libraries) describe it with a snapshot_key()
+    function in their __init__ module; see Package.snapshot_key().
+
+    """
+    filename = os.path.join(package.package_dir, package.codepath + '.py')
+    if os.path.isfile(filename):
+        # Single-file package
+        mtime = os.stat(filename).st_mtime
+    else:
+        mtime = 0
+        for dirpath, dirnames, filenames in os.walk(package.package_dir):
+            for name in filenames:
+                if name.endswith(('.pyc', '.pyo')):
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                mtime = max(mtime, st.st_mtime)
+    configuration = package.configuration
+    if configuration is not None:
+        configuration = configuration_key(configuration)
+    key = {'version': package.version,
+           'codepath': package.codepath,
+           'mtime': mtime,
+           'configuration': configuration,
+           'dependencies': sorted(package.dependencies()),
+           'package': package.snapshot_key(),
+           'vistrails': vistrails_version()}
+    # Compare keys the way they are read back from the file
+    return json.loads(json.dumps(key))
+
+
+class RegistrySnapshot(object):
+    """A module registry read back from a snapshot file.
+
+    The registry is kept as db objects; only the packages whose key still
+    matches are used.
+    """
+
+    def __init__(self, registry, packages):
+        self.registry = registry
+        self.packages = packages
+        self.descriptors_by_id = {}
+        self.descriptors_by_package = {}
+        for package in registry.db_packages:
+            descriptors = package.db_module_descriptors
+            self.descriptors_by_package[package.db_identifier] = descriptors
+            for descriptor in descriptors:
+                self.descriptors_by_id[descriptor.db_id] = descriptor
+
+    def has_package(self, package):
+        """has_package(package: Package) -> bool
+
+        Whether the snapshot can be used for this package.
+
+        """
+        if package.identifier not in self.descriptors_by_package:
+            return False
+        info = self.packages.get(package.identifier)
+        if info is None:
+            return False
+        try:
+            key = package_key(package)
+        except Exception, e:
+            debug.warning("Couldn't compute the registry snapshot key of "
+                          "package %s" % package.codepath, e)
+            return False
+        return info['key'] == key
+
+    def get_hooks(self, identifier):
+        return set(self.packages[identifier]['hooks'])
+
+    def get_descriptors(self, identifier):
+        return self.descriptors_by_package[identifier]
+
+    def get_descriptor(self, descriptor_id):
+        return self.descriptors_by_id[descriptor_id]
+
+
+def save_snapshot(filename, registry, packages):
+    """save_snapshot(filename: str, registry: ModuleRegistry,
+                     packages: [Package]) -> None
+
+    Writes the registry and the keys of the given packages.
+
+    """
+    info = {}
+    for package in packages:
+        info[package.identifier] = {'key': package_key(package),
+                                    'hooks': package.get_hooks()}
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    # The keys are written last, so an interrupted save is not used
+    if os.path.exists(filename + '.key'):
+        os.remove(filename + '.key')
+    temp = filename + '.tmp'
+    vistrails.db.services.io.save_registry_to_xml(registry, temp)
+    if os.path.exists(filename):
+        os.remove(filename)
+    os.rename(temp, filename)
+    with open(temp, 'wb') as fp:
+        json.dump(info, fp)
+    os.rename(temp, filename + '.key')
+
+
+def load_snapshot(filename):
+    """load_snapshot(filename: str) -> RegistrySnapshot
+
+    Reads a snapshot written by save_snapshot(), or returns None if there is
+    none or it can't be read.
+
+    """
+    if not os.path.exists(filename + '.key'):
+        return None
+    try:
+        with open(filename + '.key', 'rb') as fp:
+            packages = json.load(fp)
+        registry = vistrails.db.services.io.open_registry_from_xml(filename)
+    except Exception, e:
+        debug.warning("Couldn't read the registry snapshot %s" % filename, e)
+        return None
+    return RegistrySnapshot(registry, packages)
+
+
+##############################################################################
+
+class TestRegistrySnapshot(unittest.TestCase):
+    def test_package_key(self):
+        class FakePackage(object):
+            version = '1.0'
+            codepath = 'fake'
+            configuration = None
+            extra = None
+
+            def dependencies(self):
+                return []
+
+            def snapshot_key(self):
+                return self.extra
+        directory = tempfile.mkdtemp(prefix='vt_snapshot_')
+        try:
+            for name in ['__init__.py', 'init.py']:
+                with open(os.path.join(directory, name), 'w') as fp:
+                    fp.write('\n')
+                os.utime(os.path.join(directory, name), (1000, 1000))
+            package = FakePackage()
+            package.package_dir = directory
+            key = package_key(package)
+            self.assertEqual(key['mtime'], 1000)
+            self.assertEqual(package_key(package), key)
+            os.utime(os.path.join(directory, 'init.py'), (2000, 2000))
+            self.assertNotEqual(package_key(package), key)
+
+            # the package's own hook
+            key = package_key(package)
+            package.extra = [('tool.clt', 1000)]
+            self.assertNotEqual(package_key(package), key)
+            key = package_key(package)
+            self.assertEqual(package_key(package), key)
+            package.extra = [('tool.clt', 2000)]
+            self.assertNotEqual(package_key(package), key)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_deferred_package(self):
+        from vistrails.core.modules.module_registry import get_module_registry
+        from vistrails.core.packagemanager import get_package_manager
+
+        pm = get_package_manager()
+        reg = get_module_registry()
+        identifier = 'org.vistrails.vistrails.myjobs'
+        if pm.has_package(identifier):
+            self.skipTest("test package is already enabled")
+        prefixes = {'myjob': 'vistrails.tests.resources.'}
+        directory = tempfile.mkdtemp(prefix='vt_snapshot_')
+        filename = os.path.join(directory, 'registry.xml')
+        old_snapshot = pm._registry_snapshot
+        saved = []
+        pm.save_registry_snapshot = lambda: saved.append(True)
+        pm.late_enable_package('myjob', prefixes)
+        try:
+            save_snapshot(filename, reg, [pm.get_package(identifier)])
+            pm.late_disable_package('myjob')
+
+            pm._registry_snapshot = load_snapshot(filename)
+            pm.late_enable_package('myjob', prefixes)
+            pkg = pm.get_package(identifier)
+            self.assertTrue(pkg.deferred)
+            self.assertFalse(pkg.initialized())
+            descriptor = reg.get_descriptor_by_name(identifier, 'TimedJob')
+            self.assertTrue(descriptor.deferred)
+            self.assertTrue(descriptor.has_port_spec('how_long', 'input'))
+            self.assertTrue(descriptor.has_port_spec('finished', 'output'))
+
+            # Getting the class initializes the package
+            module = descriptor.module
+            self.assertEqual(module.__name__, 'TimedJob')
+            self.assertFalse(pkg.deferred)
+            self.assertTrue(pkg.initialized())
+            self.assertFalse(descriptor.deferred)
+            self.assertIs(reg.get_descriptor(module), descriptor)
+            self.assertEqual(len(descriptor.port_specs_list), 2)
+            # the snapshot was up to date
+            self.assertEqual(saved, [])
+            pm.late_disable_package('myjob')
+
+            # the snapshot is saved again if the package adds other modules
+            snapshot = load_snapshot(filename)
+            snapshot.descriptors_by_package[identifier] = [
+                    d for d in snapshot.get_descriptors(identifier)
+                    if d.db_name != 'SuspendNJob']
+            pm._registry_snapshot = snapshot
+            pm.late_enable_package('myjob', prefixes)
+            pkg = pm.get_package(identifier)
+            self.assertFalse(reg.has_descriptor_with_name(identifier,
+                                                          'SuspendNJob'))
+            reg.get_descriptor_by_name(identifier, 'TimedJob').module
+            self.assertTrue(reg.has_descriptor_with_name(identifier,
+                                                         'SuspendNJob'))
+            self.assertEqual(saved, [True])
+        finally:
+            del pm.save_registry_snapshot
+            pm._registry_snapshot = old_snapshot
+            if pm.has_package(identifier):
+                pm.late_disable_package('myjob')
+            shutil.rmtree(directory)
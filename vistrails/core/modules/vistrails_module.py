@@ -47,6 +47,7 @@ import warnings
 from vistrails.core.data_structures.bijectivedict import Bidict
 from vistrails.core import debug
 from vistrails.core.configuration import get_vistrails_configuration
+from vistrails.core.interpreter.scheduler import map_iterations
 from vistrails.core.modules.config import ModuleSettings, IPort, OPort
 from vistrails.core.vistrail.module_control_param import ModuleControlParam
 from vistrails.core.utils import VistrailsDeprecation, deprecated, \
@@ -656,7 +657,6 @@ class Module(object):
             raise ModuleError(self, "List compute has wrong depth: %s" %
                                     self.list_depth)
         combine_type = self.get_combine_type('cartesian')
-        suspended = []
 
         inputs = {} # dict of port_name: value
         port_names = []
@@ -675,21 +675,18 @@ class Module(object):
 
         elements, port_names = self.do_combine(combine_type, inputs, port_names)
         num_inputs = len(elements)
+        ## Type checking if last iteration level
+        if not self.upToDate and elements and self.list_depth == 1:
+            self.typeChecking(self, port_names, elements)
         loop = self.logging.begin_loop_execution(self, num_inputs)
-        ## Update everything for each value inside the list
-        outputs = {}
-        for i in xrange(num_inputs):
-            self.logging.update_progress(self, float(i)/num_inputs)
+
+        def iterate(i):
             module = copy.copy(self)
             module.list_depth = self.list_depth - 1
             module.had_error = False
             module.was_suspended = False
 
             if not self.upToDate: # pragma: no partial
-                ## Type checking if first iteration and last iteration level
-                if i == 0 and self.list_depth == 1:
-                    self.typeChecking(module, port_names, elements)
-
                 module.upToDate = False
                 module.computed = False
                 self.setInputValues(module, port_names, elements[i], i)
@@ -701,22 +698,37 @@ class Module(object):
             except ModuleSuspended, e:
                 e.loop_iteration = i
                 module.logging.end_update(module, e, was_suspended=True)
-                suspended.append(e)
                 loop.end_iteration(module)
-                continue
+                return e
 
             loop.end_iteration(module)
 
             ## Getting the result from the output port
-            for nameOutput in module.outputPorts:
-                if nameOutput == 'self':
-                    continue
-                if nameOutput not in outputs:
-                    outputs[nameOutput] = []
-                output = module.get_output(nameOutput)
-                outputs[nameOutput].append(output)
+            return dict((nameOutput, module.get_output(nameOutput))
+                        for nameOutput in module.outputPorts
+                        if nameOutput != 'self')
+
+        ## Update everything for each value inside the list
+        nb_threads = self.get_loop_threads()
+        if nb_threads > 1 and num_inputs > 1:
+            results = map_iterations(
+                    iterate, num_inputs, nb_threads,
+                    progress=lambda done: self.logging.update_progress(
+                            self, done * 1.0 / num_inputs))
+        else:
+            results = []
+            for i in xrange(num_inputs):
+                self.logging.update_progress(self, i * 1.0 / num_inputs)
+                results.append(iterate(i))
 
-            self.logging.update_progress(self, i * 1.0 / num_inputs)
+        suspended = []
+        outputs = {}
+        for result in results:
+            if isinstance(result, ModuleSuspended):
+                suspended.append(result)
+                continue
+            for nameOutput, output in result.iteritems():
+                outputs.setdefault(nameOutput, []).append(output)
 
         if suspended:
             raise ModuleSuspended(
@@ -729,6 +741,37 @@ class Module(object):
             self.set_output(nameOutput, outputs[nameOutput])
         loop.end_loop_execution()
 
+    def get_loop_threads(self, modules=None):
+        """Returns the number of threads to run loop iterations on.
+
+        This is set with the 'loop_parallel' control parameter; by default,
+        iterations run one after the other. They also do if one of the
+        modules computed by the iterations (this one by default) is not
+        flagged as thread_safe.
+        """
+        value = self.control_params.get(ModuleControlParam.LOOP_PARALLEL_KEY)
+        if not value:
+            return 1
+        try:
+            nb_threads = max(1, int(value))
+        except ValueError:
+            raise ModuleError(self, "Invalid number of threads for loop: %r" %
+                              value)
+        if nb_threads > 1:
+            from vistrails.core.modules.module_registry import \
+                get_module_registry
+            reg = get_module_registry()
+            if modules is None:
+                modules = [self]
+            for module in modules:
+                descriptor = reg.get_descriptor(module.__class__)
+                if not descriptor.is_thread_safe:
+                    debug.warning("Module %s is not thread-safe, loop "
+                                  "iterations will run serially" %
+                                  descriptor.name)
+                    return 1
+        return nb_threads
+
     def build_stream(self):
         """Determines and builds correct generator type.
 
@@ -1863,3 +1906,33 @@ class TestImplicitLooping(unittest.TestCase):
 
     def test_list_custom(self):
         self.run_vt("test-list-custom.vt")
+
+    def run_parallel(self, threads, values):
+        from vistrails.tests.utils import execute, intercept_result
+        from vistrails.core.modules.basic_modules import Float
+        with intercept_result(Float, 'value') as results:
+            self.assertFalse(execute([
+                    ('List', 'org.vistrails.vistrails.basic', [
+                        ('value', [('List', repr(values))]),
+                    ]),
+                    ('PythonCalc', 'org.vistrails.vistrails.pythoncalc', [
+                        ('value2', [('Float', '1.0')]),
+                        ('op', [('String', '+')]),
+                    ]),
+                    ('Float', 'org.vistrails.vistrails.basic', []),
+                ],
+                [
+                    (0, 'value', 1, 'value1'),
+                    (1, 'value', 2, 'value'),
+                ],
+                control_params=[
+                    (1, ModuleControlParam.LOOP_PARALLEL_KEY, threads),
+                ]))
+        return results[-1]
+
+    def test_parallel(self):
+        values = [float(i) for i in xrange(50)]
+        expected = [v + 1.0 for v in values]
+        self.assertEqual(self.run_parallel('1', values), expected)
+        self.assertEqual(self.run_parallel('4', values), expected)
+        self.assertEqual(self.run_parallel('4', values[:1]), expected[:1])
@@ -45,6 +45,7 @@ import inspect
 import itertools
 import os
 import sys
+import threading
 import warnings
 
 from vistrails.core import debug, get_vistrails_application, system
@@ -54,6 +55,8 @@ import vistrails.core.data_structures.graph
 from vistrails.core.modules.module_registry import MissingPackage, \
     MissingPackageVersion
 from vistrails.core.modules.package import Package
+from vistrails.core.modules.registry_snapshot import load_snapshot, \
+    save_snapshot
 from vistrails.core.requirements import MissingRequirement
 from vistrails.core.utils import VistrailsInternalError, \
     versions_increasing, VistrailsDeprecation
@@ -99,6 +102,9 @@ class PackageManager(object):
             return "Package '%s' has a bug: %s" % (self._package_name,
                                                    self._description)
 
+    # Packages that are always initialized on startup
+    never_deferred = ('basic_modules', 'abstraction')
+
     def import_packages_module(self):
         """Imports the 'vistrails.packages' package.
 
@@ -174,6 +180,12 @@ class PackageManager(object):
         self._abstraction_pkg = None
         self._currently_importing_package = None
 
+        # Packages added from the registry snapshot are initialized on
+        # demand, possibly from the interpreter's threads
+        self._registry_snapshot = None
+        self._deferred_lock = threading.RLock()
+        self._deferred_initializing = set()
+
         # Setup a global __import__ hook that calls Package#import_override()
         # for all imports executed from that package
         import __builtin__
@@ -505,7 +517,8 @@ class PackageManager(object):
             self.add_dependencies(pkg)
             #check_requirements is now called in pkg.initialize()
             #pkg.check_requirements()
-            self._registry.initialize_package(pkg)
+            if not self.defer_package(pkg):
+                self._registry.initialize_package(pkg)
             self._registry.signals.emit_new_package(pkg.identifier, True)
             app.send_notification("package_added", codepath)
             self.add_menu_items(pkg)
@@ -578,7 +591,7 @@ class PackageManager(object):
         app = get_vistrails_application()
         for package in self._package_list.itervalues():
             # print '+ initializing', package.codepath, id(package)
-            if package.initialized():
+            if package.initialized() or package.deferred:
                 # print '- already initialized'
                 continue
             try:
@@ -670,11 +683,19 @@ class PackageManager(object):
             raise self.DependencyCycle(e.back_edge[0],
                                        e.back_edge[1])
 
+        self._registry_snapshot = self.load_registry_snapshot()
+        snapshot_outdated = False
         for name in sorted_packages:
             pkg = self.get_package(name)
-            if not pkg.initialized():
+            if pkg.deferred:
+                continue
+            elif self.defer_package(pkg):
+                app.send_notification("package_added", pkg.codepath)
+            elif not pkg.initialized():
                 #check_requirements is now called in pkg.initialize()
                 #pkg.check_requirements()
+                if pkg.codepath not in self.never_deferred:
+                    snapshot_outdated = True
                 try:
                     self._registry.initialize_package(pkg)
                 except MissingRequirement, e:
@@ -697,9 +718,130 @@ class PackageManager(object):
                     self.add_menu_items(pkg)
                     app = get_vistrails_application()
                     app.send_notification("package_added", pkg.codepath)
+        if snapshot_outdated:
+            self.save_registry_snapshot()
 
         self._startup.save_persisted_startup()
 
+    def load_registry_snapshot(self):
+        """Reads the registry snapshot, if packages can be deferred.
+
+        Deferring is only done without the GUI, which lists the modules of
+        all packages anyway.
+        """
+        filename = system.get_vistrails_directory('registrySnapshot')
+        if filename is None:
+            return None
+        app = get_vistrails_application()
+        if app is None or app.is_running_gui():
+            return None
+        return load_snapshot(filename)
+
+    def save_registry_snapshot(self):
+        """Writes the registry snapshot, if the option is set.
+        """
+        filename = system.get_vistrails_directory('registrySnapshot')
+        if filename is None:
+            return
+        packages = [pkg for pkg in self._package_list.itervalues()
+                    if pkg.initialized() or pkg.deferred]
+        try:
+            save_snapshot(filename, self._registry, packages)
+        except Exception, e:
+            debug.warning("Couldn't save the registry snapshot to %s" %
+                          filename, e)
+
+    def defer_package(self, pkg):
+        """Adds a package to the registry from the snapshot.
+
+        Returns False if the snapshot can't be used for this package; it
+        then has to be initialized.
+        """
+        snapshot = self._registry_snapshot
+        if (snapshot is None or pkg.initialized() or
+                pkg.codepath in self.never_deferred or
+                not snapshot.has_package(pkg)):
+            return False
+        pkg.deferred = True
+        pkg.deferred_hooks = snapshot.get_hooks(pkg.identifier)
+        try:
+            self._registry.add_deferred_package(pkg, snapshot)
+        except Exception, e:
+            debug.warning("Couldn't use the registry snapshot for package "
+                          "%s" % pkg.codepath, e)
+            pkg.deferred = False
+            try:
+                self._registry.remove_package(pkg)
+            except MissingPackage:
+                pass
+            else:
+                # remove_package() also unloaded it
+                pkg.load()
+            return False
+        debug.log("Deferred initialization of " + pkg.codepath)
+        return True
+
+    def initialize_deferred_package(self, pkg):
+        """Initializes a package that was added from the registry snapshot.
+
+        This is called when the class of one of its modules is first needed;
+        its dependencies are initialized first.
+        """
+        with self._deferred_lock:
+            if not pkg.deferred or pkg.codepath in self._deferred_initializing:
+                return
+            for dep_id in self.all_dependencies(pkg.identifier):
+                if dep_id != pkg.identifier:
+                    self.initialize_deferred_package(self.get_package(dep_id))
+            snapshot_contents = self.package_contents(pkg)
+            self._deferred_initializing.add(pkg.codepath)
+            try:
+                self._registry.initialize_package(pkg)
+            except (MissingRequirement, Package.InitializationFailed), e:
+                pkg.deferred = False
+                debug.critical("Initialization of package <codepath %s> "
+                               "failed and will be disabled" % pkg.codepath,
+                               e)
+                self.late_disable_package(pkg.codepath)
+                raise
+            finally:
+                self._deferred_initializing.discard(pkg.codepath)
+            pkg.deferred = False
+
+            # Remove the modules that the package no longer adds, subclasses
+            # first
+            leftover = [d for d in pkg.descriptor_list if d.module is None]
+            while leftover:
+                leaves = [d for d in leftover if not d.children]
+                if not leaves:
+                    break
+                for descriptor in leaves:
+                    debug.warning("Module %s from the registry snapshot was "
+                                  "not added by package %s" % (
+                                      descriptor.name, pkg.codepath))
+                    self._registry.delete_module(descriptor.identifier,
+                                                 descriptor.name,
+                                                 descriptor.namespace)
+                    leftover.remove(descriptor)
+            self.add_menu_items(pkg)
+
+            if self.package_contents(pkg) != snapshot_contents:
+                debug.log("Registry snapshot of package %s is outdated" %
+                          pkg.codepath)
+                self.save_registry_snapshot()
+
+    @staticmethod
+    def package_contents(pkg):
+        """Returns what the registry snapshot records for a package: its
+        hooks, modules and their port specs.
+        """
+        modules = set()
+        for descriptor in pkg.descriptor_list:
+            port_specs = frozenset((spec.name, spec.type, spec.sigstring)
+                                   for spec in descriptor.port_specs_list)
+            modules.add((descriptor.name, descriptor.namespace, port_specs))
+        return set(pkg.get_hooks()), modules
+
     def add_menu_items(self, pkg):
         """Emit the appropriate signal if the package has menu items.
 
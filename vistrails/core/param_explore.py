@@ -163,7 +163,7 @@ class InterpolateDiscreteParam(object):
         pipeline
 
         """
-        m = pipeline.modules[self.module.id]
+        m = pipeline.own_module(self.module.id)
         f = ModuleFunction()
         f.name = self.function
         f.returnType = 'void'
@@ -176,6 +176,7 @@ class InterpolateDiscreteParam(object):
             p.strValue = str(v)
             f.params.append(p)
         m.functions.append(f)
+        pipeline.invalidate_module_signature(m.id)
 
 class ActionBasedParameterExploration(object):
     """
@@ -38,11 +38,15 @@ from __future__ import division
 import itertools
 
 """ Utilities for dealing with the thumbnails """
+from collections import OrderedDict
 import os
 import os.path
+import Queue
 import shutil
 import tempfile
+import threading
 import time
+import unittest
 import uuid
 import mimetypes
 # mimetypes are broken by default on windows so use the builtins
@@ -78,8 +82,14 @@ class ThumbnailCache(object):
 
     def __init__(self):
         self._temp_directory = None
-        self.elements = {}
+        # Ordered from least to most recently used
+        self.elements = OrderedDict()
         self.vtelements = {}
+        self._size = 0
+        self._lock = threading.RLock()
+        # Thumbnails being created in the background: name -> Event
+        self._pending = {}
+        self._queue = None
         self.conf = None
         conf = get_vistrails_configuration()
         if conf.has('thumbs'):
@@ -87,6 +97,7 @@ class ThumbnailCache(object):
         self.init_cache()
 
     def destroy(self):
+        self.flush()
         if self._temp_directory is not None:
             print "removing thumbnail directory"
             shutil.rmtree(self._temp_directory)
@@ -105,40 +116,88 @@ class ThumbnailCache(object):
         return self._temp_directory
     
     def init_cache(self):
+        entries = []
         for root,dirs, files in os.walk(self.get_directory()):
             for f in files:
                 fname = os.path.join(root,f)
                 statinfo = os.stat(fname)
                 size = int(statinfo[6])
                 time = float(statinfo[8])
-                entry = CacheEntry(fname, f, time, size)
-                self.elements[f] = entry
-                
+                entries.append(CacheEntry(fname, f, time, size))
+        entries.sort(key=lambda obj: obj.time)
+        for entry in entries:
+            self._add_element(entry)
+
+    def _add_element(self, entry):
+        with self._lock:
+            self._remove_element(entry.name)
+            self.elements[entry.name] = entry
+            self._size += entry.size
+
+    def _remove_element(self, name):
+        with self._lock:
+            entry = self.elements.pop(name, None)
+            if entry is not None:
+                self._size -= entry.size
+            return entry
+
     def get_abs_name_entry(self,name):
         """get_abs_name_entry(name) -> str 
         It will look for absolute file path of name in self.elements and 
         self.vtelements. It returns None if item was not found.
         
         """
-        try:
-            return self.elements[name].abs_name
-        except KeyError, e:
+        self.wait(name)
+        with self._lock:
+            entry = self.elements.pop(name, None)
+            if entry is not None:
+                # Mark as most recently used
+                self.elements[name] = entry
+                return entry.abs_name
             try:
                 return self.vtelements[name].abs_name
             except KeyError, e:
                 return None
         
     def size(self):
-        size = 0
-        for entry in self.elements.itervalues():
-            size += entry.size
-        return size
+        return self._size
+
+    def wait(self, name):
+        """wait(name: str) -> None
+        Waits for the thumbnail to be created if it is being generated in the
+        background.
+
+        """
+        with self._lock:
+            event = self._pending.get(name)
+        if event is not None:
+            event.wait()
+
+    def is_pending(self, name):
+        """is_pending(name: str) -> bool
+        Tells whether the thumbnail is still being generated in the
+        background.
+
+        """
+        with self._lock:
+            return name in self._pending
+
+    def flush(self):
+        """flush() -> None
+        Waits for all the thumbnails being generated in the background.
+
+        """
+        with self._lock:
+            events = self._pending.values()
+        for event in events:
+            event.wait()
 
     def move_cache_directory(self, sourcedir, destdir):
         """change_cache_directory(sourcedir: str, dest_dir: str) -> None"
         Moves files from sourcedir to destdir
         
         """
+        self.flush()
         if os.path.exists(destdir):
             for entry in self.elements.itervalues():
                 try:
@@ -153,61 +212,119 @@ class ThumbnailCache(object):
                                   e)
                     
     def remove_lru(self,n=1):
-        elements = self.elements.values()
-        elements.sort(key=lambda obj: obj.time)
-        num = min(n,len(elements))
-        debug.debug("Will remove %s elements from cache..."%num)
-        debug.debug("Cache has %s elements and %s bytes"%(len(elements),
+        with self._lock:
+            elements = [self._remove_element(name)
+                        for name in list(itertools.islice(self.elements, n))]
+        debug.debug("Will remove %s elements from cache..."%len(elements))
+        debug.debug("Cache has %s elements and %s bytes"%(len(self.elements),
                                                              self.size()))
-        for elem in itertools.islice(elements, num):
+        for elem in elements:
             try:
-                del self.elements[elem.name]
                 os.unlink(elem.abs_name)
             except os.error, e:
                 debug.warning("Could not remove file %s" % elem.abs_name, e)
 
     def remove(self,key):
-        if key in self.elements.keys():
-            entry = self.elements[key]
-            del self.elements[key]
-            os.unlink(entry.abs_name)
-        elif key in self.vtelements.keys():
-            entry = self.vtelements[key]
-            del self.vtelements[key]
+        self.wait(key)
+        with self._lock:
+            entry = self._remove_element(key)
+            if entry is None:
+                entry = self.vtelements.pop(key, None)
+        if entry is not None:
             os.unlink(entry.abs_name)
             
     def clear(self):
-        self.elements = {}
+        self.flush()
+        with self._lock:
+            self.elements = OrderedDict()
+            self._size = 0
         self._delete_files(self.get_directory())
         
-    def add_entry_from_cell_dump(self, folder, key=None):
+    def add_entry_from_cell_dump(self, folder, key=None, wait=True,
+                                 cleanup=False):
         """create_entry_from_cell_dump(folder: str) -> str
         Creates a cache entry from images in folder by merge them in a single 
         image and returns the name of the image in cache.
         If a valid key is provided, it will use it as the name of the 
         image file.
+
+        If wait is False, the image is created by a background thread and
+        the name is returned right away; getting the path of the entry will
+        wait for it, and returns None if it could not be created (key is
+        then kept). This requires cleanup to be True: the cache must own
+        folder, which it deletes once the images have been read.
         
         """
         
-        image = None
         thumbnail_fnames = self._get_thumbnail_fnames(folder)
-        if len(thumbnail_fnames) > 0:
+        if not thumbnail_fnames:
+            if cleanup:
+                shutil.rmtree(folder, ignore_errors=True)
+            return None
+        fname = "%s.png" % str(uuid.uuid1())
+        task = (thumbnail_fnames, fname, key, folder if cleanup else None)
+        if wait or not cleanup:
+            # The caller keeps using the folder, so the images have to be
+            # read before returning
+            return self._create_entry(*task)
+        with self._lock:
+            self._pending[fname] = threading.Event()
+            if self._queue is None:
+                self._queue = Queue.Queue()
+                worker = threading.Thread(target=self._run_worker,
+                                          name='vistrails-thumbnails')
+                worker.daemon = True
+                worker.start()
+        self._queue.put(task)
+        return fname
+
+    def _run_worker(self):
+        while True:
+            task = self._queue.get()
+            fname = task[1]
+            try:
+                self._create_entry(*task)
+            except Exception, e:
+                debug.critical("Error creating thumbnail", e)
+            finally:
+                with self._lock:
+                    event = self._pending.pop(fname)
+                event.set()
+
+    def _create_entry(self, thumbnail_fnames, fname, key, folder):
+        """_create_entry(thumbnail_fnames: list, fname: str, key: str,
+                         folder: str) -> str
+        Merges the images into a new cache entry, replacing key if given.
+        Returns the name of the entry, or None if no image could be read.
+
+        """
+        try:
             image = self._merge_thumbnails(thumbnail_fnames)
-        fname = None
-        if image is not None and image.width() > 0 and image.height() > 0:
-            fname = "%s.png" % str(uuid.uuid1())
-            abs_fname = self._save_thumbnail(image, fname) 
-            statinfo = os.stat(abs_fname)
-            size = int(statinfo[6])
-            time = float(statinfo[8])
-            entry = CacheEntry(abs_fname, fname, time, size)
-            #remove old element
-            if key:
-                self.remove(key)
-            if self.size() + size > self.conf.cacheSize*1024*1024:
-                self.remove_lru(10)
-                
-            self.elements[fname] = entry
+        finally:
+            if folder is not None:
+                shutil.rmtree(folder, ignore_errors=True)
+        if image is None or image.width() <= 0 or image.height() <= 0:
+            return None
+        abs_fname = self._save_thumbnail(image, fname) 
+        statinfo = os.stat(abs_fname)
+        size = int(statinfo[6])
+        time = float(statinfo[8])
+        entry = CacheEntry(abs_fname, fname, time, size)
+        #remove old element
+        if key:
+            self.remove(key)
+        with self._lock:
+            # Evict the least recently used entries until the new one fits
+            max_size = self.conf.cacheSize*1024*1024
+            n = freed = 0
+            for elem in self.elements.itervalues():
+                if self.size() - freed + size <= max_size:
+                    break
+                freed += elem.size
+                n += 1
+            if n:
+                self.remove_lru(n)
+            self._add_element(entry)
         return fname
         
     def add_entries_from_files(self, absfnames):
@@ -260,6 +377,7 @@ class ThumbnailCache(object):
         Generates a single image formed by all the images in the fnames list.
         
         """
+        # QImage rather than QPixmap, so this can run outside the GUI thread
         from PyQt4 import QtCore, QtGui
         height = 0
         width = 0
@@ -267,7 +385,7 @@ class ThumbnailCache(object):
         # OS may return wrong order so  we need to sort
         fnames.sort()
         for fname in fnames:
-            pix = QtGui.QPixmap(fname)
+            pix = QtGui.QImage(fname)
             if pix.height() > 0 and pix.width() > 0:
                 pixmaps.append(pix)
                 #width += pix.width()
@@ -279,7 +397,7 @@ class ThumbnailCache(object):
             painter = QtGui.QPainter(finalImage)
             x = 0
             for pix in pixmaps:
-                painter.drawPixmap(0, x, pix)
+                painter.drawImage(0, x, pix)
                 x += pix.height()
             painter.end()
             if width > ThumbnailCache.IMAGE_MAX_WIDTH:
@@ -307,3 +425,127 @@ class ThumbnailCache(object):
             local_thumb = os.path.join(local_dir, os.path.basename(thumb))
             if os.path.exists(thumb) and not os.path.exists(local_thumb):
                 shutil.copyfile(thumb, local_thumb)
+
+############################################################################
+
+class TestThumbnailCache(unittest.TestCase):
+    class FakeImage(object):
+        """Stands for the merged QImage, writing its size in bytes.
+        """
+        def __init__(self, size):
+            self.size = size
+
+        def width(self):
+            return 1
+
+        def height(self):
+            return 1
+
+        def save(self, fname):
+            with open(fname, 'wb') as fp:
+                fp.write('x' * self.size)
+
+    def setUp(self):
+        from vistrails.core.configuration import ConfigurationObject
+        self.directory = tempfile.mkdtemp(prefix='vt_test_thumbs_')
+        directory = self.directory
+        test = self
+
+        class Cache(ThumbnailCache):
+            def get_directory(self):
+                return directory
+
+            @staticmethod
+            def _merge_thumbnails(fnames):
+                test.merged.append(fnames)
+                if test.fail:
+                    return None
+                return test.FakeImage(os.path.getsize(fnames[0]))
+        self.merged = []
+        self.fail = False
+        self.cache = Cache()
+        self.cache.conf = ConfigurationObject(cacheSize=1)
+
+    def tearDown(self):
+        self.cache.flush()
+        shutil.rmtree(self.directory)
+
+    def make_dump(self, size):
+        folder = tempfile.mkdtemp(prefix='vt_test_cells_')
+        with open(os.path.join(folder, 'cell.png'), 'wb') as fp:
+            fp.write('x' * size)
+        return folder
+
+    def test_background(self):
+        folder = self.make_dump(1000)
+        name = self.cache.add_entry_from_cell_dump(folder, wait=False,
+                                                   cleanup=True)
+        self.assertIsNotNone(name)
+        abs_name = self.cache.get_abs_name_entry(name)
+        self.assertEqual(abs_name, os.path.join(self.directory, name))
+        self.assertTrue(os.path.exists(abs_name))
+        self.assertFalse(os.path.exists(folder))
+        self.assertEqual(self.cache.size(), 1000)
+
+        # no image, no thumbnail
+        folder = tempfile.mkdtemp(prefix='vt_test_cells_')
+        self.assertIsNone(self.cache.add_entry_from_cell_dump(
+                folder, wait=False, cleanup=True))
+        self.assertFalse(os.path.exists(folder))
+
+    def test_background_failure(self):
+        folder = self.make_dump(1000)
+        old_name = self.cache.add_entry_from_cell_dump(folder, cleanup=True)
+
+        # the previous entry is kept if the new one can't be created
+        self.fail = True
+        folder = self.make_dump(2000)
+        name = self.cache.add_entry_from_cell_dump(folder, old_name,
+                                                   wait=False, cleanup=True)
+        self.assertIsNotNone(name)
+        self.assertIsNone(self.cache.get_abs_name_entry(name))
+        self.assertFalse(self.cache.is_pending(name))
+        self.assertFalse(os.path.exists(folder))
+        self.assertEqual(list(self.cache.elements), [old_name])
+        self.assertEqual(self.cache.size(), 1000)
+
+    def test_caller_folder(self):
+        # folders the cache doesn't own are read before returning
+        folder = self.make_dump(1000)
+        try:
+            name = self.cache.add_entry_from_cell_dump(folder, wait=False)
+            self.assertFalse(self.cache.is_pending(name))
+            self.assertIn(name, self.cache.elements)
+            self.assertTrue(os.path.exists(folder))
+        finally:
+            shutil.rmtree(folder)
+
+    def test_lru(self):
+        names = []
+        for i in xrange(4):
+            folder = self.make_dump(300 * 1024)
+            names.append(self.cache.add_entry_from_cell_dump(folder,
+                                                             cleanup=True))
+        self.assertEqual(self.cache.size(), 3 * 300 * 1024)
+        self.assertEqual(list(self.cache.elements), names[1:])
+
+        # using an entry makes it the most recently used
+        self.cache.get_abs_name_entry(names[1])
+        folder = self.make_dump(300 * 1024)
+        names.append(self.cache.add_entry_from_cell_dump(folder,
+                                                         cleanup=True))
+        self.assertEqual(list(self.cache.elements),
+                         [names[3], names[1], names[4]])
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted(self.cache.elements))
+
+        # replacing an entry
+        folder = self.make_dump(100)
+        name = self.cache.add_entry_from_cell_dump(folder, names[3],
+                                                   cleanup=True)
+        self.assertEqual(list(self.cache.elements), [names[1], names[4], name])
+        self.assertEqual(self.cache.size(), 2 * 300 * 1024 + 100)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+        self.assertEqual(os.listdir(self.directory), [])
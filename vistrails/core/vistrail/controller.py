@@ -50,7 +50,7 @@ import vistrails.core.db.locator
 from vistrails.core import debug
 from vistrails.core.data_structures.graph import Graph
 from vistrails.core.interpreter.default import get_default_interpreter
-from vistrails.core.vistrail.job import JobMonitor
+from vistrails.core.vistrail.job import JobMonitor, journal_filename
 from vistrails.core.layout.workflow_layout import WorkflowLayout, \
     Pipeline as LayoutPipeline, Defaults as LayoutDefaults
 from vistrails.core.log.controller import LogController, DummyLogController
@@ -85,6 +85,7 @@ from vistrails.core.vistrail.module_control_param import ModuleControlParam
 from vistrails.core.vistrail.module_function import ModuleFunction
 from vistrails.core.vistrail.module_param import ModuleParam
 from vistrails.core.vistrail.pipeline import Pipeline
+from vistrails.core.vistrail.pipeline_cache import PipelineCache
 from vistrails.core.vistrail.port import Port
 from vistrails.core.vistrail.port_spec import PortSpec
 from vistrails.core.vistrail.port_spec_item import PortSpecItem
@@ -207,7 +208,12 @@ class VistrailController(object):
     current_base_version = property(_get_current_base_version)
 
     def flush_pipeline_cache(self):
-        self._pipelines = {0: Pipeline()}
+        self._pipelines = PipelineCache()
+
+    def get_pipeline_cache_stats(self):
+        """get_pipeline_cache_stats() -> dict
+        Returns the hit rates and size of the pipeline cache."""
+        return self._pipelines.stats()
 
     def logging_on(self):
         return get_vistrails_configuration().check('executionLog')
@@ -230,6 +236,9 @@ class VistrailController(object):
         self.log = Log()
         self.flush_pipeline_cache()
         self.clear_delayed_actions()
+        # Thumbnails being created in the background:
+        # (version, name, previous name)
+        self._pending_thumbnails = []
         if self.vistrail is not None:
             self.id_scope = self.vistrail.idScope
             self.current_session = self.vistrail.idScope.getNewId("session")
@@ -244,6 +253,12 @@ class VistrailController(object):
                 self._mashups = mashups
             job_annotation = vistrail.get_annotation('__jobs__')
             self.jobMonitor = JobMonitor(job_annotation and job_annotation.value)
+            journal = journal_filename(locator)
+            if journal is not None:
+                try:
+                    self.jobMonitor.setJournal(journal)
+                except (IOError, OSError), e:
+                    debug.warning("Couldn't open job journal %s" % journal, e)
         else:
             self.jobMonitor = JobMonitor()
 
@@ -2517,9 +2532,29 @@ class VistrailController(object):
 
         return (modules, connections)
 
+    def check_pending_thumbnails(self, wait=False):
+        """check_pending_thumbnails(wait: bool) -> None
+        Puts back the previous thumbnail of the versions whose thumbnail
+        could not be created in the background. If wait is True, waits for
+        all of them to be done.
+
+        """
+        thumb_cache = ThumbnailCache.getInstance()
+        if wait:
+            thumb_cache.flush()
+        pending = []
+        for (version, fname, old_fname) in self._pending_thumbnails:
+            if thumb_cache.is_pending(fname):
+                pending.append((version, fname, old_fname))
+            elif (thumb_cache.get_abs_name_entry(fname) is None and
+                    self.vistrail.get_thumbnail(version) == fname):
+                self.vistrail.set_thumbnail(version, old_fname or "")
+        self._pending_thumbnails = pending
+
     def find_thumbnails(self, tags_only=True):
         thumbnails = []
         thumb_cache = ThumbnailCache.getInstance()
+        self.check_pending_thumbnails(wait=True)
         for action in self.vistrail.actions:
             if self.vistrail.has_thumbnail(action.id):
                 thumbnail = self.vistrail.get_thumbnail(action.id)
@@ -2597,6 +2632,7 @@ class VistrailController(object):
         interpreter = get_default_interpreter()
         changed = False
         results = []
+        self.check_pending_thumbnails()
         for vis in vistrails:
             error = None
             (locator, version, pipeline, view, aliases, params, reason, sinks, extra_info) = vis
@@ -2632,9 +2668,20 @@ class VistrailController(object):
                 old_thumb_name = self.vistrail.get_thumbnail(version)
                 if 'compare_thumbnails' in extra_info:
                     old_thumb_name = None
+                # The thumbnail is created in the background if the cache
+                # can own the folder (the caller might still use its own)
+                # and it doesn't have to be compared right away
+                wait = ('compare_thumbnails' in extra_info or
+                        not temp_folder_used)
                 fname = thumb_cache.add_entry_from_cell_dump(
                                         extra_info['pathDumpCells'],
-                                        old_thumb_name)
+                                        old_thumb_name,
+                                        wait=wait,
+                                        cleanup=temp_folder_used)
+                temp_folder_used = False
+                if fname is not None and not wait:
+                    self._pending_thumbnails.append((version, fname,
+                                                     old_thumb_name))
                 if 'compare_thumbnails' in extra_info:
                     # check thumbnail difference
                     prev = None
@@ -3668,7 +3715,7 @@ class VistrailController(object):
         pipeline.validate(raise_exception, vistrail_vars)
 
     def version_switch_cost(self, descendant, ancestor):
-        """ Version switch cost as action distance
+        """ Version switch cost as the number of operations to replay
 
         """
         cost = 0
@@ -3676,8 +3723,9 @@ class VistrailController(object):
         if descendant == -1:
             descendant = 0
         while descendant != ancestor:
-            descendant = am[descendant].parent
-            cost += 1
+            action = am[descendant]
+            cost += len(action.operations)
+            descendant = action.parent
         return cost
 
     def do_version_switch(self, new_version, report_all_errors=False,
@@ -4249,14 +4297,18 @@ class VistrailController(object):
                 return result
         # Fast check: if target is cached, copy it and we're done.
         elif version in self._pipelines:
-            result = copy.copy(self._pipelines[version])
+            self._pipelines.record_lookup('hit')
+            result = copy.copy(self._pipelines.get(version))
         else:
+            cache = self._pipelines
             # Find the closest upstream pipeline to the current one
             cv = self._current_full_graph.inverse_immutable().closest_vertex
-            closest = cv(version, self._pipelines)
+            closest = cv(version, cache)
+            closest_operations = self.version_switch_cost(version, closest)
             if use_current:
-                cost_to_closest_version = self.version_switch_cost(version,
-                                                                   closest)
+                # Both ways copy a pipeline then replay operations
+                cost_to_closest_version = cache.copy_cost(closest) + \
+                    cache.replay_cost(closest_operations)
                 # Now we have to decide between the closest pipeline
                 # to version and the current pipeline
                 shared_parent = getSharedRoot(self.vistrail,
@@ -4266,22 +4318,27 @@ class VistrailController(object):
                     self.current_version, shared_parent)
                 cost_common_to_new = self.version_switch_cost(version,
                                                               shared_parent)
-                cost_to_current_version = cost_common_to_old + \
-                    cost_common_to_new
+                if self.current_version == -1 or self.current_version == 0:
+                    current_copy_cost = 0
+                else:
+                    current_copy_cost = cache.copy_cost(self.current_pipeline)
+                cost_to_current_version = current_copy_cost + \
+                    cache.replay_cost(cost_common_to_old + cost_common_to_new)
             else:
                 cost_to_closest_version = 0
                 cost_to_current_version = 1
-            # FIXME I'm assuming copying the pipeline has zero cost.
-            # Formulate a better cost model
             if cost_to_closest_version < cost_to_current_version:
                 if closest == 0:
+                    cache.record_lookup('miss')
                     result = self.vistrail.getPipeline(version)
                 else:
-                    result = copy.copy(self._pipelines[closest])
+                    cache.record_lookup('ancestor')
+                    result = copy.copy(cache.get(closest))
                     action = self.vistrail.general_action_chain(closest,
                                                                 version)
                     result.perform_action(action)
             else:
+                cache.record_lookup('miss')
                 action = \
                     self.vistrail.general_action_chain(self.current_version,
                                                        version)
@@ -4291,18 +4348,26 @@ class VistrailController(object):
                     result = copy.copy(self.current_pipeline)
                 result.perform_action(action)
 
-            if self._cache_pipelines and self.get_tag(long(version)):
-                # stash a copy for future use for tagged (and upgraded) pipelines
-                if do_validate:
-                    try:
-                        self.validate(result)
-                    except InvalidPipeline:
-                        if not allow_fail:
-                            raise
+            if self._cache_pipelines:
+                # stash a copy for future use for tagged (and upgraded)
+                # pipelines, and for versions that are visited often
+                conf = get_vistrails_configuration()
+                cache.set_limits(getattr(conf, 'pipelineCacheSize', 0),
+                                 getattr(conf, 'pipelineCacheMinVisits', 2))
+                cache.visit(version)
+                if cache.should_admit(version, result,
+                                      self.get_tag(long(version)),
+                                      closest_operations):
+                    if do_validate:
+                        try:
+                            self.validate(result)
+                        except InvalidPipeline:
+                            if not allow_fail:
+                                raise
+                        else:
+                            cache.add(version, result)
                     else:
-                        self._pipelines[version] = copy.copy(result)
-                else:
-                    self._pipelines[version] = copy.copy(result)
+                        cache.add(version, result)
         if do_validate:
             try:
                 self.validate(result)
@@ -4504,3 +4569,71 @@ class TestTerseGraph(unittest.TestCase):
             13L: [(14L, (False, False)), (17L, (False, False))],
             4L: [], 6L: [], 10L: [], 14L: [], 17L: [],
         })
+
+
+class TestPipelineCaching(unittest.TestCase):
+    def get_controller(self):
+        from vistrails.core.db.locator import XMLFileLocator
+        from vistrails.core.system import vistrails_root_directory
+
+        locator = XMLFileLocator(vistrails_root_directory() +
+                                 '/tests/resources/dummy.xml')
+        controller = VistrailController(locator.load(), locator)
+        controller.recompute_terse_graph()
+        return controller
+
+    def test_frequent_versions(self):
+        """Untagged versions are cached once visited often enough"""
+        conf = get_vistrails_configuration()
+        old_min_visits = conf.pipelineCacheMinVisits
+        conf.pipelineCacheMinVisits = 2
+        try:
+            controller = self.get_controller()
+            version = 34L
+            self.assertFalse(controller.get_tag(version))
+            p1 = controller.get_pipeline(version, do_validate=False)
+            self.assertNotIn(version, controller._pipelines)
+            controller.get_pipeline(version, do_validate=False)
+            self.assertIn(version, controller._pipelines)
+            p3 = controller.get_pipeline(version, do_validate=False)
+            self.assertEqual(p1, p3)
+            self.assertEqual(p3, controller.vistrail.getPipeline(version))
+            stats = controller.get_pipeline_cache_stats()
+            self.assertEqual(stats['hits'], 1)
+            self.assertEqual(stats['hits'] + stats['ancestor_hits'] +
+                             stats['misses'], 3)
+
+            # descendants start from the cached version
+            child = 35L
+            self.assertEqual(controller.vistrail.actionMap[child].prevId,
+                             version)
+            p4 = controller.get_pipeline(child, do_validate=False)
+            self.assertEqual(controller.get_pipeline_cache_stats()[
+                                 'ancestor_hits'], 1)
+            self.assertEqual(p4, controller.vistrail.getPipeline(child))
+        finally:
+            conf.pipelineCacheMinVisits = old_min_visits
+
+class TestPendingThumbnails(unittest.TestCase):
+    def test_failed_thumbnail(self):
+        """Versions get their previous thumbnail back if the new one
+        couldn't be created"""
+        from vistrails.core.db.locator import XMLFileLocator
+        from vistrails.core.system import vistrails_root_directory
+
+        locator = XMLFileLocator(vistrails_root_directory() +
+                                 '/tests/resources/dummy.xml')
+        controller = VistrailController(locator.load(), locator)
+        thumb_cache = ThumbnailCache.getInstance()
+        # neither name is in the cache, as if their creation failed
+        name = 'vt_test_missing_%s.png' % uuid.uuid1()
+        controller.vistrail.set_thumbnail(34L, name)
+        controller._pending_thumbnails.append((34L, name, None))
+        controller.vistrail.set_thumbnail(35L, name)
+        controller._pending_thumbnails.append((35L, name, 'previous.png'))
+        self.assertIsNone(thumb_cache.get_abs_name_entry(name))
+        controller.check_pending_thumbnails(wait=True)
+        self.assertFalse(controller.vistrail.get_thumbnail(34L))
+        self.assertEqual(controller.vistrail.get_thumbnail(35L),
+                         'previous.png')
+        self.assertEqual(controller._pending_thumbnails, [])
@@ -48,7 +48,10 @@ from uuid import uuid1
 
 import datetime
 import getpass
+import hashlib
 import json
+import os
+import threading
 import time
 import unittest
 import weakref
@@ -354,6 +357,7 @@ class JobMonitor(object):
         self.workflows = {}
         self.jobs = {}
         self.callback = None
+        self.journal = None
         if json_string is not None:
             self.unserialize(json_string)
 
@@ -393,15 +397,20 @@ class JobMonitor(object):
         """
 
         _dict = json.loads(s)
+        return self._load(_dict.get('jobs', {}), _dict.get('workflows', {}))
 
-        jobs = _dict.get('jobs', {})
+    def _load(self, jobs, workflows):
+        """ _load(jobs: dict, workflows: dict) -> dict
+            replaces the running jobs with the ones from the dicts
+
+        """
         self.jobs = {}
         for id, job in jobs.iteritems():
             self.jobs[id] = Job.from_dict(job)
 
-        workflows = _dict.get('workflows', {})
         self.workflows = {}
         for id, workflow in workflows.iteritems():
+            workflow = dict(workflow)
             workflow['jobs'] = dict([(i, self.jobs[i])
                                      for i in workflow['jobs']
                                      if i in self.jobs])
@@ -409,6 +418,87 @@ class JobMonitor(object):
             self.workflows[id] = wf
         return self.workflows
 
+    ###########################################################################
+    # Journal
+
+    def setJournal(self, filename):
+        """ setJournal(filename: str) -> None
+            records every change to the jobs in the given file
+
+        Changes already in the file are loaded first, since they are more
+        recent than the state that was saved with the vistrail. The file is
+        then rewritten with the current state, and each change is appended
+        to it as one JSON line, so that the state is never lost even if the
+        vistrail isn't saved.
+
+        """
+        if filename is not None and os.path.exists(filename):
+            self.loadJournal(filename)
+        self.journal = filename
+        if filename is not None:
+            self.compactJournal()
+
+    def loadJournal(self, filename):
+        """ loadJournal(filename: str) -> dict
+            applies the changes recorded in a journal to the running jobs
+
+        """
+        jobs = dict((id, job.to_dict()) for id, job in self.jobs.iteritems())
+        workflows = dict((id, wf.to_dict())
+                         for id, wf in self.workflows.iteritems())
+        with open(filename, 'rb') as fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Incomplete last line if we got interrupted
+                    debug.warning("Ignoring invalid entry in job journal %s" %
+                                  filename)
+                    continue
+                if 'job' in record:
+                    jobs[record['job']['id']] = record['job']
+                elif 'workflow' in record:
+                    workflows[record['workflow']['id']] = record['workflow']
+                elif 'delete_job' in record:
+                    jobs.pop(record['delete_job'], None)
+                elif 'delete_workflow' in record:
+                    workflows.pop(record['delete_workflow'], None)
+        return self._load(jobs, workflows)
+
+    def compactJournal(self):
+        """ compactJournal() -> None
+            rewrites the journal so it only contains the current state
+
+        """
+        if self.journal is None:
+            return
+        directory = os.path.dirname(self.journal)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temp = self.journal + '.tmp'
+        with open(temp, 'wb') as fp:
+            for job in self.jobs.itervalues():
+                fp.write(json.dumps({'job': job.to_dict()}) + '\n')
+            for workflow in self.workflows.itervalues():
+                fp.write(json.dumps({'workflow': workflow.to_dict()}) + '\n')
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        os.rename(temp, self.journal)
+
+    def _record(self, **record):
+        """ _record(**record) -> None
+            appends a change to the journal, if there is one
+
+        """
+        if self.journal is None:
+            return
+        try:
+            with open(self.journal, 'ab') as fp:
+                fp.write(json.dumps(record) + '\n')
+        except IOError, e:
+            debug.warning("Couldn't write to job journal %s" % self.journal,
+                          e)
+
     def addWorkflow(self, workflow):
         """ addWorkflow(workflow: Workflow) -> None
 
@@ -416,6 +506,8 @@ class JobMonitor(object):
         self.workflows[workflow.id] = workflow
         for id, job in workflow.jobs.iteritems():
             self.jobs[id] = job
+            self._record(job=job.to_dict())
+        self._record(workflow=workflow.to_dict())
 
     def getWorkflow(self, id):
         """ getWorkflow(id: str) -> Workflow
@@ -440,6 +532,8 @@ class JobMonitor(object):
                     delete = False
             if delete:
                 del self.jobs[job_id]
+                self._record(delete_job=job_id)
+        self._record(delete_workflow=id)
         if self.callback is not None and self.callback() is not None:
             self.callback().deleteWorkflow(id)
 
@@ -448,9 +542,11 @@ class JobMonitor(object):
             deletes a job from all workflows
         """
         del self.jobs[id]
+        self._record(delete_job=id)
         for wf in self.workflows.itervalues():
             if id in wf.jobs:
                 del wf.jobs[id]
+                self._record(workflow=wf.to_dict())
         if self.callback is not None and self.callback() is not None:
             self.callback().deleteJob(id)
 
@@ -516,6 +612,7 @@ class JobMonitor(object):
             for job in workflow.jobs.values():
                 if not job.finished and not job.updated:
                     job.finish()
+                    self._record(job=job.to_dict())
             if self.callback is not None and self.callback() is not None:
                 self.callback().finishWorkflow(workflow)
         finally:
@@ -541,11 +638,16 @@ class JobMonitor(object):
             job = Job(id, params, name, finished=finished)
             self.jobs[id] = job
 
+        self._record(job=job.to_dict())
+
         workflow = self.currentWorkflow()
         if workflow:
+            new = id not in workflow.jobs or workflow.id not in self.workflows
             workflow.jobs[id] = job
             # we add workflows permanently if they have at least one job
             self.workflows[workflow.id] = workflow
+            if new:
+                self._record(workflow=workflow.to_dict())
         if self.callback is not None and self.callback() is not None:
             self.callback().addJob(self.getJob(id))
 
@@ -586,9 +688,11 @@ class JobMonitor(object):
         if interval and not conf.jobAutorun:
             if handle:
                 # wait for module to complete
+                max_interval = max(interval, conf.jobCheckMaxInterval)
                 try:
                     while not self.isDone(handle):
                         time.sleep(interval)
+                        interval = min(interval * 2, max_interval)
                         print ("Waiting for job: %s,"
                                "press Ctrl+C to suspend") % job.name
                 except KeyboardInterrupt:
@@ -631,21 +735,241 @@ class JobMonitor(object):
             A job is done when it reaches finished or failed state
             val() is used by stable batchq branch
         """
-        finished = handle.finished()
-        if hasattr(finished, 'val'):
-            finished = finished.val()
-        if finished:
+        return handle_finished(handle)
+
+
+def journal_filename(locator):
+    """ journal_filename(locator: BaseLocator) -> str
+
+    Returns the file in which to record the jobs of the vistrail, or None if
+    the 'jobJournalDir' option is not set.
+    """
+    from vistrails.core.system import get_vistrails_directory
+    directory = get_vistrails_directory('jobJournalDir')
+    if not directory or locator is None:
+        return None
+    try:
+        url = locator.to_url()
+    except Exception:
+        return None
+    if not url:
+        return None
+    return os.path.join(directory,
+                        '%s.jobs' % hashlib.sha1(url).hexdigest())
+
+
+def handle_finished(handle):
+    """ handle_finished(handle: JobHandle) -> bool
+
+    A job is done when it reaches finished or failed state
+    val() is used by stable batchq branch
+    """
+    finished = handle.finished()
+    if hasattr(finished, 'val'):
+        finished = finished.val()
+    if finished:
+        return True
+
+    # FIXME : deprecate this, remove from RemoteQ
+    # finished should just return True here too
+    if hasattr(handle, 'failed'):
+        failed = handle.failed()
+        if hasattr(failed, 'val'):
+            failed = failed.val()
+        if failed:
             return True
+    return False
 
-        # FIXME : deprecate this, remove from RemoteQ
-        # finished should just return True here too
-        if hasattr(handle, 'failed'):
-            failed = handle.failed()
-            if hasattr(failed, 'val'):
-                failed = failed.val()
-            if failed:
-                return True
-        return False
+
+def check_handles(handles):
+    """ check_handles(handles: list) -> list
+
+    Checks the status of several jobs, returning for each handle True if it
+    is done, False if it is still running, or None if it couldn't be checked.
+
+    Handles that have a batch_key() method are grouped by the key it returns,
+    and each group is checked with a single call to the batch_finished()
+    method of one of them, which gets the list of handles and returns a list
+    of booleans. This allows a package to query the status of all its jobs on
+    a machine at once, for example. Other handles are checked one by one.
+    """
+    results = [None] * len(handles)
+    groups = {}
+    for i, handle in enumerate(handles):
+        key = None
+        if hasattr(handle, 'batch_key'):
+            try:
+                key = handle.batch_key()
+            except Exception, e:
+                debug.critical("Error checking job", e)
+                continue
+        if key is None:
+            try:
+                results[i] = handle_finished(handle)
+            except Exception, e:
+                debug.critical("Error checking job", e)
+        else:
+            groups.setdefault(key, []).append(i)
+    for key, indices in groups.iteritems():
+        group = [handles[i] for i in indices]
+        try:
+            finished = group[0].batch_finished(group)
+        except Exception, e:
+            debug.critical("Error checking jobs %r" % (key,), e)
+            continue
+        for i, done in zip(indices, finished):
+            results[i] = bool(done)
+    return results
+
+
+class JobPoller(object):
+    """ Checks running jobs in the background and reports when they finish.
+
+    Jobs are registered with watch() along with a callback, which is called
+    with the key and handle once the job is done. Each job is checked again
+    after twice its previous delay, between the 'jobCheckInterval' and
+    'jobCheckMaxInterval' options, and all the jobs due at the same time are
+    checked together through check_handles().
+
+    check() can be called from an existing event loop, or start() can be used
+    to run the checks from a thread, in which case callbacks are called from
+    that thread.
+    """
+    def __init__(self, interval=None, max_interval=None):
+        conf = get_vistrails_configuration()
+        if interval is None:
+            interval = conf.jobCheckInterval or 600
+        if max_interval is None:
+            max_interval = conf.jobCheckMaxInterval
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        # key -> [next check time, delay, handle, callback]
+        self._jobs = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stop = False
+
+    def watch(self, key, handle, callback=None, now=None):
+        """ watch(key: str, handle: JobHandle, callback: callable) -> None
+
+        Starts checking a job, the first check being due right away. Watching
+        the same handle again doesn't change when it will be checked.
+        """
+        with self._condition:
+            entry = self._jobs.get(key)
+            if entry is not None and entry[2] is handle:
+                entry[3] = callback
+                return
+            if now is None:
+                now = time.time()
+            self._jobs[key] = [now, self.interval, handle, callback]
+            self._condition.notify()
+
+    def unwatch(self, key):
+        """ unwatch(key: str) -> None
+
+        Stops checking a job.
+        """
+        with self._condition:
+            self._jobs.pop(key, None)
+
+    def keys(self):
+        with self._condition:
+            return self._jobs.keys()
+
+    def next_check(self):
+        """ next_check() -> float
+
+        Returns the time at which the next job is due, or None.
+        """
+        with self._condition:
+            if not self._jobs:
+                return None
+            return min(entry[0] for entry in self._jobs.itervalues())
+
+    def check(self, keys=None, force=False, now=None):
+        """ check(keys: list, force: bool) -> list
+
+        Checks the jobs that are due, or all of them if force is True,
+        optionally restricted to the given keys. Calls the callbacks of the
+        jobs that are done and stops watching them.
+
+        Returns the keys of the jobs that are done.
+        """
+        if now is None:
+            now = time.time()
+        with self._condition:
+            if keys is None:
+                keys = self._jobs.keys()
+            due = [(key, self._jobs[key]) for key in keys
+                   if key in self._jobs and (force or
+                                             self._jobs[key][0] <= now)]
+        if not due:
+            return []
+        results = check_handles([entry[2] for key, entry in due])
+
+        done = []
+        with self._condition:
+            for (key, entry), finished in zip(due, results):
+                if finished:
+                    if self._jobs.get(key) is entry:
+                        del self._jobs[key]
+                    done.append((key, entry))
+                else:
+                    entry[0] = now + entry[1]
+                    entry[1] = min(entry[1] * 2, self.max_interval)
+        for key, entry in done:
+            if entry[3] is not None:
+                try:
+                    entry[3](key, entry[2])
+                except Exception, e:
+                    debug.critical("Error in job callback", e)
+        return [key for key, entry in done]
+
+    def start(self):
+        """ start() -> None
+
+        Starts checking the jobs from a thread.
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._run,
+                                            name='vistrails-job-poller')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """ stop() -> None
+
+        Stops the thread started by start().
+        """
+        with self._condition:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stop = True
+            self._condition.notify()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stop:
+                    next_check = self.next_check()
+                    if next_check is None:
+                        self._condition.wait()
+                        continue
+                    delay = next_check - time.time()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stop:
+                    return
+            self.check()
 
 
 ###############################################################################
@@ -688,3 +1012,105 @@ class TestJob(unittest.TestCase):
         self.assertIn(workflow2.id, jm.workflows)
         self.assertEqual(workflow1, jm.workflows[workflow1.id])
         self.assertEqual(workflow2, jm.workflows[workflow2.id])
+
+    def test_journal(self):
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp(prefix='vt_jobs_')
+        try:
+            filename = os.path.join(directory, 'test.jobs')
+            jm = JobMonitor()
+            jm.setJournal(filename)
+            workflow = Workflow(12)
+            jm.startWorkflow(workflow)
+            jm.addJob('job1', {'a': 1}, 'first')
+            jm.addJob('job2', {'b': 2}, 'second')
+            jm.finishWorkflow()
+            jm.setCache('job1', {'result': 3})
+            jm.deleteJob('job2')
+
+            # changes are recorded without serializing the monitor
+            jm2 = JobMonitor()
+            jm2.loadJournal(filename)
+            self.assertEqual(set(jm2.jobs), set(['job1']))
+            self.assertTrue(jm2.jobs['job1'].finished)
+            self.assertEqual(jm2.jobs['job1'].parameters, {'result': 3})
+            self.assertEqual(jm2.workflows[workflow.id], workflow)
+
+            # the journal wins over the saved state, and gets compacted
+            jm3 = JobMonitor(JobMonitor().serialize())
+            jm3.setJournal(filename)
+            self.assertEqual(set(jm3.jobs), set(['job1']))
+            with open(filename, 'rb') as fp:
+                self.assertEqual(len(fp.readlines()), 2)
+            jm3.deleteWorkflow(workflow.id)
+            self.assertEqual(JobMonitor().loadJournal(filename), {})
+        finally:
+            shutil.rmtree(directory)
+
+    def test_poller(self):
+        checks = []
+
+        class Handle(object):
+            def __init__(self, key, done=False):
+                self.key = key
+                self.done = done
+
+            def finished(self):
+                checks.append(self.key)
+                return self.done
+
+        class BatchHandle(Handle):
+            def batch_key(self):
+                return 'machine'
+
+            def batch_finished(self, handles):
+                checks.append([h.key for h in handles])
+                return [h.done for h in handles]
+
+        finished = []
+        poller = JobPoller(10, 40)
+        handles = [BatchHandle('a'), BatchHandle('b'), Handle('c')]
+        for h in handles:
+            poller.watch(h.key, h, lambda key, handle: finished.append(key),
+                         now=0)
+
+        # batched handles are checked with a single call
+        self.assertEqual(poller.check(now=0), [])
+        self.assertEqual(sorted(checks, key=str), [['a', 'b'], 'c'])
+
+        # nothing is due until the interval has passed
+        del checks[:]
+        self.assertEqual(poller.check(now=5), [])
+        self.assertEqual(checks, [])
+        self.assertEqual(poller.next_check(), 10)
+
+        # the delay doubles up to the maximum
+        handles[0].done = True
+        self.assertEqual(poller.check(now=10), ['a'])
+        self.assertEqual(finished, ['a'])
+        self.assertEqual(poller.next_check(), 30)
+        poller.check(now=30)
+        self.assertEqual(poller.next_check(), 70)
+        poller.check(now=70)
+        self.assertEqual(poller.next_check(), 110)
+
+        # forced checks ignore the schedule
+        handles[2].done = True
+        self.assertEqual(poller.check(now=80, force=True), ['c'])
+        self.assertEqual(sorted(poller.keys()), ['b'])
+
+    def test_poller_thread(self):
+        class Handle(object):
+            def finished(self):
+                return True
+
+        done = threading.Event()
+        poller = JobPoller(0.01, 0.01)
+        poller.start()
+        try:
+            poller.watch('job', Handle(), lambda key, handle: done.set())
+            done.wait(5)
+            self.assertTrue(done.is_set())
+        finally:
+            poller.stop()
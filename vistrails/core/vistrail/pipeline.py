@@ -54,6 +54,7 @@ from vistrails.db.domain import DBWorkflow
 from vistrails.core.utils import InvalidPipeline
 
 import copy
+from itertools import izip
 
 import unittest
 from vistrails.core.vistrail.abstraction import Abstraction
@@ -128,6 +129,9 @@ class Pipeline(DBWorkflow):
         self.set_defaults()
 
     def set_defaults(self, other=None):
+        self._shared_modules = set()
+        self._shared_connections = set()
+        self._build_owner_index()
         if other is None:
             self.is_valid = False
             self.aliases = Bidict()
@@ -186,11 +190,218 @@ class Pipeline(DBWorkflow):
         return Pipeline.do_copy(self)
 
     def do_copy(self, new_ids=False, id_scope=None, id_remap=None):
+        if not new_ids:
+            return self.shared_copy()
         cp = DBWorkflow.do_copy(self, new_ids, id_scope, id_remap)
         cp.__class__ = Pipeline
         cp.set_defaults(self)
         return cp
 
+    def shared_copy(self):
+        """shared_copy() -> Pipeline
+        Returns a copy-on-write clone of the pipeline.
+
+        Modules and connections are not copied but shared between both
+        pipelines; each pipeline takes a private copy of a module or
+        connection the first time it modifies it (see own_module and
+        own_connection), so the cost of copying is proportional to what
+        is changed afterwards and not to the size of the pipeline.
+
+        Code that modifies modules, functions or parameters of a
+        pipeline without going through its methods must get them from
+        own_module, own_connection or own_object.
+
+        """
+        cp = DBWorkflow(id=self.db_id,
+                        entity_type=self.db_entity_type,
+                        name=self.db_name,
+                        version=self.db_version,
+                        last_modified=self.db_last_modified,
+                        vistrail_id=self.db_vistrail_id)
+        cp.objects = dict(self.objects)
+        cp.objects[(self.vtType, self.db_id)] = cp
+        cp.tmp_id = copy.copy(self.tmp_id)
+        cp._db_modules = self._db_modules[:]
+        cp.db_modules_id_index = dict(self.db_modules_id_index)
+        cp._db_connections = self._db_connections[:]
+        cp.db_connections_id_index = dict(self.db_connections_id_index)
+        # workflow-level annotations and plugin data are few, keep
+        # copying them eagerly
+        for name in ('annotations', 'plugin_datas', 'others'):
+            objs = [copy.copy(v) for v in getattr(self, '_db_' + name)]
+            setattr(cp, '_db_' + name, objs)
+            setattr(cp, 'db_%s_id_index' % name,
+                    dict((v.db_id, v) for v in objs))
+            for obj in objs:
+                DBWorkflow.add_to_index(cp, obj)
+        cp.is_dirty = self.is_dirty
+        cp.is_new = self.is_new
+        cp.__class__ = Pipeline
+
+        cp.is_valid = self.is_valid
+        cp.graph = copy.copy(self.graph)
+        cp.aliases = copy.copy(self.aliases)
+        cp._subpipeline_signatures = copy.copy(self._subpipeline_signatures)
+        cp._module_signatures = copy.copy(self._module_signatures)
+        cp._connection_signatures = copy.copy(self._connection_signatures)
+        self._shared_modules.update(self.db_modules_id_index)
+        self._shared_connections.update(self.db_connections_id_index)
+        cp._shared_modules = set(self.db_modules_id_index)
+        cp._shared_connections = set(self.db_connections_id_index)
+        cp._owners = dict(self._owners)
+        return cp
+
+    def own_module(self, module_id):
+        """own_module(module_id: long) -> Module
+        Returns the module with the given id, first replacing it by a
+        private copy if it is shared with a copy of this pipeline.
+
+        """
+        module = self.db_modules_id_index[module_id]
+        if module_id in self._shared_modules:
+            self._shared_modules.discard(module_id)
+            self.delete_from_index(module)
+            old_module, module = module, module.do_copy()
+            # db_change_module would search the list comparing ids
+            index = map(id, self._db_modules).index(id(old_module))
+            self._db_modules[index] = module
+            self.db_modules_id_index[module_id] = module
+            self.add_to_index(module)
+        return module
+
+    def own_connection(self, connection_id):
+        """own_connection(connection_id: long) -> Connection
+        Returns the connection with the given id, first replacing it by
+        a private copy if it is shared with a copy of this pipeline.
+
+        """
+        connection = self.db_connections_id_index[connection_id]
+        if connection_id in self._shared_connections:
+            self._shared_connections.discard(connection_id)
+            self.delete_from_index(connection)
+            old_connection, connection = connection, connection.do_copy()
+            index = map(id, self._db_connections).index(id(old_connection))
+            self._db_connections[index] = connection
+            self.db_connections_id_index[connection_id] = connection
+            self.add_to_index(connection)
+        return connection
+
+    def own_object(self, type, id):
+        """own_object(type: str, id: long) -> DBObject
+        Same as db_get_object, but makes sure the module or connection
+        holding the object is private to this pipeline, so that the
+        object can be modified in place.
+
+        """
+        if type in (Module.vtType, Abstraction.vtType, Group.vtType):
+            return self.own_module(id)
+        elif type == Connection.vtType:
+            return self.own_connection(id)
+        owner = self._owners.get((type, id))
+        if owner is not None:
+            owner_type, owner_id = owner
+            if owner_type == Connection.vtType:
+                self.own_connection(owner_id)
+            else:
+                self.own_module(owner_id)
+        return self.db_get_object(type, id)
+
+    def _index_owner(self, object, owner):
+        g = self._vtTypeMap.get
+        for (child, _, _) in object.db_children():
+            key = (g(child.vtType, child.vtType), child.getPrimaryKey())
+            self._owners[key] = owner
+
+    def _unindex_owner(self, object):
+        g = self._vtTypeMap.get
+        for (child, _, _) in object.db_children():
+            key = (g(child.vtType, child.vtType), child.getPrimaryKey())
+            self._owners.pop(key, None)
+
+    def _build_owner_index(self):
+        """Maps every object in a module or connection to the (type, id)
+        of that module or connection, so that own_object doesn't have to
+        search for it."""
+        self._owners = {}
+        for module in self.module_list:
+            self._index_owner(module, (Module.vtType, module.id))
+        for connection in self.connection_list:
+            self._index_owner(connection, (Connection.vtType, connection.id))
+
+    def _find_owner(self, object, parent_obj_type, parent_obj_id,
+                    parent_obj):
+        g = self._vtTypeMap.get
+        if parent_obj is not None and parent_obj is not self:
+            parent_obj_type = parent_obj.vtType
+            parent_obj_id = parent_obj.getPrimaryKey()
+        elif (parent_obj is self or parent_obj_type is None or
+                parent_obj_id is None):
+            obj_type = g(object.vtType, object.vtType)
+            if obj_type in (Module.vtType, Connection.vtType):
+                return (obj_type, object.getPrimaryKey())
+            return None
+        return self._owners.get((g(parent_obj_type, parent_obj_type),
+                                 parent_obj_id))
+
+    def _own_parent(self, parent_obj_type, parent_obj_id):
+        if parent_obj_type is None or parent_obj_id is None:
+            return
+        if parent_obj_type in (Abstraction.vtType, Group.vtType):
+            parent_obj_type = Module.vtType
+        if self.db_has_object(parent_obj_type, parent_obj_id):
+            self.own_object(parent_obj_type, parent_obj_id)
+
+    def add_to_index(self, object):
+        # index the whole subtree so that nested objects of added
+        # modules can be found through db_get_object and own_object
+        for (child, _, _) in object.db_children():
+            DBWorkflow.add_to_index(self, child)
+
+    def delete_from_index(self, object):
+        g = self._vtTypeMap.get
+        for (child, _, _) in object.db_children():
+            key = (g(child.vtType, child.vtType), child.getPrimaryKey())
+            if self.objects.get(key) is child:
+                del self.objects[key]
+
+    def db_add_object(self, object, parent_obj_type=None,
+                      parent_obj_id=None, parent_obj=None):
+        if parent_obj is None:
+            self._own_parent(parent_obj_type, parent_obj_id)
+        DBWorkflow.db_add_object(self, object, parent_obj_type,
+                                 parent_obj_id, parent_obj)
+        owner = self._find_owner(object, parent_obj_type, parent_obj_id,
+                                 parent_obj)
+        if owner is not None:
+            obj_type = self._vtTypeMap.get(object.vtType, object.vtType)
+            self._index_owner(self.objects[(obj_type,
+                                            object.getPrimaryKey())],
+                              owner)
+
+    def db_change_object(self, old_id, object, parent_obj_type=None,
+                         parent_obj_id=None, parent_obj=None):
+        if parent_obj is None:
+            self._own_parent(parent_obj_type, parent_obj_id)
+        DBWorkflow.db_change_object(self, old_id, object, parent_obj_type,
+                                    parent_obj_id, parent_obj)
+
+    def db_delete_object(self, obj_id, obj_type, parent_obj_type=None,
+                         parent_obj_id=None, parent_obj=None):
+        if parent_obj is None:
+            self._own_parent(parent_obj_type, parent_obj_id)
+        obj = self.objects.get((self._vtTypeMap.get(obj_type, obj_type),
+                                obj_id))
+        DBWorkflow.db_delete_object(self, obj_id, obj_type, parent_obj_type,
+                                    parent_obj_id, parent_obj)
+        if obj is not None:
+            self._unindex_owner(obj)
+        if parent_obj_type is None and (parent_obj is None or
+                                        parent_obj is self):
+            if obj_type in (Module.vtType, Abstraction.vtType, Group.vtType):
+                self._shared_modules.discard(obj_id)
+            elif obj_type == Connection.vtType:
+                self._shared_connections.discard(obj_id)
+
     @staticmethod
     def convert(_workflow):
         if _workflow.__class__ == Pipeline:
@@ -251,6 +462,7 @@ class Pipeline(DBWorkflow):
 
     def clear(self):
         """clear() -> None. Erases pipeline contents."""
+        self._owners = {}
         if hasattr(self, 'db_connections'):
             while self.db_connections:
                 self.db_delete_object(self.db_connections[0].id,
@@ -264,6 +476,8 @@ class Pipeline(DBWorkflow):
         self._subpipeline_signatures = Bidict()
         self._module_signatures = Bidict()
         self._connection_signatures = Bidict()
+        self._shared_modules = set()
+        self._shared_connections = set()
 
     def get_tmp_id(self, type):
         """get_tmp_id(type: str) -> long
@@ -369,13 +583,16 @@ class Pipeline(DBWorkflow):
 #             m.abstraction = self.abstraction_map[m.abstraction_id]
         self.db_add_object(m)
         self.graph.add_vertex(m.id)
+        self.invalidate_module_signature(m.id)
 
     def change_module(self, old_id, m, *args):
         if not self.has_module_with_id(old_id):
             raise VistrailsInternalError("module %s doesn't exist" % old_id)
+        self.invalidate_module_signature(old_id)
         self.db_change_object(old_id, m)
         self.graph.delete_vertex(old_id)
         self.graph.add_vertex(m.id)
+        self.invalidate_module_signature(m.id)
 
     def delete_module(self, id, *args):
         """delete_module(id:int) -> None 
@@ -392,12 +609,9 @@ class Pipeline(DBWorkflow):
             self.delete_connection(conn_id)
 
         # self.modules.pop(id)
+        self.invalidate_module_signature(id)
         self.db_delete_object(id, Module.vtType)
         self.graph.delete_vertex(id)
-        if id in self._module_signatures:
-            del self._module_signatures[id]
-        if id in self._subpipeline_signatures:
-            del self._subpipeline_signatures[id]
 
     def add_connection(self, c, *args):
         """add_connection(c: Connection) -> None 
@@ -412,15 +626,16 @@ class Pipeline(DBWorkflow):
             assert(c.sourceId != c.destinationId)        
             self.graph.add_edge(c.sourceId, c.destinationId, c.id)
             self.ensure_connection_specs([c.id])
+            self.invalidate_subpipeline_signatures([c.destinationId])
 
             source_name = c.source.name
-            output_ports = self.modules[c.sourceId].connected_output_ports
+            output_ports = self.own_module(c.sourceId).connected_output_ports
             if source_name not in output_ports:
                 output_ports[source_name] = 0
             output_ports[source_name] += 1
                 
             dest_name = c.destination.name
-            input_ports = self.modules[c.destinationId].connected_input_ports
+            input_ports = self.own_module(c.destinationId).connected_input_ports
             if dest_name not in input_ports:
                 input_ports[dest_name] = 0
             input_ports[dest_name] += 1
@@ -435,14 +650,16 @@ class Pipeline(DBWorkflow):
 
         old_conn = self.connections[old_id]
         if old_conn.source is not None and old_conn.destination is not None:
+            self.invalidate_subpipeline_signatures([old_conn.destinationId])
             self.graph.delete_edge(old_conn.sourceId, old_conn.destinationId,
                                    old_conn.id)
             if self.graph.out_degree(old_conn.sourceId) < 1:
-                self.modules[old_conn.sourceId].connected_output_ports.discard(
+                source_module = self.own_module(old_conn.sourceId)
+                source_module.connected_output_ports.discard(
                     old_conn.source.name)
             if self.graph.in_degree(old_conn.destinationId) < 1:
                 connected_input_ports = \
-                    self.modules[old_conn.destinationId].connected_input_ports
+                    self.own_module(old_conn.destinationId).connected_input_ports
                 connected_input_ports.discard(old_conn.destination.name)
 
         if old_id in self._connection_signatures:
@@ -452,8 +669,9 @@ class Pipeline(DBWorkflow):
             assert(c.sourceId != c.destinationId)
             self.graph.add_edge(c.sourceId, c.destinationId, c.id)
             self.ensure_connection_specs([c.id])
-            self.modules[c.sourceId].connected_output_ports.add(c.source.name)
-            self.modules[c.destinationId].connected_input_ports.add(
+            self.invalidate_subpipeline_signatures([c.destinationId])
+            self.own_module(c.sourceId).connected_output_ports.add(c.source.name)
+            self.own_module(c.destinationId).connected_input_ports.add(
                 c.destination.name)
 
     def delete_connection(self, id, *args):
@@ -470,22 +688,56 @@ class Pipeline(DBWorkflow):
         if conn.source is not None and conn.destination is not None and \
                 (conn.destinationId, conn.id) in \
                 self.graph.edges_from(conn.sourceId):
+            self.invalidate_subpipeline_signatures([conn.destinationId])
             self.graph.delete_edge(conn.sourceId, conn.destinationId, conn.id)
 
             c = conn
             source_name = c.source.name
-            output_ports = self.modules[c.sourceId].connected_output_ports
+            output_ports = self.own_module(c.sourceId).connected_output_ports
             output_ports[source_name] -= 1
                 
             dest_name = c.destination.name
-            input_ports = self.modules[c.destinationId].connected_input_ports
+            input_ports = self.own_module(c.destinationId).connected_input_ports
             input_ports[dest_name] -= 1
 
         if id in self._connection_signatures:
             del self._connection_signatures[id]
         
+    def add_function(self, function, parent_type, parent_id):
+        self.db_add_object(function, parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
+    def delete_function(self, function_id, function_type, parent_type,
+                        parent_id):
+        self.db_delete_object(function_id, ModuleFunction.vtType,
+                              parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
+    def change_function(self, old_function_id, function, parent_type,
+                        parent_id):
+        self.db_change_object(old_function_id, function,
+                              parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
+    def add_controlParameter(self, control_param, parent_type, parent_id):
+        self.db_add_object(control_param, parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
+    def delete_controlParameter(self, control_param_id, control_param_type,
+                                parent_type, parent_id):
+        self.db_delete_object(control_param_id, ModuleControlParam.vtType,
+                              parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
+    def change_controlParameter(self, old_control_param_id, control_param,
+                                parent_type, parent_id):
+        self.db_change_object(old_control_param_id, control_param,
+                              parent_type, parent_id)
+        self.invalidate_module_signature(parent_id)
+
     def add_parameter(self, param, parent_type, parent_id):
         self.db_add_object(param, parent_type, parent_id)
+        self.invalidate_function_signature(parent_id)
         if not self.has_alias(param.alias):
             self.change_alias(param.alias, 
                               param.vtType, 
@@ -497,6 +749,7 @@ class Pipeline(DBWorkflow):
     def delete_parameter(self, param_id, param_type, parent_type, parent_id):
         self.db_delete_object(param_id, ModuleParam.vtType,
                               parent_type, parent_id)
+        self.invalidate_function_signature(parent_id)
         self.remove_alias(ModuleParam.vtType, param_id, parent_type, 
                           parent_id, None)
 
@@ -505,6 +758,7 @@ class Pipeline(DBWorkflow):
                           parent_type, parent_id, None)
         self.db_change_object(old_param_id, param,
                               parent_type, parent_id)
+        self.invalidate_function_signature(parent_id)
         if not self.has_alias(param.alias):
             self.change_alias(param.alias, 
                               param.vtType, 
@@ -521,15 +775,16 @@ class Pipeline(DBWorkflow):
             self.graph.add_edge(connection.sourceId, 
                                 connection.destinationId, 
                                 connection.id)
+            self.invalidate_subpipeline_signatures([connection.destinationId])
             c = connection
             source_name = c.source.name
-            output_ports = self.modules[c.sourceId].connected_output_ports
+            output_ports = self.own_module(c.sourceId).connected_output_ports
             if source_name not in output_ports:
                 output_ports[source_name] = 0
             output_ports[source_name] += 1
                 
             dest_name = c.destination.name
-            input_ports = self.modules[c.destinationId].connected_input_ports
+            input_ports = self.own_module(c.destinationId).connected_input_ports
             if dest_name not in input_ports:
                 input_ports[dest_name] = 0
             input_ports[dest_name] += 1
@@ -537,16 +792,17 @@ class Pipeline(DBWorkflow):
     def delete_port(self, port_id, port_type, parent_type, parent_id):
         conn = self.connections[parent_id]
         if len(conn.ports) >= 2:
+            self.invalidate_subpipeline_signatures([conn.destinationId])
             self.graph.delete_edge(conn.sourceId, 
                                    conn.destinationId, 
                                    conn.id)
             c = conn
             source_name = c.source.name
-            output_ports = self.modules[c.sourceId].connected_output_ports
+            output_ports = self.own_module(c.sourceId).connected_output_ports
             output_ports[source_name] -= 1
                 
             dest_name = c.destination.name
-            input_ports = self.modules[c.destinationId].connected_input_ports
+            input_ports = self.own_module(c.destinationId).connected_input_ports
             input_ports[dest_name] -= 1
             
         self.db_delete_object(port_id, Port.vtType, parent_type, parent_id)
@@ -554,6 +810,7 @@ class Pipeline(DBWorkflow):
     def change_port(self, old_port_id, port, parent_type, parent_id):
         connection = self.connections[parent_id]
         if len(connection.ports) >= 2:
+            self.invalidate_subpipeline_signatures([connection.destinationId])
             source_list = self.graph.adjacency_list[connection.sourceId]
             source_list.remove((connection.destinationId, connection.id))
             dest_list = \
@@ -566,19 +823,22 @@ class Pipeline(DBWorkflow):
             dest_list = \
                 self.graph.inverse_adjacency_list[connection.destinationId]
             dest_list.append((connection.sourceId, connection.id))
+            self.invalidate_subpipeline_signatures([connection.destinationId])
 
     def add_port_to_registry(self, portSpec, moduleId):
-        m = self.get_module_by_id(moduleId)
+        m = self.own_module(moduleId)
         m.add_port_spec(portSpec)
+        self.invalidate_module_signature(moduleId)
 
     def add_portSpec(self, port_spec, parent_type, parent_id):
         # self.db_add_object(port_spec, parent_type, parent_id)
         self.add_port_to_registry(port_spec, parent_id)
         
     def delete_port_from_registry(self, id, moduleId):
-        m = self.get_module_by_id(moduleId)
+        m = self.own_module(moduleId)
         portSpec = m.port_specs[id]
         m.delete_port_spec(portSpec)
+        self.invalidate_module_signature(moduleId)
 
     def delete_portSpec(self, spec_id, portSpec_type, parent_type, parent_id):
         self.delete_port_from_registry(spec_id, parent_id)
@@ -679,8 +939,9 @@ class Pipeline(DBWorkflow):
         else:
             if what == 'parameter':
                 # FIXME: check if a change parameter action needs to be generated
-                parameter = self.db_get_object(what, oId)
+                parameter = self.own_object(what, oId)
                 parameter.strValue = str(value)
+                self.invalidate_function_signature(parentId)
             else:
                 raise VistrailsInternalError("only parameters are supported")
         
@@ -827,15 +1088,82 @@ class Pipeline(DBWorkflow):
     def has_connection_signature(self, signature):
         return signature in self._connection_signatures.inverse
 
+    # Invalidation
+
+    def invalidate_module_signature(self, module_id):
+        """invalidate_module_signature(module_id: int) -> None
+        Forgets the signature of the given module and every signature
+        that depends on it. Code that modifies a module in place, instead
+        of going through perform_action, must call this."""
+        if module_id in self._module_signatures:
+            del self._module_signatures[module_id]
+        self.invalidate_subpipeline_signatures([module_id])
+
+    def invalidate_function_signature(self, function_id):
+        """invalidate_function_signature(function_id: int) -> None
+        Forgets the signature of the module holding the given function."""
+        self._invalidate_owner_signature(ModuleFunction.vtType, function_id)
+
+    def invalidate_parameter_signature(self, param_id):
+        """invalidate_parameter_signature(param_id: int) -> None
+        Forgets the signature of the module holding the given parameter."""
+        self._invalidate_owner_signature(ModuleParam.vtType, param_id)
+
+    def _invalidate_owner_signature(self, type, id):
+        owner = self._owners.get((type, id))
+        if owner is not None and owner[0] == Module.vtType:
+            self.invalidate_module_signature(owner[1])
+
+    def invalidate_subpipeline_signatures(self, module_ids):
+        """invalidate_subpipeline_signatures(module_ids: list) -> None
+        Forgets the subpipeline signatures of the given modules and of
+        everything downstream of them, along with the signatures of the
+        connections touching those modules. Module signatures are kept,
+        except for modules with a custom hasher, which might depend on
+        their upstream connections (e.g. groups)."""
+        graph = self.graph
+        visited = set()
+        to_visit = [m_id for m_id in module_ids if m_id in graph.vertices]
+        while to_visit:
+            m_id = to_visit.pop()
+            if m_id in visited:
+                continue
+            visited.add(m_id)
+            if m_id in self._subpipeline_signatures:
+                del self._subpipeline_signatures[m_id]
+            if m_id in self._module_signatures and \
+                    self._has_custom_hasher(self.modules[m_id]):
+                del self._module_signatures[m_id]
+            for (_, conn_id) in graph.edges_to(m_id):
+                if conn_id in self._connection_signatures:
+                    del self._connection_signatures[conn_id]
+            for (next_id, conn_id) in graph.edges_from(m_id):
+                if conn_id in self._connection_signatures:
+                    del self._connection_signatures[conn_id]
+                to_visit.append(next_id)
+
+    @staticmethod
+    def _has_custom_hasher(module):
+        try:
+            descriptor = module.module_descriptor
+        except ModuleRegistryException:
+            return False
+        return descriptor is not None and \
+            descriptor.hasher_callable() is not None
+
     def refresh_signatures(self):
-        self._connection_signatures = {}
-        self._subpipeline_signatures = {}
-        self._module_signatures = {}
+        """refresh_signatures(): recompute all signatures from scratch.
+
+        Signatures are kept up to date as the pipeline changes, so this is
+        only needed if the pipeline was modified behind its back."""
+        self._connection_signatures = Bidict()
+        self._subpipeline_signatures = Bidict()
+        self._module_signatures = Bidict()
         self.compute_signatures()
 
     def compute_signatures(self):
         """compute_signatures(): compute all module and subpipeline signatures
-        for this pipeline."""
+        for this pipeline. Signatures that are already known are reused."""
         for i in self.modules.iterkeys():
             self.subpipeline_signature(i)
         for c in self.connections.iterkeys():
@@ -863,7 +1191,7 @@ class Pipeline(DBWorkflow):
         # do this before we check connection specs because it is
         # possible that a subpipeline invalidates the module, meaning
         # we shouldn't check the connection specs
-        for module in self.modules.itervalues():
+        for module in self.modules.values():
             if module.is_valid and (module.is_group() or 
                                     module.is_abstraction()):
                 try:
@@ -871,7 +1199,7 @@ class Pipeline(DBWorkflow):
                     if subpipeline is not None:
                         subpipeline.validate()
                 except InvalidPipeline, e:
-                    module.is_valid = False
+                    self.own_module(module.id).is_valid = False
                     e._module_id = module.id
                     exceptions.add(e)
                 if module.is_abstraction():
@@ -933,36 +1261,44 @@ class Pipeline(DBWorkflow):
 
         # print 'ensure_connection_specs:', sorted(self.modules.keys())
 
-        def find_spec(port):
-            port.is_valid = False
+        def find_spec(conn_id, port_name):
+            port = getattr(self.connections[conn_id], port_name)
+            spec = port.spec
+            is_valid = False
             module = self.get_module_by_id(port.moduleId)
             port_type_map = PortSpec.port_type_map
             try:
                 # print 'running get_port_spec', port.name
-                port.spec = module.get_port_spec(port.name, 
+                spec = module.get_port_spec(port.name, 
                                             port_type_map.inverse[port.type])
                 # print 'got spec', spec, spec.sigstring
             except ModuleRegistryException, e:
                 # debug.critical('CONNECTION EXCEPTION: %s' % e)
                 exceptions.add(e)
             else:
-                if port.spec.is_valid:
-                    port.is_valid = True
+                if spec.is_valid:
+                    is_valid = True
+            # connections shared with a copy of the pipeline are only
+            # copied if their ports really change
+            if port.spec is not spec or port.is_valid != is_valid:
+                port = getattr(self.own_connection(conn_id), port_name)
+                port.spec = spec
+                port.is_valid = is_valid
             
         if connection_ids is None:
-            connection_ids = self.connections.iterkeys()
+            connection_ids = self.connections.keys()
         for conn_id in connection_ids:
             conn = self.connections[conn_id]
             # print 'checking connection', conn_id, conn.source.moduleId, conn.source.moduleName, conn.source.name, conn.destination.moduleId, conn.destination.moduleName, conn.destination.name
             src_module = self.modules[conn.source.moduleId]
             if src_module.is_valid:
                 # print 'src_module:', src_module.name, src_module.id
-                find_spec(conn.source)
+                find_spec(conn_id, 'source')
             
             dst_module = self.modules[conn.destination.moduleId]
             if dst_module.is_valid:
                 # print 'dst_module:', dst_module.name, dst_module.id
-                find_spec(conn.destination)
+                find_spec(conn_id, 'destination')
 
             # if not conn.source.spec:
             # conn.source.spec = find_spec(conn.source)
@@ -995,9 +1331,12 @@ class Pipeline(DBWorkflow):
             exceptions = set()
             for mid in module_ids:
                 module = pipeline.modules[mid]
-                module.is_valid = False
+                # modules shared with a copy of the pipeline are only
+                # copied if they really change
                 if not module.version:
+                    module = pipeline.own_module(mid)
                     module.version = '0'
+                is_valid = False
                 try:
                     # FIXME check for upgrades, otherwise use similar
                     # descriptor, the old behavior
@@ -1006,7 +1345,9 @@ class Pipeline(DBWorkflow):
                     e._module_id = mid
                     exceptions.add(e)
                 else:
-                    module.is_valid = True
+                    is_valid = True
+                if module.is_valid != is_valid:
+                    pipeline.own_module(mid).is_valid = is_valid
             return exceptions
         # end find_descriptors
 
@@ -1017,7 +1358,8 @@ class Pipeline(DBWorkflow):
     def ensure_functions(self):
         exceptions = set()
         reg = get_module_registry()
-        for module in self.modules.itervalues():
+        for module in self.modules.values():
+            functions_valid = []
             for function in module.functions:
                 is_valid = True
                 if module.is_valid and not module.has_port_spec(function.name, 
@@ -1053,7 +1395,14 @@ class Pipeline(DBWorkflow):
                                                         function.real_id))
                         exceptions.add(e)
                     pos_map[p.pos] = p
-                function.is_valid = is_valid
+                functions_valid.append(is_valid)
+            if any(function.is_valid != is_valid
+                   for function, is_valid in izip(module.functions,
+                                                  functions_valid)):
+                module = self.own_module(module.id)
+                for function, is_valid in izip(module.functions,
+                                               functions_valid):
+                    function.is_valid = is_valid
         if len(exceptions) > 0:
             raise InvalidPipeline(exceptions, self)
         
@@ -1082,26 +1431,32 @@ class Pipeline(DBWorkflow):
 
     def ensure_port_specs(self):
         exceptions = set()
-        for module in self.modules.itervalues():
+        for module in self.modules.values():
             # if module.is_valid:
+            invalid_specs = []
             try:
-                for port_spec in module.port_specs.itervalues():
+                for spec_id, port_spec in module.port_specs.iteritems():
                     try:
                         port_spec.descriptors()
                     except MissingPackage, e:
-                        port_spec.is_valid = False
+                        invalid_specs.append(spec_id)
                         e._module_id = module.id
                         exceptions.add(e)
                     except ModuleRegistryException, e:
                         e = PortMismatch(module.package, module.name,
                                          module.namespace, port_spec.name,
                                          port_spec.type, port_spec.sigstring)
-                        port_spec.is_valid = False
+                        invalid_specs.append(spec_id)
                         e._module_id = module.id
                         exceptions.add(e)
             except ModuleRegistryException, e:
                 if module.is_valid:
-                    module.is_valid = False
+                    self.own_module(module.id).is_valid = False
+            if any(module.port_specs[spec_id].is_valid
+                   for spec_id in invalid_specs):
+                module = self.own_module(module.id)
+                for spec_id in invalid_specs:
+                    module.port_specs[spec_id].is_valid = False
     
         if len(exceptions) > 0:
             raise InvalidPipeline(exceptions, self)
@@ -1132,7 +1487,7 @@ class Pipeline(DBWorkflow):
         # Might raise GraphContainsCycles
         for module_id in self.graph.vertices_topological_sort():
             module = self.get_module_by_id(module_id)
-            module.list_depth = 0
+            list_depth = 0
             ports = []
             for module_from_id, conn_id in self.graph.edges_to(module_id):
                 prev_depth = self.get_module_by_id(module_from_id).list_depth
@@ -1167,9 +1522,13 @@ class Pipeline(DBWorkflow):
                 # list to match its depth
                 # if source depth is greater this module will be executed
                 # once for each input in the (possibly nested) list
-                module.list_depth = max(module.list_depth, depth)
-            result.append((module_id, module.list_depth))
-            module.iterated_ports = ports
+                list_depth = max(list_depth, depth)
+            if (module.list_depth != list_depth or
+                    module.iterated_ports != ports):
+                module = self.own_module(module_id)
+                module.list_depth = list_depth
+                module.iterated_ports = ports
+            result.append((module_id, list_depth))
         return result
 
     ##########################################################################
@@ -1459,6 +1818,155 @@ class TestPipeline(unittest.TestCase):
         self.assertNotEquals(c_sig_size_before, c_sig_size_after)
         self.assertNotEquals(p_sig_size_before, p_sig_size_after)
 
+    def test_incremental_signatures(self):
+        """Makes sure changing a module only invalidates the signatures
+        downstream of it."""
+        import vistrails.core.db.action
+        p = self.create_default_pipeline()
+        m1_sig = p.subpipeline_signature(1)
+        m2_sig = p.subpipeline_signature(2)
+        func = p.modules[0].functions[0]
+        old_param = func.params[0]
+        new_param = ModuleParam(id=-2,
+                                pos=old_param.pos,
+                                name=old_param.name,
+                                alias="",
+                                val='-',
+                                type=old_param.type)
+        action = vistrails.core.db.action.create_action([
+                ('change', old_param, new_param, func.vtType, func.real_id)])
+        p.perform_action(action)
+        self.assertNotIn(0, p._module_signatures)
+        self.assertNotIn(0, p._subpipeline_signatures)
+        self.assertNotIn(2, p._subpipeline_signatures)
+        self.assertIn(2, p._module_signatures)
+        self.assertEqual(p._subpipeline_signatures[1], m1_sig)
+        self.assertEqual(len(p._connection_signatures), 0)
+
+        p.compute_signatures()
+        self.assertNotEqual(p.subpipeline_signature(2), m2_sig)
+        fresh = copy.copy(p)
+        fresh.refresh_signatures()
+        for m_id in p.modules:
+            self.assertEqual(p.subpipeline_signature(m_id),
+                             fresh.subpipeline_signature(m_id))
+
+        p.delete_connection(1)
+        p.compute_signatures()
+        self.assertNotIn(1, p._connection_signatures)
+        fresh = copy.copy(p)
+        fresh.refresh_signatures()
+        self.assertEqual(p.subpipeline_signature(2),
+                         fresh.subpipeline_signature(2))
+        self.assertEqual(p.connection_signature(0),
+                         fresh.connection_signature(0))
+
+    def test_invalidate_function_signature(self):
+        """Makes sure functions and parameters added later are found."""
+        import vistrails.core.db.action
+        p = self.create_default_pipeline()
+        p.compute_signatures()
+        function = ModuleFunction(id=-1, pos=0, name='value1')
+        param = ModuleParam(id=-1, pos=0, type='Float', val='1.0')
+        function.add_parameter(param)
+        action = vistrails.core.db.action.create_action([
+                ('add', function, Module.vtType, 1)])
+        p.perform_action(action)
+        p.compute_signatures()
+        p.invalidate_parameter_signature(param.real_id)
+        self.assertNotIn(1, p._module_signatures)
+        self.assertIn(0, p._module_signatures)
+        p.compute_signatures()
+        p.invalidate_function_signature(function.real_id)
+        self.assertNotIn(1, p._module_signatures)
+        self.assertIn(0, p._module_signatures)
+
+        # deleted objects are forgotten
+        p.delete_module(1)
+        p.compute_signatures()
+        p.invalidate_parameter_signature(param.real_id)
+        self.assertIn(0, p._module_signatures)
+        self.assertNotIn((ModuleParam.vtType, param.real_id), p._owners)
+
+    def test_shared_copy(self):
+        """Makes sure copies share modules until one of them changes."""
+        import vistrails.core.db.action
+        p1 = self.create_default_pipeline()
+        p1.compute_signatures()
+        p2 = copy.copy(p1)
+        for m_id in p1.modules:
+            self.assertIs(p1.modules[m_id], p2.modules[m_id])
+        self.assertEqual(p1.subpipeline_signature(2),
+                         p2.subpipeline_signature(2))
+
+        func = p2.modules[0].functions[0]
+        old_param = func.params[0]
+        new_param = ModuleParam(id=-2,
+                                pos=old_param.pos,
+                                name=old_param.name,
+                                alias="",
+                                val='-',
+                                type=old_param.type)
+        action = vistrails.core.db.action.create_action([
+                ('change', old_param, new_param, func.vtType, func.real_id)])
+        p2.perform_action(action)
+        self.assertIsNot(p1.modules[0], p2.modules[0])
+        self.assertIs(p1.modules[1], p2.modules[1])
+        self.assertEqual(p1.modules[0].functions[0].params[0].strValue, '+')
+        self.assertEqual(p2.modules[0].functions[0].params[0].strValue, '-')
+        p2.compute_signatures()
+        self.assertNotEqual(p1.subpipeline_signature(2),
+                            p2.subpipeline_signature(2))
+
+        # the original also copies what it changes
+        function = p1.own_object(ModuleFunction.vtType,
+                                 p1.modules[1].functions[0].real_id)
+        function.params[0].strValue = '*'
+        self.assertIsNot(p1.modules[1], p2.modules[1])
+        self.assertEqual(p2.modules[1].functions[0].params[0].strValue, '+')
+        p1.delete_connection(1)
+        self.assertIn(1, p2.connections)
+        self.assertEqual(p1.modules[2].connected_input_ports['value2'], 0)
+        self.assertEqual(p2.modules[2].connected_input_ports['value2'], 1)
+
+        # copies with new ids do not share anything
+        p3 = p2.do_copy(True, IdScope(), {})
+        self.assertFalse(set(id(m) for m in p2.module_list) &
+                         set(id(m) for m in p3.module_list))
+
+    def test_shared_copy_validate(self):
+        """Makes sure validating a copy doesn't change the other one."""
+        import vistrails.core.db.action
+        p1 = self.create_default_pipeline()
+        for module in p1.module_list:
+            for function in module.functions:
+                for param in function.params:
+                    param.identifier = get_vistrails_basic_pkg_id()
+        self.assertFalse(any(m.is_valid for m in p1.module_list))
+        p2 = copy.copy(p1)
+        p2.validate()
+        self.assertTrue(all(m.is_valid for m in p2.module_list))
+        self.assertTrue(all(f.is_valid for f in p2.modules[0].functions))
+        self.assertFalse(any(m.is_valid for m in p1.module_list))
+        self.assertFalse(any(f.is_valid for f in p1.modules[0].functions))
+
+        # validating doesn't copy modules that don't change
+        p1.validate()
+        p3 = copy.copy(p1)
+        p3.validate()
+        for m_id in p1.modules:
+            self.assertIs(p1.modules[m_id], p3.modules[m_id])
+
+        # a function the module doesn't have
+        function = ModuleFunction(id=-1, pos=0, name='nonexistent')
+        action = vistrails.core.db.action.create_action([
+                ('add', function, Module.vtType, 0)])
+        p3.perform_action(action)
+        self.assertFalse(p3.validate(raise_exception=False))
+        self.assertFalse(p3.modules[0].functions[-1].is_valid)
+        self.assertEqual(len(p1.modules[0].functions), 1)
+        self.assertIs(p1.modules[1], p3.modules[1])
+
     def test_delete_connections(self):
         p = self.create_default_pipeline()
         p.delete_connection(0)
@@ -0,0 +1,285 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Cache of materialized pipelines used when switching between versions.
+
+Building the pipeline of a version means replaying the actions leading to
+it, either from the root or from a pipeline that is already available. The
+:class:`PipelineCache` keeps copies of some of these pipelines, bounded in
+total size, so that the controller can start from a close ancestor.
+"""
+
+from __future__ import division
+
+from collections import OrderedDict
+import copy
+import unittest
+
+from vistrails.core.vistrail.pipeline import Pipeline
+
+
+class PipelineCache(object):
+    """Bounded LRU cache of pipelines, keyed by version.
+
+    The empty pipeline of version 0 is always present. The size of a
+    pipeline is its number of modules, connections, functions and
+    parameters; the total size of the cached pipelines is kept under
+    `max_size` by evicting the least recently used ones (0 means
+    unbounded).
+
+    Costs are expressed in the same rough unit (copying one object), so
+    that replaying actions and copying a cached pipeline can be compared.
+    Copies share their modules and connections until they are modified
+    (see Pipeline.shared_copy), so copying a pipeline only costs one unit
+    per module and connection.
+    """
+    # Replaying an operation copies its data and updates the indexes, the
+    # graph and the signatures of the pipeline
+    OPERATION_COST = 2
+    COPY_COST = 1
+
+    def __init__(self, max_size=0, min_visits=2):
+        self.set_limits(max_size, min_visits)
+        self.clear()
+
+    def set_limits(self, max_size=0, min_visits=2):
+        """set_limits(max_size: int, min_visits: int)
+
+        Sets the size budget and the number of visits after which an
+        untagged version may be cached.
+        """
+        self.max_size = max_size
+        self.min_visits = min_visits
+
+    def clear(self):
+        self._entries = OrderedDict()
+        self._entries[0] = (Pipeline(), 0)
+        self._visits = {}
+        self.size = 0
+        self.hits = 0
+        self.ancestor_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, version):
+        return version in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, version):
+        """get(version: long) -> Pipeline
+
+        Returns the cached pipeline (not a copy), marking it as recently
+        used.
+        """
+        pipeline, size = self._entries.pop(version)
+        self._entries[version] = (pipeline, size)
+        return pipeline
+
+    @staticmethod
+    def pipeline_size(pipeline):
+        size = len(pipeline.connections)
+        for module in pipeline.module_list:
+            size += 1
+            for function in module.functions:
+                size += 1 + len(function.params)
+        return size
+
+    def copy_cost(self, version_or_pipeline):
+        """copy_cost(version_or_pipeline) -> int
+
+        Cost of copying a cached version or a given pipeline.
+        """
+        if isinstance(version_or_pipeline, Pipeline):
+            pipeline = version_or_pipeline
+        else:
+            pipeline = self._entries[version_or_pipeline][0]
+        return ((len(pipeline.modules) + len(pipeline.connections)) *
+                self.COPY_COST)
+
+    def replay_cost(self, nb_operations):
+        return nb_operations * self.OPERATION_COST
+
+    def record_lookup(self, outcome):
+        """record_lookup(outcome: str)
+
+        Counts how a pipeline was obtained: 'hit' if the version was
+        cached, 'ancestor' if it was built from a cached ancestor, 'miss'
+        otherwise.
+        """
+        if outcome == 'hit':
+            self.hits += 1
+        elif outcome == 'ancestor':
+            self.ancestor_hits += 1
+        else:
+            self.misses += 1
+
+    def visit(self, version):
+        """visit(version: long) -> int
+
+        Counts a request for a version that is not cached, returning the
+        number of requests so far.
+        """
+        visits = self._visits.get(version, 0) + 1
+        self._visits[version] = visits
+        return visits
+
+    def should_admit(self, version, pipeline, tagged, replay_operations):
+        """should_admit(version, pipeline, tagged, replay_operations) -> bool
+
+        Tagged versions are always worth caching. Other versions are cached
+        once they were requested min_visits times, if rebuilding them
+        (replaying `replay_operations` from the closest cached ancestor)
+        costs more than copying them.
+        """
+        if version in self._entries:
+            return False
+        if tagged:
+            return True
+        if self.min_visits <= 0 or \
+                self._visits.get(version, 0) < self.min_visits:
+            return False
+        return self.replay_cost(replay_operations) > \
+            self.copy_cost(pipeline)
+
+    def add(self, version, pipeline):
+        """add(version: long, pipeline: Pipeline) -> bool
+
+        Caches a copy of pipeline, evicting least recently used versions
+        to stay within budget. Returns False if the pipeline alone is over
+        budget.
+        """
+        size = self.pipeline_size(pipeline)
+        if self.max_size > 0 and size > self.max_size:
+            return False
+        self.discard(version)
+        self._entries[version] = (copy.copy(pipeline), size)
+        self.size += size
+        self._visits.pop(version, None)
+        if self.max_size > 0:
+            victims = (v for v in list(self._entries)
+                       if v != 0 and v != version)
+            while self.size > self.max_size:
+                self.discard(next(victims))
+                self.evictions += 1
+        return True
+
+    def discard(self, version):
+        if version == 0:
+            return
+        entry = self._entries.pop(version, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def stats(self):
+        """stats() -> dict
+
+        Returns counters describing how well the cache performs.
+        """
+        lookups = self.hits + self.ancestor_hits + self.misses
+        if lookups:
+            hit_rate = self.hits / lookups
+            ancestor_rate = self.ancestor_hits / lookups
+        else:
+            hit_rate = ancestor_rate = 0.0
+        return {'hits': self.hits,
+                'ancestor_hits': self.ancestor_hits,
+                'misses': self.misses,
+                'hit_rate': hit_rate,
+                'ancestor_hit_rate': ancestor_rate,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self.size}
+
+##############################################################################
+
+
+class TestPipelineCache(unittest.TestCase):
+    @staticmethod
+    def make_pipeline(nb_modules):
+        from vistrails.core.vistrail.module import Module
+        p = Pipeline()
+        for i in xrange(nb_modules):
+            p.add_module(Module(id=i, name='String',
+                                package='org.vistrails.vistrails.basic'))
+        return p
+
+    def test_lru(self):
+        cache = PipelineCache(max_size=5)
+        self.assertIn(0, cache)
+        cache.add(1, self.make_pipeline(2))
+        cache.add(2, self.make_pipeline(2))
+        cache.get(1)
+        cache.add(3, self.make_pipeline(2))
+        # 2 was used before 1
+        self.assertEqual(sorted(cache), [0, 1, 3])
+        self.assertEqual(cache.size, 4)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        # too big
+        self.assertFalse(cache.add(4, self.make_pipeline(6)))
+        self.assertNotIn(4, cache)
+
+    def test_copy(self):
+        cache = PipelineCache()
+        p = self.make_pipeline(1)
+        cache.add(1, p)
+        p.delete_module(0)
+        self.assertEqual(len(cache.get(1).modules), 1)
+
+    def test_admission(self):
+        cache = PipelineCache(min_visits=2)
+        p = self.make_pipeline(3)
+        self.assertTrue(cache.should_admit(1, p, True, 0))
+        cache.visit(2)
+        self.assertFalse(cache.should_admit(2, p, False, 100))
+        cache.visit(2)
+        self.assertTrue(cache.should_admit(2, p, False, 100))
+        # cheaper to replay than to copy
+        self.assertFalse(cache.should_admit(2, p, False, 1))
+
+    def test_stats(self):
+        cache = PipelineCache()
+        cache.record_lookup('hit')
+        cache.record_lookup('ancestor')
+        cache.record_lookup('miss')
+        cache.record_lookup('miss')
+        stats = cache.stats()
+        self.assertEqual(stats['hit_rate'], 0.25)
+        self.assertEqual(stats['ancestor_hit_rate'], 0.25)
+        self.assertEqual(stats['misses'], 2)
@@ -40,6 +40,8 @@ from vistrails.core.paramexplore.paramexplore import ParameterExploration
 import copy
 import datetime
 import getpass
+import hashlib
+import os
 
 from vistrails.db.domain import DBVistrail
 from vistrails.db.services.io import open_vt_log_from_db, open_log_from_xml
@@ -48,6 +50,7 @@ from vistrails.core.log.log import Log
 from vistrails.core.data_structures.graph import Graph
 from vistrails.core.data_structures.bijectivedict import Bidict
 from vistrails.core import debug
+from vistrails.core.configuration import get_vistrails_configuration
 import vistrails.core.db.io
 from vistrails.core.utils import VistrailsInternalError, \
      InvalidPipeline
@@ -128,6 +131,10 @@ class Vistrail(DBVistrail):
         for action in sorted(self.actions, key=lambda a: a.id):
             self.tree.addVersion(action.id, action.prevId)
 
+        # operation dicts used to materialize workflows quickly
+        self.checkpoints = VersionCheckpoints(
+                self, getattr(self, 'checkpoints_filename', None))
+
     @staticmethod
     def convert(_vistrail):
         _vistrail.__class__ = Vistrail
@@ -1154,6 +1161,110 @@ class ExplicitExpandedVersionTree(object):
         
 ##############################################################################
 
+class VersionCheckpoints(object):
+    """
+    Current operation dictionaries for some versions of a vistrail, so
+    that materializing a workflow only replays the actions since its
+    closest checkpointed ancestor instead of the whole chain from the
+    root.
+
+    Adding checkpoints never changes the vistrail itself. They are saved
+    to a separate file of the .vt bundle, listing the ids of the current
+    operations of each version after a digest of the actions; if the
+    vistrail no longer matches that digest when the file is read back, the
+    file is ignored and checkpoints are rebuilt as workflows are
+    materialized.
+    """
+    def __init__(self, vistrail, filename=None):
+        self.vistrail = vistrail
+        self.checkpoints = {}
+        # file to read the saved checkpoints from, on first use
+        self.filename = filename
+
+    def _get_interval(self):
+        """Number of actions between checkpoints, 0 to not add any."""
+        return getattr(get_vistrails_configuration(),
+                       'versionCheckpointInterval', 0)
+    interval = property(_get_interval)
+
+    def get(self, version):
+        """get(version: long) -> dict
+        Returns the operation dictionary for version, or None."""
+        if self.filename is not None:
+            self.load()
+        return self.checkpoints.get(version)
+
+    def __setitem__(self, version, op_dict):
+        self.checkpoints[version] = op_dict
+
+    def digest(self):
+        """digest() -> str
+        Returns a hash of the actions of the vistrail and their
+        operations, that the checkpoints are only valid for."""
+        h = hashlib.sha1()
+        for action in sorted(self.vistrail.db_actions, key=lambda a: a.db_id):
+            h.update('%d %d %s\n' % (
+                    action.db_id, action.db_prevId,
+                    ' '.join(str(op.db_id) for op in action.db_operations)))
+        return h.hexdigest()
+
+    def load(self):
+        """load() -> None
+        Reads the checkpoints saved in self.filename, unless they are
+        stale or the file can't be read."""
+        filename, self.filename = self.filename, None
+        try:
+            with open(filename, 'rb') as f:
+                lines = f.read().splitlines()
+        except IOError, e:
+            debug.warning("Couldn't read workflow checkpoints", e)
+            return
+        if not lines or lines[0] != self.digest():
+            debug.log("Workflow checkpoints are out of date, ignoring them")
+            return
+        operations = dict((op.db_id, op)
+                          for action in self.vistrail.db_actions
+                          for op in action.db_operations)
+        checkpoints = {}
+        try:
+            for line in lines[1:]:
+                ids = [long(i) for i in line.split()]
+                op_dict = {}
+                for op in (operations[op_id] for op_id in ids[1:]):
+                    if op.vtType == 'change':
+                        op_dict[(op.db_what, op.db_newObjId)] = op
+                    else:
+                        op_dict[(op.db_what, op.db_objectId)] = op
+                checkpoints[ids[0]] = op_dict
+        except (ValueError, KeyError, IndexError):
+            debug.warning("Ignoring invalid workflow checkpoints file %s" %
+                          filename)
+            return
+        checkpoints.update(self.checkpoints)
+        self.checkpoints = checkpoints
+
+    def save(self, filename):
+        """save(filename: str) -> bool
+        Writes the checkpoints to filename, or removes that file if there
+        are none. Returns whether a file was written."""
+        if self.filename is not None:
+            self.load()
+        if not self.checkpoints:
+            if os.path.exists(filename):
+                os.remove(filename)
+            return False
+        with open(filename, 'wb') as f:
+            f.write(self.digest() + '\n')
+            for version, op_dict in sorted(self.checkpoints.iteritems()):
+                f.write('%d %s\n' % (
+                        version,
+                        ' '.join(str(op_id)
+                                 for op_id in sorted(op.db_id for op in
+                                                     op_dict.itervalues()))))
+        return True
+
+##############################################################################
+
 class VersionAlreadyTagged(Exception):
     def __str__(self):
         return "Version is already tagged"
@@ -1283,6 +1394,116 @@ class TestVistrail(unittest.TestCase):
                            '/tests/resources/dummy.xml').load()
         assert v.actionChain(17, 17) == []
 
+    def test_checkpoints(self):
+        """Tests materializing workflows from checkpoints."""
+        from vistrails.core.db.locator import XMLFileLocator
+        from vistrails.core.vistrail.pipeline import Pipeline
+        from vistrails.db.domain import DBWorkflow
+        from vistrails.db.services.action_chain import getActionChain
+        from vistrails.db.services.vistrail import performActions
+        import vistrails.core.db.io
+        import vistrails.core.system
+
+        def replay(vistrail, version):
+            workflow = DBWorkflow()
+            performActions(getActionChain(vistrail, version), workflow)
+            Pipeline.convert(workflow)
+            return workflow
+
+        conf = get_vistrails_configuration()
+        old_interval = conf.versionCheckpointInterval
+        conf.versionCheckpointInterval = 5
+        try:
+            v = XMLFileLocator(
+                    vistrails.core.system.vistrails_root_directory() +
+                    '/tests/resources/dummy.xml').load()
+            versions = sorted(v.actionMap.iterkeys(), reverse=True)
+            for version in versions:
+                self.assertEqual(v.getPipeline(version),
+                                 replay(v, version))
+            self.assertTrue(v.checkpoints.checkpoints)
+            self.assertFalse(v.changed)
+
+            # viewing versions doesn't change the document
+            xml_str = vistrails.core.db.io.serialize(v)
+            original = XMLFileLocator(
+                    vistrails.core.system.vistrails_root_directory() +
+                    '/tests/resources/dummy.xml').load()
+            self.assertEqual(xml_str,
+                             vistrails.core.db.io.serialize(original))
+            self.assertEqual(v.idScope.ids, original.idScope.ids)
+            v2 = vistrails.core.db.io.unserialize(xml_str, Vistrail)
+            self.assertFalse(v2.checkpoints.checkpoints)
+        finally:
+            conf.versionCheckpointInterval = old_interval
+
+    def test_checkpoints_saved(self):
+        """Tests reading back the checkpoints saved in a .vt file."""
+        from vistrails.db.services.io import \
+            open_vistrail_bundle_from_zip_xml, save_vistrail_bundle_to_zip_xml
+        import vistrails.core.system
+        import shutil
+        import tempfile
+
+        def load(filename):
+            (save_bundle, vt_save_dir) = \
+                open_vistrail_bundle_from_zip_xml(filename)
+            Vistrail.convert(save_bundle.vistrail)
+            return save_bundle, vt_save_dir
+
+        def op_ids(op_dict):
+            return sorted((k, op.db_id) for k, op in op_dict.iteritems())
+
+        conf = get_vistrails_configuration()
+        old_interval = conf.versionCheckpointInterval
+        conf.versionCheckpointInterval = 5
+        tmp_dir = tempfile.mkdtemp(prefix='vt_checkpoints')
+        dirs = [tmp_dir]
+        try:
+            save_bundle, vt_save_dir = load(os.path.join(
+                    vistrails.core.system.vistrails_root_directory(),
+                    'tests/resources/terminator.vt'))
+            dirs.append(vt_save_dir)
+            v = save_bundle.vistrail
+            versions = sorted(v.actionMap.iterkeys())
+            pipelines = dict((version, v.getPipeline(version))
+                             for version in versions)
+            self.assertTrue(v.checkpoints.checkpoints)
+            filename = os.path.join(tmp_dir, 'terminator.vt')
+            save_vistrail_bundle_to_zip_xml(save_bundle, filename,
+                                            vt_save_dir)
+
+            # the checkpoints are read back with the vistrail
+            conf.versionCheckpointInterval = 0
+            save_bundle, vt_save_dir = load(filename)
+            dirs.append(vt_save_dir)
+            v2 = save_bundle.vistrail
+            for version, op_dict in v.checkpoints.checkpoints.iteritems():
+                self.assertEqual(op_ids(v2.checkpoints.get(version)),
+                                 op_ids(op_dict))
+            self.assertEqual(sorted(v2.checkpoints.checkpoints),
+                             sorted(v.checkpoints.checkpoints))
+            for version in versions:
+                self.assertEqual(v2.getPipeline(version), pipelines[version])
+
+            # stale checkpoints are dropped and rebuilt
+            conf.versionCheckpointInterval = 5
+            save_bundle, vt_save_dir = load(filename)
+            dirs.append(vt_save_dir)
+            v3 = save_bundle.vistrail
+            with open(v3.checkpoints.filename, 'r+b') as f:
+                f.write('0' * 40)
+            self.assertIsNone(v3.checkpoints.get(versions[-1]))
+            self.assertFalse(v3.checkpoints.checkpoints)
+            for version in versions:
+                self.assertEqual(v3.getPipeline(version), pipelines[version])
+            self.assertEqual(sorted(v3.checkpoints.checkpoints),
+                             sorted(v.checkpoints.checkpoints))
+        finally:
+            conf.versionCheckpointInterval = old_interval
+            for d in dirs:
+                shutil.rmtree(d)
+
     def test_get_version_negative_one(self):
         """Tests getting the 'no version' vistrail. This should raise
         VistrailsDBException.
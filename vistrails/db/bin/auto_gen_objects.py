@@ -345,6 +345,17 @@ class Object(object):
             pass
         return 'DB%s' % capitalizeOne(Object.getName(self))
 
+    def useSlots(self):
+        # slots="false" is needed when the subclasses cannot work with
+        # a __slots__ layout: they also inherit from another domain
+        # class, they override __setattr__, or objects loaded with an
+        # older schema version are converted to them in place (mashups)
+        try:
+            return self.params['slots'] != 'false'
+        except KeyError:
+            pass
+        return True
+
     def getChildren(self):
         return 'db_children'
 
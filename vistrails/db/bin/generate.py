@@ -151,7 +151,7 @@ def indent_python(fname):
     autopep8.fix_file(fname, options=autopep8.parse_args([fname, '-i']))
 
 def run_template(template_fname, objects, version, version_string, output_file,
-                 indent=False):
+                 indent=False, **kwargs):
     [prefix, suffix] = os.path.basename(template_fname).split('.', 1)
     (fd, p_fname) = tempfile.mkstemp(prefix=prefix, suffix=suffix)
     os.close(fd)
@@ -162,7 +162,8 @@ def run_template(template_fname, objects, version, version_string, output_file,
         f = open(output_file, 'w')
         f.write(template.render(objs=objects,
                                 version=version,
-                                version_string=version_string))
+                                version_string=version_string,
+                                **kwargs))
         f.close()
         if indent:
             indent_python(output_file)
@@ -230,6 +231,8 @@ def main(argv=None):
                     'b:': ('base directory', False, 'dir'),
                     'd:': ('versions directory', False, 'dir'),
                     'p': ('generate python domain classes', False),
+                    'l': ('use __slots__ and lazy indexes in domain classes',
+                          False),
                     's': ('generate sql schema and persistence classes', False),
                     'x': ('generate xml schema and persistence classes', False),
                     'v:': ('vistrail version tag', True, 'version'),
@@ -308,7 +311,7 @@ def main(argv=None):
             objects = parser.parse(versionDirs['specs'])
         run_template('templates/domain.py.mako', objects, version, versionName,
                      os.path.join(versionDirs['domain'], 'auto_gen.py'),
-                     True)
+                     True, slots=bool(options['l']))
 
         if not options['n']:
             domainFile = os.path.join(baseDirs['domain'], '__init__.py')
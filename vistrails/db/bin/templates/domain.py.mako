@@ -25,6 +25,19 @@ def shouldIgnoreIndexDelete(index):
     if type(index) == type([]):
         return index[0][0] == '!'
     return index[0] == '!'
+
+def getSlots(obj):
+    slots = []
+    for field in obj.getPythonFields():
+        slots.append(field.getPrivateName())
+        if field.isReference() and not field.isInverse():
+            slots.append('db_deleted_%s' % field.getRegularName())
+        if field.isPlural():
+            for index in field.getAllIndices():
+                slots.append('_db_%s_%s_index' % (field.getRegularName(),
+                                                  getIndexName(index)))
+    slots.extend(['is_dirty', 'is_new', '__dict__', '__weakref__'])
+    return slots
 %> \\
 <%text>###############################################################################
 ##
@@ -67,10 +80,17 @@ def shouldIgnoreIndexDelete(index):
 import copy
 
 % for obj in objs:
+<% use_slots = slots and obj.useSlots() %> \\
 class ${obj.getClassName()}(object):
 
     vtType = '${obj.getRegularName()}'
 
+    % if use_slots:
+    ## __dict__ keeps the layout compatible with the subclasses, which
+    ## add their own attributes and are assigned to __class__
+    __slots__ = (${(',\n' + ' ' * 17).join(repr(str(s)) for s in getSlots(obj))})
+
+    % endif
     def __init__(self, ${', '.join(['%s=None' % n \
                                     for n in obj.getConstructorNames()])}):
         % for field in obj.getPythonFields():
@@ -79,7 +99,11 @@ class ${obj.getClassName()}(object):
         % endif
         % if field.isPlural():
         % for index in field.getAllIndices():
+        % if use_slots:
+        self._db_${field.getRegularName()}_${getIndexName(index)}_index = None
+        % else:
         self.db_${field.getRegularName()}_${getIndexName(index)}_index = {}
+        % endif
         % endfor
         if ${field.getRegularName()} is None:
             % if field.getPythonType() == 'hash':
@@ -89,7 +113,7 @@ class ${obj.getClassName()}(object):
             % endif
         else:
             self.${field.getPrivateName()} = ${field.getRegularName()}
-            % if len(field.getAllIndices()) > 0:
+            % if len(field.getAllIndices()) > 0 and not use_slots:
             % if field.getPythonType() == 'hash':
             for v in self.${field.getPrivateName()}.itervalues():
             % else:
@@ -107,6 +131,19 @@ class ${obj.getClassName()}(object):
         self.is_dirty = True
         self.is_new = True
     
+    % if use_slots:
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in ${obj.getClassName()}.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
+    % endif
     def __copy__(self):
         return ${obj.getClassName()}.do_copy(self)
 
@@ -186,7 +223,7 @@ class ${obj.getClassName()}(object):
         
         # recreate indices and set flags
         % for field in obj.getPythonFields():
-        % if len(field.getAllIndices()) > 0:
+        % if len(field.getAllIndices()) > 0 and not use_slots:
         % for index in field.getAllIndices():
         cp.db_${field.getRegularName()}_${getIndexName(index)}_index = \
             dict((${getIndexKey('v', index)}, v) \
@@ -399,8 +436,16 @@ class ${obj.getClassName()}(object):
         self.${field.getPrivateName()}.append(${field.getName()})
         % endif
         % for index in field.getAllIndices():
+        % if use_slots:
+        if self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index is not None:
+            self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index[${getIndexKey(field.getName(), index)}] = \
+                    ${field.getName()}
+        % else:
         self.db_${field.getRegularName()}_${getIndexName(index)}_index[ \!
             ${getIndexKey(field.getName(), index)}] = ${field.getName()}
+        % endif
         % endfor
     def ${field.getModifier()}(self, ${field.getName()}):
         self.is_dirty = True
@@ -428,8 +473,16 @@ class ${obj.getClassName()}(object):
         % endif
         % endif
         % for index in field.getAllIndices():
+        % if use_slots:
+        if self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index is not None:
+            self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index[${getIndexKey(field.getName(), index)}] = \
+                    ${field.getName()}
+        % else:
         self.db_${field.getRegularName()}_${getIndexName(index)}_index[ \!
             ${getIndexKey(field.getName(), index)}] = ${field.getName()}
+        % endif
         % endfor
     def ${field.getRemover()}(self, ${field.getName()}):
         self.is_dirty = True
@@ -460,7 +513,17 @@ class ${obj.getClassName()}(object):
         % endif
         % if field.getPythonType() == 'hash' or field.getReferencedObject().getKey() is not None:
         % for index in field.getAllIndices():
-        % if shouldIgnoreIndexDelete(index):
+        % if use_slots:
+        if self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index is not None:
+            % if shouldIgnoreIndexDelete(index):
+            self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index.pop(${getIndexKey(field.getName(), index)}, None)
+            % else:
+            del self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index[${getIndexKey(field.getName(), index)}]
+            % endif
+        % elif shouldIgnoreIndexDelete(index):
         try:
             del self.db_${field.getRegularName()}_${getIndexName(index)}_ \!
                 index[${getIndexKey(field.getName(), index)}]
@@ -488,6 +551,23 @@ class ${obj.getClassName()}(object):
         % endif
     % endif
     % for index in field.getAllIndices():
+    % if use_slots:
+    def __get_db_${field.getRegularName()}_${getIndexName(index)}_ \!
+            index(self):
+        if self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index is None:
+            self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+                index = dict((${getIndexKey('v', index)}, v) \
+                             for v in self.${field.getPrivateIterator()})
+        return self._db_${field.getRegularName()}_${getIndexName(index)}_index
+    def __set_db_${field.getRegularName()}_${getIndexName(index)}_ \!
+            index(self, index):
+        self._db_${field.getRegularName()}_${getIndexName(index)}_ \!
+            index = index
+    db_${field.getRegularName()}_${getIndexName(index)}_index = property( \!
+        __get_db_${field.getRegularName()}_${getIndexName(index)}_index, \
+        __set_db_${field.getRegularName()}_${getIndexName(index)}_index)
+    % endif
     def db_get_${field.getSingleName()}_by_${getIndexName(index)}(self, key):
         return self.db_${field.getRegularName()}_ \!
             ${getIndexName(index)}_index[key]
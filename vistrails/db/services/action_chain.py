@@ -92,31 +92,30 @@ def getCurrentOperationDict(actions, currentOperations=None):
     for action in actions:
         for operation in action.db_operations:
             operationvtType = operation.vtType
-            d = operation.__dict__
             if operationvtType == 'add':
-                currentOperations[(d['_db_what'], 
-                                   d['_db_objectId'])] = \
+                currentOperations[(operation._db_what, 
+                                   operation._db_objectId)] = \
                                    operation
             elif operationvtType == 'delete':
-                what = d['_db_what']
-                objectId = d['_db_objectId']
+                what = operation._db_what
+                objectId = operation._db_objectId
                 t = (what, objectId)
                 try:
                     del currentOperations[t]
                 except KeyError:
-                    msg = "Illegal delete operation: %d" % d['_db_id']
+                    msg = "Illegal delete operation: %d" % operation._db_id
                     raise RuntimeError(msg)
             elif operationvtType == 'change':
-                what = d['_db_what']
-                objectId = d['_db_oldObjId']
+                what = operation._db_what
+                objectId = operation._db_oldObjId
                 t = (what, objectId)
                 try:
                     del currentOperations[t]
                 except KeyError:
-                    msg = "Illegal change operation: %d" % d['_db_id']
+                    msg = "Illegal change operation: %d" % operation._db_id
                     raise RuntimeError(msg)
                 currentOperations[(what,
-                                   d['_db_newObjId'])] = operation
+                                   operation._db_newObjId)] = operation
             else:
                 msg = "Unrecognized operation '%s'" % operation.vtType
                 raise TypeError(msg)
@@ -129,3 +128,42 @@ def getCurrentOperations(actions):
     sortedOperations.sort(key=lambda x: x.db_id)
     return sortedOperations
 
+
+def getCheckpointedOperationDict(obj, version, checkpoints, interval=0):
+    """Returns the same dictionary as
+    getCurrentOperationDict(getActionChain(obj, version)), but only
+    replays the actions since the closest ancestor of version found in
+    checkpoints (a mapping from version to operation dictionary, whose
+    get() returns None for unknown versions).
+
+    If interval is positive, the dictionary is also stored in
+    checkpoints every interval actions along the replayed chain, so
+    that materializing nearby versions later is cheap.
+
+    """
+    chain = []
+    currentOperations = None
+    currentId = version
+    while currentId > 0:
+        currentOperations = checkpoints.get(currentId)
+        if currentOperations is not None:
+            break
+        action = obj.db_get_action_by_id(currentId)
+        chain.append(action)
+        currentId = action.db_prevId
+    chain.reverse()
+    if currentOperations is None:
+        currentOperations = {}
+    else:
+        currentOperations = dict(currentOperations)
+    for i, action in enumerate(chain):
+        getCurrentOperationDict([action], currentOperations)
+        if interval > 0 and (i + 1) % interval == 0:
+            checkpoints[action.db_id] = dict(currentOperations)
+    return currentOperations
+
+def getCheckpointedOperations(obj, version, checkpoints, interval=0):
+    sortedOperations = getCheckpointedOperationDict(obj, version, checkpoints,
+                                                    interval).values()
+    sortedOperations.sort(key=lambda x: x.db_id)
+    return sortedOperations
@@ -47,6 +47,7 @@ import vistrails.core.requirements
 
 from datetime import datetime
 import os.path
+import posixpath
 import shutil
 import tempfile
 import copy
@@ -574,9 +575,9 @@ def save_to_xml(obj, filename, version=None):
         raise VistrailsDBException("cannot save object of type "
                                    "'%s' to xml" % type)
 
-def open_bundle_from_zip_xml(bundle_type, filename):
+def open_bundle_from_zip_xml(bundle_type, filename, versions=None):
     if bundle_type == DBVistrail.vtType:
-        return open_vistrail_bundle_from_zip_xml(filename)
+        return open_vistrail_bundle_from_zip_xml(filename, versions)
     else:
         raise VistrailsDBException("cannot open bundle of type '%s' from zip" %\
                                        bundle_type)
@@ -682,15 +683,116 @@ def unserialize(str, obj_type):
 ##############################################################################
 # Vistrail I/O
 
-def open_vistrail_from_xml(filename):
-    """open_vistrail_from_xml(filename) -> Vistrail"""
-    tree = ElementTree.parse(filename)
-    version = get_version_for_xml(tree.getroot())
+def open_vistrail_from_xml(filename, versions=None):
+    """open_vistrail_from_xml(filename, versions: list) -> Vistrail
+
+    The file is read incrementally (see StreamedXMLTree) so that each
+    action is turned into a DBAction as soon as it has been parsed and its
+    XML is released right away.
+
+    If versions (a list of tag names or version ids) is given, only the
+    actions needed to materialize those versions are loaded (see
+    read_vistrail_versions_from_xml).
+
+    """
+    return read_vistrail_versions_from_xml(filename, versions)
+
+def index_vistrail_xml(f):
+    """index_vistrail_xml(f: file) -> (dict, dict, dict)
+
+    Reads the headers of a vistrail XML document without building any
+    domain object. Returns the parent of every action, the version id of
+    every tag and the version each upgraded version was upgraded to.
+
+    """
+    parents = {}
+    tags = {}
+    upgrades = {}
+    for child in StreamedXMLTree(f).getchildren():
+        tag = strip_xml_namespace(child.tag)
+        if tag == 'action':
+            parents[long(child.get('id'))] = long(child.get('prevId'))
+        elif tag == 'tag':
+            tags[child.get('name')] = long(child.get('id'))
+        elif tag == 'actionAnnotation':
+            key = child.get('key')
+            if key == '__tag__':
+                tags[child.get('value')] = long(child.get('actionId'))
+            elif key == '__upgrade__':
+                upgrades[long(child.get('actionId'))] = long(child.get('value'))
+    return (parents, tags, upgrades)
+
+def get_vistrail_versions_closure(versions, parents, tags, upgrades):
+    """get_vistrail_versions_closure(versions: list, parents: dict,
+                                     tags: dict, upgrades: dict) -> set
+
+    Returns the ids of all the actions needed to materialize the given
+    versions (tag names or version ids) and their upgrades, using the
+    index built by index_vistrail_xml. Unknown versions are ignored.
+
+    """
+    needed = set()
+    to_visit = []
+    for version in versions:
+        if isinstance(version, basestring):
+            if version in tags:
+                to_visit.append(tags[version])
+        else:
+            to_visit.append(version)
+    while len(to_visit) > 0:
+        version = to_visit.pop()
+        while version not in needed and version in parents:
+            needed.add(version)
+            if version in upgrades:
+                to_visit.append(upgrades[version])
+            version = parents[version]
+    return needed
+
+def read_vistrail_versions_from_xml(filename, versions=None, zip_file=None):
+    """read_vistrail_versions_from_xml(filename: str, versions: list,
+                                       zip_file: ZipFile) -> Vistrail
+
+    Reads a vistrail from an XML file, or from the member named filename
+    of zip_file if it is given, without extracting it. If versions is not
+    None, the document is read twice: a first pass indexes
+    the action headers and tags, and the second one only builds the
+    actions on the paths to the requested versions, along with the tags
+    and annotations that refer to them. Such a vistrail has is_partial set
+    and cannot be saved.
+
+    """
+    if zip_file is not None:
+        open_file = lambda: zip_file.open(filename)
+    else:
+        open_file = lambda: open(filename, 'rb')
+
+    if versions is not None:
+        f = open_file()
+        try:
+            (parents, tags, upgrades) = index_vistrail_xml(f)
+        finally:
+            f.close()
+        needed = get_vistrail_versions_closure(versions, parents, tags,
+                                               upgrades)
+        def skip(tag, node):
+            if tag == 'action' or tag == 'tag':
+                return long(node.get('id')) not in needed
+            elif tag == 'actionAnnotation' or tag == 'parameterExploration':
+                return long(node.get('actionId')) not in needed
+            return False
+    else:
+        skip = None
+
+    f = open_file()
     try:
+        tree = StreamedXMLTree(f, skip)
+        version = get_version_for_xml(tree.getroot())
         daoList = getVersionDAO(version)
         vistrail = daoList.open_from_xml(filename, DBVistrail.vtType, tree)
         if vistrail is None:
             raise VistrailsDBException("Couldn't read vistrail from XML")
+        # drop the parser state before translating
+        del tree
         vistrail = translate_vistrail(vistrail, version)
         vistrails.db.services.vistrail.update_id_scope(vistrail)
     except VistrailsDBException, e:
@@ -699,18 +801,30 @@ def open_vistrail_from_xml(filename):
                 "This vistrail was created by a newer version of VisTrails "
                 "and cannot be opened.")
         raise e
+    finally:
+        f.close()
 
+    # schemas read with minidom do not stream and are always fully loaded
+    vistrail.is_partial = (versions is not None and
+                           len(vistrail.db_actions) < len(parents))
     return vistrail
 
-def open_vistrail_bundle_from_zip_xml(filename):
-    """open_vistrail_bundle_from_zip_xml(filename) -> SaveBundle
+def open_vistrail_bundle_from_zip_xml(filename, versions=None):
+    """open_vistrail_bundle_from_zip_xml(filename, versions) -> SaveBundle
     Open a vistrail from a zip compressed format.
     It expects that the vistrail file inside archive has name 'vistrail',
     the log inside archive has name 'log',
+    the workflow checkpoints inside archive have name 'checkpoints',
     abstractions inside archive have prefix 'abstraction_',
     and thumbnails inside archive are '.png' files in 'thumbs' dir
 
+    If versions (a list of tag names or version ids) is given, see
+    open_vistrail_versions_from_zip_xml.
+
     """
+    if versions is not None:
+        return open_vistrail_versions_from_zip_xml(filename, versions)
+
     vt_save_dir = tempfile.mkdtemp(prefix='vt_save')
 
     z = zipfile.ZipFile(filename)
@@ -722,6 +836,7 @@ def open_vistrail_bundle_from_zip_xml(filename):
     vistrail = None
     log = None
     log_fname = None
+    checkpoints_fname = None
     abstraction_files = []
     unknown_files = []
     thumbnail_files = []
@@ -738,6 +853,9 @@ def open_vistrail_bundle_from_zip_xml(filename):
                     log_fname = os.path.join(root, fname)
                     # log = open_log_from_xml(os.path.join(root, fname))
                     # objs.append(DBLog.vtType, log)
+                elif fname == 'checkpoints' and root == vt_save_dir:
+                    # read by the vistrail when it first needs them
+                    checkpoints_fname = os.path.join(root, fname)
                 elif fname.startswith('abstraction_'):
                     abstraction_file = os.path.join(root, fname)
                     abstraction_files.append(abstraction_file)
@@ -767,6 +885,7 @@ def open_vistrail_bundle_from_zip_xml(filename):
     if vistrail is None:
         raise VistrailsDBException("vt file does not contain vistrail")
     vistrail.db_log_filename = log_fname
+    vistrail.checkpoints_filename = checkpoints_fname
 
     # call package hooks
     from vistrails.core.packagemanager import get_package_manager
@@ -779,6 +898,80 @@ def open_vistrail_bundle_from_zip_xml(filename):
                              thumbnails=thumbnail_files, mashups=mashups)
     return (save_bundle, vt_save_dir)
 
+def check_vistrail_complete(vistrail):
+    if getattr(vistrail, 'is_partial', False):
+        raise VistrailsDBException("Cannot save a vistrail that was only "
+                                   "partially loaded")
+
+def open_vistrail_versions_from_zip_xml(filename, versions):
+    """open_vistrail_versions_from_zip_xml(filename, versions: list)
+         -> (SaveBundle, str)
+    Open the parts of a vistrail bundle needed to run some versions.
+
+    The archive is not extracted: the vistrail is read directly from the
+    zip and only the actions leading to versions (tag names or version ids)
+    are loaded, along with the mashuptrails of these actions. Only the
+    abstractions and the files handled by packages are extracted to the
+    returned directory; thumbnails and the log are left out. The bundle is
+    meant for read-only use: its vistrail cannot be saved.
+
+    """
+    from vistrails.core.packagemanager import get_package_manager
+    pm = get_package_manager()
+
+    vt_save_dir = tempfile.mkdtemp(prefix='vt_save')
+    abstraction_files = []
+    unknown_files = []
+    mashups = []
+    z = zipfile.ZipFile(filename)
+    try:
+        names = z.namelist()
+        if 'vistrail' not in names:
+            raise VistrailsDBException("vt file does not contain vistrail")
+        vistrail = read_vistrail_versions_from_xml('vistrail', versions, z)
+        action_ids = set(action.db_id for action in vistrail.db_actions)
+        for name in names:
+            (dirname, fname) = posixpath.split(name)
+            if (not fname or name == 'vistrail' or name == 'log' or
+                    name == 'checkpoints'):
+                continue
+            elif fname.startswith('abstraction_'):
+                abstraction_files.append(z.extract(name, vt_save_dir))
+            elif dirname == 'thumbs' and fname.endswith('.png'):
+                continue
+            elif dirname == 'mashups':
+                # only the root element is parsed to find the version
+                f = z.open(name)
+                try:
+                    vt_version = StreamedXMLTree(f).get('vtVersion')
+                finally:
+                    f.close()
+                if vt_version and long(vt_version) in action_ids:
+                    f = z.open(name)
+                    try:
+                        mashups.append(open_mashuptrail_from_xml(f))
+                    finally:
+                        f.close()
+            elif any(package.can_handle_vt_file(fname)
+                     for package in pm.enabled_package_list()):
+                z.extract(name, vt_save_dir)
+            else:
+                unknown_files.append(name)
+    finally:
+        z.close()
+    if len(unknown_files) > 0:
+        raise VistrailsDBException("Unknown files in vt file: %s" % \
+                                       unknown_files)
+    vistrail.db_log_filename = None
+
+    # call package hooks
+    for package in pm.enabled_package_list():
+        package.loadVistrailFileHook(vistrail, vt_save_dir)
+
+    save_bundle = SaveBundle(DBVistrail.vtType, vistrail, None,
+                             abstractions=abstraction_files, mashups=mashups)
+    return (save_bundle, vt_save_dir)
+
 def open_vistrail_bundle_from_db(db_connection, vistrail_id, tmp_dir=None):
     """open_vistrail_bundle_from_db(db_connection, id: long, tmp_dir: str) -> SaveBundle
        Open a vistrail bundle from the database.
@@ -837,6 +1030,7 @@ def open_vistrail_from_db(db_connection, id, lock=False, version=None):
     return vistrail
 
 def save_vistrail_to_xml(vistrail, filename, version=None):
+    check_vistrail_complete(vistrail)
     tags = {'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
             'xsi:schemaLocation': 'http://www.vistrails.org/vistrail.xsd'
             }
@@ -900,6 +1094,20 @@ def save_vistrail_bundle_to_zip_xml(save_bundle, filename, vt_save_dir=None, ver
         save_log_to_xml(save_bundle.log, xml_fname, version, True)
         save_bundle.vistrail.db_log_filename = xml_fname
 
+    # Save workflow checkpoints
+    checkpoints = getattr(save_bundle.vistrail, 'checkpoints', None)
+    if checkpoints is not None:
+        checkpoints_fname = os.path.join(vt_save_dir, 'checkpoints')
+        try:
+            if checkpoints.save(checkpoints_fname):
+                save_bundle.vistrail.checkpoints_filename = checkpoints_fname
+            else:
+                save_bundle.vistrail.checkpoints_filename = None
+        except (IOError, OSError), e:
+            # they are only a cache, the vistrail can be saved without them
+            debug.warning("Couldn't save workflow checkpoints", e)
+            save_bundle.vistrail.checkpoints_filename = None
+
     # Save Abstractions
     saved_abstractions = []
     for obj in save_bundle.abstractions:
@@ -1030,6 +1238,7 @@ def save_vistrail_bundle_to_db(save_bundle, db_connection, do_copy=False, versio
                       mashups=list(save_bundle.mashups))
 
 def save_vistrail_to_db(vistrail, db_connection, do_copy=False, version=None):
+    check_vistrail_complete(vistrail)
     if db_connection is None:
         msg = "Need to call open_db_connection() before reading"
         raise VistrailsDBException(msg)
@@ -1789,6 +1998,72 @@ def get_version_for_xml(root):
 def get_type_for_xml(root):
     return root.tag
 
+def strip_xml_namespace(tag):
+    if tag[0] == '{':
+        return tag.split('}')[1]
+    return tag
+
+class StreamedXMLTree(object):
+    """StreamedXMLTree(file, skip: callable) -> incrementally parsed XML
+
+    Stands in for both an ElementTree and its root element when passed to
+    a DAO's open_from_xml. The root's tag and attributes are available as
+    soon as its start tag has been read, and getchildren() yields every
+    top-level child once its end tag has been parsed. A child is discarded
+    as soon as the caller moves on to the next one, so the whole document
+    is never held in memory; the children can only be iterated once.
+
+    If skip is given, skip(tag, element) is called with the tag (without
+    namespace) of every top-level child as soon as its start tag has been
+    read, and the child is discarded without being yielded if it returns
+    True. Only the attributes of the element are available at that point.
+
+    """
+    def __init__(self, source, skip=None):
+        self._events = ElementTree.iterparse(source, events=('start', 'end'))
+        self._skip = skip
+        _, self._root = self._events.next()
+        self.tag = self._root.tag
+        self.text = None
+
+    def getroot(self):
+        return self
+
+    def get(self, key, default=None):
+        return self._root.get(key, default)
+
+    def keys(self):
+        return self._root.keys()
+
+    def items(self):
+        return self._root.items()
+
+    def getchildren(self):
+        if self._events is None:
+            raise VistrailsDBException("XML children were already read")
+        events, self._events = self._events, None
+        depth = 0
+        skipped = False
+        for event, elem in events:
+            if event == 'start':
+                if depth == 0 and self._skip is not None:
+                    skipped = self._skip(strip_xml_namespace(elem.tag), elem)
+                depth += 1
+            elif depth == 0:
+                # end of the root element
+                self.text = self._root.text
+                break
+            else:
+                depth -= 1
+                if depth == 0:
+                    if not skipped:
+                        yield elem
+                    elem.clear()
+                    del self._root[:]
+
+    def __iter__(self):
+        return self.getchildren()
+
 def get_current_time(db_connection=None):
     timestamp = datetime.now()
     if db_connection is not None:
@@ -1851,6 +2126,23 @@ class TestDBIO(unittest.TestCase):
                          'tests/resources/dummy_new.xml'))
         assert vistrail is not None
 
+    def test_streamed_xml(self):
+        """test that the streaming reader matches a full parse"""
+        filename = os.path.join(
+            vistrails.core.system.vistrails_root_directory(),
+            'tests/resources/test_change_vistrail.xml')
+        tree = ElementTree.parse(filename)
+        dao_list = getVersionDAO(get_version_for_xml(tree.getroot()))
+        expected = dao_list.open_from_xml(filename, DBVistrail.vtType, tree)
+        with open(filename, 'rb') as f:
+            streamed = dao_list.open_from_xml(filename, DBVistrail.vtType,
+                                              StreamedXMLTree(f))
+        self.assertEqual(ElementTree.tostring(
+                             dao_list.write_xml_object(expected)),
+                         ElementTree.tostring(
+                             dao_list.write_xml_object(streamed)))
+        self.assertEqual(len(streamed.db_actions), 56)
+
     def test3(self):
         """test importing a vt file"""
 
@@ -1861,6 +2153,35 @@ class TestDBIO(unittest.TestCase):
                          'tests/resources/dummy_new.vt'))
         assert save_bundle.vistrail is not None
 
+    def test_open_versions(self):
+        """test opening only the actions needed by a tag of a vt file"""
+        from vistrails.core.vistrail.vistrail import Vistrail
+        filename = os.path.join(vistrails.core.system.vistrails_root_directory(),
+                                'tests/resources/terminator.vt')
+        (full_bundle, full_dir) = open_vistrail_bundle_from_zip_xml(filename)
+        (save_bundle, vt_save_dir) = open_vistrail_bundle_from_zip_xml(
+            filename, ['Histogram'])
+        try:
+            full = full_bundle.vistrail
+            partial = save_bundle.vistrail
+            Vistrail.convert(full)
+            Vistrail.convert(partial)
+            self.assertTrue(partial.is_partial)
+            self.assertLess(len(partial.actions), len(full.actions))
+            version = full.get_version_number('Histogram')
+            self.assertEqual(partial.get_version_number('Histogram'), version)
+            expected = full.getPipeline(version)
+            pipeline = partial.getPipeline(version)
+            self.assertEqual(sorted(pipeline.modules),
+                             sorted(expected.modules))
+            self.assertEqual(sorted(pipeline.connections),
+                             sorted(expected.connections))
+            self.assertRaises(VistrailsDBException, save_vistrail_to_xml,
+                              partial, os.path.join(vt_save_dir, 'vistrail'))
+        finally:
+            shutil.rmtree(full_dir)
+            shutil.rmtree(vt_save_dir)
+
     def test4(self):
         """ test saving a vt file """
 
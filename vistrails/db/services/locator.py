@@ -615,14 +615,16 @@ class ZIPFileLocator(XMLFileLocator):
         XMLFileLocator.__init__(self, filename, **kwargs)
         self.tmp_dir = None
 
-    def load(self, type):
+    def load(self, type, versions=None):
         fname = self.get_temporary()
         if fname:
             from vistrails.db.domain import DBVistrail
             obj = io.open_from_xml(fname, type)
             return SaveBundle(DBVistrail.vtType, obj)
         else:
-            (save_bundle, tmp_dir) = io.open_bundle_from_zip_xml(type, self._name)
+            (save_bundle, tmp_dir) = io.open_bundle_from_zip_xml(type,
+                                                                 self._name,
+                                                                 versions)
             self.tmp_dir = tmp_dir
             for obj in save_bundle.get_db_objs():
                 obj.locator = self
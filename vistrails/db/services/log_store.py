@@ -0,0 +1,460 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Indexed store for execution logs, backed by an SQLite database.
+
+The log of a vistrail is normally a file to which each workflow execution is
+appended as an XML fragment; reading it back or finding the executions of a
+module means parsing all of it. LogStore records each workflow execution as it
+is added, along with an index of the module, group and loop executions it
+contains, so that these can be queried without loading anything else.
+
+The XML of each workflow execution is kept as well, so that they can be
+turned back into a DBLog or exported to the usual XML log formats.
+"""
+
+from __future__ import division
+
+from collections import namedtuple
+import sqlite3
+import threading
+
+from vistrails.db import VistrailsDBException
+from vistrails.db.domain import DBLog, DBWorkflowExec, DBModuleExec, \
+    DBGroupExec, DBLoopExec
+from vistrails.db.versions import currentVersion
+
+
+ItemExecRecord = namedtuple('ItemExecRecord', [
+        'workflow_exec', 'id', 'type', 'parent', 'iteration',
+        'module_id', 'module_name', 'signature', 'cached', 'completed',
+        'error', 'ts_start', 'ts_end'])
+
+
+_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS workflow_exec(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vistrail TEXT,
+        parent_id INTEGER,
+        parent_type TEXT,
+        parent_version INTEGER,
+        user TEXT,
+        name TEXT,
+        completed INTEGER,
+        ts_start TEXT,
+        ts_end TEXT,
+        version TEXT NOT NULL,
+        xml TEXT NOT NULL)
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS item_exec(
+        workflow_exec INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        parent INTEGER,
+        iteration INTEGER,
+        module_id INTEGER,
+        module_name TEXT,
+        signature TEXT,
+        cached INTEGER,
+        completed INTEGER,
+        error TEXT,
+        ts_start TEXT,
+        ts_end TEXT,
+        PRIMARY KEY (workflow_exec, id))
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_wf_version '
+    'ON workflow_exec(vistrail, parent_version)',
+    'CREATE INDEX IF NOT EXISTS idx_wf_time ON workflow_exec(ts_start)',
+    'CREATE INDEX IF NOT EXISTS idx_item_module '
+    'ON item_exec(module_id, workflow_exec)',
+    'CREATE INDEX IF NOT EXISTS idx_item_signature ON item_exec(signature)',
+    'CREATE INDEX IF NOT EXISTS idx_item_time ON item_exec(ts_start)',
+]
+
+
+def _timestamp(ts):
+    if ts is None:
+        return None
+    return str(ts)
+
+
+def _index_items(items, parent=None, iteration=None, parent_module=None):
+    """Yields the rows of item_exec for a list of item executions.
+    """
+    for item in items:
+        if item.vtType == DBModuleExec.vtType:
+            yield (item.db_id, item.vtType, parent, iteration,
+                   item.db_module_id, item.db_module_name,
+                   getattr(item, 'signature', None), item.db_cached,
+                   item.db_completed, item.db_error,
+                   _timestamp(item.db_ts_start), _timestamp(item.db_ts_end))
+            for row in _index_items(item.db_loop_execs, item.db_id, None,
+                                    item.db_module_id):
+                yield row
+        elif item.vtType == DBGroupExec.vtType:
+            yield (item.db_id, item.vtType, parent, iteration,
+                   item.db_module_id, item.db_group_name,
+                   getattr(item, 'signature', None), item.db_cached,
+                   item.db_completed, item.db_error,
+                   _timestamp(item.db_ts_start), _timestamp(item.db_ts_end))
+            for row in _index_items(item.db_item_execs, item.db_id):
+                yield row
+        elif item.vtType == DBLoopExec.vtType:
+            yield (item.db_id, item.vtType, parent, iteration,
+                   parent_module, None, None, None, None, None,
+                   _timestamp(item.db_ts_start), _timestamp(item.db_ts_end))
+            for loop_iteration in item.db_loop_iterations:
+                for row in _index_items(loop_iteration.db_item_execs,
+                                        item.db_id,
+                                        loop_iteration.db_iteration):
+                    yield row
+
+
+class LogStore(object):
+    """Execution log stored in an SQLite database.
+
+    Several vistrails can share the same database; the `vistrail` arguments
+    are a name identifying the one a workflow execution belongs to (for
+    instance the name of its locator).
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        try:
+            self.conn = sqlite3.connect(filename, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                self.conn.execute(statement)
+            self.conn.commit()
+        except sqlite3.Error, e:
+            raise VistrailsDBException("Can't open log database %s: %s" % (
+                                       filename, e))
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def add_workflow_exec(self, workflow_exec, vistrail=None):
+        """add_workflow_exec(workflow_exec: DBWorkflowExec, vistrail: str)
+                -> int
+
+        Records a workflow execution, which must be of the current schema
+        version, and returns its id in the store.
+        """
+        from vistrails.db.services.io import serialize
+
+        xml = serialize(workflow_exec)
+        rows = list(_index_items(workflow_exec.db_item_execs))
+        with self.lock:
+            try:
+                cur = self.conn.execute(
+                        'INSERT INTO workflow_exec(vistrail, parent_id, '
+                        'parent_type, parent_version, user, name, '
+                        'completed, ts_start, ts_end, version, xml) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (vistrail, workflow_exec.db_parent_id,
+                         workflow_exec.db_parent_type,
+                         workflow_exec.db_parent_version,
+                         workflow_exec.db_user, workflow_exec.db_name,
+                         workflow_exec.db_completed,
+                         _timestamp(workflow_exec.db_ts_start),
+                         _timestamp(workflow_exec.db_ts_end),
+                         currentVersion, xml))
+                wf_exec_id = cur.lastrowid
+                self.conn.executemany(
+                        'INSERT INTO item_exec VALUES '
+                        '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        [(wf_exec_id,) + row for row in rows])
+                self.conn.commit()
+            except sqlite3.Error, e:
+                self.conn.rollback()
+                raise VistrailsDBException("Can't write to log database "
+                                           "%s: %s" % (self.filename, e))
+        return wf_exec_id
+
+    def add_log(self, log, vistrail=None):
+        """add_log(log: DBLog, vistrail: str) -> list
+
+        Records all the workflow executions of a log, returning their ids.
+        """
+        return [self.add_workflow_exec(workflow_exec, vistrail)
+                for workflow_exec in log.db_workflow_execs]
+
+    def _select(self, query, params):
+        with self.lock:
+            return self.conn.execute(query, params).fetchall()
+
+    @staticmethod
+    def _conditions(**kwargs):
+        conditions = []
+        params = []
+        for column, op, value in (
+                ('vistrail', '=', kwargs.get('vistrail')),
+                ('parent_version', '=', kwargs.get('version')),
+                ('w.ts_start', '>=', _timestamp(kwargs.get('since'))),
+                ('w.ts_start', '<', _timestamp(kwargs.get('until'))),
+                ('module_id', '=', kwargs.get('module_id')),
+                ('signature', '=', kwargs.get('signature')),
+                ('i.completed', '=', kwargs.get('completed')),
+                ('type', '=', kwargs.get('type'))):
+            if value is not None:
+                conditions.append('%s %s ?' % (column, op))
+                params.append(value)
+        if conditions:
+            return ' WHERE ' + ' AND '.join(conditions), params
+        else:
+            return '', params
+
+    def workflow_exec_ids(self, vistrail=None, version=None, since=None,
+                          until=None):
+        """workflow_exec_ids(vistrail: str, version: int,
+                             since: datetime, until: datetime) -> list
+
+        Returns the ids of the workflow executions matching all the given
+        criteria, in the order they were recorded.
+        """
+        where, params = self._conditions(vistrail=vistrail, version=version,
+                                         since=since, until=until)
+        rows = self._select('SELECT id FROM workflow_exec w%s ORDER BY id' %
+                            where, params)
+        return [row[0] for row in rows]
+
+    def find_item_execs(self, module_id=None, signature=None, vistrail=None,
+                        version=None, since=None, until=None,
+                        completed=None, type=None):
+        """find_item_execs(module_id: int, signature: str, vistrail: str,
+                           version: int, since: datetime, until: datetime,
+                           completed: int, type: str) -> list
+
+        Returns ItemExecRecord tuples for the module, group and loop
+        executions matching all the given criteria. `version`, `since` and
+        `until` apply to the workflow execution.
+        """
+        where, params = self._conditions(
+                module_id=module_id, signature=signature, vistrail=vistrail,
+                version=version, since=since, until=until,
+                completed=completed, type=type)
+        rows = self._select(
+                'SELECT i.workflow_exec, i.id, type, parent, iteration, '
+                'module_id, module_name, signature, cached, i.completed, '
+                'error, i.ts_start, i.ts_end '
+                'FROM item_exec i JOIN workflow_exec w '
+                'ON i.workflow_exec = w.id%s '
+                'ORDER BY i.workflow_exec, i.id' % where,
+                params)
+        return [ItemExecRecord(*row) for row in rows]
+
+    def get_workflow_exec(self, wf_exec_id):
+        """get_workflow_exec(wf_exec_id: int) -> DBWorkflowExec
+        """
+        from vistrails.db.services.io import unserialize
+
+        rows = self._select('SELECT version, xml FROM workflow_exec '
+                            'WHERE id = ?', (wf_exec_id,))
+        if not rows:
+            raise KeyError(wf_exec_id)
+        version, xml = rows[0]
+        if version != currentVersion:
+            raise VistrailsDBException("Log database %s contains version "
+                                       "%s, expected %s" % (
+                                       self.filename, version,
+                                       currentVersion))
+        workflow_exec = unserialize(xml, DBWorkflowExec.vtType)
+        workflow_exec.db_id = wf_exec_id
+        return workflow_exec
+
+    def get_log(self, wf_exec_ids=None, vistrail=None):
+        """get_log(wf_exec_ids: list, vistrail: str) -> DBLog
+
+        Builds a log from the given workflow executions, or all those of
+        the vistrail.
+        """
+        if wf_exec_ids is None:
+            wf_exec_ids = self.workflow_exec_ids(vistrail=vistrail)
+        log = DBLog(workflow_execs=[self.get_workflow_exec(i)
+                                    for i in wf_exec_ids],
+                    version=currentVersion)
+        if wf_exec_ids:
+            log.id_scope.updateBeginId(DBWorkflowExec.vtType,
+                                       max(wf_exec_ids) + 1)
+        return log
+
+    def import_xml(self, filename, was_appended=True, vistrail=None):
+        """import_xml(filename: str, was_appended: bool, vistrail: str)
+                -> list
+
+        Records all the workflow executions from an XML log file.
+        """
+        from vistrails.db.services.io import open_log_from_xml
+
+        return self.add_log(open_log_from_xml(filename, was_appended),
+                            vistrail)
+
+    def export_xml(self, filename, wf_exec_ids=None, vistrail=None,
+                   do_append=False, version=None):
+        """export_xml(filename: str, wf_exec_ids: list, vistrail: str,
+                      do_append: bool, version: str) -> None
+
+        Writes workflow executions to an XML log file, either as a complete
+        log or appended to a vistrail's log (see save_log_to_xml()).
+        """
+        from vistrails.db.services.io import save_log_to_xml
+
+        save_log_to_xml(self.get_log(wf_exec_ids, vistrail), filename,
+                        version, do_append)
+
+###############################################################################
+
+import unittest
+
+
+class TestLogStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import tempfile
+        cls.directory = tempfile.mkdtemp(prefix='vt_logstore_')
+
+    @classmethod
+    def tearDownClass(cls):
+        import shutil
+        shutil.rmtree(cls.directory)
+
+    def make_workflow_exec(self, version, when, completed=1):
+        from datetime import datetime
+        from vistrails.db.domain import DBLoopIteration
+
+        ts = datetime(2016, 1, when, 12, 0, 0)
+        looped = DBModuleExec(id=4, module_id=2, module_name='Looped',
+                              ts_start=ts, ts_end=ts, cached=0,
+                              completed=completed)
+        looped.signature = 'sig%d' % when
+        loop = DBLoopExec(id=2, ts_start=ts, ts_end=ts,
+                          loop_iterations=[DBLoopIteration(
+                                  id=3, iteration=0, completed=1,
+                                  ts_start=ts, ts_end=ts,
+                                  item_execs=[looped])])
+        module_exec = DBModuleExec(id=1, module_id=2, module_name='Looped',
+                                   ts_start=ts, ts_end=ts, cached=0,
+                                   completed=completed, loop_execs=[loop])
+        other = DBModuleExec(id=5, module_id=7, module_name='Other',
+                             ts_start=ts, ts_end=ts, cached=1, completed=1)
+        return DBWorkflowExec(id=1, user='tester', ts_start=ts, ts_end=ts,
+                              parent_type='vistrail', parent_id=1,
+                              parent_version=version, completed=completed,
+                              item_execs=[module_exec, other])
+
+    def make_store(self, name):
+        import os
+        return LogStore(os.path.join(self.directory, name))
+
+    def test_query(self):
+        from datetime import datetime
+
+        store = self.make_store('query.db')
+        try:
+            first = store.add_workflow_exec(self.make_workflow_exec(3, 1),
+                                            'a.vt')
+            second = store.add_workflow_exec(self.make_workflow_exec(5, 2),
+                                             'a.vt')
+            third = store.add_workflow_exec(self.make_workflow_exec(3, 3, -1),
+                                            'b.vt')
+
+            self.assertEqual(store.workflow_exec_ids(), [first, second, third])
+            self.assertEqual(store.workflow_exec_ids(vistrail='a.vt',
+                                                     version=3),
+                             [first])
+            self.assertEqual(
+                    store.workflow_exec_ids(since=datetime(2016, 1, 2),
+                                            until=datetime(2016, 1, 3)),
+                    [second])
+
+            records = store.find_item_execs(module_id=2, vistrail='a.vt')
+            self.assertEqual([(r.workflow_exec, r.id, r.type)
+                              for r in records],
+                             [(first, 1, 'module_exec'),
+                              (first, 2, 'loop_exec'),
+                              (first, 4, 'module_exec'),
+                              (second, 1, 'module_exec'),
+                              (second, 2, 'loop_exec'),
+                              (second, 4, 'module_exec')])
+            self.assertEqual((records[2].parent, records[2].iteration),
+                             (2, 0))
+
+            record, = store.find_item_execs(signature='sig3')
+            self.assertEqual((record.workflow_exec, record.id,
+                              record.completed),
+                             (third, 4, -1))
+            self.assertEqual(len(store.find_item_execs(completed=-1,
+                                                       type='module_exec')),
+                             2)
+        finally:
+            store.close()
+
+    def test_xml(self):
+        import os
+
+        store = self.make_store('xml.db')
+        try:
+            store.add_workflow_exec(self.make_workflow_exec(3, 1), 'a.vt')
+            store.add_workflow_exec(self.make_workflow_exec(4, 2), 'a.vt')
+            store.add_workflow_exec(self.make_workflow_exec(5, 3), 'b.vt')
+
+            log = store.get_log(vistrail='a.vt')
+            self.assertEqual([w.db_parent_version
+                              for w in log.db_workflow_execs],
+                             [3, 4])
+            module_exec = log.db_workflow_execs[1].db_item_execs[0]
+            self.assertEqual(module_exec.db_module_name, 'Looped')
+            self.assertEqual(len(module_exec.db_loop_execs), 1)
+
+            # Appended format, like the log in a .vt
+            filename = os.path.join(self.directory, 'log')
+            store.export_xml(filename, vistrail='a.vt', do_append=True)
+            store.export_xml(filename, vistrail='b.vt', do_append=True)
+            other = self.make_store('imported.db')
+            try:
+                self.assertEqual(len(other.import_xml(filename)), 3)
+                self.assertEqual(
+                        [r.workflow_exec
+                         for r in other.find_item_execs(module_id=7)],
+                        [1, 2, 3])
+            finally:
+                other.close()
+        finally:
+            store.close()
@@ -38,7 +38,7 @@ from __future__ import division
 from vistrails.db.domain import DBWorkflow, DBAdd, DBDelete, DBAction, DBAbstraction, \
     DBModule, DBConnection, DBPort, DBFunction, DBParameter, DBGroup
 from vistrails.db.services.action_chain import getActionChain, getCurrentOperationDict, \
-    getCurrentOperations, simplify_ops
+    getCurrentOperations, getCheckpointedOperations, simplify_ops
 from vistrails.db import VistrailsDBException
 
 import copy
@@ -76,8 +76,15 @@ def materializeWorkflow(vistrail, version):
         workflow = DBWorkflow()
         #for action in getActionChain(vistrail, version):
         #    oldPerformAction(action, workflow)
-        performActions(getActionChain(vistrail, version), 
-                            workflow)
+        if hasattr(vistrail, 'checkpoints'):
+            # start from the closest checkpointed ancestor
+            performAdds(getCheckpointedOperations(
+                            vistrail, version, vistrail.checkpoints,
+                            vistrail.checkpoints.interval),
+                        workflow)
+        else:
+            performActions(getActionChain(vistrail, version), 
+                                workflow)
         workflow.db_id = version
         workflow.db_vistrailId = vistrail.db_id
         return workflow
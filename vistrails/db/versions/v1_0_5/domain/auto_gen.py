@@ -42,6 +42,21 @@ class DBOpmWasGeneratedBy(object):
 
     vtType = 'opm_was_generated_by'
 
+    __slots__ = ('_db_effect',
+                 'db_deleted_effect',
+                 '_db_role',
+                 'db_deleted_role',
+                 '_db_cause',
+                 'db_deleted_cause',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_opm_times',
+                 'db_deleted_opm_times',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, effect=None, role=None, cause=None, accounts=None, opm_times=None):
         self.db_deleted_effect = []
         self._db_effect = effect
@@ -62,6 +77,17 @@ class DBOpmWasGeneratedBy(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmWasGeneratedBy.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmWasGeneratedBy.do_copy(self)
 
@@ -311,6 +337,14 @@ class DBConfigKey(object):
 
     vtType = 'config_key'
 
+    __slots__ = ('_db_value',
+                 'db_deleted_value',
+                 '_db_name',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None, name=None):
         self.db_deleted_value = []
         self._db_value = value
@@ -318,6 +352,17 @@ class DBConfigKey(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConfigKey.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConfigKey.do_copy(self)
 
@@ -1073,6 +1118,23 @@ class DBOpmWasControlledBy(object):
 
     vtType = 'opm_was_controlled_by'
 
+    __slots__ = ('_db_effect',
+                 'db_deleted_effect',
+                 '_db_role',
+                 'db_deleted_role',
+                 '_db_cause',
+                 'db_deleted_cause',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_starts',
+                 'db_deleted_starts',
+                 '_db_ends',
+                 'db_deleted_ends',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, effect=None, role=None, cause=None, accounts=None, starts=None, ends=None):
         self.db_deleted_effect = []
         self._db_effect = effect
@@ -1098,6 +1160,17 @@ class DBOpmWasControlledBy(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmWasControlledBy.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmWasControlledBy.do_copy(self)
 
@@ -1394,6 +1467,18 @@ class DBAdd(object):
 
     vtType = 'add'
 
+    __slots__ = ('_db_data',
+                 'db_deleted_data',
+                 '_db_id',
+                 '_db_what',
+                 '_db_objectId',
+                 '_db_parentObjId',
+                 '_db_parentObjType',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, data=None, id=None, what=None, objectId=None, parentObjId=None, parentObjType=None):
         self.db_deleted_data = []
         self._db_data = data
@@ -1405,6 +1490,17 @@ class DBAdd(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBAdd.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBAdd.do_copy(self)
 
@@ -1651,6 +1747,16 @@ class DBProvGeneration(object):
 
     vtType = 'prov_generation'
 
+    __slots__ = ('_db_prov_entity',
+                 'db_deleted_prov_entity',
+                 '_db_prov_activity',
+                 'db_deleted_prov_activity',
+                 '_db_prov_role',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_entity=None, prov_activity=None, prov_role=None):
         self.db_deleted_prov_entity = []
         self._db_prov_entity = prov_entity
@@ -1660,6 +1766,17 @@ class DBProvGeneration(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvGeneration.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvGeneration.do_copy(self)
 
@@ -1798,6 +1915,21 @@ class DBOpmUsed(object):
 
     vtType = 'opm_used'
 
+    __slots__ = ('_db_effect',
+                 'db_deleted_effect',
+                 '_db_role',
+                 'db_deleted_role',
+                 '_db_cause',
+                 'db_deleted_cause',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_opm_times',
+                 'db_deleted_opm_times',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, effect=None, role=None, cause=None, accounts=None, opm_times=None):
         self.db_deleted_effect = []
         self._db_effect = effect
@@ -1818,6 +1950,17 @@ class DBOpmUsed(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmUsed.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmUsed.do_copy(self)
 
@@ -2067,11 +2210,28 @@ class DBOpmArtifactIdCause(object):
 
     vtType = 'opm_artifact_id_cause'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmArtifactIdCause.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmArtifactIdCause.do_copy(self)
 
@@ -2139,11 +2299,28 @@ class DBRefProvEntity(object):
 
     vtType = 'ref_prov_entity'
 
+    __slots__ = ('_db_prov_ref',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_ref=None):
         self._db_prov_ref = prov_ref
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBRefProvEntity.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBRefProvEntity.do_copy(self)
 
@@ -2211,6 +2388,18 @@ class DBVtConnection(object):
 
     vtType = 'vt_connection'
 
+    __slots__ = ('_db_id',
+                 '_db_vt_source',
+                 '_db_vt_dest',
+                 '_db_vt_source_port',
+                 '_db_vt_dest_port',
+                 '_db_vt_source_signature',
+                 '_db_vt_dest_signature',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, vt_source=None, vt_dest=None, vt_source_port=None, vt_dest_port=None, vt_source_signature=None, vt_dest_signature=None):
         self._db_id = id
         self._db_vt_source = vt_source
@@ -2222,6 +2411,17 @@ class DBVtConnection(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBVtConnection.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBVtConnection.do_copy(self)
 
@@ -2402,12 +2602,30 @@ class DBOpmAccount(object):
 
     vtType = 'opm_account'
 
+    __slots__ = ('_db_id',
+                 '_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, value=None):
         self._db_id = id
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAccount.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAccount.do_copy(self)
 
@@ -2493,15 +2711,34 @@ class DBGroupExec(object):
 
     vtType = 'group_exec'
 
+    __slots__ = ('_db_item_execs',
+                 'db_deleted_item_execs',
+                 '_db_item_execs_id_index',
+                 '_db_id',
+                 '_db_ts_start',
+                 '_db_ts_end',
+                 '_db_cached',
+                 '_db_module_id',
+                 '_db_group_name',
+                 '_db_group_type',
+                 '_db_completed',
+                 '_db_error',
+                 '_db_machine_id',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, item_execs=None, id=None, ts_start=None, ts_end=None, cached=None, module_id=None, group_name=None, group_type=None, completed=None, error=None, machine_id=None, annotations=None):
         self.db_deleted_item_execs = []
-        self.db_item_execs_id_index = {}
+        self._db_item_execs_id_index = None
         if item_execs is None:
             self._db_item_execs = []
         else:
             self._db_item_execs = item_execs
-            for v in self._db_item_execs:
-                self.db_item_execs_id_index[v.db_id] = v
         self._db_id = id
         self._db_ts_start = ts_start
         self._db_ts_end = ts_end
@@ -2513,16 +2750,25 @@ class DBGroupExec(object):
         self._db_error = error
         self._db_machine_id = machine_id
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
+        self._db_annotations_id_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBGroupExec.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBGroupExec.do_copy(self)
 
@@ -2560,8 +2806,6 @@ class DBGroupExec(object):
                 cp._db_machine_id = id_remap[('machine', self._db_machine_id)]
         
         # recreate indices and set flags
-        cp.db_item_execs_id_index = dict((v.db_id, v) for v in cp._db_item_execs)
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -2709,7 +2953,8 @@ class DBGroupExec(object):
     def db_add_item_exec(self, item_exec):
         self.is_dirty = True
         self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_change_item_exec(self, item_exec):
         self.is_dirty = True
         found = False
@@ -2720,7 +2965,8 @@ class DBGroupExec(object):
                 break
         if not found:
             self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_delete_item_exec(self, item_exec):
         self.is_dirty = True
         for i in xrange(len(self._db_item_execs)):
@@ -2729,12 +2975,20 @@ class DBGroupExec(object):
                     self.db_deleted_item_execs.append(self._db_item_execs[i])
                 del self._db_item_execs[i]
                 break
-        del self.db_item_execs_id_index[item_exec.db_id]
+        if self._db_item_execs_id_index is not None:
+            del self._db_item_execs_id_index[item_exec.db_id]
     def db_get_item_exec(self, key):
         for i in xrange(len(self._db_item_execs)):
             if self._db_item_execs[i].db_id == key:
                 return self._db_item_execs[i]
         return None
+    def __get_db_item_execs_id_index(self):
+        if self._db_item_execs_id_index is None:
+            self._db_item_execs_id_index = dict((v.db_id, v) for v in self._db_item_execs)
+        return self._db_item_execs_id_index
+    def __set_db_item_execs_id_index(self, index):
+        self._db_item_execs_id_index = index
+    db_item_execs_id_index = property(__get_db_item_execs_id_index, __set_db_item_execs_id_index)
     def db_get_item_exec_by_id(self, key):
         return self.db_item_execs_id_index[key]
     def db_has_item_exec_with_id(self, key):
@@ -2881,7 +3135,8 @@ class DBGroupExec(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -2892,7 +3147,8 @@ class DBGroupExec(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -2901,12 +3157,20 @@ class DBGroupExec(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
@@ -2919,11 +3183,28 @@ class DBOpmAgentId(object):
 
     vtType = 'opm_agent_id'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAgentId.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAgentId.do_copy(self)
 
@@ -2991,6 +3272,17 @@ class DBParameter(object):
 
     vtType = 'parameter'
 
+    __slots__ = ('_db_id',
+                 '_db_pos',
+                 '_db_name',
+                 '_db_type',
+                 '_db_val',
+                 '_db_alias',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, pos=None, name=None, type=None, val=None, alias=None):
         self._db_id = id
         self._db_pos = pos
@@ -3001,6 +3293,17 @@ class DBParameter(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBParameter.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBParameter.do_copy(self)
 
@@ -3162,6 +3465,43 @@ class DBVistrail(object):
 
     vtType = 'vistrail'
 
+    __slots__ = ('_db_id',
+                 '_db_entity_type',
+                 '_db_version',
+                 '_db_name',
+                 '_db_last_modified',
+                 '_db_actions',
+                 'db_deleted_actions',
+                 '_db_actions_id_index',
+                 '_db_tags',
+                 'db_deleted_tags',
+                 '_db_tags_id_index',
+                 '_db_tags_name_index',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 '_db_annotations_key_index',
+                 '_db_controlParameters',
+                 'db_deleted_controlParameters',
+                 '_db_controlParameters_id_index',
+                 '_db_controlParameters_name_index',
+                 '_db_vistrailVariables',
+                 'db_deleted_vistrailVariables',
+                 '_db_vistrailVariables_name_index',
+                 '_db_vistrailVariables_uuid_index',
+                 '_db_parameter_explorations',
+                 'db_deleted_parameter_explorations',
+                 '_db_parameter_explorations_id_index',
+                 '_db_actionAnnotations',
+                 'db_deleted_actionAnnotations',
+                 '_db_actionAnnotations_id_index',
+                 '_db_actionAnnotations_action_id_index',
+                 '_db_actionAnnotations_key_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, entity_type=None, version=None, name=None, last_modified=None, actions=None, tags=None, annotations=None, controlParameters=None, vistrailVariables=None, parameter_explorations=None, actionAnnotations=None):
         self._db_id = id
         self._db_entity_type = entity_type
@@ -3169,76 +3509,67 @@ class DBVistrail(object):
         self._db_name = name
         self._db_last_modified = last_modified
         self.db_deleted_actions = []
-        self.db_actions_id_index = {}
+        self._db_actions_id_index = None
         if actions is None:
             self._db_actions = []
         else:
             self._db_actions = actions
-            for v in self._db_actions:
-                self.db_actions_id_index[v.db_id] = v
         self.db_deleted_tags = []
-        self.db_tags_id_index = {}
-        self.db_tags_name_index = {}
+        self._db_tags_id_index = None
+        self._db_tags_name_index = None
         if tags is None:
             self._db_tags = []
         else:
             self._db_tags = tags
-            for v in self._db_tags:
-                self.db_tags_id_index[v.db_id] = v
-                self.db_tags_name_index[v.db_name] = v
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
-        self.db_annotations_key_index = {}
+        self._db_annotations_id_index = None
+        self._db_annotations_key_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
-                self.db_annotations_key_index[v.db_key] = v
         self.db_deleted_controlParameters = []
-        self.db_controlParameters_id_index = {}
-        self.db_controlParameters_name_index = {}
+        self._db_controlParameters_id_index = None
+        self._db_controlParameters_name_index = None
         if controlParameters is None:
             self._db_controlParameters = []
         else:
             self._db_controlParameters = controlParameters
-            for v in self._db_controlParameters:
-                self.db_controlParameters_id_index[v.db_id] = v
-                self.db_controlParameters_name_index[v.db_name] = v
         self.db_deleted_vistrailVariables = []
-        self.db_vistrailVariables_name_index = {}
-        self.db_vistrailVariables_uuid_index = {}
+        self._db_vistrailVariables_name_index = None
+        self._db_vistrailVariables_uuid_index = None
         if vistrailVariables is None:
             self._db_vistrailVariables = []
         else:
             self._db_vistrailVariables = vistrailVariables
-            for v in self._db_vistrailVariables:
-                self.db_vistrailVariables_name_index[v.db_name] = v
-                self.db_vistrailVariables_uuid_index[v.db_uuid] = v
         self.db_deleted_parameter_explorations = []
-        self.db_parameter_explorations_id_index = {}
+        self._db_parameter_explorations_id_index = None
         if parameter_explorations is None:
             self._db_parameter_explorations = []
         else:
             self._db_parameter_explorations = parameter_explorations
-            for v in self._db_parameter_explorations:
-                self.db_parameter_explorations_id_index[v.db_id] = v
         self.db_deleted_actionAnnotations = []
-        self.db_actionAnnotations_id_index = {}
-        self.db_actionAnnotations_action_id_index = {}
-        self.db_actionAnnotations_key_index = {}
+        self._db_actionAnnotations_id_index = None
+        self._db_actionAnnotations_action_id_index = None
+        self._db_actionAnnotations_key_index = None
         if actionAnnotations is None:
             self._db_actionAnnotations = []
         else:
             self._db_actionAnnotations = actionAnnotations
-            for v in self._db_actionAnnotations:
-                self.db_actionAnnotations_id_index[v.db_id] = v
-                self.db_actionAnnotations_action_id_index[(v.db_action_id,v.db_key)] = v
-                self.db_actionAnnotations_key_index[(v.db_key,v.db_value)] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBVistrail.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBVistrail.do_copy(self)
 
@@ -3287,19 +3618,6 @@ class DBVistrail(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_actions_id_index = dict((v.db_id, v) for v in cp._db_actions)
-        cp.db_tags_id_index = dict((v.db_id, v) for v in cp._db_tags)
-        cp.db_tags_name_index = dict((v.db_name, v) for v in cp._db_tags)
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
-        cp.db_annotations_key_index = dict((v.db_key, v) for v in cp._db_annotations)
-        cp.db_controlParameters_id_index = dict((v.db_id, v) for v in cp._db_controlParameters)
-        cp.db_controlParameters_name_index = dict((v.db_name, v) for v in cp._db_controlParameters)
-        cp.db_vistrailVariables_name_index = dict((v.db_name, v) for v in cp._db_vistrailVariables)
-        cp.db_vistrailVariables_uuid_index = dict((v.db_uuid, v) for v in cp._db_vistrailVariables)
-        cp.db_parameter_explorations_id_index = dict((v.db_id, v) for v in cp._db_parameter_explorations)
-        cp.db_actionAnnotations_id_index = dict((v.db_id, v) for v in cp._db_actionAnnotations)
-        cp.db_actionAnnotations_action_id_index = dict(((v.db_action_id,v.db_key), v) for v in cp._db_actionAnnotations)
-        cp.db_actionAnnotations_key_index = dict(((v.db_key,v.db_value), v) for v in cp._db_actionAnnotations)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -3590,7 +3908,8 @@ class DBVistrail(object):
     def db_add_action(self, action):
         self.is_dirty = True
         self._db_actions.append(action)
-        self.db_actions_id_index[action.db_id] = action
+        if self._db_actions_id_index is not None:
+            self._db_actions_id_index[action.db_id] = action
     def db_change_action(self, action):
         self.is_dirty = True
         found = False
@@ -3601,7 +3920,8 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_actions.append(action)
-        self.db_actions_id_index[action.db_id] = action
+        if self._db_actions_id_index is not None:
+            self._db_actions_id_index[action.db_id] = action
     def db_delete_action(self, action):
         self.is_dirty = True
         for i in xrange(len(self._db_actions)):
@@ -3610,12 +3930,20 @@ class DBVistrail(object):
                     self.db_deleted_actions.append(self._db_actions[i])
                 del self._db_actions[i]
                 break
-        del self.db_actions_id_index[action.db_id]
+        if self._db_actions_id_index is not None:
+            del self._db_actions_id_index[action.db_id]
     def db_get_action(self, key):
         for i in xrange(len(self._db_actions)):
             if self._db_actions[i].db_id == key:
                 return self._db_actions[i]
         return None
+    def __get_db_actions_id_index(self):
+        if self._db_actions_id_index is None:
+            self._db_actions_id_index = dict((v.db_id, v) for v in self._db_actions)
+        return self._db_actions_id_index
+    def __set_db_actions_id_index(self, index):
+        self._db_actions_id_index = index
+    db_actions_id_index = property(__get_db_actions_id_index, __set_db_actions_id_index)
     def db_get_action_by_id(self, key):
         return self.db_actions_id_index[key]
     def db_has_action_with_id(self, key):
@@ -3632,8 +3960,10 @@ class DBVistrail(object):
     def db_add_tag(self, tag):
         self.is_dirty = True
         self._db_tags.append(tag)
-        self.db_tags_id_index[tag.db_id] = tag
-        self.db_tags_name_index[tag.db_name] = tag
+        if self._db_tags_id_index is not None:
+            self._db_tags_id_index[tag.db_id] = tag
+        if self._db_tags_name_index is not None:
+            self._db_tags_name_index[tag.db_name] = tag
     def db_change_tag(self, tag):
         self.is_dirty = True
         found = False
@@ -3644,8 +3974,10 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_tags.append(tag)
-        self.db_tags_id_index[tag.db_id] = tag
-        self.db_tags_name_index[tag.db_name] = tag
+        if self._db_tags_id_index is not None:
+            self._db_tags_id_index[tag.db_id] = tag
+        if self._db_tags_name_index is not None:
+            self._db_tags_name_index[tag.db_name] = tag
     def db_delete_tag(self, tag):
         self.is_dirty = True
         for i in xrange(len(self._db_tags)):
@@ -3654,17 +3986,33 @@ class DBVistrail(object):
                     self.db_deleted_tags.append(self._db_tags[i])
                 del self._db_tags[i]
                 break
-        del self.db_tags_id_index[tag.db_id]
-        del self.db_tags_name_index[tag.db_name]
+        if self._db_tags_id_index is not None:
+            del self._db_tags_id_index[tag.db_id]
+        if self._db_tags_name_index is not None:
+            del self._db_tags_name_index[tag.db_name]
     def db_get_tag(self, key):
         for i in xrange(len(self._db_tags)):
             if self._db_tags[i].db_id == key:
                 return self._db_tags[i]
         return None
+    def __get_db_tags_id_index(self):
+        if self._db_tags_id_index is None:
+            self._db_tags_id_index = dict((v.db_id, v) for v in self._db_tags)
+        return self._db_tags_id_index
+    def __set_db_tags_id_index(self, index):
+        self._db_tags_id_index = index
+    db_tags_id_index = property(__get_db_tags_id_index, __set_db_tags_id_index)
     def db_get_tag_by_id(self, key):
         return self.db_tags_id_index[key]
     def db_has_tag_with_id(self, key):
         return key in self.db_tags_id_index
+    def __get_db_tags_name_index(self):
+        if self._db_tags_name_index is None:
+            self._db_tags_name_index = dict((v.db_name, v) for v in self._db_tags)
+        return self._db_tags_name_index
+    def __set_db_tags_name_index(self, index):
+        self._db_tags_name_index = index
+    db_tags_name_index = property(__get_db_tags_name_index, __set_db_tags_name_index)
     def db_get_tag_by_name(self, key):
         return self.db_tags_name_index[key]
     def db_has_tag_with_name(self, key):
@@ -3681,8 +4029,10 @@ class DBVistrail(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
-        self.db_annotations_key_index[annotation.db_key] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_key_index is not None:
+            self._db_annotations_key_index[annotation.db_key] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -3693,8 +4043,10 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
-        self.db_annotations_key_index[annotation.db_key] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_key_index is not None:
+            self._db_annotations_key_index[annotation.db_key] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -3703,17 +4055,33 @@ class DBVistrail(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
-        del self.db_annotations_key_index[annotation.db_key]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_key_index is not None:
+            del self._db_annotations_key_index[annotation.db_key]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
         return key in self.db_annotations_id_index
+    def __get_db_annotations_key_index(self):
+        if self._db_annotations_key_index is None:
+            self._db_annotations_key_index = dict((v.db_key, v) for v in self._db_annotations)
+        return self._db_annotations_key_index
+    def __set_db_annotations_key_index(self, index):
+        self._db_annotations_key_index = index
+    db_annotations_key_index = property(__get_db_annotations_key_index, __set_db_annotations_key_index)
     def db_get_annotation_by_key(self, key):
         return self.db_annotations_key_index[key]
     def db_has_annotation_with_key(self, key):
@@ -3730,8 +4098,10 @@ class DBVistrail(object):
     def db_add_controlParameter(self, controlParameter):
         self.is_dirty = True
         self._db_controlParameters.append(controlParameter)
-        self.db_controlParameters_id_index[controlParameter.db_id] = controlParameter
-        self.db_controlParameters_name_index[controlParameter.db_name] = controlParameter
+        if self._db_controlParameters_id_index is not None:
+            self._db_controlParameters_id_index[controlParameter.db_id] = controlParameter
+        if self._db_controlParameters_name_index is not None:
+            self._db_controlParameters_name_index[controlParameter.db_name] = controlParameter
     def db_change_controlParameter(self, controlParameter):
         self.is_dirty = True
         found = False
@@ -3742,8 +4112,10 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_controlParameters.append(controlParameter)
-        self.db_controlParameters_id_index[controlParameter.db_id] = controlParameter
-        self.db_controlParameters_name_index[controlParameter.db_name] = controlParameter
+        if self._db_controlParameters_id_index is not None:
+            self._db_controlParameters_id_index[controlParameter.db_id] = controlParameter
+        if self._db_controlParameters_name_index is not None:
+            self._db_controlParameters_name_index[controlParameter.db_name] = controlParameter
     def db_delete_controlParameter(self, controlParameter):
         self.is_dirty = True
         for i in xrange(len(self._db_controlParameters)):
@@ -3752,17 +4124,33 @@ class DBVistrail(object):
                     self.db_deleted_controlParameters.append(self._db_controlParameters[i])
                 del self._db_controlParameters[i]
                 break
-        del self.db_controlParameters_id_index[controlParameter.db_id]
-        del self.db_controlParameters_name_index[controlParameter.db_name]
+        if self._db_controlParameters_id_index is not None:
+            del self._db_controlParameters_id_index[controlParameter.db_id]
+        if self._db_controlParameters_name_index is not None:
+            del self._db_controlParameters_name_index[controlParameter.db_name]
     def db_get_controlParameter(self, key):
         for i in xrange(len(self._db_controlParameters)):
             if self._db_controlParameters[i].db_id == key:
                 return self._db_controlParameters[i]
         return None
+    def __get_db_controlParameters_id_index(self):
+        if self._db_controlParameters_id_index is None:
+            self._db_controlParameters_id_index = dict((v.db_id, v) for v in self._db_controlParameters)
+        return self._db_controlParameters_id_index
+    def __set_db_controlParameters_id_index(self, index):
+        self._db_controlParameters_id_index = index
+    db_controlParameters_id_index = property(__get_db_controlParameters_id_index, __set_db_controlParameters_id_index)
     def db_get_controlParameter_by_id(self, key):
         return self.db_controlParameters_id_index[key]
     def db_has_controlParameter_with_id(self, key):
         return key in self.db_controlParameters_id_index
+    def __get_db_controlParameters_name_index(self):
+        if self._db_controlParameters_name_index is None:
+            self._db_controlParameters_name_index = dict((v.db_name, v) for v in self._db_controlParameters)
+        return self._db_controlParameters_name_index
+    def __set_db_controlParameters_name_index(self, index):
+        self._db_controlParameters_name_index = index
+    db_controlParameters_name_index = property(__get_db_controlParameters_name_index, __set_db_controlParameters_name_index)
     def db_get_controlParameter_by_name(self, key):
         return self.db_controlParameters_name_index[key]
     def db_has_controlParameter_with_name(self, key):
@@ -3779,8 +4167,10 @@ class DBVistrail(object):
     def db_add_vistrailVariable(self, vistrailVariable):
         self.is_dirty = True
         self._db_vistrailVariables.append(vistrailVariable)
-        self.db_vistrailVariables_name_index[vistrailVariable.db_name] = vistrailVariable
-        self.db_vistrailVariables_uuid_index[vistrailVariable.db_uuid] = vistrailVariable
+        if self._db_vistrailVariables_name_index is not None:
+            self._db_vistrailVariables_name_index[vistrailVariable.db_name] = vistrailVariable
+        if self._db_vistrailVariables_uuid_index is not None:
+            self._db_vistrailVariables_uuid_index[vistrailVariable.db_uuid] = vistrailVariable
     def db_change_vistrailVariable(self, vistrailVariable):
         self.is_dirty = True
         found = False
@@ -3791,8 +4181,10 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_vistrailVariables.append(vistrailVariable)
-        self.db_vistrailVariables_name_index[vistrailVariable.db_name] = vistrailVariable
-        self.db_vistrailVariables_uuid_index[vistrailVariable.db_uuid] = vistrailVariable
+        if self._db_vistrailVariables_name_index is not None:
+            self._db_vistrailVariables_name_index[vistrailVariable.db_name] = vistrailVariable
+        if self._db_vistrailVariables_uuid_index is not None:
+            self._db_vistrailVariables_uuid_index[vistrailVariable.db_uuid] = vistrailVariable
     def db_delete_vistrailVariable(self, vistrailVariable):
         self.is_dirty = True
         for i in xrange(len(self._db_vistrailVariables)):
@@ -3801,17 +4193,33 @@ class DBVistrail(object):
                     self.db_deleted_vistrailVariables.append(self._db_vistrailVariables[i])
                 del self._db_vistrailVariables[i]
                 break
-        del self.db_vistrailVariables_name_index[vistrailVariable.db_name]
-        del self.db_vistrailVariables_uuid_index[vistrailVariable.db_uuid]
+        if self._db_vistrailVariables_name_index is not None:
+            del self._db_vistrailVariables_name_index[vistrailVariable.db_name]
+        if self._db_vistrailVariables_uuid_index is not None:
+            del self._db_vistrailVariables_uuid_index[vistrailVariable.db_uuid]
     def db_get_vistrailVariable(self, key):
         for i in xrange(len(self._db_vistrailVariables)):
             if self._db_vistrailVariables[i].db_name == key:
                 return self._db_vistrailVariables[i]
         return None
+    def __get_db_vistrailVariables_name_index(self):
+        if self._db_vistrailVariables_name_index is None:
+            self._db_vistrailVariables_name_index = dict((v.db_name, v) for v in self._db_vistrailVariables)
+        return self._db_vistrailVariables_name_index
+    def __set_db_vistrailVariables_name_index(self, index):
+        self._db_vistrailVariables_name_index = index
+    db_vistrailVariables_name_index = property(__get_db_vistrailVariables_name_index, __set_db_vistrailVariables_name_index)
     def db_get_vistrailVariable_by_name(self, key):
         return self.db_vistrailVariables_name_index[key]
     def db_has_vistrailVariable_with_name(self, key):
         return key in self.db_vistrailVariables_name_index
+    def __get_db_vistrailVariables_uuid_index(self):
+        if self._db_vistrailVariables_uuid_index is None:
+            self._db_vistrailVariables_uuid_index = dict((v.db_uuid, v) for v in self._db_vistrailVariables)
+        return self._db_vistrailVariables_uuid_index
+    def __set_db_vistrailVariables_uuid_index(self, index):
+        self._db_vistrailVariables_uuid_index = index
+    db_vistrailVariables_uuid_index = property(__get_db_vistrailVariables_uuid_index, __set_db_vistrailVariables_uuid_index)
     def db_get_vistrailVariable_by_uuid(self, key):
         return self.db_vistrailVariables_uuid_index[key]
     def db_has_vistrailVariable_with_uuid(self, key):
@@ -3828,7 +4236,8 @@ class DBVistrail(object):
     def db_add_parameter_exploration(self, parameter_exploration):
         self.is_dirty = True
         self._db_parameter_explorations.append(parameter_exploration)
-        self.db_parameter_explorations_id_index[parameter_exploration.db_id] = parameter_exploration
+        if self._db_parameter_explorations_id_index is not None:
+            self._db_parameter_explorations_id_index[parameter_exploration.db_id] = parameter_exploration
     def db_change_parameter_exploration(self, parameter_exploration):
         self.is_dirty = True
         found = False
@@ -3839,7 +4248,8 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_parameter_explorations.append(parameter_exploration)
-        self.db_parameter_explorations_id_index[parameter_exploration.db_id] = parameter_exploration
+        if self._db_parameter_explorations_id_index is not None:
+            self._db_parameter_explorations_id_index[parameter_exploration.db_id] = parameter_exploration
     def db_delete_parameter_exploration(self, parameter_exploration):
         self.is_dirty = True
         for i in xrange(len(self._db_parameter_explorations)):
@@ -3848,12 +4258,20 @@ class DBVistrail(object):
                     self.db_deleted_parameter_explorations.append(self._db_parameter_explorations[i])
                 del self._db_parameter_explorations[i]
                 break
-        del self.db_parameter_explorations_id_index[parameter_exploration.db_id]
+        if self._db_parameter_explorations_id_index is not None:
+            del self._db_parameter_explorations_id_index[parameter_exploration.db_id]
     def db_get_parameter_exploration(self, key):
         for i in xrange(len(self._db_parameter_explorations)):
             if self._db_parameter_explorations[i].db_id == key:
                 return self._db_parameter_explorations[i]
         return None
+    def __get_db_parameter_explorations_id_index(self):
+        if self._db_parameter_explorations_id_index is None:
+            self._db_parameter_explorations_id_index = dict((v.db_id, v) for v in self._db_parameter_explorations)
+        return self._db_parameter_explorations_id_index
+    def __set_db_parameter_explorations_id_index(self, index):
+        self._db_parameter_explorations_id_index = index
+    db_parameter_explorations_id_index = property(__get_db_parameter_explorations_id_index, __set_db_parameter_explorations_id_index)
     def db_get_parameter_exploration_by_id(self, key):
         return self.db_parameter_explorations_id_index[key]
     def db_has_parameter_exploration_with_id(self, key):
@@ -3870,9 +4288,12 @@ class DBVistrail(object):
     def db_add_actionAnnotation(self, actionAnnotation):
         self.is_dirty = True
         self._db_actionAnnotations.append(actionAnnotation)
-        self.db_actionAnnotations_id_index[actionAnnotation.db_id] = actionAnnotation
-        self.db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)] = actionAnnotation
-        self.db_actionAnnotations_key_index[(actionAnnotation.db_key,actionAnnotation.db_value)] = actionAnnotation
+        if self._db_actionAnnotations_id_index is not None:
+            self._db_actionAnnotations_id_index[actionAnnotation.db_id] = actionAnnotation
+        if self._db_actionAnnotations_action_id_index is not None:
+            self._db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)] = actionAnnotation
+        if self._db_actionAnnotations_key_index is not None:
+            self._db_actionAnnotations_key_index[(actionAnnotation.db_key,actionAnnotation.db_value)] = actionAnnotation
     def db_change_actionAnnotation(self, actionAnnotation):
         self.is_dirty = True
         found = False
@@ -3883,9 +4304,12 @@ class DBVistrail(object):
                 break
         if not found:
             self._db_actionAnnotations.append(actionAnnotation)
-        self.db_actionAnnotations_id_index[actionAnnotation.db_id] = actionAnnotation
-        self.db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)] = actionAnnotation
-        self.db_actionAnnotations_key_index[(actionAnnotation.db_key,actionAnnotation.db_value)] = actionAnnotation
+        if self._db_actionAnnotations_id_index is not None:
+            self._db_actionAnnotations_id_index[actionAnnotation.db_id] = actionAnnotation
+        if self._db_actionAnnotations_action_id_index is not None:
+            self._db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)] = actionAnnotation
+        if self._db_actionAnnotations_key_index is not None:
+            self._db_actionAnnotations_key_index[(actionAnnotation.db_key,actionAnnotation.db_value)] = actionAnnotation
     def db_delete_actionAnnotation(self, actionAnnotation):
         self.is_dirty = True
         for i in xrange(len(self._db_actionAnnotations)):
@@ -3894,25 +4318,46 @@ class DBVistrail(object):
                     self.db_deleted_actionAnnotations.append(self._db_actionAnnotations[i])
                 del self._db_actionAnnotations[i]
                 break
-        del self.db_actionAnnotations_id_index[actionAnnotation.db_id]
-        del self.db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)]
-        try:
-            del self.db_actionAnnotations_key_index[(actionAnnotation.db_key,actionAnnotation.db_value)]
-        except KeyError:
-            pass
+        if self._db_actionAnnotations_id_index is not None:
+            del self._db_actionAnnotations_id_index[actionAnnotation.db_id]
+        if self._db_actionAnnotations_action_id_index is not None:
+            del self._db_actionAnnotations_action_id_index[(actionAnnotation.db_action_id,actionAnnotation.db_key)]
+        if self._db_actionAnnotations_key_index is not None:
+            self._db_actionAnnotations_key_index.pop((actionAnnotation.db_key,actionAnnotation.db_value), None)
     def db_get_actionAnnotation(self, key):
         for i in xrange(len(self._db_actionAnnotations)):
             if self._db_actionAnnotations[i].db_id == key:
                 return self._db_actionAnnotations[i]
         return None
+    def __get_db_actionAnnotations_id_index(self):
+        if self._db_actionAnnotations_id_index is None:
+            self._db_actionAnnotations_id_index = dict((v.db_id, v) for v in self._db_actionAnnotations)
+        return self._db_actionAnnotations_id_index
+    def __set_db_actionAnnotations_id_index(self, index):
+        self._db_actionAnnotations_id_index = index
+    db_actionAnnotations_id_index = property(__get_db_actionAnnotations_id_index, __set_db_actionAnnotations_id_index)
     def db_get_actionAnnotation_by_id(self, key):
         return self.db_actionAnnotations_id_index[key]
     def db_has_actionAnnotation_with_id(self, key):
         return key in self.db_actionAnnotations_id_index
+    def __get_db_actionAnnotations_action_id_index(self):
+        if self._db_actionAnnotations_action_id_index is None:
+            self._db_actionAnnotations_action_id_index = dict(((v.db_action_id,v.db_key), v) for v in self._db_actionAnnotations)
+        return self._db_actionAnnotations_action_id_index
+    def __set_db_actionAnnotations_action_id_index(self, index):
+        self._db_actionAnnotations_action_id_index = index
+    db_actionAnnotations_action_id_index = property(__get_db_actionAnnotations_action_id_index, __set_db_actionAnnotations_action_id_index)
     def db_get_actionAnnotation_by_action_id(self, key):
         return self.db_actionAnnotations_action_id_index[key]
     def db_has_actionAnnotation_with_action_id(self, key):
         return key in self.db_actionAnnotations_action_id_index
+    def __get_db_actionAnnotations_key_index(self):
+        if self._db_actionAnnotations_key_index is None:
+            self._db_actionAnnotations_key_index = dict(((v.db_key,v.db_value), v) for v in self._db_actionAnnotations)
+        return self._db_actionAnnotations_key_index
+    def __set_db_actionAnnotations_key_index(self, index):
+        self._db_actionAnnotations_key_index = index
+    db_actionAnnotations_key_index = property(__get_db_actionAnnotations_key_index, __set_db_actionAnnotations_key_index)
     def db_get_actionAnnotation_by_key(self, key):
         return self.db_actionAnnotations_key_index[key]
     def db_has_actionAnnotation_with_key(self, key):
@@ -3925,12 +4370,30 @@ class DBOpmArtifactValue(object):
 
     vtType = 'opm_artifact_value'
 
+    __slots__ = ('_db_value',
+                 'db_deleted_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self.db_deleted_value = []
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmArtifactValue.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmArtifactValue.do_copy(self)
 
@@ -4023,11 +4486,28 @@ class DBConfigStr(object):
 
     vtType = 'config_str'
 
+    __slots__ = ('_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConfigStr.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConfigStr.do_copy(self)
 
@@ -4093,6 +4573,18 @@ class DBStartup(object):
 
     vtType = 'startup'
 
+    __slots__ = ('_db_version',
+                 '_db_configuration',
+                 'db_deleted_configuration',
+                 '_db_enabled_packages',
+                 'db_deleted_enabled_packages',
+                 '_db_disabled_packages',
+                 'db_deleted_disabled_packages',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, version=None, configuration=None, enabled_packages=None, disabled_packages=None):
         self._db_version = version
         self.db_deleted_configuration = []
@@ -4104,6 +4596,17 @@ class DBStartup(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBStartup.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBStartup.do_copy(self)
 
@@ -4830,6 +5333,17 @@ class DBPort(object):
 
     vtType = 'port'
 
+    __slots__ = ('_db_id',
+                 '_db_type',
+                 '_db_moduleId',
+                 '_db_moduleName',
+                 '_db_name',
+                 '_db_signature',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, type=None, moduleId=None, moduleName=None, name=None, signature=None):
         self._db_id = id
         self._db_type = type
@@ -4840,6 +5354,17 @@ class DBPort(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPort.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPort.do_copy(self)
 
@@ -5003,18 +5528,35 @@ class DBOpmAgents(object):
 
     vtType = 'opm_agents'
 
+    __slots__ = ('_db_agents',
+                 'db_deleted_agents',
+                 '_db_agents_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, agents=None):
         self.db_deleted_agents = []
-        self.db_agents_id_index = {}
+        self._db_agents_id_index = None
         if agents is None:
             self._db_agents = []
         else:
             self._db_agents = agents
-            for v in self._db_agents:
-                self.db_agents_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAgents.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAgents.do_copy(self)
 
@@ -5035,7 +5577,6 @@ class DBOpmAgents(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_agents_id_index = dict((v.db_id, v) for v in cp._db_agents)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -5098,7 +5639,8 @@ class DBOpmAgents(object):
     def db_add_agent(self, agent):
         self.is_dirty = True
         self._db_agents.append(agent)
-        self.db_agents_id_index[agent.db_id] = agent
+        if self._db_agents_id_index is not None:
+            self._db_agents_id_index[agent.db_id] = agent
     def db_change_agent(self, agent):
         self.is_dirty = True
         found = False
@@ -5109,7 +5651,8 @@ class DBOpmAgents(object):
                 break
         if not found:
             self._db_agents.append(agent)
-        self.db_agents_id_index[agent.db_id] = agent
+        if self._db_agents_id_index is not None:
+            self._db_agents_id_index[agent.db_id] = agent
     def db_delete_agent(self, agent):
         self.is_dirty = True
         for i in xrange(len(self._db_agents)):
@@ -5118,12 +5661,20 @@ class DBOpmAgents(object):
                     self.db_deleted_agents.append(self._db_agents[i])
                 del self._db_agents[i]
                 break
-        del self.db_agents_id_index[agent.db_id]
+        if self._db_agents_id_index is not None:
+            del self._db_agents_id_index[agent.db_id]
     def db_get_agent(self, key):
         for i in xrange(len(self._db_agents)):
             if self._db_agents[i].db_id == key:
                 return self._db_agents[i]
         return None
+    def __get_db_agents_id_index(self):
+        if self._db_agents_id_index is None:
+            self._db_agents_id_index = dict((v.db_id, v) for v in self._db_agents)
+        return self._db_agents_id_index
+    def __set_db_agents_id_index(self, index):
+        self._db_agents_id_index = index
+    db_agents_id_index = property(__get_db_agents_id_index, __set_db_agents_id_index)
     def db_get_agent_by_id(self, key):
         return self.db_agents_id_index[key]
     def db_has_agent_with_id(self, key):
@@ -5135,6 +5686,13 @@ class DBOpmDependencies(object):
 
     vtType = 'opm_dependencies'
 
+    __slots__ = ('_db_dependencys',
+                 'db_deleted_dependencys',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, dependencys=None):
         self.db_deleted_dependencys = []
         if dependencys is None:
@@ -5144,6 +5702,17 @@ class DBOpmDependencies(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmDependencies.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmDependencies.do_copy(self)
 
@@ -5263,22 +5832,43 @@ class DBPEFunction(object):
 
     vtType = 'pe_function'
 
+    __slots__ = ('_db_id',
+                 '_db_module_id',
+                 '_db_port_name',
+                 '_db_is_alias',
+                 '_db_parameters',
+                 'db_deleted_parameters',
+                 '_db_parameters_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, module_id=None, port_name=None, is_alias=None, parameters=None):
         self._db_id = id
         self._db_module_id = module_id
         self._db_port_name = port_name
         self._db_is_alias = is_alias
         self.db_deleted_parameters = []
-        self.db_parameters_id_index = {}
+        self._db_parameters_id_index = None
         if parameters is None:
             self._db_parameters = []
         else:
             self._db_parameters = parameters
-            for v in self._db_parameters:
-                self.db_parameters_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPEFunction.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPEFunction.do_copy(self)
 
@@ -5304,7 +5894,6 @@ class DBPEFunction(object):
                 cp._db_module_id = id_remap[('module', self._db_module_id)]
         
         # recreate indices and set flags
-        cp.db_parameters_id_index = dict((v.db_id, v) for v in cp._db_parameters)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -5439,7 +6028,8 @@ class DBPEFunction(object):
     def db_add_parameter(self, parameter):
         self.is_dirty = True
         self._db_parameters.append(parameter)
-        self.db_parameters_id_index[parameter.db_id] = parameter
+        if self._db_parameters_id_index is not None:
+            self._db_parameters_id_index[parameter.db_id] = parameter
     def db_change_parameter(self, parameter):
         self.is_dirty = True
         found = False
@@ -5450,7 +6040,8 @@ class DBPEFunction(object):
                 break
         if not found:
             self._db_parameters.append(parameter)
-        self.db_parameters_id_index[parameter.db_id] = parameter
+        if self._db_parameters_id_index is not None:
+            self._db_parameters_id_index[parameter.db_id] = parameter
     def db_delete_parameter(self, parameter):
         self.is_dirty = True
         for i in xrange(len(self._db_parameters)):
@@ -5459,12 +6050,20 @@ class DBPEFunction(object):
                     self.db_deleted_parameters.append(self._db_parameters[i])
                 del self._db_parameters[i]
                 break
-        del self.db_parameters_id_index[parameter.db_id]
+        if self._db_parameters_id_index is not None:
+            del self._db_parameters_id_index[parameter.db_id]
     def db_get_parameter(self, key):
         for i in xrange(len(self._db_parameters)):
             if self._db_parameters[i].db_id == key:
                 return self._db_parameters[i]
         return None
+    def __get_db_parameters_id_index(self):
+        if self._db_parameters_id_index is None:
+            self._db_parameters_id_index = dict((v.db_id, v) for v in self._db_parameters)
+        return self._db_parameters_id_index
+    def __set_db_parameters_id_index(self, index):
+        self._db_parameters_id_index = index
+    db_parameters_id_index = property(__get_db_parameters_id_index, __set_db_parameters_id_index)
     def db_get_parameter_by_id(self, key):
         return self.db_parameters_id_index[key]
     def db_has_parameter_with_id(self, key):
@@ -5477,56 +6076,83 @@ class DBWorkflow(object):
 
     vtType = 'workflow'
 
+    __slots__ = ('_db_modules',
+                 'db_deleted_modules',
+                 '_db_modules_id_index',
+                 '_db_id',
+                 '_db_entity_type',
+                 '_db_name',
+                 '_db_version',
+                 '_db_last_modified',
+                 '_db_connections',
+                 'db_deleted_connections',
+                 '_db_connections_id_index',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 '_db_plugin_datas',
+                 'db_deleted_plugin_datas',
+                 '_db_plugin_datas_id_index',
+                 '_db_others',
+                 'db_deleted_others',
+                 '_db_others_id_index',
+                 '_db_vistrail_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, modules=None, id=None, entity_type=None, name=None, version=None, last_modified=None, connections=None, annotations=None, plugin_datas=None, others=None, vistrail_id=None):
         self.db_deleted_modules = []
-        self.db_modules_id_index = {}
+        self._db_modules_id_index = None
         if modules is None:
             self._db_modules = []
         else:
             self._db_modules = modules
-            for v in self._db_modules:
-                self.db_modules_id_index[v.db_id] = v
         self._db_id = id
         self._db_entity_type = entity_type
         self._db_name = name
         self._db_version = version
         self._db_last_modified = last_modified
         self.db_deleted_connections = []
-        self.db_connections_id_index = {}
+        self._db_connections_id_index = None
         if connections is None:
             self._db_connections = []
         else:
             self._db_connections = connections
-            for v in self._db_connections:
-                self.db_connections_id_index[v.db_id] = v
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
+        self._db_annotations_id_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
         self.db_deleted_plugin_datas = []
-        self.db_plugin_datas_id_index = {}
+        self._db_plugin_datas_id_index = None
         if plugin_datas is None:
             self._db_plugin_datas = []
         else:
             self._db_plugin_datas = plugin_datas
-            for v in self._db_plugin_datas:
-                self.db_plugin_datas_id_index[v.db_id] = v
         self.db_deleted_others = []
-        self.db_others_id_index = {}
+        self._db_others_id_index = None
         if others is None:
             self._db_others = []
         else:
             self._db_others = others
-            for v in self._db_others:
-                self.db_others_id_index[v.db_id] = v
         self._db_vistrail_id = vistrail_id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBWorkflow.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBWorkflow.do_copy(self)
 
@@ -5570,11 +6196,6 @@ class DBWorkflow(object):
                 cp._db_vistrail_id = id_remap[('vistrail', self._db_vistrail_id)]
         
         # recreate indices and set flags
-        cp.db_modules_id_index = dict((v.db_id, v) for v in cp._db_modules)
-        cp.db_connections_id_index = dict((v.db_id, v) for v in cp._db_connections)
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
-        cp.db_plugin_datas_id_index = dict((v.db_id, v) for v in cp._db_plugin_datas)
-        cp.db_others_id_index = dict((v.db_id, v) for v in cp._db_others)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -5771,7 +6392,8 @@ class DBWorkflow(object):
     def db_add_module(self, module):
         self.is_dirty = True
         self._db_modules.append(module)
-        self.db_modules_id_index[module.db_id] = module
+        if self._db_modules_id_index is not None:
+            self._db_modules_id_index[module.db_id] = module
     def db_change_module(self, module):
         self.is_dirty = True
         found = False
@@ -5782,7 +6404,8 @@ class DBWorkflow(object):
                 break
         if not found:
             self._db_modules.append(module)
-        self.db_modules_id_index[module.db_id] = module
+        if self._db_modules_id_index is not None:
+            self._db_modules_id_index[module.db_id] = module
     def db_delete_module(self, module):
         self.is_dirty = True
         for i in xrange(len(self._db_modules)):
@@ -5791,12 +6414,20 @@ class DBWorkflow(object):
                     self.db_deleted_modules.append(self._db_modules[i])
                 del self._db_modules[i]
                 break
-        del self.db_modules_id_index[module.db_id]
+        if self._db_modules_id_index is not None:
+            del self._db_modules_id_index[module.db_id]
     def db_get_module(self, key):
         for i in xrange(len(self._db_modules)):
             if self._db_modules[i].db_id == key:
                 return self._db_modules[i]
         return None
+    def __get_db_modules_id_index(self):
+        if self._db_modules_id_index is None:
+            self._db_modules_id_index = dict((v.db_id, v) for v in self._db_modules)
+        return self._db_modules_id_index
+    def __set_db_modules_id_index(self, index):
+        self._db_modules_id_index = index
+    db_modules_id_index = property(__get_db_modules_id_index, __set_db_modules_id_index)
     def db_get_module_by_id(self, key):
         return self.db_modules_id_index[key]
     def db_has_module_with_id(self, key):
@@ -5878,7 +6509,8 @@ class DBWorkflow(object):
     def db_add_connection(self, connection):
         self.is_dirty = True
         self._db_connections.append(connection)
-        self.db_connections_id_index[connection.db_id] = connection
+        if self._db_connections_id_index is not None:
+            self._db_connections_id_index[connection.db_id] = connection
     def db_change_connection(self, connection):
         self.is_dirty = True
         found = False
@@ -5889,7 +6521,8 @@ class DBWorkflow(object):
                 break
         if not found:
             self._db_connections.append(connection)
-        self.db_connections_id_index[connection.db_id] = connection
+        if self._db_connections_id_index is not None:
+            self._db_connections_id_index[connection.db_id] = connection
     def db_delete_connection(self, connection):
         self.is_dirty = True
         for i in xrange(len(self._db_connections)):
@@ -5898,12 +6531,20 @@ class DBWorkflow(object):
                     self.db_deleted_connections.append(self._db_connections[i])
                 del self._db_connections[i]
                 break
-        del self.db_connections_id_index[connection.db_id]
+        if self._db_connections_id_index is not None:
+            del self._db_connections_id_index[connection.db_id]
     def db_get_connection(self, key):
         for i in xrange(len(self._db_connections)):
             if self._db_connections[i].db_id == key:
                 return self._db_connections[i]
         return None
+    def __get_db_connections_id_index(self):
+        if self._db_connections_id_index is None:
+            self._db_connections_id_index = dict((v.db_id, v) for v in self._db_connections)
+        return self._db_connections_id_index
+    def __set_db_connections_id_index(self, index):
+        self._db_connections_id_index = index
+    db_connections_id_index = property(__get_db_connections_id_index, __set_db_connections_id_index)
     def db_get_connection_by_id(self, key):
         return self.db_connections_id_index[key]
     def db_has_connection_with_id(self, key):
@@ -5920,7 +6561,8 @@ class DBWorkflow(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -5931,7 +6573,8 @@ class DBWorkflow(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -5940,12 +6583,20 @@ class DBWorkflow(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
@@ -5962,7 +6613,8 @@ class DBWorkflow(object):
     def db_add_plugin_data(self, plugin_data):
         self.is_dirty = True
         self._db_plugin_datas.append(plugin_data)
-        self.db_plugin_datas_id_index[plugin_data.db_id] = plugin_data
+        if self._db_plugin_datas_id_index is not None:
+            self._db_plugin_datas_id_index[plugin_data.db_id] = plugin_data
     def db_change_plugin_data(self, plugin_data):
         self.is_dirty = True
         found = False
@@ -5973,7 +6625,8 @@ class DBWorkflow(object):
                 break
         if not found:
             self._db_plugin_datas.append(plugin_data)
-        self.db_plugin_datas_id_index[plugin_data.db_id] = plugin_data
+        if self._db_plugin_datas_id_index is not None:
+            self._db_plugin_datas_id_index[plugin_data.db_id] = plugin_data
     def db_delete_plugin_data(self, plugin_data):
         self.is_dirty = True
         for i in xrange(len(self._db_plugin_datas)):
@@ -5982,12 +6635,20 @@ class DBWorkflow(object):
                     self.db_deleted_plugin_datas.append(self._db_plugin_datas[i])
                 del self._db_plugin_datas[i]
                 break
-        del self.db_plugin_datas_id_index[plugin_data.db_id]
+        if self._db_plugin_datas_id_index is not None:
+            del self._db_plugin_datas_id_index[plugin_data.db_id]
     def db_get_plugin_data(self, key):
         for i in xrange(len(self._db_plugin_datas)):
             if self._db_plugin_datas[i].db_id == key:
                 return self._db_plugin_datas[i]
         return None
+    def __get_db_plugin_datas_id_index(self):
+        if self._db_plugin_datas_id_index is None:
+            self._db_plugin_datas_id_index = dict((v.db_id, v) for v in self._db_plugin_datas)
+        return self._db_plugin_datas_id_index
+    def __set_db_plugin_datas_id_index(self, index):
+        self._db_plugin_datas_id_index = index
+    db_plugin_datas_id_index = property(__get_db_plugin_datas_id_index, __set_db_plugin_datas_id_index)
     def db_get_plugin_data_by_id(self, key):
         return self.db_plugin_datas_id_index[key]
     def db_has_plugin_data_with_id(self, key):
@@ -6004,7 +6665,8 @@ class DBWorkflow(object):
     def db_add_other(self, other):
         self.is_dirty = True
         self._db_others.append(other)
-        self.db_others_id_index[other.db_id] = other
+        if self._db_others_id_index is not None:
+            self._db_others_id_index[other.db_id] = other
     def db_change_other(self, other):
         self.is_dirty = True
         found = False
@@ -6015,7 +6677,8 @@ class DBWorkflow(object):
                 break
         if not found:
             self._db_others.append(other)
-        self.db_others_id_index[other.db_id] = other
+        if self._db_others_id_index is not None:
+            self._db_others_id_index[other.db_id] = other
     def db_delete_other(self, other):
         self.is_dirty = True
         for i in xrange(len(self._db_others)):
@@ -6024,12 +6687,20 @@ class DBWorkflow(object):
                     self.db_deleted_others.append(self._db_others[i])
                 del self._db_others[i]
                 break
-        del self.db_others_id_index[other.db_id]
+        if self._db_others_id_index is not None:
+            del self._db_others_id_index[other.db_id]
     def db_get_other(self, key):
         for i in xrange(len(self._db_others)):
             if self._db_others[i].db_id == key:
                 return self._db_others[i]
         return None
+    def __get_db_others_id_index(self):
+        if self._db_others_id_index is None:
+            self._db_others_id_index = dict((v.db_id, v) for v in self._db_others)
+        return self._db_others_id_index
+    def __set_db_others_id_index(self, index):
+        self._db_others_id_index = index
+    db_others_id_index = property(__get_db_others_id_index, __set_db_others_id_index)
     def db_get_other_by_id(self, key):
         return self.db_others_id_index[key]
     def db_has_other_with_id(self, key):
@@ -6360,6 +7031,19 @@ class DBChange(object):
 
     vtType = 'change'
 
+    __slots__ = ('_db_data',
+                 'db_deleted_data',
+                 '_db_id',
+                 '_db_what',
+                 '_db_oldObjId',
+                 '_db_newObjId',
+                 '_db_parentObjId',
+                 '_db_parentObjType',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, data=None, id=None, what=None, oldObjId=None, newObjId=None, parentObjId=None, parentObjType=None):
         self.db_deleted_data = []
         self._db_data = data
@@ -6372,6 +7056,17 @@ class DBChange(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBChange.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBChange.do_copy(self)
 
@@ -6639,6 +7334,22 @@ class DBPackage(object):
 
     vtType = 'package'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 '_db_identifier',
+                 '_db_codepath',
+                 '_db_load_configuration',
+                 '_db_version',
+                 '_db_description',
+                 '_db_module_descriptors',
+                 'db_deleted_module_descriptors',
+                 '_db_module_descriptors_id_index',
+                 '_db_module_descriptors_name_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None, identifier=None, codepath=None, load_configuration=None, version=None, description=None, module_descriptors=None):
         self._db_id = id
         self._db_name = name
@@ -6648,18 +7359,26 @@ class DBPackage(object):
         self._db_version = version
         self._db_description = description
         self.db_deleted_module_descriptors = []
-        self.db_module_descriptors_id_index = {}
-        self.db_module_descriptors_name_index = {}
+        self._db_module_descriptors_id_index = None
+        self._db_module_descriptors_name_index = None
         if module_descriptors is None:
             self._db_module_descriptors = []
         else:
             self._db_module_descriptors = module_descriptors
-            for v in self._db_module_descriptors:
-                self.db_module_descriptors_id_index[v.db_id] = v
-                self.db_module_descriptors_name_index[(v.db_name,v.db_namespace,v.db_version)] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPackage.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPackage.do_copy(self)
 
@@ -6686,8 +7405,6 @@ class DBPackage(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_module_descriptors_id_index = dict((v.db_id, v) for v in cp._db_module_descriptors)
-        cp.db_module_descriptors_name_index = dict(((v.db_name,v.db_namespace,v.db_version), v) for v in cp._db_module_descriptors)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -6876,8 +7593,10 @@ class DBPackage(object):
     def db_add_module_descriptor(self, module_descriptor):
         self.is_dirty = True
         self._db_module_descriptors.append(module_descriptor)
-        self.db_module_descriptors_id_index[module_descriptor.db_id] = module_descriptor
-        self.db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)] = module_descriptor
+        if self._db_module_descriptors_id_index is not None:
+            self._db_module_descriptors_id_index[module_descriptor.db_id] = module_descriptor
+        if self._db_module_descriptors_name_index is not None:
+            self._db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)] = module_descriptor
     def db_change_module_descriptor(self, module_descriptor):
         self.is_dirty = True
         found = False
@@ -6888,8 +7607,10 @@ class DBPackage(object):
                 break
         if not found:
             self._db_module_descriptors.append(module_descriptor)
-        self.db_module_descriptors_id_index[module_descriptor.db_id] = module_descriptor
-        self.db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)] = module_descriptor
+        if self._db_module_descriptors_id_index is not None:
+            self._db_module_descriptors_id_index[module_descriptor.db_id] = module_descriptor
+        if self._db_module_descriptors_name_index is not None:
+            self._db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)] = module_descriptor
     def db_delete_module_descriptor(self, module_descriptor):
         self.is_dirty = True
         for i in xrange(len(self._db_module_descriptors)):
@@ -6898,17 +7619,33 @@ class DBPackage(object):
                     self.db_deleted_module_descriptors.append(self._db_module_descriptors[i])
                 del self._db_module_descriptors[i]
                 break
-        del self.db_module_descriptors_id_index[module_descriptor.db_id]
-        del self.db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)]
+        if self._db_module_descriptors_id_index is not None:
+            del self._db_module_descriptors_id_index[module_descriptor.db_id]
+        if self._db_module_descriptors_name_index is not None:
+            del self._db_module_descriptors_name_index[(module_descriptor.db_name,module_descriptor.db_namespace,module_descriptor.db_version)]
     def db_get_module_descriptor(self, key):
         for i in xrange(len(self._db_module_descriptors)):
             if self._db_module_descriptors[i].db_id == key:
                 return self._db_module_descriptors[i]
         return None
+    def __get_db_module_descriptors_id_index(self):
+        if self._db_module_descriptors_id_index is None:
+            self._db_module_descriptors_id_index = dict((v.db_id, v) for v in self._db_module_descriptors)
+        return self._db_module_descriptors_id_index
+    def __set_db_module_descriptors_id_index(self, index):
+        self._db_module_descriptors_id_index = index
+    db_module_descriptors_id_index = property(__get_db_module_descriptors_id_index, __set_db_module_descriptors_id_index)
     def db_get_module_descriptor_by_id(self, key):
         return self.db_module_descriptors_id_index[key]
     def db_has_module_descriptor_with_id(self, key):
         return key in self.db_module_descriptors_id_index
+    def __get_db_module_descriptors_name_index(self):
+        if self._db_module_descriptors_name_index is None:
+            self._db_module_descriptors_name_index = dict(((v.db_name,v.db_namespace,v.db_version), v) for v in self._db_module_descriptors)
+        return self._db_module_descriptors_name_index
+    def __set_db_module_descriptors_name_index(self, index):
+        self._db_module_descriptors_name_index = index
+    db_module_descriptors_name_index = property(__get_db_module_descriptors_name_index, __set_db_module_descriptors_name_index)
     def db_get_module_descriptor_by_name(self, key):
         return self.db_module_descriptors_name_index[key]
     def db_has_module_descriptor_with_name(self, key):
@@ -6921,21 +7658,41 @@ class DBLoopExec(object):
 
     vtType = 'loop_exec'
 
+    __slots__ = ('_db_id',
+                 '_db_ts_start',
+                 '_db_ts_end',
+                 '_db_loop_iterations',
+                 'db_deleted_loop_iterations',
+                 '_db_loop_iterations_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, ts_start=None, ts_end=None, loop_iterations=None):
         self._db_id = id
         self._db_ts_start = ts_start
         self._db_ts_end = ts_end
         self.db_deleted_loop_iterations = []
-        self.db_loop_iterations_id_index = {}
+        self._db_loop_iterations_id_index = None
         if loop_iterations is None:
             self._db_loop_iterations = []
         else:
             self._db_loop_iterations = loop_iterations
-            for v in self._db_loop_iterations:
-                self.db_loop_iterations_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBLoopExec.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBLoopExec.do_copy(self)
 
@@ -6958,7 +7715,6 @@ class DBLoopExec(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_loop_iterations_id_index = dict((v.db_id, v) for v in cp._db_loop_iterations)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -7075,7 +7831,8 @@ class DBLoopExec(object):
     def db_add_loop_iteration(self, loop_iteration):
         self.is_dirty = True
         self._db_loop_iterations.append(loop_iteration)
-        self.db_loop_iterations_id_index[loop_iteration.db_id] = loop_iteration
+        if self._db_loop_iterations_id_index is not None:
+            self._db_loop_iterations_id_index[loop_iteration.db_id] = loop_iteration
     def db_change_loop_iteration(self, loop_iteration):
         self.is_dirty = True
         found = False
@@ -7086,7 +7843,8 @@ class DBLoopExec(object):
                 break
         if not found:
             self._db_loop_iterations.append(loop_iteration)
-        self.db_loop_iterations_id_index[loop_iteration.db_id] = loop_iteration
+        if self._db_loop_iterations_id_index is not None:
+            self._db_loop_iterations_id_index[loop_iteration.db_id] = loop_iteration
     def db_delete_loop_iteration(self, loop_iteration):
         self.is_dirty = True
         for i in xrange(len(self._db_loop_iterations)):
@@ -7095,12 +7853,20 @@ class DBLoopExec(object):
                     self.db_deleted_loop_iterations.append(self._db_loop_iterations[i])
                 del self._db_loop_iterations[i]
                 break
-        del self.db_loop_iterations_id_index[loop_iteration.db_id]
+        if self._db_loop_iterations_id_index is not None:
+            del self._db_loop_iterations_id_index[loop_iteration.db_id]
     def db_get_loop_iteration(self, key):
         for i in xrange(len(self._db_loop_iterations)):
             if self._db_loop_iterations[i].db_id == key:
                 return self._db_loop_iterations[i]
         return None
+    def __get_db_loop_iterations_id_index(self):
+        if self._db_loop_iterations_id_index is None:
+            self._db_loop_iterations_id_index = dict((v.db_id, v) for v in self._db_loop_iterations)
+        return self._db_loop_iterations_id_index
+    def __set_db_loop_iterations_id_index(self, index):
+        self._db_loop_iterations_id_index = index
+    db_loop_iterations_id_index = property(__get_db_loop_iterations_id_index, __set_db_loop_iterations_id_index)
     def db_get_loop_iteration_by_id(self, key):
         return self.db_loop_iterations_id_index[key]
     def db_has_loop_iteration_with_id(self, key):
@@ -7113,21 +7879,39 @@ class DBConnection(object):
 
     vtType = 'connection'
 
+    __slots__ = ('_db_id',
+                 '_db_ports',
+                 'db_deleted_ports',
+                 '_db_ports_id_index',
+                 '_db_ports_type_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, ports=None):
         self._db_id = id
         self.db_deleted_ports = []
-        self.db_ports_id_index = {}
-        self.db_ports_type_index = {}
+        self._db_ports_id_index = None
+        self._db_ports_type_index = None
         if ports is None:
             self._db_ports = []
         else:
             self._db_ports = ports
-            for v in self._db_ports:
-                self.db_ports_id_index[v.db_id] = v
-                self.db_ports_type_index[v.db_type] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConnection.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConnection.do_copy(self)
 
@@ -7148,8 +7932,6 @@ class DBConnection(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_ports_id_index = dict((v.db_id, v) for v in cp._db_ports)
-        cp.db_ports_type_index = dict((v.db_type, v) for v in cp._db_ports)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -7230,8 +8012,10 @@ class DBConnection(object):
     def db_add_port(self, port):
         self.is_dirty = True
         self._db_ports.append(port)
-        self.db_ports_id_index[port.db_id] = port
-        self.db_ports_type_index[port.db_type] = port
+        if self._db_ports_id_index is not None:
+            self._db_ports_id_index[port.db_id] = port
+        if self._db_ports_type_index is not None:
+            self._db_ports_type_index[port.db_type] = port
     def db_change_port(self, port):
         self.is_dirty = True
         found = False
@@ -7242,8 +8026,10 @@ class DBConnection(object):
                 break
         if not found:
             self._db_ports.append(port)
-        self.db_ports_id_index[port.db_id] = port
-        self.db_ports_type_index[port.db_type] = port
+        if self._db_ports_id_index is not None:
+            self._db_ports_id_index[port.db_id] = port
+        if self._db_ports_type_index is not None:
+            self._db_ports_type_index[port.db_type] = port
     def db_delete_port(self, port):
         self.is_dirty = True
         for i in xrange(len(self._db_ports)):
@@ -7252,17 +8038,33 @@ class DBConnection(object):
                     self.db_deleted_ports.append(self._db_ports[i])
                 del self._db_ports[i]
                 break
-        del self.db_ports_id_index[port.db_id]
-        del self.db_ports_type_index[port.db_type]
+        if self._db_ports_id_index is not None:
+            del self._db_ports_id_index[port.db_id]
+        if self._db_ports_type_index is not None:
+            del self._db_ports_type_index[port.db_type]
     def db_get_port(self, key):
         for i in xrange(len(self._db_ports)):
             if self._db_ports[i].db_id == key:
                 return self._db_ports[i]
         return None
+    def __get_db_ports_id_index(self):
+        if self._db_ports_id_index is None:
+            self._db_ports_id_index = dict((v.db_id, v) for v in self._db_ports)
+        return self._db_ports_id_index
+    def __set_db_ports_id_index(self, index):
+        self._db_ports_id_index = index
+    db_ports_id_index = property(__get_db_ports_id_index, __set_db_ports_id_index)
     def db_get_port_by_id(self, key):
         return self.db_ports_id_index[key]
     def db_has_port_with_id(self, key):
         return key in self.db_ports_id_index
+    def __get_db_ports_type_index(self):
+        if self._db_ports_type_index is None:
+            self._db_ports_type_index = dict((v.db_type, v) for v in self._db_ports)
+        return self._db_ports_type_index
+    def __set_db_ports_type_index(self, index):
+        self._db_ports_type_index = index
+    db_ports_type_index = property(__get_db_ports_type_index, __set_db_ports_type_index)
     def db_get_port_by_type(self, key):
         return self.db_ports_type_index[key]
     def db_has_port_with_type(self, key):
@@ -7275,11 +8077,28 @@ class DBConfigBool(object):
 
     vtType = 'config_bool'
 
+    __slots__ = ('_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConfigBool.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConfigBool.do_copy(self)
 
@@ -7345,33 +8164,56 @@ class DBAction(object):
 
     vtType = 'action'
 
+    __slots__ = ('_db_operations',
+                 'db_deleted_operations',
+                 '_db_operations_id_index',
+                 '_db_id',
+                 '_db_prevId',
+                 '_db_date',
+                 '_db_session',
+                 '_db_user',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 '_db_annotations_key_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, operations=None, id=None, prevId=None, date=None, session=None, user=None, annotations=None):
         self.db_deleted_operations = []
-        self.db_operations_id_index = {}
+        self._db_operations_id_index = None
         if operations is None:
             self._db_operations = []
         else:
             self._db_operations = operations
-            for v in self._db_operations:
-                self.db_operations_id_index[v.db_id] = v
         self._db_id = id
         self._db_prevId = prevId
         self._db_date = date
         self._db_session = session
         self._db_user = user
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
-        self.db_annotations_key_index = {}
+        self._db_annotations_id_index = None
+        self._db_annotations_key_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
-                self.db_annotations_key_index[v.db_key] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBAction.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBAction.do_copy(self)
 
@@ -7402,9 +8244,6 @@ class DBAction(object):
                 cp._db_prevId = id_remap[('action', self._db_prevId)]
         
         # recreate indices and set flags
-        cp.db_operations_id_index = dict((v.db_id, v) for v in cp._db_operations)
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
-        cp.db_annotations_key_index = dict((v.db_key, v) for v in cp._db_annotations)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -7527,7 +8366,8 @@ class DBAction(object):
     def db_add_operation(self, operation):
         self.is_dirty = True
         self._db_operations.append(operation)
-        self.db_operations_id_index[operation.db_id] = operation
+        if self._db_operations_id_index is not None:
+            self._db_operations_id_index[operation.db_id] = operation
     def db_change_operation(self, operation):
         self.is_dirty = True
         found = False
@@ -7538,7 +8378,8 @@ class DBAction(object):
                 break
         if not found:
             self._db_operations.append(operation)
-        self.db_operations_id_index[operation.db_id] = operation
+        if self._db_operations_id_index is not None:
+            self._db_operations_id_index[operation.db_id] = operation
     def db_delete_operation(self, operation):
         self.is_dirty = True
         for i in xrange(len(self._db_operations)):
@@ -7547,12 +8388,20 @@ class DBAction(object):
                     self.db_deleted_operations.append(self._db_operations[i])
                 del self._db_operations[i]
                 break
-        del self.db_operations_id_index[operation.db_id]
+        if self._db_operations_id_index is not None:
+            del self._db_operations_id_index[operation.db_id]
     def db_get_operation(self, key):
         for i in xrange(len(self._db_operations)):
             if self._db_operations[i].db_id == key:
                 return self._db_operations[i]
         return None
+    def __get_db_operations_id_index(self):
+        if self._db_operations_id_index is None:
+            self._db_operations_id_index = dict((v.db_id, v) for v in self._db_operations)
+        return self._db_operations_id_index
+    def __set_db_operations_id_index(self, index):
+        self._db_operations_id_index = index
+    db_operations_id_index = property(__get_db_operations_id_index, __set_db_operations_id_index)
     def db_get_operation_by_id(self, key):
         return self.db_operations_id_index[key]
     def db_has_operation_with_id(self, key):
@@ -7634,8 +8483,10 @@ class DBAction(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
-        self.db_annotations_key_index[annotation.db_key] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_key_index is not None:
+            self._db_annotations_key_index[annotation.db_key] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -7646,8 +8497,10 @@ class DBAction(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
-        self.db_annotations_key_index[annotation.db_key] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_key_index is not None:
+            self._db_annotations_key_index[annotation.db_key] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -7656,17 +8509,33 @@ class DBAction(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
-        del self.db_annotations_key_index[annotation.db_key]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_key_index is not None:
+            del self._db_annotations_key_index[annotation.db_key]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
         return key in self.db_annotations_id_index
+    def __get_db_annotations_key_index(self):
+        if self._db_annotations_key_index is None:
+            self._db_annotations_key_index = dict((v.db_key, v) for v in self._db_annotations)
+        return self._db_annotations_key_index
+    def __set_db_annotations_key_index(self, index):
+        self._db_annotations_key_index = index
+    db_annotations_key_index = property(__get_db_annotations_key_index, __set_db_annotations_key_index)
     def db_get_annotation_by_key(self, key):
         return self.db_annotations_key_index[key]
     def db_has_annotation_with_key(self, key):
@@ -7679,6 +8548,14 @@ class DBStartupPackage(object):
 
     vtType = 'startup_package'
 
+    __slots__ = ('_db_name',
+                 '_db_configuration',
+                 'db_deleted_configuration',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, name=None, configuration=None):
         self._db_name = name
         self.db_deleted_configuration = []
@@ -7686,6 +8563,17 @@ class DBStartupPackage(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBStartupPackage.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBStartupPackage.do_copy(self)
 
@@ -7789,11 +8677,28 @@ class DBConfigInt(object):
 
     vtType = 'config_int'
 
+    __slots__ = ('_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConfigInt.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConfigInt.do_copy(self)
 
@@ -7859,11 +8764,28 @@ class DBOpmProcessIdEffect(object):
 
     vtType = 'opm_process_id_effect'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmProcessIdEffect.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmProcessIdEffect.do_copy(self)
 
@@ -7931,11 +8853,28 @@ class DBRefProvPlan(object):
 
     vtType = 'ref_prov_plan'
 
+    __slots__ = ('_db_prov_ref',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_ref=None):
         self._db_prov_ref = prov_ref
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBRefProvPlan.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBRefProvPlan.do_copy(self)
 
@@ -8003,15 +8942,23 @@ class DBOpmAccounts(object):
 
     vtType = 'opm_accounts'
 
+    __slots__ = ('_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_accounts_id_index',
+                 '_db_opm_overlapss',
+                 'db_deleted_opm_overlapss',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, accounts=None, opm_overlapss=None):
         self.db_deleted_accounts = []
-        self.db_accounts_id_index = {}
+        self._db_accounts_id_index = None
         if accounts is None:
             self._db_accounts = []
         else:
             self._db_accounts = accounts
-            for v in self._db_accounts:
-                self.db_accounts_id_index[v.db_id] = v
         self.db_deleted_opm_overlapss = []
         if opm_overlapss is None:
             self._db_opm_overlapss = []
@@ -8020,6 +8967,17 @@ class DBOpmAccounts(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAccounts.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAccounts.do_copy(self)
 
@@ -8044,7 +9002,6 @@ class DBOpmAccounts(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_accounts_id_index = dict((v.db_id, v) for v in cp._db_accounts)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -8130,7 +9087,8 @@ class DBOpmAccounts(object):
     def db_add_account(self, account):
         self.is_dirty = True
         self._db_accounts.append(account)
-        self.db_accounts_id_index[account.db_id] = account
+        if self._db_accounts_id_index is not None:
+            self._db_accounts_id_index[account.db_id] = account
     def db_change_account(self, account):
         self.is_dirty = True
         found = False
@@ -8141,7 +9099,8 @@ class DBOpmAccounts(object):
                 break
         if not found:
             self._db_accounts.append(account)
-        self.db_accounts_id_index[account.db_id] = account
+        if self._db_accounts_id_index is not None:
+            self._db_accounts_id_index[account.db_id] = account
     def db_delete_account(self, account):
         self.is_dirty = True
         for i in xrange(len(self._db_accounts)):
@@ -8150,12 +9109,20 @@ class DBOpmAccounts(object):
                     self.db_deleted_accounts.append(self._db_accounts[i])
                 del self._db_accounts[i]
                 break
-        del self.db_accounts_id_index[account.db_id]
+        if self._db_accounts_id_index is not None:
+            del self._db_accounts_id_index[account.db_id]
     def db_get_account(self, key):
         for i in xrange(len(self._db_accounts)):
             if self._db_accounts[i].db_id == key:
                 return self._db_accounts[i]
         return None
+    def __get_db_accounts_id_index(self):
+        if self._db_accounts_id_index is None:
+            self._db_accounts_id_index = dict((v.db_id, v) for v in self._db_accounts)
+        return self._db_accounts_id_index
+    def __set_db_accounts_id_index(self, index):
+        self._db_accounts_id_index = index
+    db_accounts_id_index = property(__get_db_accounts_id_index, __set_db_accounts_id_index)
     def db_get_account_by_id(self, key):
         return self.db_accounts_id_index[key]
     def db_has_account_with_id(self, key):
@@ -8187,11 +9154,28 @@ class DBRefProvAgent(object):
 
     vtType = 'ref_prov_agent'
 
+    __slots__ = ('_db_prov_ref',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_ref=None):
         self._db_prov_ref = prov_ref
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBRefProvAgent.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBRefProvAgent.do_copy(self)
 
@@ -8259,6 +9243,23 @@ class DBPortSpec(object):
 
     vtType = 'portSpec'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 '_db_type',
+                 '_db_optional',
+                 '_db_depth',
+                 '_db_union',
+                 '_db_sort_key',
+                 '_db_portSpecItems',
+                 'db_deleted_portSpecItems',
+                 '_db_portSpecItems_id_index',
+                 '_db_min_conns',
+                 '_db_max_conns',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None, type=None, optional=None, depth=None, union=None, sort_key=None, portSpecItems=None, min_conns=None, max_conns=None):
         self._db_id = id
         self._db_name = name
@@ -8268,18 +9269,27 @@ class DBPortSpec(object):
         self._db_union = union
         self._db_sort_key = sort_key
         self.db_deleted_portSpecItems = []
-        self.db_portSpecItems_id_index = {}
+        self._db_portSpecItems_id_index = None
         if portSpecItems is None:
             self._db_portSpecItems = []
         else:
             self._db_portSpecItems = portSpecItems
-            for v in self._db_portSpecItems:
-                self.db_portSpecItems_id_index[v.db_id] = v
         self._db_min_conns = min_conns
         self._db_max_conns = max_conns
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPortSpec.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPortSpec.do_copy(self)
 
@@ -8308,7 +9318,6 @@ class DBPortSpec(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_portSpecItems_id_index = dict((v.db_id, v) for v in cp._db_portSpecItems)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -8503,7 +9512,8 @@ class DBPortSpec(object):
     def db_add_portSpecItem(self, portSpecItem):
         self.is_dirty = True
         self._db_portSpecItems.append(portSpecItem)
-        self.db_portSpecItems_id_index[portSpecItem.db_id] = portSpecItem
+        if self._db_portSpecItems_id_index is not None:
+            self._db_portSpecItems_id_index[portSpecItem.db_id] = portSpecItem
     def db_change_portSpecItem(self, portSpecItem):
         self.is_dirty = True
         found = False
@@ -8514,7 +9524,8 @@ class DBPortSpec(object):
                 break
         if not found:
             self._db_portSpecItems.append(portSpecItem)
-        self.db_portSpecItems_id_index[portSpecItem.db_id] = portSpecItem
+        if self._db_portSpecItems_id_index is not None:
+            self._db_portSpecItems_id_index[portSpecItem.db_id] = portSpecItem
     def db_delete_portSpecItem(self, portSpecItem):
         self.is_dirty = True
         for i in xrange(len(self._db_portSpecItems)):
@@ -8523,12 +9534,20 @@ class DBPortSpec(object):
                     self.db_deleted_portSpecItems.append(self._db_portSpecItems[i])
                 del self._db_portSpecItems[i]
                 break
-        del self.db_portSpecItems_id_index[portSpecItem.db_id]
+        if self._db_portSpecItems_id_index is not None:
+            del self._db_portSpecItems_id_index[portSpecItem.db_id]
     def db_get_portSpecItem(self, key):
         for i in xrange(len(self._db_portSpecItems)):
             if self._db_portSpecItems[i].db_id == key:
                 return self._db_portSpecItems[i]
         return None
+    def __get_db_portSpecItems_id_index(self):
+        if self._db_portSpecItems_id_index is None:
+            self._db_portSpecItems_id_index = dict((v.db_id, v) for v in self._db_portSpecItems)
+        return self._db_portSpecItems_id_index
+    def __set_db_portSpecItems_id_index(self, index):
+        self._db_portSpecItems_id_index = index
+    db_portSpecItems_id_index = property(__get_db_portSpecItems_id_index, __set_db_portSpecItems_id_index)
     def db_get_portSpecItem_by_id(self, key):
         return self.db_portSpecItems_id_index[key]
     def db_has_portSpecItem_with_id(self, key):
@@ -8567,18 +9586,35 @@ class DBEnabledPackages(object):
 
     vtType = 'enabled_packages'
 
+    __slots__ = ('_db_packages',
+                 'db_deleted_packages',
+                 '_db_packages_name_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, packages=None):
         self.db_deleted_packages = []
-        self.db_packages_name_index = {}
+        self._db_packages_name_index = None
         if packages is None:
             self._db_packages = []
         else:
             self._db_packages = packages
-            for v in self._db_packages:
-                self.db_packages_name_index[v.db_name] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBEnabledPackages.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBEnabledPackages.do_copy(self)
 
@@ -8599,7 +9635,6 @@ class DBEnabledPackages(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_packages_name_index = dict((v.db_name, v) for v in cp._db_packages)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -8662,16 +9697,25 @@ class DBEnabledPackages(object):
     def db_add_package(self, package):
         self.is_dirty = True
         self._db_packages.append(package)
-        self.db_packages_name_index[package.db_name] = package
+        if self._db_packages_name_index is not None:
+            self._db_packages_name_index[package.db_name] = package
     def db_change_package(self, package):
         self.is_dirty = True
         self._db_packages.append(package)
-        self.db_packages_name_index[package.db_name] = package
+        if self._db_packages_name_index is not None:
+            self._db_packages_name_index[package.db_name] = package
     def db_delete_package(self, package):
         self.is_dirty = True
         raise Exception('Cannot delete a non-keyed object')
     def db_get_package(self, key):
         return None
+    def __get_db_packages_name_index(self):
+        if self._db_packages_name_index is None:
+            self._db_packages_name_index = dict((v.db_name, v) for v in self._db_packages)
+        return self._db_packages_name_index
+    def __set_db_packages_name_index(self, index):
+        self._db_packages_name_index = index
+    db_packages_name_index = property(__get_db_packages_name_index, __set_db_packages_name_index)
     def db_get_package_by_name(self, key):
         return self.db_packages_name_index[key]
     def db_has_package_with_name(self, key):
@@ -8683,6 +9727,16 @@ class DBOpmArtifact(object):
 
     vtType = 'opm_artifact'
 
+    __slots__ = ('_db_id',
+                 '_db_value',
+                 'db_deleted_value',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, value=None, accounts=None):
         self._db_id = id
         self.db_deleted_value = []
@@ -8695,6 +9749,17 @@ class DBOpmArtifact(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmArtifact.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmArtifact.do_copy(self)
 
@@ -8846,6 +9911,20 @@ class DBLog(object):
 
     vtType = 'log'
 
+    __slots__ = ('_db_id',
+                 '_db_entity_type',
+                 '_db_version',
+                 '_db_name',
+                 '_db_last_modified',
+                 '_db_workflow_execs',
+                 'db_deleted_workflow_execs',
+                 '_db_workflow_execs_id_index',
+                 '_db_vistrail_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, entity_type=None, version=None, name=None, last_modified=None, workflow_execs=None, vistrail_id=None):
         self._db_id = id
         self._db_entity_type = entity_type
@@ -8853,17 +9932,26 @@ class DBLog(object):
         self._db_name = name
         self._db_last_modified = last_modified
         self.db_deleted_workflow_execs = []
-        self.db_workflow_execs_id_index = {}
+        self._db_workflow_execs_id_index = None
         if workflow_execs is None:
             self._db_workflow_execs = []
         else:
             self._db_workflow_execs = workflow_execs
-            for v in self._db_workflow_execs:
-                self.db_workflow_execs_id_index[v.db_id] = v
         self._db_vistrail_id = vistrail_id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBLog.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBLog.do_copy(self)
 
@@ -8891,7 +9979,6 @@ class DBLog(object):
                 cp._db_vistrail_id = id_remap[('vistrail', self._db_vistrail_id)]
         
         # recreate indices and set flags
-        cp.db_workflow_execs_id_index = dict((v.db_id, v) for v in cp._db_workflow_execs)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -9049,7 +10136,8 @@ class DBLog(object):
     def db_add_workflow_exec(self, workflow_exec):
         self.is_dirty = True
         self._db_workflow_execs.append(workflow_exec)
-        self.db_workflow_execs_id_index[workflow_exec.db_id] = workflow_exec
+        if self._db_workflow_execs_id_index is not None:
+            self._db_workflow_execs_id_index[workflow_exec.db_id] = workflow_exec
     def db_change_workflow_exec(self, workflow_exec):
         self.is_dirty = True
         found = False
@@ -9060,7 +10148,8 @@ class DBLog(object):
                 break
         if not found:
             self._db_workflow_execs.append(workflow_exec)
-        self.db_workflow_execs_id_index[workflow_exec.db_id] = workflow_exec
+        if self._db_workflow_execs_id_index is not None:
+            self._db_workflow_execs_id_index[workflow_exec.db_id] = workflow_exec
     def db_delete_workflow_exec(self, workflow_exec):
         self.is_dirty = True
         for i in xrange(len(self._db_workflow_execs)):
@@ -9069,12 +10158,20 @@ class DBLog(object):
                     self.db_deleted_workflow_execs.append(self._db_workflow_execs[i])
                 del self._db_workflow_execs[i]
                 break
-        del self.db_workflow_execs_id_index[workflow_exec.db_id]
+        if self._db_workflow_execs_id_index is not None:
+            del self._db_workflow_execs_id_index[workflow_exec.db_id]
     def db_get_workflow_exec(self, key):
         for i in xrange(len(self._db_workflow_execs)):
             if self._db_workflow_execs[i].db_id == key:
                 return self._db_workflow_execs[i]
         return None
+    def __get_db_workflow_execs_id_index(self):
+        if self._db_workflow_execs_id_index is None:
+            self._db_workflow_execs_id_index = dict((v.db_id, v) for v in self._db_workflow_execs)
+        return self._db_workflow_execs_id_index
+    def __set_db_workflow_execs_id_index(self, index):
+        self._db_workflow_execs_id_index = index
+    db_workflow_execs_id_index = property(__get_db_workflow_execs_id_index, __set_db_workflow_execs_id_index)
     def db_get_workflow_exec_by_id(self, key):
         return self.db_workflow_execs_id_index[key]
     def db_has_workflow_exec_with_id(self, key):
@@ -9100,15 +10197,27 @@ class DBLoopIteration(object):
 
     vtType = 'loop_iteration'
 
+    __slots__ = ('_db_item_execs',
+                 'db_deleted_item_execs',
+                 '_db_item_execs_id_index',
+                 '_db_id',
+                 '_db_ts_start',
+                 '_db_ts_end',
+                 '_db_iteration',
+                 '_db_completed',
+                 '_db_error',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, item_execs=None, id=None, ts_start=None, ts_end=None, iteration=None, completed=None, error=None):
         self.db_deleted_item_execs = []
-        self.db_item_execs_id_index = {}
+        self._db_item_execs_id_index = None
         if item_execs is None:
             self._db_item_execs = []
         else:
             self._db_item_execs = item_execs
-            for v in self._db_item_execs:
-                self.db_item_execs_id_index[v.db_id] = v
         self._db_id = id
         self._db_ts_start = ts_start
         self._db_ts_end = ts_end
@@ -9118,6 +10227,17 @@ class DBLoopIteration(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBLoopIteration.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBLoopIteration.do_copy(self)
 
@@ -9143,7 +10263,6 @@ class DBLoopIteration(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_item_execs_id_index = dict((v.db_id, v) for v in cp._db_item_execs)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -9248,7 +10367,8 @@ class DBLoopIteration(object):
     def db_add_item_exec(self, item_exec):
         self.is_dirty = True
         self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_change_item_exec(self, item_exec):
         self.is_dirty = True
         found = False
@@ -9259,7 +10379,8 @@ class DBLoopIteration(object):
                 break
         if not found:
             self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_delete_item_exec(self, item_exec):
         self.is_dirty = True
         for i in xrange(len(self._db_item_execs)):
@@ -9268,12 +10389,20 @@ class DBLoopIteration(object):
                     self.db_deleted_item_execs.append(self._db_item_execs[i])
                 del self._db_item_execs[i]
                 break
-        del self.db_item_execs_id_index[item_exec.db_id]
+        if self._db_item_execs_id_index is not None:
+            del self._db_item_execs_id_index[item_exec.db_id]
     def db_get_item_exec(self, key):
         for i in xrange(len(self._db_item_execs)):
             if self._db_item_execs[i].db_id == key:
                 return self._db_item_execs[i]
         return None
+    def __get_db_item_execs_id_index(self):
+        if self._db_item_execs_id_index is None:
+            self._db_item_execs_id_index = dict((v.db_id, v) for v in self._db_item_execs)
+        return self._db_item_execs_id_index
+    def __set_db_item_execs_id_index(self, index):
+        self._db_item_execs_id_index = index
+    db_item_execs_id_index = property(__get_db_item_execs_id_index, __set_db_item_execs_id_index)
     def db_get_item_exec_by_id(self, key):
         return self.db_item_execs_id_index[key]
     def db_has_item_exec_with_id(self, key):
@@ -9364,11 +10493,28 @@ class DBOpmProcessIdCause(object):
 
     vtType = 'opm_process_id_cause'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmProcessIdCause.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmProcessIdCause.do_copy(self)
 
@@ -9436,18 +10582,35 @@ class DBOpmArtifacts(object):
 
     vtType = 'opm_artifacts'
 
+    __slots__ = ('_db_artifacts',
+                 'db_deleted_artifacts',
+                 '_db_artifacts_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, artifacts=None):
         self.db_deleted_artifacts = []
-        self.db_artifacts_id_index = {}
+        self._db_artifacts_id_index = None
         if artifacts is None:
             self._db_artifacts = []
         else:
             self._db_artifacts = artifacts
-            for v in self._db_artifacts:
-                self.db_artifacts_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmArtifacts.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmArtifacts.do_copy(self)
 
@@ -9468,7 +10631,6 @@ class DBOpmArtifacts(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_artifacts_id_index = dict((v.db_id, v) for v in cp._db_artifacts)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -9531,7 +10693,8 @@ class DBOpmArtifacts(object):
     def db_add_artifact(self, artifact):
         self.is_dirty = True
         self._db_artifacts.append(artifact)
-        self.db_artifacts_id_index[artifact.db_id] = artifact
+        if self._db_artifacts_id_index is not None:
+            self._db_artifacts_id_index[artifact.db_id] = artifact
     def db_change_artifact(self, artifact):
         self.is_dirty = True
         found = False
@@ -9542,7 +10705,8 @@ class DBOpmArtifacts(object):
                 break
         if not found:
             self._db_artifacts.append(artifact)
-        self.db_artifacts_id_index[artifact.db_id] = artifact
+        if self._db_artifacts_id_index is not None:
+            self._db_artifacts_id_index[artifact.db_id] = artifact
     def db_delete_artifact(self, artifact):
         self.is_dirty = True
         for i in xrange(len(self._db_artifacts)):
@@ -9551,12 +10715,20 @@ class DBOpmArtifacts(object):
                     self.db_deleted_artifacts.append(self._db_artifacts[i])
                 del self._db_artifacts[i]
                 break
-        del self.db_artifacts_id_index[artifact.db_id]
+        if self._db_artifacts_id_index is not None:
+            del self._db_artifacts_id_index[artifact.db_id]
     def db_get_artifact(self, key):
         for i in xrange(len(self._db_artifacts)):
             if self._db_artifacts[i].db_id == key:
                 return self._db_artifacts[i]
         return None
+    def __get_db_artifacts_id_index(self):
+        if self._db_artifacts_id_index is None:
+            self._db_artifacts_id_index = dict((v.db_id, v) for v in self._db_artifacts)
+        return self._db_artifacts_id_index
+    def __set_db_artifacts_id_index(self, index):
+        self._db_artifacts_id_index = index
+    db_artifacts_id_index = property(__get_db_artifacts_id_index, __set_db_artifacts_id_index)
     def db_get_artifact_by_id(self, key):
         return self.db_artifacts_id_index[key]
     def db_has_artifact_with_id(self, key):
@@ -9568,6 +10740,16 @@ class DBPEParameter(object):
 
     vtType = 'pe_parameter'
 
+    __slots__ = ('_db_id',
+                 '_db_pos',
+                 '_db_interpolator',
+                 '_db_value',
+                 '_db_dimension',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, pos=None, interpolator=None, value=None, dimension=None):
         self._db_id = id
         self._db_pos = pos
@@ -9577,6 +10759,17 @@ class DBPEParameter(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPEParameter.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPEParameter.do_copy(self)
 
@@ -9719,15 +10912,39 @@ class DBWorkflowExec(object):
 
     vtType = 'workflow_exec'
 
+    __slots__ = ('_db_item_execs',
+                 'db_deleted_item_execs',
+                 '_db_item_execs_id_index',
+                 '_db_id',
+                 '_db_user',
+                 '_db_ip',
+                 '_db_session',
+                 '_db_vt_version',
+                 '_db_ts_start',
+                 '_db_ts_end',
+                 '_db_parent_id',
+                 '_db_parent_type',
+                 '_db_parent_version',
+                 '_db_completed',
+                 '_db_name',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 '_db_machines',
+                 'db_deleted_machines',
+                 '_db_machines_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, item_execs=None, id=None, user=None, ip=None, session=None, vt_version=None, ts_start=None, ts_end=None, parent_id=None, parent_type=None, parent_version=None, completed=None, name=None, annotations=None, machines=None):
         self.db_deleted_item_execs = []
-        self.db_item_execs_id_index = {}
+        self._db_item_execs_id_index = None
         if item_execs is None:
             self._db_item_execs = []
         else:
             self._db_item_execs = item_execs
-            for v in self._db_item_execs:
-                self.db_item_execs_id_index[v.db_id] = v
         self._db_id = id
         self._db_user = user
         self._db_ip = ip
@@ -9741,24 +10958,31 @@ class DBWorkflowExec(object):
         self._db_completed = completed
         self._db_name = name
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
+        self._db_annotations_id_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
         self.db_deleted_machines = []
-        self.db_machines_id_index = {}
+        self._db_machines_id_index = None
         if machines is None:
             self._db_machines = []
         else:
             self._db_machines = machines
-            for v in self._db_machines:
-                self.db_machines_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBWorkflowExec.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBWorkflowExec.do_copy(self)
 
@@ -9798,9 +11022,6 @@ class DBWorkflowExec(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_item_execs_id_index = dict((v.db_id, v) for v in cp._db_item_execs)
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
-        cp.db_machines_id_index = dict((v.db_id, v) for v in cp._db_machines)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -9981,7 +11202,8 @@ class DBWorkflowExec(object):
     def db_add_item_exec(self, item_exec):
         self.is_dirty = True
         self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_change_item_exec(self, item_exec):
         self.is_dirty = True
         found = False
@@ -9992,7 +11214,8 @@ class DBWorkflowExec(object):
                 break
         if not found:
             self._db_item_execs.append(item_exec)
-        self.db_item_execs_id_index[item_exec.db_id] = item_exec
+        if self._db_item_execs_id_index is not None:
+            self._db_item_execs_id_index[item_exec.db_id] = item_exec
     def db_delete_item_exec(self, item_exec):
         self.is_dirty = True
         for i in xrange(len(self._db_item_execs)):
@@ -10001,12 +11224,20 @@ class DBWorkflowExec(object):
                     self.db_deleted_item_execs.append(self._db_item_execs[i])
                 del self._db_item_execs[i]
                 break
-        del self.db_item_execs_id_index[item_exec.db_id]
+        if self._db_item_execs_id_index is not None:
+            del self._db_item_execs_id_index[item_exec.db_id]
     def db_get_item_exec(self, key):
         for i in xrange(len(self._db_item_execs)):
             if self._db_item_execs[i].db_id == key:
                 return self._db_item_execs[i]
         return None
+    def __get_db_item_execs_id_index(self):
+        if self._db_item_execs_id_index is None:
+            self._db_item_execs_id_index = dict((v.db_id, v) for v in self._db_item_execs)
+        return self._db_item_execs_id_index
+    def __set_db_item_execs_id_index(self, index):
+        self._db_item_execs_id_index = index
+    db_item_execs_id_index = property(__get_db_item_execs_id_index, __set_db_item_execs_id_index)
     def db_get_item_exec_by_id(self, key):
         return self.db_item_execs_id_index[key]
     def db_has_item_exec_with_id(self, key):
@@ -10179,7 +11410,8 @@ class DBWorkflowExec(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -10190,7 +11422,8 @@ class DBWorkflowExec(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -10199,12 +11432,20 @@ class DBWorkflowExec(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
@@ -10221,7 +11462,8 @@ class DBWorkflowExec(object):
     def db_add_machine(self, machine):
         self.is_dirty = True
         self._db_machines.append(machine)
-        self.db_machines_id_index[machine.db_id] = machine
+        if self._db_machines_id_index is not None:
+            self._db_machines_id_index[machine.db_id] = machine
     def db_change_machine(self, machine):
         self.is_dirty = True
         found = False
@@ -10232,7 +11474,8 @@ class DBWorkflowExec(object):
                 break
         if not found:
             self._db_machines.append(machine)
-        self.db_machines_id_index[machine.db_id] = machine
+        if self._db_machines_id_index is not None:
+            self._db_machines_id_index[machine.db_id] = machine
     def db_delete_machine(self, machine):
         self.is_dirty = True
         for i in xrange(len(self._db_machines)):
@@ -10241,12 +11484,20 @@ class DBWorkflowExec(object):
                     self.db_deleted_machines.append(self._db_machines[i])
                 del self._db_machines[i]
                 break
-        del self.db_machines_id_index[machine.db_id]
+        if self._db_machines_id_index is not None:
+            del self._db_machines_id_index[machine.db_id]
     def db_get_machine(self, key):
         for i in xrange(len(self._db_machines)):
             if self._db_machines[i].db_id == key:
                 return self._db_machines[i]
         return None
+    def __get_db_machines_id_index(self):
+        if self._db_machines_id_index is None:
+            self._db_machines_id_index = dict((v.db_id, v) for v in self._db_machines)
+        return self._db_machines_id_index
+    def __set_db_machines_id_index(self, index):
+        self._db_machines_id_index = index
+    db_machines_id_index = property(__get_db_machines_id_index, __set_db_machines_id_index)
     def db_get_machine_by_id(self, key):
         return self.db_machines_id_index[key]
     def db_has_machine_with_id(self, key):
@@ -10259,6 +11510,14 @@ class DBLocation(object):
 
     vtType = 'location'
 
+    __slots__ = ('_db_id',
+                 '_db_x',
+                 '_db_y',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, x=None, y=None):
         self._db_id = id
         self._db_x = x
@@ -10266,6 +11525,17 @@ class DBLocation(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBLocation.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBLocation.do_copy(self)
 
@@ -10370,21 +11640,41 @@ class DBFunction(object):
 
     vtType = 'function'
 
+    __slots__ = ('_db_id',
+                 '_db_pos',
+                 '_db_name',
+                 '_db_parameters',
+                 'db_deleted_parameters',
+                 '_db_parameters_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, pos=None, name=None, parameters=None):
         self._db_id = id
         self._db_pos = pos
         self._db_name = name
         self.db_deleted_parameters = []
-        self.db_parameters_id_index = {}
+        self._db_parameters_id_index = None
         if parameters is None:
             self._db_parameters = []
         else:
             self._db_parameters = parameters
-            for v in self._db_parameters:
-                self.db_parameters_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBFunction.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBFunction.do_copy(self)
 
@@ -10407,7 +11697,6 @@ class DBFunction(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_parameters_id_index = dict((v.db_id, v) for v in cp._db_parameters)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -10524,7 +11813,8 @@ class DBFunction(object):
     def db_add_parameter(self, parameter):
         self.is_dirty = True
         self._db_parameters.append(parameter)
-        self.db_parameters_id_index[parameter.db_id] = parameter
+        if self._db_parameters_id_index is not None:
+            self._db_parameters_id_index[parameter.db_id] = parameter
     def db_change_parameter(self, parameter):
         self.is_dirty = True
         found = False
@@ -10535,7 +11825,8 @@ class DBFunction(object):
                 break
         if not found:
             self._db_parameters.append(parameter)
-        self.db_parameters_id_index[parameter.db_id] = parameter
+        if self._db_parameters_id_index is not None:
+            self._db_parameters_id_index[parameter.db_id] = parameter
     def db_delete_parameter(self, parameter):
         self.is_dirty = True
         for i in xrange(len(self._db_parameters)):
@@ -10544,12 +11835,20 @@ class DBFunction(object):
                     self.db_deleted_parameters.append(self._db_parameters[i])
                 del self._db_parameters[i]
                 break
-        del self.db_parameters_id_index[parameter.db_id]
+        if self._db_parameters_id_index is not None:
+            del self._db_parameters_id_index[parameter.db_id]
     def db_get_parameter(self, key):
         for i in xrange(len(self._db_parameters)):
             if self._db_parameters[i].db_id == key:
                 return self._db_parameters[i]
         return None
+    def __get_db_parameters_id_index(self):
+        if self._db_parameters_id_index is None:
+            self._db_parameters_id_index = dict((v.db_id, v) for v in self._db_parameters)
+        return self._db_parameters_id_index
+    def __set_db_parameters_id_index(self, index):
+        self._db_parameters_id_index = index
+    db_parameters_id_index = property(__get_db_parameters_id_index, __set_db_parameters_id_index)
     def db_get_parameter_by_id(self, key):
         return self.db_parameters_id_index[key]
     def db_has_parameter_with_id(self, key):
@@ -10562,6 +11861,17 @@ class DBActionAnnotation(object):
 
     vtType = 'actionAnnotation'
 
+    __slots__ = ('_db_id',
+                 '_db_key',
+                 '_db_value',
+                 '_db_action_id',
+                 '_db_date',
+                 '_db_user',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, key=None, value=None, action_id=None, date=None, user=None):
         self._db_id = id
         self._db_key = key
@@ -10572,6 +11882,17 @@ class DBActionAnnotation(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBActionAnnotation.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBActionAnnotation.do_copy(self)
 
@@ -10735,6 +12056,22 @@ class DBProvActivity(object):
 
     vtType = 'prov_activity'
 
+    __slots__ = ('_db_id',
+                 '_db_startTime',
+                 '_db_endTime',
+                 '_db_vt_id',
+                 '_db_vt_type',
+                 '_db_vt_cached',
+                 '_db_vt_completed',
+                 '_db_vt_machine_id',
+                 '_db_vt_error',
+                 '_db_is_part_of',
+                 'db_deleted_is_part_of',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, startTime=None, endTime=None, vt_id=None, vt_type=None, vt_cached=None, vt_completed=None, vt_machine_id=None, vt_error=None, is_part_of=None):
         self._db_id = id
         self._db_startTime = startTime
@@ -10750,6 +12087,17 @@ class DBProvActivity(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvActivity.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvActivity.do_copy(self)
 
@@ -11006,6 +12354,16 @@ class DBProvUsage(object):
 
     vtType = 'prov_usage'
 
+    __slots__ = ('_db_prov_activity',
+                 'db_deleted_prov_activity',
+                 '_db_prov_entity',
+                 'db_deleted_prov_entity',
+                 '_db_prov_role',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_activity=None, prov_entity=None, prov_role=None):
         self.db_deleted_prov_activity = []
         self._db_prov_activity = prov_activity
@@ -11015,6 +12373,17 @@ class DBProvUsage(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvUsage.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvUsage.do_copy(self)
 
@@ -11153,11 +12522,28 @@ class DBOpmArtifactIdEffect(object):
 
     vtType = 'opm_artifact_id_effect'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmArtifactIdEffect.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmArtifactIdEffect.do_copy(self)
 
@@ -11225,6 +12611,21 @@ class DBOpmGraph(object):
 
     vtType = 'opm_graph'
 
+    __slots__ = ('_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_processes',
+                 'db_deleted_processes',
+                 '_db_artifacts',
+                 'db_deleted_artifacts',
+                 '_db_agents',
+                 'db_deleted_agents',
+                 '_db_dependencies',
+                 'db_deleted_dependencies',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, accounts=None, processes=None, artifacts=None, agents=None, dependencies=None):
         self.db_deleted_accounts = []
         self._db_accounts = accounts
@@ -11239,6 +12640,17 @@ class DBOpmGraph(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmGraph.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmGraph.do_copy(self)
 
@@ -11464,11 +12876,28 @@ class DBIsPartOf(object):
 
     vtType = 'is_part_of'
 
+    __slots__ = ('_db_prov_ref',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_ref=None):
         self._db_prov_ref = prov_ref
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBIsPartOf.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBIsPartOf.do_copy(self)
 
@@ -11534,6 +12963,21 @@ class DBOpmWasDerivedFrom(object):
 
     vtType = 'opm_was_derived_from'
 
+    __slots__ = ('_db_effect',
+                 'db_deleted_effect',
+                 '_db_role',
+                 'db_deleted_role',
+                 '_db_cause',
+                 'db_deleted_cause',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_opm_times',
+                 'db_deleted_opm_times',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, effect=None, role=None, cause=None, accounts=None, opm_times=None):
         self.db_deleted_effect = []
         self._db_effect = effect
@@ -11554,6 +12998,17 @@ class DBOpmWasDerivedFrom(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmWasDerivedFrom.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmWasDerivedFrom.do_copy(self)
 
@@ -11803,6 +13258,14 @@ class DBControlParameter(object):
 
     vtType = 'controlParameter'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 '_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None, value=None):
         self._db_id = id
         self._db_name = name
@@ -11810,6 +13273,17 @@ class DBControlParameter(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBControlParameter.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBControlParameter.do_copy(self)
 
@@ -11914,12 +13388,30 @@ class DBPluginData(object):
 
     vtType = 'plugin_data'
 
+    __slots__ = ('_db_id',
+                 '_db_data',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, data=None):
         self._db_id = id
         self._db_data = data
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPluginData.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPluginData.do_copy(self)
 
@@ -12005,6 +13497,16 @@ class DBDelete(object):
 
     vtType = 'delete'
 
+    __slots__ = ('_db_id',
+                 '_db_what',
+                 '_db_objectId',
+                 '_db_parentObjId',
+                 '_db_parentObjType',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, what=None, objectId=None, parentObjId=None, parentObjType=None):
         self._db_id = id
         self._db_what = what
@@ -12014,6 +13516,17 @@ class DBDelete(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBDelete.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBDelete.do_copy(self)
 
@@ -12160,6 +13673,17 @@ class DBVistrailVariable(object):
 
     vtType = 'vistrailVariable'
 
+    __slots__ = ('_db_name',
+                 '_db_uuid',
+                 '_db_package',
+                 '_db_module',
+                 '_db_namespace',
+                 '_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, name=None, uuid=None, package=None, module=None, namespace=None, value=None):
         self._db_name = name
         self._db_uuid = uuid
@@ -12170,6 +13694,17 @@ class DBVistrailVariable(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBVistrailVariable.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBVistrailVariable.do_copy(self)
 
@@ -12331,6 +13866,13 @@ class DBOpmOverlaps(object):
 
     vtType = 'opm_overlaps'
 
+    __slots__ = ('_db_opm_account_ids',
+                 'db_deleted_opm_account_ids',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, opm_account_ids=None):
         self.db_deleted_opm_account_ids = []
         if opm_account_ids is None:
@@ -12340,6 +13882,17 @@ class DBOpmOverlaps(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmOverlaps.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmOverlaps.do_copy(self)
 
@@ -12437,6 +13990,21 @@ class DBOpmWasTriggeredBy(object):
 
     vtType = 'opm_was_triggered_by'
 
+    __slots__ = ('_db_effect',
+                 'db_deleted_effect',
+                 '_db_role',
+                 'db_deleted_role',
+                 '_db_cause',
+                 'db_deleted_cause',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 '_db_opm_times',
+                 'db_deleted_opm_times',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, effect=None, role=None, cause=None, accounts=None, opm_times=None):
         self.db_deleted_effect = []
         self._db_effect = effect
@@ -12457,6 +14025,17 @@ class DBOpmWasTriggeredBy(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmWasTriggeredBy.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmWasTriggeredBy.do_copy(self)
 
@@ -12706,6 +14285,22 @@ class DBModuleDescriptor(object):
 
     vtType = 'module_descriptor'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 '_db_package',
+                 '_db_namespace',
+                 '_db_package_version',
+                 '_db_version',
+                 '_db_base_descriptor_id',
+                 '_db_portSpecs',
+                 'db_deleted_portSpecs',
+                 '_db_portSpecs_id_index',
+                 '_db_portSpecs_name_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None, package=None, namespace=None, package_version=None, version=None, base_descriptor_id=None, portSpecs=None):
         self._db_id = id
         self._db_name = name
@@ -12715,18 +14310,26 @@ class DBModuleDescriptor(object):
         self._db_version = version
         self._db_base_descriptor_id = base_descriptor_id
         self.db_deleted_portSpecs = []
-        self.db_portSpecs_id_index = {}
-        self.db_portSpecs_name_index = {}
+        self._db_portSpecs_id_index = None
+        self._db_portSpecs_name_index = None
         if portSpecs is None:
             self._db_portSpecs = []
         else:
             self._db_portSpecs = portSpecs
-            for v in self._db_portSpecs:
-                self.db_portSpecs_id_index[v.db_id] = v
-                self.db_portSpecs_name_index[(v.db_name,v.db_type)] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBModuleDescriptor.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBModuleDescriptor.do_copy(self)
 
@@ -12755,8 +14358,6 @@ class DBModuleDescriptor(object):
                 cp._db_base_descriptor_id = id_remap[('module_descriptor', self._db_base_descriptor_id)]
         
         # recreate indices and set flags
-        cp.db_portSpecs_id_index = dict((v.db_id, v) for v in cp._db_portSpecs)
-        cp.db_portSpecs_name_index = dict(((v.db_name,v.db_type), v) for v in cp._db_portSpecs)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -12945,8 +14546,10 @@ class DBModuleDescriptor(object):
     def db_add_portSpec(self, portSpec):
         self.is_dirty = True
         self._db_portSpecs.append(portSpec)
-        self.db_portSpecs_id_index[portSpec.db_id] = portSpec
-        self.db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)] = portSpec
+        if self._db_portSpecs_id_index is not None:
+            self._db_portSpecs_id_index[portSpec.db_id] = portSpec
+        if self._db_portSpecs_name_index is not None:
+            self._db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)] = portSpec
     def db_change_portSpec(self, portSpec):
         self.is_dirty = True
         found = False
@@ -12957,8 +14560,10 @@ class DBModuleDescriptor(object):
                 break
         if not found:
             self._db_portSpecs.append(portSpec)
-        self.db_portSpecs_id_index[portSpec.db_id] = portSpec
-        self.db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)] = portSpec
+        if self._db_portSpecs_id_index is not None:
+            self._db_portSpecs_id_index[portSpec.db_id] = portSpec
+        if self._db_portSpecs_name_index is not None:
+            self._db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)] = portSpec
     def db_delete_portSpec(self, portSpec):
         self.is_dirty = True
         for i in xrange(len(self._db_portSpecs)):
@@ -12967,17 +14572,33 @@ class DBModuleDescriptor(object):
                     self.db_deleted_portSpecs.append(self._db_portSpecs[i])
                 del self._db_portSpecs[i]
                 break
-        del self.db_portSpecs_id_index[portSpec.db_id]
-        del self.db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)]
+        if self._db_portSpecs_id_index is not None:
+            del self._db_portSpecs_id_index[portSpec.db_id]
+        if self._db_portSpecs_name_index is not None:
+            del self._db_portSpecs_name_index[(portSpec.db_name,portSpec.db_type)]
     def db_get_portSpec(self, key):
         for i in xrange(len(self._db_portSpecs)):
             if self._db_portSpecs[i].db_id == key:
                 return self._db_portSpecs[i]
         return None
+    def __get_db_portSpecs_id_index(self):
+        if self._db_portSpecs_id_index is None:
+            self._db_portSpecs_id_index = dict((v.db_id, v) for v in self._db_portSpecs)
+        return self._db_portSpecs_id_index
+    def __set_db_portSpecs_id_index(self, index):
+        self._db_portSpecs_id_index = index
+    db_portSpecs_id_index = property(__get_db_portSpecs_id_index, __set_db_portSpecs_id_index)
     def db_get_portSpec_by_id(self, key):
         return self.db_portSpecs_id_index[key]
     def db_has_portSpec_with_id(self, key):
         return key in self.db_portSpecs_id_index
+    def __get_db_portSpecs_name_index(self):
+        if self._db_portSpecs_name_index is None:
+            self._db_portSpecs_name_index = dict(((v.db_name,v.db_type), v) for v in self._db_portSpecs)
+        return self._db_portSpecs_name_index
+    def __set_db_portSpecs_name_index(self, index):
+        self._db_portSpecs_name_index = index
+    db_portSpecs_name_index = property(__get_db_portSpecs_name_index, __set_db_portSpecs_name_index)
     def db_get_portSpec_by_name(self, key):
         return self.db_portSpecs_name_index[key]
     def db_has_portSpec_with_name(self, key):
@@ -12990,12 +14611,30 @@ class DBTag(object):
 
     vtType = 'tag'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None):
         self._db_id = id
         self._db_name = name
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBTag.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBTag.do_copy(self)
 
@@ -13083,11 +14722,28 @@ class DBOpmRole(object):
 
     vtType = 'opm_role'
 
+    __slots__ = ('_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmRole.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmRole.do_copy(self)
 
@@ -13153,39 +14809,54 @@ class DBProvDocument(object):
 
     vtType = 'prov_document'
 
+    __slots__ = ('_db_prov_entitys',
+                 'db_deleted_prov_entitys',
+                 '_db_prov_entitys_id_index',
+                 '_db_prov_activitys',
+                 'db_deleted_prov_activitys',
+                 '_db_prov_activitys_id_index',
+                 '_db_prov_agents',
+                 'db_deleted_prov_agents',
+                 '_db_prov_agents_id_index',
+                 '_db_vt_connections',
+                 'db_deleted_vt_connections',
+                 '_db_vt_connections_id_index',
+                 '_db_prov_usages',
+                 'db_deleted_prov_usages',
+                 '_db_prov_generations',
+                 'db_deleted_prov_generations',
+                 '_db_prov_associations',
+                 'db_deleted_prov_associations',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_entitys=None, prov_activitys=None, prov_agents=None, vt_connections=None, prov_usages=None, prov_generations=None, prov_associations=None):
         self.db_deleted_prov_entitys = []
-        self.db_prov_entitys_id_index = {}
+        self._db_prov_entitys_id_index = None
         if prov_entitys is None:
             self._db_prov_entitys = []
         else:
             self._db_prov_entitys = prov_entitys
-            for v in self._db_prov_entitys:
-                self.db_prov_entitys_id_index[v.db_id] = v
         self.db_deleted_prov_activitys = []
-        self.db_prov_activitys_id_index = {}
+        self._db_prov_activitys_id_index = None
         if prov_activitys is None:
             self._db_prov_activitys = []
         else:
             self._db_prov_activitys = prov_activitys
-            for v in self._db_prov_activitys:
-                self.db_prov_activitys_id_index[v.db_id] = v
         self.db_deleted_prov_agents = []
-        self.db_prov_agents_id_index = {}
+        self._db_prov_agents_id_index = None
         if prov_agents is None:
             self._db_prov_agents = []
         else:
             self._db_prov_agents = prov_agents
-            for v in self._db_prov_agents:
-                self.db_prov_agents_id_index[v.db_id] = v
         self.db_deleted_vt_connections = []
-        self.db_vt_connections_id_index = {}
+        self._db_vt_connections_id_index = None
         if vt_connections is None:
             self._db_vt_connections = []
         else:
             self._db_vt_connections = vt_connections
-            for v in self._db_vt_connections:
-                self.db_vt_connections_id_index[v.db_id] = v
         self.db_deleted_prov_usages = []
         if prov_usages is None:
             self._db_prov_usages = []
@@ -13204,6 +14875,17 @@ class DBProvDocument(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvDocument.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvDocument.do_copy(self)
 
@@ -13248,10 +14930,6 @@ class DBProvDocument(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_prov_entitys_id_index = dict((v.db_id, v) for v in cp._db_prov_entitys)
-        cp.db_prov_activitys_id_index = dict((v.db_id, v) for v in cp._db_prov_activitys)
-        cp.db_prov_agents_id_index = dict((v.db_id, v) for v in cp._db_prov_agents)
-        cp.db_vt_connections_id_index = dict((v.db_id, v) for v in cp._db_vt_connections)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -13452,7 +15130,8 @@ class DBProvDocument(object):
     def db_add_prov_entity(self, prov_entity):
         self.is_dirty = True
         self._db_prov_entitys.append(prov_entity)
-        self.db_prov_entitys_id_index[prov_entity.db_id] = prov_entity
+        if self._db_prov_entitys_id_index is not None:
+            self._db_prov_entitys_id_index[prov_entity.db_id] = prov_entity
     def db_change_prov_entity(self, prov_entity):
         self.is_dirty = True
         found = False
@@ -13463,7 +15142,8 @@ class DBProvDocument(object):
                 break
         if not found:
             self._db_prov_entitys.append(prov_entity)
-        self.db_prov_entitys_id_index[prov_entity.db_id] = prov_entity
+        if self._db_prov_entitys_id_index is not None:
+            self._db_prov_entitys_id_index[prov_entity.db_id] = prov_entity
     def db_delete_prov_entity(self, prov_entity):
         self.is_dirty = True
         for i in xrange(len(self._db_prov_entitys)):
@@ -13472,12 +15152,20 @@ class DBProvDocument(object):
                     self.db_deleted_prov_entitys.append(self._db_prov_entitys[i])
                 del self._db_prov_entitys[i]
                 break
-        del self.db_prov_entitys_id_index[prov_entity.db_id]
+        if self._db_prov_entitys_id_index is not None:
+            del self._db_prov_entitys_id_index[prov_entity.db_id]
     def db_get_prov_entity(self, key):
         for i in xrange(len(self._db_prov_entitys)):
             if self._db_prov_entitys[i].db_id == key:
                 return self._db_prov_entitys[i]
         return None
+    def __get_db_prov_entitys_id_index(self):
+        if self._db_prov_entitys_id_index is None:
+            self._db_prov_entitys_id_index = dict((v.db_id, v) for v in self._db_prov_entitys)
+        return self._db_prov_entitys_id_index
+    def __set_db_prov_entitys_id_index(self, index):
+        self._db_prov_entitys_id_index = index
+    db_prov_entitys_id_index = property(__get_db_prov_entitys_id_index, __set_db_prov_entitys_id_index)
     def db_get_prov_entity_by_id(self, key):
         return self.db_prov_entitys_id_index[key]
     def db_has_prov_entity_with_id(self, key):
@@ -13494,7 +15182,8 @@ class DBProvDocument(object):
     def db_add_prov_activity(self, prov_activity):
         self.is_dirty = True
         self._db_prov_activitys.append(prov_activity)
-        self.db_prov_activitys_id_index[prov_activity.db_id] = prov_activity
+        if self._db_prov_activitys_id_index is not None:
+            self._db_prov_activitys_id_index[prov_activity.db_id] = prov_activity
     def db_change_prov_activity(self, prov_activity):
         self.is_dirty = True
         found = False
@@ -13505,7 +15194,8 @@ class DBProvDocument(object):
                 break
         if not found:
             self._db_prov_activitys.append(prov_activity)
-        self.db_prov_activitys_id_index[prov_activity.db_id] = prov_activity
+        if self._db_prov_activitys_id_index is not None:
+            self._db_prov_activitys_id_index[prov_activity.db_id] = prov_activity
     def db_delete_prov_activity(self, prov_activity):
         self.is_dirty = True
         for i in xrange(len(self._db_prov_activitys)):
@@ -13514,12 +15204,20 @@ class DBProvDocument(object):
                     self.db_deleted_prov_activitys.append(self._db_prov_activitys[i])
                 del self._db_prov_activitys[i]
                 break
-        del self.db_prov_activitys_id_index[prov_activity.db_id]
+        if self._db_prov_activitys_id_index is not None:
+            del self._db_prov_activitys_id_index[prov_activity.db_id]
     def db_get_prov_activity(self, key):
         for i in xrange(len(self._db_prov_activitys)):
             if self._db_prov_activitys[i].db_id == key:
                 return self._db_prov_activitys[i]
         return None
+    def __get_db_prov_activitys_id_index(self):
+        if self._db_prov_activitys_id_index is None:
+            self._db_prov_activitys_id_index = dict((v.db_id, v) for v in self._db_prov_activitys)
+        return self._db_prov_activitys_id_index
+    def __set_db_prov_activitys_id_index(self, index):
+        self._db_prov_activitys_id_index = index
+    db_prov_activitys_id_index = property(__get_db_prov_activitys_id_index, __set_db_prov_activitys_id_index)
     def db_get_prov_activity_by_id(self, key):
         return self.db_prov_activitys_id_index[key]
     def db_has_prov_activity_with_id(self, key):
@@ -13536,7 +15234,8 @@ class DBProvDocument(object):
     def db_add_prov_agent(self, prov_agent):
         self.is_dirty = True
         self._db_prov_agents.append(prov_agent)
-        self.db_prov_agents_id_index[prov_agent.db_id] = prov_agent
+        if self._db_prov_agents_id_index is not None:
+            self._db_prov_agents_id_index[prov_agent.db_id] = prov_agent
     def db_change_prov_agent(self, prov_agent):
         self.is_dirty = True
         found = False
@@ -13547,7 +15246,8 @@ class DBProvDocument(object):
                 break
         if not found:
             self._db_prov_agents.append(prov_agent)
-        self.db_prov_agents_id_index[prov_agent.db_id] = prov_agent
+        if self._db_prov_agents_id_index is not None:
+            self._db_prov_agents_id_index[prov_agent.db_id] = prov_agent
     def db_delete_prov_agent(self, prov_agent):
         self.is_dirty = True
         for i in xrange(len(self._db_prov_agents)):
@@ -13556,12 +15256,20 @@ class DBProvDocument(object):
                     self.db_deleted_prov_agents.append(self._db_prov_agents[i])
                 del self._db_prov_agents[i]
                 break
-        del self.db_prov_agents_id_index[prov_agent.db_id]
+        if self._db_prov_agents_id_index is not None:
+            del self._db_prov_agents_id_index[prov_agent.db_id]
     def db_get_prov_agent(self, key):
         for i in xrange(len(self._db_prov_agents)):
             if self._db_prov_agents[i].db_id == key:
                 return self._db_prov_agents[i]
         return None
+    def __get_db_prov_agents_id_index(self):
+        if self._db_prov_agents_id_index is None:
+            self._db_prov_agents_id_index = dict((v.db_id, v) for v in self._db_prov_agents)
+        return self._db_prov_agents_id_index
+    def __set_db_prov_agents_id_index(self, index):
+        self._db_prov_agents_id_index = index
+    db_prov_agents_id_index = property(__get_db_prov_agents_id_index, __set_db_prov_agents_id_index)
     def db_get_prov_agent_by_id(self, key):
         return self.db_prov_agents_id_index[key]
     def db_has_prov_agent_with_id(self, key):
@@ -13578,7 +15286,8 @@ class DBProvDocument(object):
     def db_add_vt_connection(self, vt_connection):
         self.is_dirty = True
         self._db_vt_connections.append(vt_connection)
-        self.db_vt_connections_id_index[vt_connection.db_id] = vt_connection
+        if self._db_vt_connections_id_index is not None:
+            self._db_vt_connections_id_index[vt_connection.db_id] = vt_connection
     def db_change_vt_connection(self, vt_connection):
         self.is_dirty = True
         found = False
@@ -13589,7 +15298,8 @@ class DBProvDocument(object):
                 break
         if not found:
             self._db_vt_connections.append(vt_connection)
-        self.db_vt_connections_id_index[vt_connection.db_id] = vt_connection
+        if self._db_vt_connections_id_index is not None:
+            self._db_vt_connections_id_index[vt_connection.db_id] = vt_connection
     def db_delete_vt_connection(self, vt_connection):
         self.is_dirty = True
         for i in xrange(len(self._db_vt_connections)):
@@ -13598,12 +15308,20 @@ class DBProvDocument(object):
                     self.db_deleted_vt_connections.append(self._db_vt_connections[i])
                 del self._db_vt_connections[i]
                 break
-        del self.db_vt_connections_id_index[vt_connection.db_id]
+        if self._db_vt_connections_id_index is not None:
+            del self._db_vt_connections_id_index[vt_connection.db_id]
     def db_get_vt_connection(self, key):
         for i in xrange(len(self._db_vt_connections)):
             if self._db_vt_connections[i].db_id == key:
                 return self._db_vt_connections[i]
         return None
+    def __get_db_vt_connections_id_index(self):
+        if self._db_vt_connections_id_index is None:
+            self._db_vt_connections_id_index = dict((v.db_id, v) for v in self._db_vt_connections)
+        return self._db_vt_connections_id_index
+    def __set_db_vt_connections_id_index(self, index):
+        self._db_vt_connections_id_index = index
+    db_vt_connections_id_index = property(__get_db_vt_connections_id_index, __set_db_vt_connections_id_index)
     def db_get_vt_connection_by_id(self, key):
         return self.db_vt_connections_id_index[key]
     def db_has_vt_connection_with_id(self, key):
@@ -13675,18 +15393,35 @@ class DBOpmProcesses(object):
 
     vtType = 'opm_processes'
 
+    __slots__ = ('_db_processs',
+                 'db_deleted_processs',
+                 '_db_processs_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, processs=None):
         self.db_deleted_processs = []
-        self.db_processs_id_index = {}
+        self._db_processs_id_index = None
         if processs is None:
             self._db_processs = []
         else:
             self._db_processs = processs
-            for v in self._db_processs:
-                self.db_processs_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmProcesses.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmProcesses.do_copy(self)
 
@@ -13707,7 +15442,6 @@ class DBOpmProcesses(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_processs_id_index = dict((v.db_id, v) for v in cp._db_processs)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -13770,7 +15504,8 @@ class DBOpmProcesses(object):
     def db_add_process(self, process):
         self.is_dirty = True
         self._db_processs.append(process)
-        self.db_processs_id_index[process.db_id] = process
+        if self._db_processs_id_index is not None:
+            self._db_processs_id_index[process.db_id] = process
     def db_change_process(self, process):
         self.is_dirty = True
         found = False
@@ -13781,7 +15516,8 @@ class DBOpmProcesses(object):
                 break
         if not found:
             self._db_processs.append(process)
-        self.db_processs_id_index[process.db_id] = process
+        if self._db_processs_id_index is not None:
+            self._db_processs_id_index[process.db_id] = process
     def db_delete_process(self, process):
         self.is_dirty = True
         for i in xrange(len(self._db_processs)):
@@ -13790,12 +15526,20 @@ class DBOpmProcesses(object):
                     self.db_deleted_processs.append(self._db_processs[i])
                 del self._db_processs[i]
                 break
-        del self.db_processs_id_index[process.db_id]
+        if self._db_processs_id_index is not None:
+            del self._db_processs_id_index[process.db_id]
     def db_get_process(self, key):
         for i in xrange(len(self._db_processs)):
             if self._db_processs[i].db_id == key:
                 return self._db_processs[i]
         return None
+    def __get_db_processs_id_index(self):
+        if self._db_processs_id_index is None:
+            self._db_processs_id_index = dict((v.db_id, v) for v in self._db_processs)
+        return self._db_processs_id_index
+    def __set_db_processs_id_index(self, index):
+        self._db_processs_id_index = index
+    db_processs_id_index = property(__get_db_processs_id_index, __set_db_processs_id_index)
     def db_get_process_by_id(self, key):
         return self.db_processs_id_index[key]
     def db_has_process_with_id(self, key):
@@ -13807,11 +15551,28 @@ class DBOpmAccountId(object):
 
     vtType = 'opm_account_id'
 
+    __slots__ = ('_db_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None):
         self._db_id = id
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAccountId.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAccountId.do_copy(self)
 
@@ -13879,6 +15640,20 @@ class DBPortSpecItem(object):
 
     vtType = 'portSpecItem'
 
+    __slots__ = ('_db_id',
+                 '_db_pos',
+                 '_db_module',
+                 '_db_package',
+                 '_db_namespace',
+                 '_db_label',
+                 '_db_default',
+                 '_db_values',
+                 '_db_entry_type',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, pos=None, module=None, package=None, namespace=None, label=None, default=None, values=None, entry_type=None):
         self._db_id = id
         self._db_pos = pos
@@ -13892,6 +15667,17 @@ class DBPortSpecItem(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBPortSpecItem.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBPortSpecItem.do_copy(self)
 
@@ -14795,6 +16581,17 @@ class DBMachine(object):
 
     vtType = 'machine'
 
+    __slots__ = ('_db_id',
+                 '_db_name',
+                 '_db_os',
+                 '_db_architecture',
+                 '_db_processor',
+                 '_db_ram',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, name=None, os=None, architecture=None, processor=None, ram=None):
         self._db_id = id
         self._db_name = name
@@ -14805,6 +16602,17 @@ class DBMachine(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBMachine.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBMachine.do_copy(self)
 
@@ -14968,11 +16776,28 @@ class DBConfigFloat(object):
 
     vtType = 'config_float'
 
+    __slots__ = ('_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBConfigFloat.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBConfigFloat.do_copy(self)
 
@@ -15038,6 +16863,14 @@ class DBOther(object):
 
     vtType = 'other'
 
+    __slots__ = ('_db_id',
+                 '_db_key',
+                 '_db_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, key=None, value=None):
         self._db_id = id
         self._db_key = key
@@ -15045,6 +16878,17 @@ class DBOther(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOther.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOther.do_copy(self)
 
@@ -15149,11 +16993,28 @@ class DBRefProvActivity(object):
 
     vtType = 'ref_prov_activity'
 
+    __slots__ = ('_db_prov_ref',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_ref=None):
         self._db_prov_ref = prov_ref
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBRefProvActivity.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBRefProvActivity.do_copy(self)
 
@@ -15706,6 +17567,19 @@ class DBProvAgent(object):
 
     vtType = 'prov_agent'
 
+    __slots__ = ('_db_id',
+                 '_db_vt_id',
+                 '_db_prov_type',
+                 '_db_prov_label',
+                 '_db_vt_machine_os',
+                 '_db_vt_machine_architecture',
+                 '_db_vt_machine_processor',
+                 '_db_vt_machine_ram',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, vt_id=None, prov_type=None, prov_label=None, vt_machine_os=None, vt_machine_architecture=None, vt_machine_processor=None, vt_machine_ram=None):
         self._db_id = id
         self._db_vt_id = vt_id
@@ -15718,6 +17592,17 @@ class DBProvAgent(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvAgent.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvAgent.do_copy(self)
 
@@ -16338,6 +18223,21 @@ class DBRegistry(object):
 
     vtType = 'registry'
 
+    __slots__ = ('_db_id',
+                 '_db_entity_type',
+                 '_db_version',
+                 '_db_root_descriptor_id',
+                 '_db_name',
+                 '_db_last_modified',
+                 '_db_packages',
+                 'db_deleted_packages',
+                 '_db_packages_id_index',
+                 '_db_packages_identifier_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, entity_type=None, version=None, root_descriptor_id=None, name=None, last_modified=None, packages=None):
         self._db_id = id
         self._db_entity_type = entity_type
@@ -16346,18 +18246,26 @@ class DBRegistry(object):
         self._db_name = name
         self._db_last_modified = last_modified
         self.db_deleted_packages = []
-        self.db_packages_id_index = {}
-        self.db_packages_identifier_index = {}
+        self._db_packages_id_index = None
+        self._db_packages_identifier_index = None
         if packages is None:
             self._db_packages = []
         else:
             self._db_packages = packages
-            for v in self._db_packages:
-                self.db_packages_id_index[v.db_id] = v
-                self.db_packages_identifier_index[(v.db_identifier,v.db_version)] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBRegistry.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBRegistry.do_copy(self)
 
@@ -16385,8 +18293,6 @@ class DBRegistry(object):
                 cp._db_root_descriptor_id = id_remap[('module_descriptor', self._db_root_descriptor_id)]
         
         # recreate indices and set flags
-        cp.db_packages_id_index = dict((v.db_id, v) for v in cp._db_packages)
-        cp.db_packages_identifier_index = dict(((v.db_identifier,v.db_version), v) for v in cp._db_packages)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -16557,8 +18463,10 @@ class DBRegistry(object):
     def db_add_package(self, package):
         self.is_dirty = True
         self._db_packages.append(package)
-        self.db_packages_id_index[package.db_id] = package
-        self.db_packages_identifier_index[(package.db_identifier,package.db_version)] = package
+        if self._db_packages_id_index is not None:
+            self._db_packages_id_index[package.db_id] = package
+        if self._db_packages_identifier_index is not None:
+            self._db_packages_identifier_index[(package.db_identifier,package.db_version)] = package
     def db_change_package(self, package):
         self.is_dirty = True
         found = False
@@ -16569,8 +18477,10 @@ class DBRegistry(object):
                 break
         if not found:
             self._db_packages.append(package)
-        self.db_packages_id_index[package.db_id] = package
-        self.db_packages_identifier_index[(package.db_identifier,package.db_version)] = package
+        if self._db_packages_id_index is not None:
+            self._db_packages_id_index[package.db_id] = package
+        if self._db_packages_identifier_index is not None:
+            self._db_packages_identifier_index[(package.db_identifier,package.db_version)] = package
     def db_delete_package(self, package):
         self.is_dirty = True
         for i in xrange(len(self._db_packages)):
@@ -16579,17 +18489,33 @@ class DBRegistry(object):
                     self.db_deleted_packages.append(self._db_packages[i])
                 del self._db_packages[i]
                 break
-        del self.db_packages_id_index[package.db_id]
-        del self.db_packages_identifier_index[(package.db_identifier,package.db_version)]
+        if self._db_packages_id_index is not None:
+            del self._db_packages_id_index[package.db_id]
+        if self._db_packages_identifier_index is not None:
+            del self._db_packages_identifier_index[(package.db_identifier,package.db_version)]
     def db_get_package(self, key):
         for i in xrange(len(self._db_packages)):
             if self._db_packages[i].db_id == key:
                 return self._db_packages[i]
         return None
+    def __get_db_packages_id_index(self):
+        if self._db_packages_id_index is None:
+            self._db_packages_id_index = dict((v.db_id, v) for v in self._db_packages)
+        return self._db_packages_id_index
+    def __set_db_packages_id_index(self, index):
+        self._db_packages_id_index = index
+    db_packages_id_index = property(__get_db_packages_id_index, __set_db_packages_id_index)
     def db_get_package_by_id(self, key):
         return self.db_packages_id_index[key]
     def db_has_package_with_id(self, key):
         return key in self.db_packages_id_index
+    def __get_db_packages_identifier_index(self):
+        if self._db_packages_identifier_index is None:
+            self._db_packages_identifier_index = dict(((v.db_identifier,v.db_version), v) for v in self._db_packages)
+        return self._db_packages_identifier_index
+    def __set_db_packages_identifier_index(self, index):
+        self._db_packages_identifier_index = index
+    db_packages_identifier_index = property(__get_db_packages_identifier_index, __set_db_packages_identifier_index)
     def db_get_package_by_identifier(self, key):
         return self.db_packages_identifier_index[key]
     def db_has_package_with_identifier(self, key):
@@ -16602,6 +18528,15 @@ class DBOpmAgent(object):
 
     vtType = 'opm_agent'
 
+    __slots__ = ('_db_id',
+                 '_db_value',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, value=None, accounts=None):
         self._db_id = id
         self._db_value = value
@@ -16613,6 +18548,17 @@ class DBOpmAgent(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmAgent.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmAgent.do_copy(self)
 
@@ -16748,6 +18694,25 @@ class DBProvEntity(object):
 
     vtType = 'prov_entity'
 
+    __slots__ = ('_db_id',
+                 '_db_prov_type',
+                 '_db_prov_label',
+                 '_db_prov_value',
+                 '_db_vt_id',
+                 '_db_vt_type',
+                 '_db_vt_desc',
+                 '_db_vt_package',
+                 '_db_vt_version',
+                 '_db_vt_cache',
+                 '_db_vt_location_x',
+                 '_db_vt_location_y',
+                 '_db_is_part_of',
+                 'db_deleted_is_part_of',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, prov_type=None, prov_label=None, prov_value=None, vt_id=None, vt_type=None, vt_desc=None, vt_package=None, vt_version=None, vt_cache=None, vt_location_x=None, vt_location_y=None, is_part_of=None):
         self._db_id = id
         self._db_prov_type = prov_type
@@ -16766,6 +18731,17 @@ class DBProvEntity(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvEntity.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvEntity.do_copy(self)
 
@@ -17190,6 +19166,14 @@ class DBOpmTime(object):
 
     vtType = 'opm_time'
 
+    __slots__ = ('_db_no_later_than',
+                 '_db_no_earlier_than',
+                 '_db_clock_id',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, no_later_than=None, no_earlier_than=None, clock_id=None):
         self._db_no_later_than = no_later_than
         self._db_no_earlier_than = no_earlier_than
@@ -17197,6 +19181,17 @@ class DBOpmTime(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmTime.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmTime.do_copy(self)
 
@@ -17300,6 +19295,21 @@ class DBParameterExploration(object):
 
     vtType = 'parameter_exploration'
 
+    __slots__ = ('_db_id',
+                 '_db_action_id',
+                 '_db_name',
+                 '_db_date',
+                 '_db_user',
+                 '_db_dims',
+                 '_db_layout',
+                 '_db_functions',
+                 'db_deleted_functions',
+                 '_db_functions_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, action_id=None, name=None, date=None, user=None, dims=None, layout=None, functions=None):
         self._db_id = id
         self._db_action_id = action_id
@@ -17309,16 +19319,25 @@ class DBParameterExploration(object):
         self._db_dims = dims
         self._db_layout = layout
         self.db_deleted_functions = []
-        self.db_functions_id_index = {}
+        self._db_functions_id_index = None
         if functions is None:
             self._db_functions = []
         else:
             self._db_functions = functions
-            for v in self._db_functions:
-                self.db_functions_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBParameterExploration.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBParameterExploration.do_copy(self)
 
@@ -17347,7 +19366,6 @@ class DBParameterExploration(object):
                 cp._db_action_id = id_remap[('action', self._db_action_id)]
         
         # recreate indices and set flags
-        cp.db_functions_id_index = dict((v.db_id, v) for v in cp._db_functions)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -17536,7 +19554,8 @@ class DBParameterExploration(object):
     def db_add_function(self, function):
         self.is_dirty = True
         self._db_functions.append(function)
-        self.db_functions_id_index[function.db_id] = function
+        if self._db_functions_id_index is not None:
+            self._db_functions_id_index[function.db_id] = function
     def db_change_function(self, function):
         self.is_dirty = True
         found = False
@@ -17547,7 +19566,8 @@ class DBParameterExploration(object):
                 break
         if not found:
             self._db_functions.append(function)
-        self.db_functions_id_index[function.db_id] = function
+        if self._db_functions_id_index is not None:
+            self._db_functions_id_index[function.db_id] = function
     def db_delete_function(self, function):
         self.is_dirty = True
         for i in xrange(len(self._db_functions)):
@@ -17556,12 +19576,20 @@ class DBParameterExploration(object):
                     self.db_deleted_functions.append(self._db_functions[i])
                 del self._db_functions[i]
                 break
-        del self.db_functions_id_index[function.db_id]
+        if self._db_functions_id_index is not None:
+            del self._db_functions_id_index[function.db_id]
     def db_get_function(self, key):
         for i in xrange(len(self._db_functions)):
             if self._db_functions[i].db_id == key:
                 return self._db_functions[i]
         return None
+    def __get_db_functions_id_index(self):
+        if self._db_functions_id_index is None:
+            self._db_functions_id_index = dict((v.db_id, v) for v in self._db_functions)
+        return self._db_functions_id_index
+    def __set_db_functions_id_index(self, index):
+        self._db_functions_id_index = index
+    db_functions_id_index = property(__get_db_functions_id_index, __set_db_functions_id_index)
     def db_get_function_by_id(self, key):
         return self.db_functions_id_index[key]
     def db_has_function_with_id(self, key):
@@ -17747,6 +19775,16 @@ class DBOpmProcess(object):
 
     vtType = 'opm_process'
 
+    __slots__ = ('_db_id',
+                 '_db_value',
+                 'db_deleted_value',
+                 '_db_accounts',
+                 'db_deleted_accounts',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, value=None, accounts=None):
         self._db_id = id
         self.db_deleted_value = []
@@ -17759,6 +19797,17 @@ class DBOpmProcess(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmProcess.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmProcess.do_copy(self)
 
@@ -17910,18 +19959,35 @@ class DBDisabledPackages(object):
 
     vtType = 'disabled_packages'
 
+    __slots__ = ('_db_packages',
+                 'db_deleted_packages',
+                 '_db_packages_name_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, packages=None):
         self.db_deleted_packages = []
-        self.db_packages_name_index = {}
+        self._db_packages_name_index = None
         if packages is None:
             self._db_packages = []
         else:
             self._db_packages = packages
-            for v in self._db_packages:
-                self.db_packages_name_index[v.db_name] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBDisabledPackages.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBDisabledPackages.do_copy(self)
 
@@ -17942,7 +20008,6 @@ class DBDisabledPackages(object):
             cp.db_id = new_id
         
         # recreate indices and set flags
-        cp.db_packages_name_index = dict((v.db_name, v) for v in cp._db_packages)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -18005,16 +20070,25 @@ class DBDisabledPackages(object):
     def db_add_package(self, package):
         self.is_dirty = True
         self._db_packages.append(package)
-        self.db_packages_name_index[package.db_name] = package
+        if self._db_packages_name_index is not None:
+            self._db_packages_name_index[package.db_name] = package
     def db_change_package(self, package):
         self.is_dirty = True
         self._db_packages.append(package)
-        self.db_packages_name_index[package.db_name] = package
+        if self._db_packages_name_index is not None:
+            self._db_packages_name_index[package.db_name] = package
     def db_delete_package(self, package):
         self.is_dirty = True
         raise Exception('Cannot delete a non-keyed object')
     def db_get_package(self, key):
         return None
+    def __get_db_packages_name_index(self):
+        if self._db_packages_name_index is None:
+            self._db_packages_name_index = dict((v.db_name, v) for v in self._db_packages)
+        return self._db_packages_name_index
+    def __set_db_packages_name_index(self, index):
+        self._db_packages_name_index = index
+    db_packages_name_index = property(__get_db_packages_name_index, __set_db_packages_name_index)
     def db_get_package_by_name(self, key):
         return self.db_packages_name_index[key]
     def db_has_package_with_name(self, key):
@@ -18026,6 +20100,26 @@ class DBModuleExec(object):
 
     vtType = 'module_exec'
 
+    __slots__ = ('_db_id',
+                 '_db_ts_start',
+                 '_db_ts_end',
+                 '_db_cached',
+                 '_db_module_id',
+                 '_db_module_name',
+                 '_db_completed',
+                 '_db_error',
+                 '_db_machine_id',
+                 '_db_annotations',
+                 'db_deleted_annotations',
+                 '_db_annotations_id_index',
+                 '_db_loop_execs',
+                 'db_deleted_loop_execs',
+                 '_db_loop_execs_id_index',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, id=None, ts_start=None, ts_end=None, cached=None, module_id=None, module_name=None, completed=None, error=None, machine_id=None, annotations=None, loop_execs=None):
         self._db_id = id
         self._db_ts_start = ts_start
@@ -18037,24 +20131,31 @@ class DBModuleExec(object):
         self._db_error = error
         self._db_machine_id = machine_id
         self.db_deleted_annotations = []
-        self.db_annotations_id_index = {}
+        self._db_annotations_id_index = None
         if annotations is None:
             self._db_annotations = []
         else:
             self._db_annotations = annotations
-            for v in self._db_annotations:
-                self.db_annotations_id_index[v.db_id] = v
         self.db_deleted_loop_execs = []
-        self.db_loop_execs_id_index = {}
+        self._db_loop_execs_id_index = None
         if loop_execs is None:
             self._db_loop_execs = []
         else:
             self._db_loop_execs = loop_execs
-            for v in self._db_loop_execs:
-                self.db_loop_execs_id_index[v.db_id] = v
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBModuleExec.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBModuleExec.do_copy(self)
 
@@ -18091,8 +20192,6 @@ class DBModuleExec(object):
                 cp._db_machine_id = id_remap[('machine', self._db_machine_id)]
         
         # recreate indices and set flags
-        cp.db_annotations_id_index = dict((v.db_id, v) for v in cp._db_annotations)
-        cp.db_loop_execs_id_index = dict((v.db_id, v) for v in cp._db_loop_execs)
         if not new_ids:
             cp.is_dirty = self.is_dirty
             cp.is_new = self.is_new
@@ -18340,7 +20439,8 @@ class DBModuleExec(object):
     def db_add_annotation(self, annotation):
         self.is_dirty = True
         self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_change_annotation(self, annotation):
         self.is_dirty = True
         found = False
@@ -18351,7 +20451,8 @@ class DBModuleExec(object):
                 break
         if not found:
             self._db_annotations.append(annotation)
-        self.db_annotations_id_index[annotation.db_id] = annotation
+        if self._db_annotations_id_index is not None:
+            self._db_annotations_id_index[annotation.db_id] = annotation
     def db_delete_annotation(self, annotation):
         self.is_dirty = True
         for i in xrange(len(self._db_annotations)):
@@ -18360,12 +20461,20 @@ class DBModuleExec(object):
                     self.db_deleted_annotations.append(self._db_annotations[i])
                 del self._db_annotations[i]
                 break
-        del self.db_annotations_id_index[annotation.db_id]
+        if self._db_annotations_id_index is not None:
+            del self._db_annotations_id_index[annotation.db_id]
     def db_get_annotation(self, key):
         for i in xrange(len(self._db_annotations)):
             if self._db_annotations[i].db_id == key:
                 return self._db_annotations[i]
         return None
+    def __get_db_annotations_id_index(self):
+        if self._db_annotations_id_index is None:
+            self._db_annotations_id_index = dict((v.db_id, v) for v in self._db_annotations)
+        return self._db_annotations_id_index
+    def __set_db_annotations_id_index(self, index):
+        self._db_annotations_id_index = index
+    db_annotations_id_index = property(__get_db_annotations_id_index, __set_db_annotations_id_index)
     def db_get_annotation_by_id(self, key):
         return self.db_annotations_id_index[key]
     def db_has_annotation_with_id(self, key):
@@ -18382,7 +20491,8 @@ class DBModuleExec(object):
     def db_add_loop_exec(self, loop_exec):
         self.is_dirty = True
         self._db_loop_execs.append(loop_exec)
-        self.db_loop_execs_id_index[loop_exec.db_id] = loop_exec
+        if self._db_loop_execs_id_index is not None:
+            self._db_loop_execs_id_index[loop_exec.db_id] = loop_exec
     def db_change_loop_exec(self, loop_exec):
         self.is_dirty = True
         found = False
@@ -18393,7 +20503,8 @@ class DBModuleExec(object):
                 break
         if not found:
             self._db_loop_execs.append(loop_exec)
-        self.db_loop_execs_id_index[loop_exec.db_id] = loop_exec
+        if self._db_loop_execs_id_index is not None:
+            self._db_loop_execs_id_index[loop_exec.db_id] = loop_exec
     def db_delete_loop_exec(self, loop_exec):
         self.is_dirty = True
         for i in xrange(len(self._db_loop_execs)):
@@ -18402,12 +20513,20 @@ class DBModuleExec(object):
                     self.db_deleted_loop_execs.append(self._db_loop_execs[i])
                 del self._db_loop_execs[i]
                 break
-        del self.db_loop_execs_id_index[loop_exec.db_id]
+        if self._db_loop_execs_id_index is not None:
+            del self._db_loop_execs_id_index[loop_exec.db_id]
     def db_get_loop_exec(self, key):
         for i in xrange(len(self._db_loop_execs)):
             if self._db_loop_execs[i].db_id == key:
                 return self._db_loop_execs[i]
         return None
+    def __get_db_loop_execs_id_index(self):
+        if self._db_loop_execs_id_index is None:
+            self._db_loop_execs_id_index = dict((v.db_id, v) for v in self._db_loop_execs)
+        return self._db_loop_execs_id_index
+    def __set_db_loop_execs_id_index(self, index):
+        self._db_loop_execs_id_index = index
+    db_loop_execs_id_index = property(__get_db_loop_execs_id_index, __set_db_loop_execs_id_index)
     def db_get_loop_exec_by_id(self, key):
         return self.db_loop_execs_id_index[key]
     def db_has_loop_exec_with_id(self, key):
@@ -18420,6 +20539,18 @@ class DBProvAssociation(object):
 
     vtType = 'prov_association'
 
+    __slots__ = ('_db_prov_activity',
+                 'db_deleted_prov_activity',
+                 '_db_prov_agent',
+                 'db_deleted_prov_agent',
+                 '_db_prov_plan',
+                 'db_deleted_prov_plan',
+                 '_db_prov_role',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, prov_activity=None, prov_agent=None, prov_plan=None, prov_role=None):
         self.db_deleted_prov_activity = []
         self._db_prov_activity = prov_activity
@@ -18431,6 +20562,17 @@ class DBProvAssociation(object):
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBProvAssociation.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBProvAssociation.do_copy(self)
 
@@ -18604,12 +20746,30 @@ class DBOpmProcessValue(object):
 
     vtType = 'opm_process_value'
 
+    __slots__ = ('_db_value',
+                 'db_deleted_value',
+                 'is_dirty',
+                 'is_new',
+                 '__dict__',
+                 '__weakref__')
+
     def __init__(self, value=None):
         self.db_deleted_value = []
         self._db_value = value
         self.is_dirty = True
         self.is_new = True
     
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in DBOpmProcessValue.__slots__:
+            if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.iteritems():
+            setattr(self, name, value)
+
     def __copy__(self):
         return DBOpmProcessValue.do_copy(self)
 
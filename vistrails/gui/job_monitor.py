@@ -38,11 +38,10 @@ from __future__ import division
 
 from PyQt4 import QtCore, QtGui
 
-from vistrails.core import debug
 from vistrails.core.configuration import get_vistrails_configuration, \
     get_vistrails_persistent_configuration
 from vistrails.core.modules.vistrails_module import ModuleSuspended
-from vistrails.core.vistrail.job import module_name
+from vistrails.core.vistrail.job import JobPoller, module_name
 from vistrails.gui import theme
 from vistrails.gui.common_widgets import QDockPushButton
 from vistrails.gui.vistrails_palette import QVistrailsPaletteInterface
@@ -140,6 +139,7 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
         self.timer_id = None
         self.updating_now = False
         self.widgets = {}
+        self.poller = JobPoller()
 
         self.layout = QtGui.QVBoxLayout()
 
@@ -150,7 +150,7 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
         buttonsLayout.addWidget(run_now)
         run_all = QDockPushButton("Check all")
         run_all.setToolTip("Check all jobs now")
-        run_all.clicked.connect(self.timerEvent)
+        run_all.clicked.connect(lambda: self.check_jobs(now=True))
         buttonsLayout.addWidget(run_all)
         label = QtGui.QLabel('Refresh interval (seconds):')
         buttonsLayout.addWidget(label)
@@ -228,6 +228,10 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
             if self.timer_id is not None:
                 self.killTimer(self.timer_id)
             self.timer_id = self.startTimer(refresh*1000)
+            self.poller.interval = refresh
+            self.poller.max_interval = max(
+                    refresh,
+                    get_vistrails_configuration().jobCheckMaxInterval)
         else:
             if self.timer_id:
                 self.killTimer(self.timer_id)
@@ -236,11 +240,13 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
         get_vistrails_persistent_configuration().jobCheckInterval = refresh
         self.updating_now = False
 
-    def update_job(self, job, force=True):
+    def update_job(self, job, force=True, check=True):
         """ Checks specified job
 
             force: bool - True means we should ask user to resume jobs
             that has been paused
+            check: bool - False means the status of the jobs has already
+            been checked by the poller
         """
         if isinstance(job, QJobItem):
             vistrail_item = job.vistrail()
@@ -251,7 +257,7 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
             job = None
         else:
             for workflow_item in job.workflowItems.values():
-                self.update_job(workflow_item, force)
+                self.update_job(workflow_item, force, check)
             return
         jm = vistrail_item.jobMonitor
         workflow = workflow_item.workflow
@@ -292,16 +298,11 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
             return
 
         job_items = workflow_item.jobs.values() if job is None else [job]
-        for job_item in job_items:
-            if job_item.job.finished or job_item.job.ready:
-                continue
-            try:
-                # call monitor
-                if jm.isDone(job_item.handle):
-                    job_item.job.ready = True
-            except Exception, e:
-                debug.critical("Error checking job %s: %s" %
-                               (workflow_item.text(0), e))
+        if check:
+            # checked now, regardless of when they are due
+            self.watch_jobs(job_items)
+            self.poller.check([job_item.job.id for job_item in job_items],
+                              force=True)
         if workflow_item.updateJobs():
             QJobView.instance().set_visible(True)
 
@@ -339,15 +340,45 @@ class QJobView(QtGui.QWidget, QVistrailsPaletteInterface):
                 workflow_item.execute()
                 self.updating_now = True
 
-    def check_jobs(self, job=None):
+    def watch_jobs(self, job_items):
+        """ Registers the running jobs with the poller
+        """
+        for job_item in job_items:
+            if (job_item.job.finished or job_item.job.ready or
+                    not job_item.handle):
+                continue
+            self.poller.watch(job_item.job.id, job_item.handle,
+                              lambda key, handle, job=job_item.job:
+                                  setattr(job, 'ready', True))
+
+    def check_jobs(self, job=None, now=False):
+        """ Checks the specified job, or all the jobs that are due
+
+            now: bool - True means all the jobs should be checked, even the
+            ones that were checked recently
+        """
         if self.updating_now:
             return
         self.updating_now = True
         try:
             if job is None:
+                # Check all the jobs that are due at once, so that they can
+                # be batched, then update the items
+                job_items = []
+                for i in xrange(self.jobView.topLevelItemCount()):
+                    vistrail_item = self.jobView.topLevelItem(i)
+                    for workflow_item in vistrail_item.workflowItems.values():
+                        if not workflow_item.workflowFinished:
+                            job_items.extend(workflow_item.jobs.values())
+                self.watch_jobs(job_items)
+                running = set(job_item.job.id for job_item in job_items)
+                for key in self.poller.keys():
+                    if key not in running:
+                        self.poller.unwatch(key)
+                self.poller.check(force=now)
                 for i in xrange(self.jobView.topLevelItemCount()):
                     vistrail_item = self.jobView.topLevelItem(i)
-                    self.update_job(vistrail_item, force=False)
+                    self.update_job(vistrail_item, force=False, check=False)
             else:
                 self.update_job(job)
         finally:
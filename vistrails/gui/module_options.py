@@ -105,6 +105,16 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
         self.portCombiner = QPortCombineTreeWidget(self.stateChanged)
         self.layout().addWidget(self.portCombiner)
         self.portCombiner.setVisible(False)
+
+        layout = QtGui.QHBoxLayout()
+        layout.addWidget(QtGui.QLabel("Parallel iterations:"))
+        self.parallelEdit = QtGui.QLineEdit()
+        self.parallelEdit.setValidator(QtGui.QIntValidator(1, 1024, self))
+        self.parallelEdit.setToolTip('Number of threads running the '
+                                     'iterations of the loop at the same time')
+        layout.addWidget(self.parallelEdit)
+        layout.addStretch(1)
+        self.layout().addLayout(layout)
         
         whileLayout = QtGui.QVBoxLayout()
 
@@ -209,6 +219,7 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
         self.feedInputEdit.textChanged.connect(self.stateChanged)
         self.feedOutputEdit.textChanged.connect(self.stateChanged)
         self.jobCacheButton.toggled.connect(self.stateChanged)
+        self.parallelEdit.textChanged.connect(self.stateChanged)
 
     def sizeHint(self):
         """ sizeHint() -> QSize
@@ -304,6 +315,7 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
             self.feedInputLabel.setVisible(False)
             self.feedOutputLabel.setVisible(False)
             self.portCombiner.setVisible(False)
+            self.parallelEdit.setEnabled(False)
             self.jobCacheButton.setEnabled(False)
             self.state_changed = False
             self.saveButton.setEnabled(False)
@@ -329,6 +341,8 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
         self.feedOutputLabel.setVisible(False)
         self.portCombiner.setVisible(False)
         self.portCombiner.setDefault(module)
+        self.parallelEdit.setEnabled(True)
+        self.parallelEdit.setText('')
         self.jobCacheButton.setEnabled(True)
         self.jobCacheButton.setChecked(False)
         if module.has_control_parameter_with_name(ModuleControlParam.LOOP_KEY):
@@ -339,6 +353,9 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
             self.portCombiner.setVisible(type not in ['pairwise', 'cartesian'])
             if type not in ['pairwise', 'cartesian']:
                 self.portCombiner.setValue(type)
+        if module.has_control_parameter_with_name(ModuleControlParam.LOOP_PARALLEL_KEY):
+            threads = module.get_control_parameter_by_name(ModuleControlParam.LOOP_PARALLEL_KEY).value
+            self.parallelEdit.setText(threads)
         if (module.has_control_parameter_with_name(ModuleControlParam.WHILE_COND_KEY) or
                 module.has_control_parameter_with_name(ModuleControlParam.WHILE_MAX_KEY)):
             self.whileButton.setChecked(True)
@@ -373,6 +390,8 @@ class QModuleOptions(QtGui.QDialog, QVistrailsPaletteInterface):
         else:
             value = self.portCombiner.getValue()
         values.append((ModuleControlParam.LOOP_KEY, value))
+        values.append((ModuleControlParam.LOOP_PARALLEL_KEY,
+                       self.parallelEdit.text()))
         _while = self.whileButton.isChecked()
         values.append((ModuleControlParam.WHILE_COND_KEY,
                        _while and self.condEdit.text()))
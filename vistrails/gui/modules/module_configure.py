@@ -214,6 +214,9 @@ class _DefaultModuleConfigurationWidget(StandardModuleConfigurationWidget):
         return QtCore.QSize(384, 512)
         
     def saveTriggered(self, checked = False):
+        # the module might be shared with copies of the pipeline
+        self.module = self.controller.current_pipeline.own_module(
+            self.module.id)
         for port in self.inputPorts:
             if (port.optional and
                 self.inputDict[port.name].checkState()==QtCore.Qt.Checked):
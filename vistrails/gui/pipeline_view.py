@@ -2343,13 +2343,15 @@ class QPipelineScene(QInteractiveGraphicsScene):
                 connection = pipeline.connections[c_id]
                 smid = connection.source.moduleId
                 s = connection.source.spec
-                if s and s.optional:
-                    smm = pipeline.modules[smid]
+                if (s and s.optional and s.name not in
+                        pipeline.modules[smid].visible_output_ports):
+                    smm = pipeline.own_module(smid)
                     smm.visible_output_ports.add(s.name)
                 dmid = connection.destination.moduleId   
                 d = connection.destination.spec
-                if d and d.optional:
-                    dmm = pipeline.modules[dmid]
+                if (d and d.optional and d.name not in
+                        pipeline.modules[dmid].visible_input_ports):
+                    dmm = pipeline.own_module(dmid)
                     dmm.visible_input_ports.add(d.name)
 
             # remove old connection shapes
@@ -3250,13 +3252,13 @@ class QPipelineScene(QInteractiveGraphicsScene):
         Toggles the breakpoint attribute for the module with given id
         """
         if self.controller:
-            module = self.controller.current_pipeline.modules[id]
+            module = self.controller.current_pipeline.own_module(id)
             module.toggle_breakpoint()
             self.recreate_module(self.controller.current_pipeline, id)
 
     def toggle_watched(self, id):
         if self.controller:
-            module = self.controller.current_pipeline.modules[id]
+            module = self.controller.current_pipeline.own_module(id)
             module.toggle_watched()
 
     def print_error(self, id):
@@ -41,4 +41,25 @@ from vistrails.core.configuration import ConfigurationObject
 
 from identifiers import *
 
-configuration = ConfigurationObject(env=(None, str))
+# cache_dir enables the cache of tool outputs; cache_size is in megabytes
+configuration = ConfigurationObject(env=(None, str),
+                                    cache_dir=(None, str),
+                                    cache_size=1024)
+
+
+def snapshot_key():
+    """Modules are created from the .clt files in the CLTools directory, so
+    the registry snapshot is only valid while they are unchanged.
+    """
+    import os
+    from vistrails.core.system import current_dot_vistrails
+
+    if name != "CLTools":
+        # standalone package: the tools are in the package directory
+        return None
+    location = os.path.join(current_dot_vistrails(), "CLTools")
+    if not os.path.isdir(location):
+        return []
+    return [[path, os.stat(os.path.join(location, path)).st_mtime]
+            for path in sorted(os.listdir(location))
+            if path.endswith('.clt')]
@@ -0,0 +1,329 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Content-addressed cache for the outputs of command-line tools.
+
+The outputs of an invocation are stored under a key that only depends on
+the tool's description and on the values of its inputs, input files being
+identified by the hash of their contents. Output files are stored once per
+distinct content in `objects/`, and each invocation's record (output
+values and file hashes) in `entries/`. When the files take more than the
+maximum size, the least recently used entries are removed along with the
+files that no other entry refers to.
+
+Files are written atomically (to a temporary file which is then renamed) so
+several processes can share the same directory.
+"""
+
+from __future__ import division
+
+import cPickle as pickle
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from vistrails.core import debug
+
+
+def file_hash(filename):
+    """Returns the SHA-1 hex digest of a file's contents.
+    """
+    hasher = hashlib.sha1()
+    with open(filename, 'rb') as fp:
+        chunk = fp.read(1 << 20)
+        while chunk:
+            hasher.update(chunk)
+            chunk = fp.read(1 << 20)
+    return hasher.hexdigest()
+
+
+def _write_atomic(path, write):
+    """Calls write(fileobj) on a temporary file then renames it to path.
+    """
+    dirname = os.path.dirname(path)
+    try:
+        os.makedirs(dirname)
+    except OSError:
+        if not os.path.isdir(dirname):
+            raise
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            write(fp)
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp, path)
+    except:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _copy_from(filename):
+    """Returns a function for _write_atomic() that copies that file.
+    """
+    def write(fp):
+        with open(filename, 'rb') as src:
+            shutil.copyfileobj(src, fp)
+    return write
+
+
+class OutputCache(object):
+    """A directory storing the outputs of command-line invocations.
+
+    Outputs are given as a dict mapping port names to either ('file',
+    filename) or ('value', value), where value can be pickled.
+    """
+    # Files without an entry are only removed once they are this old, as
+    # another process might be storing them right now
+    ORPHAN_AGE = 60
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, 'entries', key)
+
+    def get(self, key):
+        """get(key: str) -> dict or None
+
+        Returns the outputs stored for that key, with file outputs as
+        ('file', path_in_the_cache, suffix), or None.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as fp:
+                outputs = pickle.load(fp)
+        except IOError:
+            return None
+        except Exception, e:
+            debug.warning("Couldn't read CLTools cache entry %s" % key, e)
+            return None
+        result = {}
+        for name, output in outputs.iteritems():
+            if output[0] == 'file':
+                digest, suffix = output[1:]
+                object_path = self._object_path(digest)
+                if not os.path.isfile(object_path):
+                    return None
+                result[name] = ('file', object_path, suffix)
+            else:
+                result[name] = output
+        # Used for the least-recently-used eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, outputs):
+        """put(key: str, outputs: dict) -> bool
+
+        Stores the outputs for that key. Returns False if they couldn't be
+        stored.
+        """
+        entry = {}
+        try:
+            for name, output in outputs.iteritems():
+                if output[0] == 'file':
+                    filename = output[1]
+                    digest = file_hash(filename)
+                    object_path = self._object_path(digest)
+                    if not os.path.exists(object_path):
+                        _write_atomic(object_path, _copy_from(filename))
+                    entry[name] = ('file', digest,
+                                   os.path.splitext(filename)[1])
+                else:
+                    entry[name] = output
+            data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+            _write_atomic(self._entry_path(key), lambda fp: fp.write(data))
+        except (IOError, OSError, pickle.PicklingError, TypeError), e:
+            debug.warning("Couldn't store CLTools outputs in cache", e)
+            return False
+        try:
+            self.evict()
+        except (IOError, OSError), e:
+            # The outputs were stored, the cache is only over size for now
+            debug.warning("Couldn't evict entries from the CLTools cache", e)
+        return True
+
+    def evict(self):
+        """Removes entries and files until the files fit in max_size.
+
+        Entries are removed least recently used first, and a file is removed
+        when no entry refers to it anymore. Files removed concurrently by
+        another process are skipped.
+        """
+        def listdir(path):
+            try:
+                return os.listdir(path)
+            except OSError:
+                return []
+
+        sizes = {}
+        objects_dir = os.path.join(self.directory, 'objects')
+        for subdir in listdir(objects_dir):
+            subdir = os.path.join(objects_dir, subdir)
+            for digest in listdir(subdir):
+                if not digest.startswith('.tmp'):
+                    path = os.path.join(subdir, digest)
+                    try:
+                        sizes[digest] = os.stat(path).st_size
+                    except OSError:
+                        pass
+        total = sum(sizes.itervalues())
+        if total <= self.max_size:
+            return
+
+        entries = []
+        refcounts = dict((digest, 0) for digest in sizes)
+        entries_dir = os.path.join(self.directory, 'entries')
+        for key in listdir(entries_dir):
+            if key.startswith('.tmp'):
+                continue
+            path = os.path.join(entries_dir, key)
+            try:
+                mtime = os.stat(path).st_mtime
+                with open(path, 'rb') as fp:
+                    outputs = pickle.load(fp)
+            except Exception:
+                continue
+            digests = [output[1] for output in outputs.itervalues()
+                       if output[0] == 'file']
+            for digest in digests:
+                refcounts[digest] = refcounts.get(digest, 0) + 1
+            entries.append((mtime, path, digests))
+        entries.sort()
+
+        def remove_object(digest):
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                return 0
+            return sizes.pop(digest, 0)
+
+        now = time.time()
+        for digest, refcount in refcounts.items():
+            if refcount == 0:
+                path = self._object_path(digest)
+                try:
+                    if now - os.stat(path).st_mtime >= self.ORPHAN_AGE:
+                        total -= remove_object(digest)
+                except OSError:
+                    pass
+
+        for mtime, path, digests in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            for digest in digests:
+                refcounts[digest] -= 1
+                if refcounts[digest] == 0:
+                    total -= remove_object(digest)
+
+
+##############################################################################
+
+class TestOutputCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vt_cltools_cache_')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_file(self, name, contents):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as fp:
+            fp.write(contents)
+        return path
+
+    def test_roundtrip(self):
+        cache = OutputCache(os.path.join(self.directory, 'cache'), 1000)
+        self.assertIsNone(cache.get('key1'))
+        out = self.make_file('out.txt', 'contents')
+        self.assertTrue(cache.put('key1', {'f_out': ('file', out),
+                                           'return_code': ('value', 0)}))
+        outputs = cache.get('key1')
+        self.assertEqual(sorted(outputs), ['f_out', 'return_code'])
+        self.assertEqual(outputs['return_code'], ('value', 0))
+        kind, path, suffix = outputs['f_out']
+        self.assertEqual((kind, suffix), ('file', '.txt'))
+        with open(path, 'rb') as fp:
+            self.assertEqual(fp.read(), 'contents')
+        # Same content is only stored once
+        cache.put('key2', {'f_out': ('file', out)})
+        self.assertEqual(cache.get('key2')['f_out'][1], path)
+
+    def test_eviction(self):
+        cache = OutputCache(os.path.join(self.directory, 'cache'), 25)
+        for i in xrange(3):
+            out = self.make_file('out%d' % i, str(i) * 10)
+            cache.put('key%d' % i, {'out': ('file', out)})
+            # Makes sure the modification times are ordered
+            os.utime(cache._entry_path('key%d' % i), (i, i))
+        self.assertIsNone(cache.get('key0'))
+        self.assertIsNotNone(cache.get('key1'))
+        self.assertIsNotNone(cache.get('key2'))
+        # key1 was used last, key2 goes first
+        os.utime(cache._entry_path('key2'), (10, 10))
+        os.utime(cache._entry_path('key1'), (20, 20))
+        cache.put('key3', {'out': ('file', self.make_file('out3', 'x' * 10))})
+        self.assertIsNone(cache.get('key2'))
+        self.assertIsNotNone(cache.get('key1'))
+        self.assertIsNotNone(cache.get('key3'))
+
+    def test_eviction_concurrent_removal(self):
+        cache = OutputCache(os.path.join(self.directory, 'cache'), 5)
+        listdir = os.listdir
+        def listdir_with_removed(path):
+            # Lists files and directories that another process removed
+            return listdir(path) + ['.removed', 'removed']
+        os.listdir = listdir_with_removed
+        try:
+            out = self.make_file('out', 'x' * 10)
+            self.assertTrue(cache.put('key', {'out': ('file', out)}))
+        finally:
+            os.listdir = listdir
+        self.assertIsNone(cache.get('key'))
@@ -37,6 +37,7 @@
 from __future__ import division
 
 import errno
+import hashlib
 import json
 import os
 import shutil
@@ -46,10 +47,12 @@ import sys
 from vistrails.core.modules.vistrails_module import Module, ModuleError, IncompleteImplementation, new_module
 import vistrails.core.modules.module_registry
 from vistrails.core import debug
+from vistrails.core.modules.basic_modules import PathObject
 from vistrails.core.packagemanager import get_package_manager
 import vistrails.core.system
 from vistrails.core.system import packages_directory, vistrails_root_directory
 
+from .cache import OutputCache, file_hash
 import identifiers
 
 
@@ -65,6 +68,10 @@ class CLTools(Module):
     def compute(self):
         raise IncompleteImplementation # pragma: no cover
 
+    def is_cacheable(self):
+        # The stdout of a running process can only be read once
+        return not stdout_is_piped(self)
+
 
 SUFFIX = '.clt'
 DEFAULTFILESUFFIX = '.cld'
@@ -85,6 +92,199 @@ def _eintr_retry_call(func, *args):
             raise
 
 
+class ProcessPipe(object):
+    """The stdout of a tool that is still running.
+
+    It is set as the stdout output of a module whose stdout only goes to
+    another tool's stdin, so that the next process reads directly from it
+    instead of the data going through VisTrails. The consumer waits on the
+    upstream processes after its own process exits; if it never does (the
+    consumer failed or didn't run), finalize() kills them at the end of the
+    execution.
+    """
+    def __init__(self, module, process, return_code, upstream):
+        self.module = module
+        self.process = process
+        self.return_code = return_code
+        self.upstream = upstream
+        self.stream = process.stdout
+
+    def wait(self):
+        """Waits for this process and the ones feeding it to exit.
+
+        Returns a list of (tool_name, returncode) for the processes that
+        returned an unexpected code.
+        """
+        failed = []
+        for pipe in self.upstream:
+            failed.extend(pipe.wait())
+        self.process.wait()
+        if (self.return_code is not None and
+                self.process.returncode != self.return_code):
+            failed.append((self.module.tool_name, self.process.returncode))
+        return failed
+
+    def finalize(self):
+        """Kills the process if nothing waited on it.
+        """
+        self.stream.close()
+        if self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except OSError: # pragma: no cover
+                pass # Exited in the meantime
+            self.process.wait()
+
+
+def _is_simple(p_module):
+    """Whether a pipeline module runs once, without looping or control.
+    """
+    return p_module.list_depth == 0 and not p_module.control_parameters
+
+
+def stdout_is_piped(module):
+    """stdout_is_piped(module: CLTools) -> bool
+
+    Whether the stdout of that module can go straight into the next
+    process. This is the case if its only outgoing connection is from
+    stdout to the stdin of another CLTools module, and neither loops.
+    """
+    conf = getattr(module, 'conf', None)
+    pipeline = module.moduleInfo.get('pipeline')
+    if (conf is None or 'stdout' not in conf or pipeline is None or
+            get_output_cache() is not None):
+        return False
+    module_id = module.moduleInfo['moduleId']
+    if module_id not in pipeline.modules:
+        return False
+    edges = pipeline.graph.edges_from(module_id)
+    if len(edges) != 1 or not _is_simple(pipeline.modules[module_id]):
+        return False
+    dest_id, conn_id = edges[0]
+    connection = pipeline.connections[conn_id]
+    if connection.source.name != conf['stdout'][0]:
+        return False
+    p_dest = pipeline.modules[dest_id]
+    dest_class = p_dest.module_descriptor.module
+    if (not issubclass(dest_class, CLTools) or
+            'stdin' not in dest_class.conf or
+            connection.destination.name != dest_class.conf['stdin'][0]):
+        return False
+    stdin_connections = [
+            c_id for frm, c_id in pipeline.graph.edges_to(dest_id)
+            if (pipeline.connections[c_id].destination.name ==
+                    connection.destination.name)]
+    return len(stdin_connections) == 1 and _is_simple(p_dest)
+
+
+class Uncacheable(Exception):
+    """Raised when the outputs of an invocation can't be cached.
+    """
+
+
+def _value_signature(hasher, value):
+    """Feeds an input value to the hasher, files by their contents.
+    """
+    if isinstance(value, PathObject):
+        # Directories could change without us noticing
+        if not os.path.isfile(value.name):
+            raise Uncacheable
+        hasher.update('file:%s;' % file_hash(value.name))
+    elif isinstance(value, (list, tuple)):
+        hasher.update('list:%d;' % len(value))
+        for item in value:
+            _value_signature(hasher, item)
+    elif isinstance(value, (basestring, bool, int, long, float)):
+        hasher.update('%s:%r;' % (type(value).__name__, value))
+    else:
+        raise Uncacheable
+
+
+def get_output_cache():
+    """Returns the OutputCache, or None if caching is disabled.
+    """
+    if not configuration.check('cache_dir'):
+        return None
+    return OutputCache(configuration.cache_dir,
+                       configuration.cache_size * 1024 * 1024)
+
+
+def cache_key(module):
+    """Computes the key of an invocation in the output cache.
+
+    The key covers the tool description, the configured environment and
+    the values on each input port, input files being identified by their
+    contents. Returns None if the invocation can't be cached.
+    """
+    conf = module.conf
+    hasher = hashlib.sha1()
+    hasher.update(json.dumps(conf, sort_keys=True))
+    if configuration.check('env'):
+        hasher.update(configuration.env)
+    names = [name for type, name, klass, options in conf['args']
+             if type.lower() in ('input', 'inputoutput')]
+    if 'stdin' in conf:
+        names.append(conf['stdin'][0])
+    if 'options' in conf and 'env_port' in conf['options']:
+        names.append('env')
+    try:
+        for name in names:
+            hasher.update('port:%s;' % name)
+            _value_signature(hasher, module.force_get_input_list(name))
+    except Uncacheable:
+        return None
+    except (IOError, OSError), e:
+        debug.warning("Couldn't hash CLTools inputs", e)
+        return None
+    return hasher.hexdigest()
+
+
+def store_outputs(module, cache, key):
+    """Stores the outputs of a module that just ran in the cache.
+    """
+    outputs = {}
+    for name, value in module.outputPorts.iteritems():
+        if name == 'self':
+            continue
+        elif isinstance(value, PathObject):
+            if not os.path.isfile(value.name):
+                return
+            outputs[name] = ('file', value.name)
+        elif isinstance(value, (basestring, bool, int, long, float)):
+            outputs[name] = ('value', value)
+        else:
+            return
+    cache.put(key, outputs)
+
+
+def restore_outputs(module, cache, key):
+    """Sets the outputs of a module from the cache.
+
+    Returns False if the key is not in the cache.
+    """
+    outputs = cache.get(key)
+    if outputs is None:
+        return False
+    results = {}
+    for name, output in outputs.iteritems():
+        if output[0] == 'file':
+            path, suffix = output[1:]
+            # Copy so that downstream modules can't alter the cache
+            file = module.interpreter.filePool.create_file(suffix=suffix)
+            try:
+                shutil.copyfile(path, file.name)
+            except IOError:
+                # Evicted by another process
+                return False
+            results[name] = file
+        else:
+            results[name] = output[1]
+    for name, value in results.iteritems():
+        module.set_output(name, value)
+    module.annotate({'cltools_cache': key})
+    return True
+
+
 def _add_tool(path):
     # first create classes
     tool_name = os.path.basename(path)
@@ -102,7 +302,7 @@ def _add_tool(path):
         debug.critical("Package CLTools could not parse '%s'" % path, exc)
         return
 
-    def compute(self):
+    def run(self):
         """ 1. read inputs
             2. call with inputs
             3. set outputs
@@ -115,6 +315,12 @@ def _add_tool(path):
         open_files = []
         stdin = None
         kwargs = {}
+        # stdout goes directly to the next tool, this doesn't wait for the
+        # process to exit
+        pipe_stdout = stdout_is_piped(self)
+        upstream_pipes = []
+        # stdin can't be written with communicate() if stdout is piped
+        stdin_file = file_std or pipe_stdout
         for type, name, klass, options in self.conf['args']:
             type = type.lower()
             klass = klass.lower()
@@ -191,30 +397,37 @@ def _add_tool(path):
             type = type.lower()
             if self.has_input(name):
                 value = self.get_input(name)
-                if "file" == type:
-                    if file_std:
-                        f = open(value.name, 'rb')
-                    else:
-                        f = open(value.name, 'rb')
-                        stdin = f.read()
-                        f.close()
-                elif "string" == type:
-                    if file_std:
-                        file = self.interpreter.filePool.create_file()
-                        f = open(file.name, 'wb')
-                        f.write(value)
-                        f.close()
-                        f = open(file.name, 'rb')
-                    else:
-                        stdin = value
-                else: # pragma: no cover
-                    raise ValueError
-                if file_std:
-                    open_files.append(f)
-                    kwargs['stdin'] = f.fileno()
+                if isinstance(value, ProcessPipe):
+                    # Reads directly from the previous tool's process
+                    upstream_pipes.append(value)
+                    kwargs['stdin'] = value.stream
                 else:
-                    kwargs['stdin'] = subprocess.PIPE
-        if "stdout" in self.conf:
+                    if "file" == type:
+                        if stdin_file:
+                            f = open(value.name, 'rb')
+                        else:
+                            f = open(value.name, 'rb')
+                            stdin = f.read()
+                            f.close()
+                    elif "string" == type:
+                        if stdin_file:
+                            file = self.interpreter.filePool.create_file()
+                            f = open(file.name, 'wb')
+                            f.write(value)
+                            f.close()
+                            f = open(file.name, 'rb')
+                        else:
+                            stdin = value
+                    else: # pragma: no cover
+                        raise ValueError
+                    if stdin_file:
+                        open_files.append(f)
+                        kwargs['stdin'] = f.fileno()
+                    else:
+                        kwargs['stdin'] = subprocess.PIPE
+        if pipe_stdout:
+            kwargs['stdout'] = subprocess.PIPE
+        elif "stdout" in self.conf:
             if file_std:
                 name, type, options = self.conf["stdout"]
                 type = type.lower()
@@ -232,7 +445,15 @@ def _add_tool(path):
             else:
                 kwargs['stdout'] = subprocess.PIPE
         if "stderr" in self.conf:
-            if file_std:
+            if pipe_stdout and not file_std:
+                # Nothing reads the process' output while it runs, stderr
+                # goes to a file so that it can't block
+                file = self.interpreter.filePool.create_file(
+                        suffix=DEFAULTFILESUFFIX)
+                f = open(file.name, 'wb')
+                open_files.append(f)
+                kwargs['stderr'] = f.fileno()
+            elif file_std:
                 name, type, options = self.conf["stderr"]
                 type = type.lower()
                 file = self.interpreter.filePool.create_file(
@@ -311,8 +532,22 @@ def _add_tool(path):
         if 'dir' in self.conf:
             kwargs['cwd'] = self.conf['dir']
 
-        process = subprocess.Popen(args, **kwargs)
-        if file_std:
+        try:
+            process = subprocess.Popen(args, **kwargs)
+        finally:
+            # The processes now share the pipes, closing our end so that
+            # the writer gets SIGPIPE if the reader exits early
+            for pipe in upstream_pipes:
+                pipe.stream.close()
+        if pipe_stdout:
+            for f in open_files:
+                f.close()
+            name = self.conf["stdout"][0]
+            pipe = ProcessPipe(self, process, return_code, upstream_pipes)
+            self.interpreter.add_finalizer(pipe.finalize)
+            self.set_output(name, pipe)
+            return
+        elif file_std:
             process.wait()
         else:
             #if stdin:
@@ -324,6 +559,12 @@ def _add_tool(path):
             #if stderr:
             #    print "stderr:", len(stderr), stderr[:30]
 
+        failed = []
+        for pipe in upstream_pipes:
+            failed.extend(pipe.wait())
+        if failed:
+            raise ModuleError(self, "Upstream command %s returned %d" %
+                              failed[0])
         if return_code is not None:
             if process.returncode != return_code:
                 raise ModuleError(self, "Command returned %d (!= %d)" % (
@@ -368,6 +609,16 @@ def _add_tool(path):
                 else: # pragma: no cover
                     raise ValueError
 
+    def compute(self):
+        cache = get_output_cache()
+        key = None
+        if cache is not None:
+            key = cache_key(self)
+            if key is not None and restore_outputs(self, cache, key):
+                return
+        run(self)
+        if key is not None:
+            store_outputs(self, cache, key)
 
     # create docstring
     d = """This module is a wrapper for the command line tool '%s'""" % \
@@ -586,3 +837,75 @@ class TestCLTools(unittest.TestCase):
         """With std_using_files: use files instead of pipes.
         """
         self.do_the_test('intern_cltools_2')
+
+    def run_chain(self, codes):
+        """Runs intern_cltools_3 several times, connected stdout to stdin.
+        """
+        modules = []
+        connections = []
+        for i, code in enumerate(codes):
+            functions = [('tag', [('String', 'abc'[i])]),
+                         ('code', [('Integer', str(code))])]
+            if i == 0:
+                functions.append(('stdin', [('String', 'x:')]))
+            else:
+                connections.append((i - 1, 'stdout', i, 'stdin'))
+            modules.append(('intern_cltools_3',
+                            'org.vistrails.vistrails.cltools', functions))
+        with intercept_results(self._tools['intern_cltools_3'],
+                               'stdout') as (stdout,):
+            errors = execute(modules, connections)
+        return errors, stdout
+
+    def test_pipe_chain(self):
+        """Chained tools are connected with OS pipes.
+        """
+        errors, stdout = self.run_chain([0, 0, 0])
+        self.assertFalse(errors)
+        self.assertEqual(len(stdout), 3)
+        self.assertIsInstance(stdout[0], ProcessPipe)
+        self.assertIsInstance(stdout[1], ProcessPipe)
+        self.assertEqual(stdout[2], 'x:abc')
+
+    def test_pipe_chain_failure(self):
+        """A failing tool in a chain makes the last module fail.
+        """
+        errors, stdout = self.run_chain([0, 2, 0])
+        self.assertEqual(errors.keys(), [2])
+        self.assertIn("returned 2", errors[2].msg)
+
+    def test_pipe_not_consumed(self):
+        """A tool whose reader fails to start is terminated afterwards.
+        """
+        old_popen = subprocess.Popen
+        def popen(*args, **kwargs):
+            if 'stdin' in kwargs and not isinstance(kwargs['stdin'], int):
+                # The reader, getting the previous tool's stdout
+                raise OSError(errno.ENOENT, "No such file or directory")
+            return old_popen(*args, **kwargs)
+        subprocess.Popen = popen
+        try:
+            errors, stdout = self.run_chain([0, 0])
+        finally:
+            subprocess.Popen = old_popen
+        self.assertEqual(errors.keys(), [1])
+        self.assertIsInstance(stdout[0], ProcessPipe)
+        self.assertIsNotNone(stdout[0].process.returncode)
+
+    def test_output_cache(self):
+        """With cache_dir set, the tool doesn't run again for same inputs.
+        """
+        import tempfile
+        cache_dir = tempfile.mkdtemp(prefix='vt_cltools_cache_')
+        old_popen = subprocess.Popen
+        configuration.cache_dir = cache_dir
+        try:
+            self.do_the_test('intern_cltools_1')
+            def popen(*args, **kwargs):
+                self.fail("Tool was run despite cached outputs")
+            subprocess.Popen = popen
+            self.do_the_test('intern_cltools_1')
+        finally:
+            subprocess.Popen = old_popen
+            configuration.cache_dir = None
+            shutil.rmtree(cache_dir)
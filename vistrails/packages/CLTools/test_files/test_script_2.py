@@ -0,0 +1,17 @@
+# pragma: no testimport
+
+from __future__ import division
+
+import sys
+
+
+if __name__ == '__main__':
+    # Copies stdin to stdout, appending the first argument, then exits with
+    # the second argument as return code
+    tag, code = sys.argv[1:]
+    data = sys.stdin.read(4096)
+    while data:
+        sys.stdout.write(data)
+        data = sys.stdin.read(4096)
+    sys.stdout.write(tag)
+    sys.exit(int(code))
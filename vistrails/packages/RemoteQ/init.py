@@ -90,6 +90,50 @@ class Machine(Module):
         end_machine()
         return machine
 
+class PBSHandle(object):
+    """ Wraps a PBS job so that the JobMonitor can check many jobs at once.
+
+    This implements the JobHandle interface by forwarding to the RemoteQ job,
+    and adds batch_key() and batch_finished() so that the status of all the
+    jobs on the same machine is read from a single qstat command.
+    """
+    def __init__(self, job, job_id, machine):
+        self.job = job
+        self.job_id = str(job_id).strip()
+        self.machine = machine
+
+    def __getattr__(self, name):
+        return getattr(self.job, name)
+
+    def finished(self):
+        return self.job.finished()
+
+    def batch_key(self):
+        params = self.machine.params
+        return ('pbs', params['server'], params['port'], params['username'])
+
+    def batch_finished(self, handles):
+        use_machine(self.machine)
+        try:
+            m = current_machine()
+            output = m.remote.send_command("qstat")
+            exitcode = m.remote.last_exitcode()
+        finally:
+            end_machine()
+        if exitcode != 0:
+            raise RuntimeError("qstat failed with exit code %s: %s" %
+                               (exitcode, output))
+        # qstat may truncate the job ids, so match on the sequence number
+        states = {}
+        for line in output.split('\n'):
+            fields = line.split()
+            if len(fields) >= 6:
+                states[fields[0].split('.')[0]] = fields[4]
+        # jobs that are no longer listed have finished
+        return [states.get(h.job_id.split('.')[0], 'C') == 'C'
+                for h in handles]
+
+
 class RQModule(JobMixin, Module):
     """ This is the base class of all RemoteQ modules and handles the
         connections to servers
@@ -340,6 +384,8 @@ class PBSJob(RQModule):
                     status += ': ' + comment[10:]
             end_machine()
             # The PBS class provides the JobHandle interface, i.e. finished()
+            if ret:
+                job = PBSHandle(job, ret, machine)
             raise ModuleSuspended(self, '%s' % status, handle=job)
         # copies the created files to the client
         get_result = TransferFiles("local", input_directory, working_directory,
@@ -375,6 +421,7 @@ class RunPBSScript(RQModule):
                     ]
     
     job = None
+    job_id = None
     def job_read_inputs(self):
         d = {}
         if not self.has_input('command'):
@@ -409,12 +456,15 @@ class RunPBSScript(RQModule):
             except ValueError:
                 end_machine()
                 raise ModuleError(self, "Error submitting job: %s" % ret)
+            self.job_id = ret.split('\n')[0]
         self.set_job_machine(params, self.machine)
         return params
         
     def job_get_handle(self, params):
         if not self.job:
             self.job_start(params)
+        if self.job_id is not None:
+            return PBSHandle(self.job, self.job_id, self.machine)
         return self.job
 
     def job_finish(self, params):
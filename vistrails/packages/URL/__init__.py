@@ -46,4 +46,10 @@ check is performed efficiently using HTTP headers.
 
 from __future__ import division
 
+from vistrails.core.configuration import ConfigurationObject
+
 from identifiers import *
+
+# Number of files that HTTPDirectory and DownloadFile (when looping over a
+# list of URLs) download at the same time
+configuration = ConfigurationObject(downloadThreads=4)
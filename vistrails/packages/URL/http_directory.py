@@ -41,8 +41,13 @@ from __future__ import division
 from HTMLParser import HTMLParser
 import os
 import re
+import shutil
 
 from .https_if_available import build_opener
+from .workers import run_tasks
+
+
+BUFFER_SIZE = 256 * 1024
 
 
 re_url = re.compile(r'^(([a-zA-Z_-]+)://([^/]+))(/.*)?$')
@@ -92,51 +97,55 @@ class ListingParser(HTMLParser):
                     break
 
 
-def download_directory(url, target, insecure=False):
-    def mkdir():
-        if not mkdir.done:
-            try:
-                os.mkdir(target)
-            except OSError:
-                pass
-            mkdir.done = True
-    mkdir.done = False
+def download_directory(url, target, insecure=False, nb_threads=4):
+    """Downloads the files under url into the target directory.
 
+    Listings and files are fetched by nb_threads threads; the opener keeps
+    their connections alive between requests.
+    """
     opener = build_opener(insecure=insecure)
-    response = opener.open(url)
-
-    if response.info().type == 'text/html':
-        contents = response.read()
-
-        parser = ListingParser(url)
-        parser.feed(contents)
-        for link in parser.links:
-            link = resolve_link(link, url)
-            if link[-1] == '/':
-                link = link[:-1]
-            if not link.startswith(url):
-                continue
-            name = link.rsplit('/', 1)[1]
-            if '?' in name:
-                continue
-            mkdir()
-            download_directory(link, os.path.join(target, name), insecure)
-        if not mkdir.done:
-            # We didn't find anything to write inside this directory
-            # Maybe it's a HTML file?
-            if url[-1] != '/':
-                end = target[-5:].lower()
-                if not (end.endswith('.htm') or end.endswith('.html')):
-                    target = target + '.html'
-                with open(target, 'wb') as fp:
-                    fp.write(contents)
-    else:
-        buffer_size = 4096
-        with open(target, 'wb') as fp:
-            chunk = response.read(buffer_size)
-            while chunk:
-                fp.write(chunk)
-                chunk = response.read(buffer_size)
+
+    def fetch(task, add_task):
+        url, target = task
+        response = opener.open(url)
+
+        if response.info().type == 'text/html':
+            contents = response.read()
+
+            parser = ListingParser(url)
+            parser.feed(contents)
+            created = False
+            for link in parser.links:
+                link = resolve_link(link, url)
+                if link[-1] == '/':
+                    link = link[:-1]
+                if not link.startswith(url):
+                    continue
+                name = link.rsplit('/', 1)[1]
+                if '?' in name:
+                    continue
+                if not created:
+                    try:
+                        os.mkdir(target)
+                    except OSError:
+                        pass
+                    created = True
+                add_task((link, os.path.join(target, name)))
+            if not created:
+                # We didn't find anything to write inside this directory
+                # Maybe it's a HTML file?
+                if url[-1] != '/':
+                    end = target[-5:].lower()
+                    if not (end.endswith('.htm') or end.endswith('.html')):
+                        target = target + '.html'
+                    with open(target, 'wb') as fp:
+                        fp.write(contents)
+        else:
+            with open(target, 'wb') as fp:
+                shutil.copyfileobj(response, fp, BUFFER_SIZE)
+            response.close()
+
+    run_tasks([(url, target)], fetch, nb_threads)
 
 
 ###############################################################################
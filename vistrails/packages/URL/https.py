@@ -49,6 +49,9 @@ import ssl
 import certifi
 from backports.ssl_match_hostname import match_hostname
 
+from .keepalive import KeepAliveHandler, KeepAliveHTTPHandler, \
+    KeepAliveHTTPSHandler
+
 
 __all__ = ['VerifiedHTTPSHandler', 'https_handler', 'build_opener']
 
@@ -79,7 +82,7 @@ class CertValidatingHTTPSConnection(httplib.HTTPConnection):
             match_hostname(cert, hostname)
 
 
-class VerifiedHTTPSHandler(urllib2.HTTPSHandler):
+class VerifiedHTTPSHandler(KeepAliveHandler, urllib2.HTTPSHandler):
     def __init__(self, **kwargs):
         urllib2.HTTPSHandler.__init__(self)
         self._connection_args = kwargs
@@ -105,5 +108,7 @@ def build_opener(*handlers, **kwargs):
 
     if not insecure:
         handlers = handlers + (https_handler,)
-    handlers = handlers + (urllib2.ProxyHandler(),)
+    else:
+        handlers = handlers + (KeepAliveHTTPSHandler(),)
+    handlers = handlers + (KeepAliveHTTPHandler(), urllib2.ProxyHandler())
     return urllib2.build_opener(*handlers)
@@ -41,6 +41,8 @@ import urllib2
 from vistrails.core.bundles.pyimport import py_import
 from vistrails.core import debug
 
+from .keepalive import KeepAliveHTTPHandler, KeepAliveHTTPSHandler
+
 
 try:
     py_import('certifi', {
@@ -56,6 +58,7 @@ except ImportError:
         if not insecure:
             debug.warning("Unable to use secure SSL requests -- please "
                           "install certifi and ssl_match_hostname")
+        args = args + (KeepAliveHTTPHandler(), KeepAliveHTTPSHandler())
         return urllib2.build_opener(*args, **kwargs)
 else:
     from .https import *
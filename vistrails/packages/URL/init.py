@@ -48,8 +48,11 @@ from __future__ import division
 
 from datetime import datetime
 import email.utils
+import httplib
 import os
 import re
+import threading
+import time
 import urllib
 import urllib2
 
@@ -64,6 +67,7 @@ from vistrails.core.bundles.pyimport import py_import
 from vistrails.core import debug
 import vistrails.core.modules.basic_modules
 from vistrails.core.modules.basic_modules import PathObject
+from vistrails.core.modules.config import ModuleSettings
 import vistrails.core.modules.module_registry
 from vistrails.core.modules.vistrails_module import Module, ModuleError
 from vistrails.core.system import current_dot_vistrails, strptime
@@ -72,6 +76,7 @@ from vistrails.core.upgradeworkflow import UpgradeWorkflowHandler
 from .identifiers import identifier
 from .http_directory import download_directory
 from .https_if_available import build_opener
+from .workers import run_tasks
 
 
 package_directory = None
@@ -79,6 +84,14 @@ package_directory = None
 MAX_CACHE_FILENAME = 100
 
 
+# Size of the reads from the network, adapted to the transfer rate
+CHUNK_SIZE = 64 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+_re_content_range = re.compile(r'^bytes ([0-9]+)-')
+
+
 ###############################################################################
 
 def cache_filename(url):
@@ -91,13 +104,45 @@ def cache_filename(url):
         return url[:MAX_CACHE_FILENAME - 41] + "_" + hasher.hexdigest()
 
 
+_cache_locks = {}
+_cache_locks_lock = threading.Lock()
+
+def cache_file_lock(filename):
+    """Returns the lock guarding a file of the local cache.
+    """
+    with _cache_locks_lock:
+        try:
+            return _cache_locks[filename]
+        except KeyError:
+            lock = _cache_locks[filename] = threading.Lock()
+            return lock
+
+
+def next_chunk_size(chunk_size, received, elapsed):
+    """Returns the size of the next read from the network.
+
+    Reads that fill up quickly double the size, so that fast transfers are
+    not slowed down by small reads; slow reads halve it, so that progress is
+    still reported regularly.
+    """
+    if received >= chunk_size and elapsed < 0.1:
+        return min(chunk_size * 2, MAX_CHUNK_SIZE)
+    elif elapsed > 1.0:
+        return max(chunk_size // 2, MIN_CHUNK_SIZE)
+    return chunk_size
+
+
 ###############################################################################
 
 class Downloader(object):
+    # How many times an interrupted transfer is resumed before giving up
+    retries = 3
+
     def __init__(self, url, module, insecure):
         self.url = url
         self.module = module
         self.opener = build_opener(insecure=insecure)
+        self.report_progress = True
 
     def execute(self):
         """ Tries to download a file from url.
@@ -106,7 +151,13 @@ class Downloader(object):
         """
         self.local_filename = os.path.join(package_directory,
                                            cache_filename(self.url))
+        self.partial_filename = self.local_filename + '.part'
+        self.offset = 0
+
+        with cache_file_lock(self.local_filename):
+            return self._execute()
 
+    def _execute(self):
         # Before download
         self.pre_download()
 
@@ -149,30 +200,67 @@ class Downloader(object):
 
     def download(self, response):
         try:
-            dl_size = 0
-            CHUNKSIZE = 4096
-            f2 = open(self.local_filename, 'wb')
-            while True:
-                if self.size_header is not None:
-                    self.module.logging.update_progress(
-                            self.module,
-                            dl_size * 1.0/self.size_header)
-                chunk = response.read(CHUNKSIZE)
-                if not chunk:
-                    break
-                dl_size += len(chunk)
-                f2.write(chunk)
-            f2.close()
+            self.transfer(response)
+        except Exception, e:
+            self.discard_partial()
+            raise ModuleError(
+                    self.module,
+                    "Error retrieving URL: %s" % debug.format_exception(e))
+        self.complete_partial()
+
+    def transfer(self, response):
+        """Writes the body of the response to the partial file.
+
+        The body is written at self.offset, which is updated as data is
+        written so that an interrupted transfer can be resumed from there.
+        """
+        chunk_size = CHUNK_SIZE
+        try:
+            if self.offset:
+                f2 = open(self.partial_filename, 'r+b')
+                f2.seek(self.offset)
+                f2.truncate()
+            else:
+                f2 = open(self.partial_filename, 'wb')
+            with f2:
+                while True:
+                    if (self.size_header is not None and
+                            self.report_progress):
+                        self.module.logging.update_progress(
+                                self.module,
+                                self.offset * 1.0/self.size_header)
+                    start = time.time()
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    chunk_size = next_chunk_size(chunk_size, len(chunk),
+                                                 time.time() - start)
+                    f2.write(chunk)
+                    self.offset += len(chunk)
+        finally:
             response.close()
+        # httplib doesn't report connections closed early
+        if self.size_header is not None and self.offset < self.size_header:
+            raise httplib.IncompleteRead('', self.size_header - self.offset)
 
-        except Exception, e:
+    def complete_partial(self):
+        """Moves the downloaded file in place in the cache.
+        """
+        if os.name == 'nt' and os.path.exists(self.local_filename):
+            os.remove(self.local_filename)
+        os.rename(self.partial_filename, self.local_filename)
+        try:
+            os.remove(self.partial_filename + '.etag')
+        except OSError:
+            pass
+
+    def discard_partial(self):
+        for filename in (self.partial_filename,
+                         self.partial_filename + '.etag'):
             try:
-                os.unlink(self.local_filename)
+                os.unlink(filename)
             except OSError:
                 pass
-            raise ModuleError(
-                    self.module,
-                    "Error retrieving URL: %s" % debug.format_exception(e))
 
     def post_download(self, response):
         pass
@@ -191,9 +279,23 @@ class HTTPDownloader(Downloader):
         except IOError:
             self.etag = None
 
+        # Partial file left by an interrupted transfer, with the ETag or
+        # Last-Modified date of the version it is part of
+        self.validator = None
+        try:
+            with open(self.partial_filename + '.etag') as validator_file:
+                validator = validator_file.read()
+            offset = os.path.getsize(self.partial_filename)
+        except (IOError, OSError):
+            pass
+        else:
+            if validator and offset:
+                self.validator = validator
+                self.offset = offset
+
     def send_request(self):
         try:
-            request = urllib2.Request(self.url)
+            request = self.range_request()
             if self.etag is not None:
                 request.add_header(
                     'If-None-Match',
@@ -207,13 +309,49 @@ class HTTPDownloader(Downloader):
                     mtime)
             except OSError:
                 pass
-            return self.opener.open(request)
+            return self.open_range(request)
         except urllib2.HTTPError, e:
             if e.code == 304:
                 # Not modified
+                if e.fp is not None:
+                    e.close()
                 return None
             raise
 
+    def range_request(self):
+        """Builds a request for the data after self.offset.
+
+        The If-Range header makes the server send the whole file instead if
+        it changed since the partial file was written.
+        """
+        request = urllib2.Request(self.url)
+        if self.offset and self.validator:
+            request.add_header('Range', 'bytes=%d-' % self.offset)
+            request.add_header('If-Range', self.validator)
+        return request
+
+    def open_range(self, request):
+        try:
+            response = self.opener.open(request)
+        except urllib2.HTTPError, e:
+            if e.code != 416 or not self.offset:
+                raise
+            # Range not satisfiable, the partial file is no good
+            self.discard_partial()
+            self.offset = 0
+            return self.opener.open(self.url)
+        if response.getcode() == 206:
+            m = _re_content_range.match(
+                    response.headers.get('content-range', ''))
+            if m is None or int(m.group(1)) != self.offset:
+                # Not the range we asked for, get the whole file
+                response.close()
+                self.offset = 0
+                return self.opener.open(self.url)
+        else:
+            self.offset = 0
+        return response
+
     def read_headers(self, response):
         try:
             self.mod_header = response.headers['last-modified']
@@ -223,9 +361,15 @@ class HTTPDownloader(Downloader):
             size_header = response.headers['content-length']
             if not size_header:
                 raise ValueError
-            self.size_header = int(size_header)
+            self.size_header = int(size_header) + self.offset
         except (KeyError, ValueError):
             self.size_header = None
+        # Weak ETags can't be used to resume
+        etag = response.headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            self.validator = etag
+        else:
+            self.validator = self.mod_header
         return True
 
     def _is_outdated(self):
@@ -246,9 +390,43 @@ class HTTPDownloader(Downloader):
         return remote_time > local_time
 
     def download(self, response):
-        if (not self.is_in_local_cache or
+        if (self.offset or not self.is_in_local_cache or
                 not self.mod_header or self._is_outdated()):
-            Downloader.download(self, response)
+            self.resumable_download(response)
+
+    def resumable_download(self, response):
+        """Downloads the file, resuming the transfer on network errors.
+
+        If it still fails, the partial file is kept so that the next
+        execution can resume from there.
+        """
+        if self.validator:
+            with open(self.partial_filename + '.etag', 'w') as validator_file:
+                validator_file.write(self.validator)
+        retries = self.retries
+        while True:
+            try:
+                self.transfer(response)
+                break
+            except (IOError, httplib.HTTPException), e:
+                resumable = self.validator and self.offset
+                if not resumable:
+                    self.discard_partial()
+                if not resumable or not retries:
+                    raise ModuleError(
+                            self.module,
+                            "Error retrieving URL: %s" %
+                            debug.format_exception(e))
+            retries -= 1
+            debug.warning("Download of %s interrupted after %d bytes, "
+                          "resuming" % (self.url, self.offset))
+            try:
+                response = self.open_range(self.range_request())
+            except urllib2.URLError, e:
+                raise ModuleError(
+                        self.module,
+                        "Network error: %s" % debug.format_exception(e))
+        self.complete_partial()
 
     def post_download(self, response):
         try:
@@ -384,7 +562,14 @@ class DownloadFile(Module):
             Note that nothing is url encoded, that the path can be relative
             (to the user's home directory) and that no username or port can
             be specified
+
+    When looping over a list of URLs, the files are downloaded concurrently.
     """
+    _settings = ModuleSettings(thread_safe=True)
+
+    # url -> (True, local_filename) or (False, error message), filled before
+    # looping over a list of URLs
+    _prefetched = None
 
     def compute(self):
         self.check_input('url')
@@ -395,11 +580,45 @@ class DownloadFile(Module):
         result = PathObject(local_filename)
         self.set_output('file', result)
 
+    def compute_all(self):
+        ports = [port for port, depth, value in self.iterated_ports]
+        if self.list_depth == 1 and ports == ['url']:
+            self.prefetch(self.get_input('url'), self.get_input('insecure'))
+        try:
+            Module.compute_all(self)
+        finally:
+            self._prefetched = None
+
+    def prefetch(self, urls, insecure):
+        """Downloads all the URLs concurrently.
+
+        The iterations of the loop then use the results.
+        """
+        results = {}
+
+        def fetch(url, add_task):
+            scheme = urllib2.splittype(url)[0]
+            downloader = downloaders.get(scheme, Downloader)(url, self,
+                                                             insecure)
+            downloader.report_progress = False
+            try:
+                results[url] = True, downloader.execute()
+            except ModuleError, e:
+                results[url] = False, e.msg
+
+        run_tasks(set(urls), fetch, configuration.downloadThreads)
+        self._prefetched = results
+
     def download(self, url, insecure):
         """ Tries to download a file from url.
 
         Returns the path to the local file.
         """
+        if self._prefetched is not None and url in self._prefetched:
+            success, result = self._prefetched[url]
+            if not success:
+                raise ModuleError(self, result)
+            return result
         scheme = urllib2.splittype(url)[0]
         DL = downloaders.get(scheme, Downloader)
         return DL(url, self, insecure).execute()
@@ -421,7 +640,8 @@ class HTTPDirectory(Module):
     def download(self, url, insecure):
         local_path = self.interpreter.filePool.create_directory(
                 prefix='vt_http').name
-        download_directory(url, local_path, insecure)
+        download_directory(url, local_path, insecure,
+                           configuration.downloadThreads)
         return local_path
 
 
@@ -612,6 +832,125 @@ class TestDownloadFile(unittest.TestCase):
             ]))
 
 
+class TestResume(unittest.TestCase):
+    """Interrupted transfers are resumed with a Range request.
+    """
+    DATA = ''.join(chr(i % 251) for i in xrange(300000))
+
+    @classmethod
+    def setUpClass(cls):
+        import BaseHTTPServer
+        import SocketServer
+
+        from vistrails.core.packagemanager import get_package_manager
+        from vistrails.core.modules.module_registry import MissingPackage
+        pm = get_package_manager()
+        try:
+            pm.get_package('org.vistrails.vistrails.http')
+        except MissingPackage:
+            pm.late_enable_package('URL')
+
+        cls.requests = requests = []
+        data = cls.DATA
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                requests.append((self.path, self.headers.get('Range')))
+                start = 0
+                m = re.match(r'^bytes=([0-9]+)-$',
+                             self.headers.get('Range', ''))
+                if m is not None and self.headers.get('If-Range') == '"v1"':
+                    start = int(m.group(1))
+                    self.send_response(206)
+                    self.send_header('Content-Range', 'bytes %d-%d/%d' % (
+                                     start, len(data) - 1, len(data)))
+                else:
+                    self.send_response(200)
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Length', str(len(data) - start))
+                self.end_headers()
+                if requests.count(('/file', None)) == 1 and start == 0:
+                    # Drop the first connection in the middle of the body
+                    self.wfile.write(data[:100000])
+                    self.close_connection = 1
+                else:
+                    self.wfile.write(data[start:])
+
+            def log_message(self, *args):
+                pass
+
+        class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+
+        cls.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        from .keepalive import connection_pool
+        connection_pool.clear()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_resume(self):
+        from vistrails.tests.utils import execute, intercept_result
+        url = 'http://127.0.0.1:%d/file' % self.server.server_address[1]
+        with intercept_result(DownloadFile, 'local_filename') as results:
+            self.assertFalse(execute([
+                    ('DownloadFile', identifier, [
+                        ('url', [('String', url)]),
+                    ]),
+                ]))
+        self.assertEqual([r for r in self.requests if r[0] == '/file'],
+                         [('/file', None), ('/file', 'bytes=100000-')])
+        with open(results[0], 'rb') as fp:
+            self.assertTrue(fp.read() == self.DATA)
+        os.remove(results[0])
+        os.remove(results[0] + '.etag')
+
+    def test_list(self):
+        """Looping over a list of URLs.
+        """
+        from vistrails.tests.utils import execute, intercept_result
+        url = 'http://127.0.0.1:%d/list' % self.server.server_address[1]
+        urls = ['%s%d' % (url, i) for i in xrange(5)]
+        with intercept_result(DownloadFile, 'local_filename') as results:
+            self.assertFalse(execute([
+                    ('List', 'org.vistrails.vistrails.basic', [
+                        ('value', [('List', repr(urls))]),
+                    ]),
+                    ('DownloadFile', identifier, []),
+                ],
+                [
+                    (0, 'value', 1, 'url'),
+                ]))
+        # Each URL was only requested once, by the concurrent downloads
+        self.assertEqual(
+                sorted(r[0] for r in self.requests if r[0][:5] == '/list'),
+                ['/list%d' % i for i in xrange(5)])
+        self.assertEqual(len(results[-1]), 5)
+        for url, filename in zip(urls, results[-1]):
+            self.assertEqual(filename, os.path.join(package_directory,
+                                                    cache_filename(url)))
+            with open(filename, 'rb') as fp:
+                self.assertTrue(fp.read() == self.DATA)
+            os.remove(filename)
+            os.remove(filename + '.etag')
+
+    def test_chunk_size(self):
+        size = CHUNK_SIZE
+        size = next_chunk_size(size, size, 0.01)
+        self.assertEqual(size, CHUNK_SIZE * 2)
+        self.assertEqual(next_chunk_size(size, size // 3, 0.01), size)
+        self.assertEqual(next_chunk_size(size, size, 2.0), CHUNK_SIZE)
+        self.assertEqual(next_chunk_size(MAX_CHUNK_SIZE, MAX_CHUNK_SIZE, 0),
+                         MAX_CHUNK_SIZE)
+
+
 class TestHTTPDirectory(unittest.TestCase):
     def test_download(self):
         url = 'http://www.vistrails.org/testing/httpdirectory/test/'
@@ -0,0 +1,254 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Keep-alive HTTP handlers for urllib2.
+
+urllib2 opens a new connection for each request and asks the server to close
+it afterwards. The handlers here keep the connection open once a response has
+been read completely, and put it in a pool so that the next request to the
+same host can reuse it, saving the TCP (and TLS) handshakes.
+"""
+
+from __future__ import division
+
+import httplib
+import socket
+import threading
+import urllib
+import urllib2
+
+
+__all__ = ['ConnectionPool', 'connection_pool', 'KeepAliveHandler',
+           'KeepAliveHTTPHandler', 'KeepAliveHTTPSHandler']
+
+
+class ConnectionPool(object):
+    """Idle connections, by handler, scheme and host.
+    """
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def get(self, key):
+        """Returns an idle connection for that key, or None.
+        """
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop()
+        return None
+
+    def put(self, key, connection):
+        """Makes a connection available for later requests.
+        """
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        """Closes all the idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for connection in connections:
+                connection.close()
+
+
+connection_pool = ConnectionPool()
+
+
+class PooledResponse(object):
+    """Wraps an HTTPResponse, releasing the connection once it's read.
+    """
+    def __init__(self, response, connection, key, pool):
+        self._response = response
+        self._connection = connection
+        self._key = key
+        self._pool = pool
+
+    def recv(self, amt=None):
+        data = self._response.read(amt)
+        if self._response.isclosed():
+            self.close()
+        return data
+
+    read = recv
+
+    def close(self):
+        if self._connection is None:
+            return
+        length = self._response.length
+        done = length == 0 or (length is None and self._response.isclosed())
+        self._response.close()
+        if done and not self._response.will_close:
+            self._pool.put(self._key, self._connection)
+        else:
+            # Unread data is still coming, the connection can't be reused
+            self._connection.close()
+        self._connection = None
+
+
+class KeepAliveHandler(object):
+    """Mixin for urllib2's HTTP handlers that reuses connections.
+
+    Requests with a body or going through a tunneling proxy use urllib2's
+    default behavior.
+    """
+    pool = connection_pool
+
+    def do_open(self, http_class, req, **http_conn_args):
+        if req.has_data() or getattr(req, '_tunnel_host', None):
+            return urllib2.AbstractHTTPHandler.do_open(
+                    self, http_class, req, **http_conn_args)
+
+        host = req.get_host()
+        if not host:
+            raise urllib2.URLError('no host given')
+        key = (self.__class__, req.get_type(), host)
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update((k, v) for k, v in req.headers.iteritems()
+                       if k not in headers)
+        headers = dict((name.title(), val) for name, val in headers.items())
+
+        connection = self.pool.get(key)
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = http_class(host, timeout=req.timeout,
+                                        **http_conn_args)
+            try:
+                connection.request(req.get_method(), req.get_selector(),
+                                   None, headers)
+                response = connection.getresponse(buffering=True)
+            except (socket.error, httplib.HTTPException), e:
+                connection.close()
+                if reused:
+                    # The server closed the idle connection, try a new one
+                    connection = None
+                    reused = False
+                    continue
+                raise urllib2.URLError(e)
+            break
+
+        fp = socket._fileobject(
+                PooledResponse(response, connection, key, self.pool),
+                close=True)
+        resp = urllib.addinfourl(fp, response.msg, req.get_full_url())
+        resp.code = response.status
+        resp.msg = response.reason
+        return resp
+
+
+class KeepAliveHTTPHandler(KeepAliveHandler, urllib2.HTTPHandler):
+    pass
+
+
+class KeepAliveHTTPSHandler(KeepAliveHandler, urllib2.HTTPSHandler):
+    pass
+
+
+###############################################################################
+
+import unittest
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_reuse(self):
+        pool = ConnectionPool(max_idle=1)
+        self.assertIsNone(pool.get('host'))
+        conn1, conn2 = FakeConnection(), FakeConnection()
+        pool.put('host', conn1)
+        pool.put('host', conn2)
+        # Only one idle connection is kept
+        self.assertTrue(conn2.closed)
+        self.assertIsNone(pool.get('other'))
+        self.assertIs(pool.get('host'), conn1)
+        self.assertIsNone(pool.get('host'))
+        self.assertFalse(conn1.closed)
+
+    def test_server(self):
+        """Requests to a local server go through the same connection.
+        """
+        import BaseHTTPServer
+
+        peers = []
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                peers.append(self.client_address)
+                body = 'path=%s' % self.path
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            opener = urllib2.build_opener(KeepAliveHTTPHandler(),
+                                          urllib2.ProxyHandler({}))
+            url = 'http://127.0.0.1:%d' % server.server_address[1]
+            for path in ('/a', '/b', '/c'):
+                response = opener.open(url + path)
+                self.assertEqual(response.read(), 'path=%s' % path)
+                response.close()
+        finally:
+            # The server handles the kept-alive connection until it's closed
+            KeepAliveHandler.pool.clear()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(len(peers), 3)
+        self.assertEqual(len(set(peers)), 1)
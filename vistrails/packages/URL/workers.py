@@ -0,0 +1,117 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Runs network tasks on a small pool of threads.
+"""
+
+from __future__ import division
+
+import Queue
+import sys
+import threading
+
+
+def run_tasks(tasks, handler, nb_threads):
+    """run_tasks(tasks: iterable, handler: callable, nb_threads: int) -> None
+
+    Calls handler(task, add_task) for each task from nb_threads threads;
+    add_task() can be used to queue more tasks. The first exception raised
+    by a handler is re-raised once the running tasks are done, and the
+    remaining tasks are dropped.
+    """
+    queue = Queue.Queue()
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            task = queue.get()
+            try:
+                if task is None:
+                    return
+                with lock:
+                    if errors:
+                        continue
+                try:
+                    handler(task, queue.put)
+                except Exception:
+                    with lock:
+                        errors.append(sys.exc_info())
+            finally:
+                queue.task_done()
+
+    for task in tasks:
+        queue.put(task)
+    threads = []
+    for n in xrange(max(1, nb_threads)):
+        t = threading.Thread(target=worker, name='vistrails-url-%d' % n)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    queue.join()
+    for t in threads:
+        queue.put(None)
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+
+
+###############################################################################
+
+import unittest
+
+
+class TestRunTasks(unittest.TestCase):
+    def test_tasks(self):
+        done = []
+
+        def handler(n, add_task):
+            done.append(n)
+            if n < 10:
+                add_task(n * 2 + 10)
+                add_task(n * 2 + 11)
+
+        run_tasks([0, 1], handler, 3)
+        self.assertEqual(sorted(done), [0, 1, 10, 11, 12, 13])
+
+    def test_error(self):
+        def handler(n, add_task):
+            if n == 3:
+                raise ValueError("task %d" % n)
+
+        with self.assertRaises(ValueError) as cm:
+            run_tasks(range(10), handler, 2)
+        self.assertEqual(str(cm.exception), "task 3")
@@ -37,6 +37,7 @@ from __future__ import division
 
 import copy
 
+from vistrails.core.interpreter.scheduler import map_iterations
 from vistrails.core.modules.vistrails_module import Module, ModuleError, \
     InvalidOutput, ModuleSuspended, ModuleWasSuspended
 
@@ -149,24 +150,21 @@ class FoldWithModule(Fold):
         else:
             element_is_iter = True
             inputList = rawInputList
-        suspended = []
-        loop = self.logging.begin_loop_execution(self, len(inputList))
-        ## Update everything for each value inside the list
-        for i, element in enumerate(inputList):
-            self.logging.update_progress(self, float(i)/len(inputList))
-            if element_is_iter:
-                self.element = element
-            else:
-                self.element = element[0]
-            do_operation = True
+        num_inputs = len(inputList)
+        loop = self.logging.begin_loop_execution(self, num_inputs)
+
+        def iterate(i):
+            """Updates the modules on FunctionPort for element i.
+
+            Returns the value on OutputPort, or a ModuleSuspended exception.
+            """
+            element = inputList[i]
+            elementResult = None
+            suspended = None
             for connector in self.inputPorts.get('FunctionPort'):
                 module = copy.copy(connector.obj)
 
                 if not self.upToDate: # pragma: no branch
-                    ## Type checking
-                    if i == 0:
-                        self.typeChecking(module, nameInput, inputList)
-
                     module.upToDate = False
                     module.computed = False
 
@@ -177,8 +175,7 @@ class FoldWithModule(Fold):
                 try:
                     module.update()
                 except ModuleSuspended, e:
-                    suspended.append(e)
-                    do_operation = False
+                    suspended = e
                     loop.end_iteration(module)
                     continue
 
@@ -188,17 +185,49 @@ class FoldWithModule(Fold):
                 if nameOutput not in module.outputPorts:
                     raise ModuleError(module,
                                       'Invalid output port: %s' % nameOutput)
-                self.elementResult = module.get_output(nameOutput)
-            if do_operation:
-                self.operation()
+                elementResult = module.get_output(nameOutput)
+            if suspended is not None:
+                return suspended
+            return elementResult
+
+        ## Type checking
+        if not self.upToDate and inputList: # pragma: no branch
+            for connector in self.inputPorts.get('FunctionPort'):
+                self.typeChecking(connector.obj, nameInput, inputList)
 
-            self.logging.update_progress(self, i * 1.0 / len(inputList))
+        ## Update everything for each value inside the list
+        nb_threads = self.get_loop_threads(
+                [connector.obj
+                 for connector in self.inputPorts.get('FunctionPort')])
+        if nb_threads > 1 and num_inputs > 1:
+            results = map_iterations(
+                    iterate, num_inputs, nb_threads,
+                    progress=lambda done: self.logging.update_progress(
+                            self, done * 1.0 / num_inputs))
+        else:
+            results = []
+            for i in xrange(num_inputs):
+                self.logging.update_progress(self, i * 1.0 / num_inputs)
+                results.append(iterate(i))
+
+        ## The operation is applied in order, on the calling thread
+        suspended = []
+        for element, result in zip(inputList, results):
+            if element_is_iter:
+                self.element = element
+            else:
+                self.element = element[0]
+            if isinstance(result, ModuleSuspended):
+                suspended.append(result)
+                continue
+            self.elementResult = result
+            self.operation()
 
         if suspended:
             raise ModuleSuspended(
                     self,
                     "function module suspended in %d/%d iterations" % (
-                            len(suspended), len(inputList)),
+                            len(suspended), num_inputs),
                     children=suspended)
         loop.end_loop_execution()
 
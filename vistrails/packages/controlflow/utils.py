@@ -205,6 +205,72 @@ class TestMap(unittest.TestCase):
                 ]))
         self.assertEqual(results, [[3, 11, 1]])
 
+    def run_parallel(self, function_module, values):
+        """Runs Map with 4 threads over function_module, which adds 1.
+
+        Returns the result and whether the iterations ran on threads.
+        """
+        from vistrails.core.vistrail.module_control_param import \
+            ModuleControlParam
+        from vistrails.packages.controlflow import fold
+
+        threaded = []
+        def map_iterations(*args, **kwargs):
+            threaded.append(True)
+            return orig_map_iterations(*args, **kwargs)
+        orig_map_iterations = fold.map_iterations
+        fold.map_iterations = map_iterations
+        try:
+            with intercept_result(Map, 'Result') as results:
+                self.assertFalse(execute([
+                        function_module,
+                        ('Map', 'org.vistrails.vistrails.control_flow', [
+                            ('InputPort', [('List', "['value1']")]),
+                            ('OutputPort', [('String', 'value')]),
+                            ('InputList', [('List', repr(values))]),
+                        ]),
+                    ],
+                    [
+                        (0, 'self', 1, 'FunctionPort'),
+                    ],
+                    add_port_specs=[
+                        (0, 'input', 'value1',
+                         'org.vistrails.vistrails.basic:Float'),
+                        (0, 'output', 'value',
+                         'org.vistrails.vistrails.basic:Float'),
+                    ],
+                    control_params=[
+                        (1, ModuleControlParam.LOOP_PARALLEL_KEY, '4'),
+                    ]))
+        finally:
+            fold.map_iterations = orig_map_iterations
+        return results[-1], bool(threaded)
+
+    def test_parallel(self):
+        values = [float(i) for i in xrange(20)]
+        expected = [v + 1.0 for v in values]
+        result, threaded = self.run_parallel(
+                ('PythonCalc', 'org.vistrails.vistrails.pythoncalc', [
+                    ('value2', [('Float', '1.0')]),
+                    ('op', [('String', '+')]),
+                ]),
+                values)
+        self.assertEqual(result, expected)
+        self.assertTrue(threaded)
+
+    def test_parallel_not_thread_safe(self):
+        """Modules that are not thread-safe are iterated serially."""
+        values = [float(i) for i in xrange(20)]
+        expected = [v + 1.0 for v in values]
+        result, threaded = self.run_parallel(
+                ('PythonSource', 'org.vistrails.vistrails.basic', [
+                    ('source', [('String', urllib2.quote(
+                            'value = value1 + 1'))]),
+                ]),
+                values)
+        self.assertEqual(result, expected)
+        self.assertFalse(threaded)
+
 
 class TestUtils(unittest.TestCase):
     def test_filter(self):
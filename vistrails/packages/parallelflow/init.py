@@ -40,8 +40,8 @@ from vistrails.core.modules.vistrails_module import Module
 from vistrails.core.modules.module_registry import get_module_registry
 from vistrails.core.modules.basic_modules import List, String
 
-from engine_manager import EngineManager
-from map import Map
+from .local import shutdown as shutdown_local
+from .map import Map
 
 
 def initialize(*args,**keywords):
@@ -52,14 +52,24 @@ def initialize(*args,**keywords):
     reg.add_input_port(Map, 'InputList', (List, ''))
     reg.add_input_port(Map, 'InputPort', (List, ''))
     reg.add_input_port(Map, 'OutputPort', (String, ''))
+    reg.add_input_port(Map, 'Backend', (String, ''), optional=True,
+                       entry_types=['enum'], values=[['ipython', 'local']],
+                       defaults=['ipython'])
     reg.add_output_port(Map, 'Result', (List, ''))
 
 
 def finalize():
-    EngineManager.cleanup()
+    shutdown_local()
+    try:
+        from .engine_manager import EngineManager
+    except ImportError:
+        pass
+    else:
+        EngineManager.cleanup()
 
 
 def menu_items():
+    from .engine_manager import EngineManager
     return (
             ("Start new engine processes",
              lambda: EngineManager.start_engines()),
@@ -0,0 +1,226 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+"""Local backend for the Map module, running on a pool of processes.
+
+The IPython backend sends a whole serialized workflow for each element, which
+the engine loads into a new Vistrail and runs after flushing its
+interpreter. The local backend keeps a pool of worker processes alive between
+executions instead: the module to run is written once to a temporary file,
+that each worker loads the first time it sees it, and the tasks then only
+carry the input values of each element. The workers don't flush their
+interpreter, so whatever it cached stays available to the next elements.
+"""
+
+from __future__ import division
+
+import multiprocessing
+import os
+import tempfile
+import threading
+
+from vistrails.core.db.io import serialize
+from vistrails.core.db.locator import XMLFileLocator
+from vistrails.core import debug
+from vistrails.core.interpreter.default import get_default_interpreter
+from vistrails.core.log.controller import LogController
+from vistrails.core.log.log import Log
+from vistrails.core.modules.vistrails_module import Module, ModuleError
+from vistrails.core.vistrail.module_function import ModuleFunction
+from vistrails.core.vistrail.module_param import ModuleParam
+from vistrails.core.vistrail.pipeline import Pipeline
+from vistrails.db.domain import IdScope
+
+try:
+    import hashlib
+    sha1_hash = hashlib.sha1
+except ImportError:
+    import sha
+    sha1_hash = sha.new
+
+
+def add_functions(module, functions):
+    """Sets constant values on the input ports of a pipeline module.
+
+    functions is a list of (port_name, type, value) tuples.
+    """
+    # getting highest id between functions to guarantee unique ids
+    if module.functions:
+        high_id = max(function.db_id for function in module.functions)
+    else:
+        high_id = 0
+    # TODO: 'pos' should not be always 0 here
+    id_scope = IdScope(beginId=long(high_id+1))
+    for port_name, type, value in functions:
+        mod_function = ModuleFunction(
+                id=id_scope.getNewId(ModuleFunction.vtType),
+                pos=0,
+                name=port_name)
+        mod_param = ModuleParam(id=0L,
+                                pos=0,
+                                type=type,
+                                val=value)
+        mod_function.add_parameter(mod_param)
+        module.add_function(mod_function)
+
+
+###############################################################################
+# Worker side
+
+# Modules loaded by this worker, by hash of their serialized pipeline
+_modules = {}
+MAX_MODULES = 8
+
+
+def init_worker():
+    """Starts a VisTrails application in a new worker, if needed.
+
+    On systems using fork(), the worker inherits the parent's application.
+    """
+    from vistrails.core.application import get_vistrails_application
+    if get_vistrails_application() is None:
+        import vistrails.core.application
+        vistrails.core.application.init({'spawned': True}, args=[])
+
+
+def load_module(key, filename):
+    try:
+        return _modules[key]
+    except KeyError:
+        pass
+    pipeline = XMLFileLocator(filename).load(Pipeline)
+    module, = pipeline.module_list
+    if len(_modules) >= MAX_MODULES:
+        _modules.popitem()
+    _modules[key] = module
+    return module
+
+
+def execute_element(task):
+    """Runs the module for one element of the input list.
+
+    Returns a dictionary like parallelflow.map.execute_wf().
+    """
+    key, filename, functions, output_port = task
+    try:
+        module = load_module(key, filename).do_copy()
+        add_functions(module, functions)
+        pipeline = Pipeline()
+        pipeline.add_module(module)
+
+        log = Log()
+        logger = LogController(log)
+        result = get_default_interpreter().execute(
+                pipeline,
+                logger=logger,
+                reason='Parallel Map Execution')
+
+        errors = ['%s: %s' % (module.name, error)
+                  for error in result.errors.itervalues()]
+        try:
+            module_log = log.workflow_execs[0].item_execs[0]
+        except IndexError:
+            errors.append("Module log not found")
+            return dict(errors=errors)
+        xml_log = serialize(module_log)
+        machine_log = serialize(logger.machine)
+
+        # The module might not have run if the interpreter had it cached
+        output = None
+        if not result.errors:
+            try:
+                output = result.objects[module.id].get_output(output_port)
+            except ModuleError:
+                errors.append("Output port not found: %s" % output_port)
+                return dict(errors=errors)
+            if isinstance(output, Module):
+                raise TypeError("Output value is a Module instance")
+
+        return dict(errors=errors,
+                    output=output,
+                    xml_log=xml_log,
+                    machine_log=machine_log)
+    except Exception, e:
+        return dict(errors=[debug.format_exception(e)])
+
+
+###############################################################################
+# Client side
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(processes=None):
+    """Returns the pool of worker processes, starting it if needed.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = multiprocessing.Pool(processes, initializer=init_worker)
+        return _pool
+
+
+def shutdown():
+    """Stops the worker processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool.join()
+            _pool = None
+
+
+def execute_local(module_xml, elements, output_port, processes=None):
+    """Runs a serialized module for each element on the local pool.
+
+    module_xml is a serialized Pipeline containing only that module, and
+    elements is a list of functions to add to it, as accepted by
+    add_functions().
+
+    Returns a list of dictionaries like parallelflow.map.execute_wf().
+    """
+    key = sha1_hash(module_xml).hexdigest()
+    fd, filename = tempfile.mkstemp(prefix='vt_map_', suffix='.xml')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(module_xml)
+        return get_pool(processes).map(
+                execute_element,
+                [(key, filename, functions, output_port)
+                 for functions in elements])
+    finally:
+        os.remove(filename)
@@ -52,11 +52,8 @@ from vistrails.core.modules.vistrails_module import Module, ModuleError, \
 from vistrails.core.vistrail.annotation import Annotation
 from vistrails.core.vistrail.controller import VistrailController
 from vistrails.core.vistrail.group import Group
-from vistrails.core.vistrail.module_function import ModuleFunction
-from vistrails.core.vistrail.module_param import ModuleParam
 from vistrails.core.vistrail.pipeline import Pipeline
 from vistrails.core.vistrail.vistrail import Vistrail
-from vistrails.db.domain import IdScope
 import vistrails.db.versions
 
 import copy
@@ -67,9 +64,7 @@ import re
 import sys
 import tempfile
 
-from IPython.parallel.error import CompositeError
-
-from .api import get_client
+from .local import add_functions, execute_local
 
 try:
     import hashlib
@@ -187,6 +182,8 @@ class Map(Module):
     The FunctionPort should be connected to the 'self' output of the module you
     want to execute.
     The InputList is the list of values to be scattered on the engines.
+    Set Backend to 'local' to use a pool of local processes instead of
+    IPython; these are kept between executions, with their cache.
     """
     def __init__(self):
         Module.__init__(self)
@@ -236,6 +233,9 @@ class Map(Module):
         nameInput = self.get_input('InputPort')
         nameOutput = self.get_input('OutputPort')
         rawInputList = self.get_input('InputList')
+        backend = self.force_get_input('Backend', 'ipython')
+        if backend not in ('ipython', 'local'):
+            raise ModuleError(self, "Unknown backend %r" % backend)
 
         # Create inputList to always have iterable elements
         # to simplify code
@@ -247,6 +247,8 @@ class Map(Module):
             inputList = rawInputList
 
         workflows = []
+        elements = []
+        base_module = None
         module = None
         vtType = None
 
@@ -293,17 +295,7 @@ class Map(Module):
                     group.pipeline = pipeline_db_module.pipeline
                     pipeline_db_module = group
 
-                # getting highest id between functions to guarantee unique ids
-                # TODO: can get current IdScope here?
-                if pipeline_db_module.functions:
-                    high_id = max(function.db_id
-                                  for function in pipeline_db_module.functions)
-                else:
-                    high_id = 0
-
-                # adding function and parameter to module in pipeline
-                # TODO: 'pos' should not be always 0 here
-                id_scope = IdScope(beginId=long(high_id+1))
+                functions = []
                 for elementValue, inputPort in izip(element, nameInput):
 
                     p_spec = pipeline_db_module.get_port_spec(inputPort, 'input')
@@ -317,95 +309,46 @@ class Map(Module):
                                 self,
                                 "Module inputs should be Constant types")
                     type = p_spec.sigstring[1:-1]
+                    if backend == 'local':
+                        # not serialized, so translate the values here
+                        elementValue = descrs[0].module.translate_to_string(
+                                elementValue)
+                    functions.append((inputPort, type, elementValue))
+
+                if backend == 'local':
+                    # the module is only sent once, the workers then receive
+                    # the inputs for each element
+                    if base_module is None:
+                        base_module = self.serialize_module(pipeline_db_module)
+                    elements.append(functions)
+                else:
+                    # adding function and parameter to module in pipeline
+                    add_functions(pipeline_db_module, functions)
 
-                    mod_function = ModuleFunction(id=id_scope.getNewId(ModuleFunction.vtType),
-                                                  pos=0,
-                                                  name=inputPort)
-                    mod_param = ModuleParam(id=0L,
-                                            pos=0,
-                                            type=type,
-                                            val=elementValue)
-
-                    mod_function.add_parameter(mod_param)
-                    pipeline_db_module.add_function(mod_function)
-
-                # serializing module
-                wf = self.serialize_module(pipeline_db_module)
-                workflows.append(wf)
+                    # serializing module
+                    wf = self.serialize_module(pipeline_db_module)
+                    workflows.append(wf)
 
             # getting first connector, ignoring the rest
             break
 
-        # IPython stuff
-        try:
-            rc = get_client()
-        except Exception, error:
-            raise ModuleError(self, "Exception while loading IPython: %s" %
-                              debug.format_exception(error))
-        if rc is None:
-            raise ModuleError(self, "Couldn't get an IPython connection")
-        engines = rc.ids
-        if not engines:
-            raise ModuleError(
-                    self,
-                    "Exception while loading IPython: No IPython engines "
-                    "detected!")
-
-        # initializes each engine
-        # importing modules and initializing the VisTrails application
-        # in the engines *only* in the first execution on this engine
-        uninitialized = []
-        for eng in engines:
-            try:
-                rc[eng]['init']
-            except Exception:
-                uninitialized.append(eng)
-        if uninitialized:
-            init_view = rc[uninitialized]
-            with init_view.sync_imports():
-                import tempfile
-                import inspect
-
-                # VisTrails API
-                import vistrails
-                import vistrails.core
-                import vistrails.core.db.action
-                import vistrails.core.application
-                import vistrails.core.modules.module_registry
-                from vistrails.core.db.io import serialize
-                from vistrails.core.vistrail.vistrail import Vistrail
-                from vistrails.core.vistrail.pipeline import Pipeline
-                from vistrails.core.db.locator import XMLFileLocator
-                from vistrails.core.vistrail.controller import VistrailController
-                from vistrails.core.interpreter.default import get_default_interpreter
-
-            # initializing a VisTrails application
-            try:
-                init_view.execute(
-                        'app = vistrails.core.application.init('
-                        '        {"spawned": True},'
-                        '        args=[])',
-                        block=True)
-            except CompositeError, e:
-                self.print_compositeerror(e)
-                raise ModuleError(self, "Error initializing application on "
-                                  "IPython engines:\n"
-                                  "%s" % self.list_exceptions(e))
-
-            init_view['init'] = True
-
         # setting computing color
         module.logging.set_computing(module)
 
-        # executing function in engines
+        # executing function in parallel
         # each map returns a dictionary
-        try:
-            ldview = rc.load_balanced_view()
-            map_result = ldview.map_sync(execute_wf, workflows, [nameOutput]*len(workflows))
-        except CompositeError, e:
-            self.print_compositeerror(e)
-            raise ModuleError(self, "Error from IPython engines:\n"
-                              "%s" % self.list_exceptions(e))
+        if backend == 'local':
+            if not elements:
+                map_result = []
+            else:
+                try:
+                    map_result = execute_local(base_module, elements,
+                                               nameOutput)
+                except Exception, e:
+                    raise ModuleError(self, "Error from local processes:\n"
+                                      "%s" % debug.format_exception(e))
+        else:
+            map_result = self.execute_ipython(workflows, nameOutput)
 
         # verifying errors
         errors = []
@@ -429,6 +372,9 @@ class Map(Module):
             self.result.append(output)
 
         # including execution logs
+        if getattr(self.logging.log, 'log', None) is None:
+            # not logging anything (DummyLogController)
+            return
         for engine in range(len(map_result)):
             log = map_result[engine]['xml_log']
             exec_ = None
@@ -469,6 +415,82 @@ class Map(Module):
             self.logging.add_exec(exec_)
 
 
+    def execute_ipython(self, workflows, nameOutput):
+        """Runs the serialized workflows on the IPython engines.
+
+        Returns the list of dictionaries returned by execute_wf().
+        """
+        from IPython.parallel.error import CompositeError
+
+        from .api import get_client
+
+        try:
+            rc = get_client()
+        except Exception, error:
+            raise ModuleError(self, "Exception while loading IPython: %s" %
+                              debug.format_exception(error))
+        if rc is None:
+            raise ModuleError(self, "Couldn't get an IPython connection")
+        engines = rc.ids
+        if not engines:
+            raise ModuleError(
+                    self,
+                    "Exception while loading IPython: No IPython engines "
+                    "detected!")
+
+        # initializes each engine
+        # importing modules and initializing the VisTrails application
+        # in the engines *only* in the first execution on this engine
+        uninitialized = []
+        for eng in engines:
+            try:
+                rc[eng]['init']
+            except Exception:
+                uninitialized.append(eng)
+        if uninitialized:
+            init_view = rc[uninitialized]
+            with init_view.sync_imports():
+                import tempfile
+                import inspect
+
+                # VisTrails API
+                import vistrails
+                import vistrails.core
+                import vistrails.core.db.action
+                import vistrails.core.application
+                import vistrails.core.modules.module_registry
+                from vistrails.core.db.io import serialize
+                from vistrails.core.vistrail.vistrail import Vistrail
+                from vistrails.core.vistrail.pipeline import Pipeline
+                from vistrails.core.db.locator import XMLFileLocator
+                from vistrails.core.vistrail.controller import VistrailController
+                from vistrails.core.interpreter.default import get_default_interpreter
+
+            # initializing a VisTrails application
+            try:
+                init_view.execute(
+                        'app = vistrails.core.application.init('
+                        '        {"spawned": True},'
+                        '        args=[])',
+                        block=True)
+            except CompositeError, e:
+                self.print_compositeerror(e)
+                raise ModuleError(self, "Error initializing application on "
+                                  "IPython engines:\n"
+                                  "%s" % self.list_exceptions(e))
+
+            init_view['init'] = True
+
+        # executing function in engines
+        try:
+            ldview = rc.load_balanced_view()
+            return ldview.map_sync(execute_wf, workflows,
+                                   [nameOutput]*len(workflows))
+        except CompositeError, e:
+            self.print_compositeerror(e)
+            raise ModuleError(self, "Error from IPython engines:\n"
+                              "%s" % self.list_exceptions(e))
+
     def serialize_module(self, module):
         """
         Serializes a module to be executed in parallel.
@@ -545,3 +567,41 @@ def get_module(value, signature):
         debug.warning("Could not identify the type of the list element.")
         debug.warning("Type checking is not going to be done inside Map module.")
         return None
+
+###############################################################################
+
+import unittest
+
+
+class TestLocalMap(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        from .local import shutdown
+        shutdown()
+
+    def run_map(self, input_list):
+        from vistrails.tests.utils import execute, intercept_result
+        with intercept_result(Map, 'Result') as results:
+            self.assertFalse(execute([
+                    ('PythonCalc', 'org.vistrails.vistrails.pythoncalc', [
+                        ('value2', [('Float', '10.0')]),
+                        ('op', [('String', '+')]),
+                    ]),
+                    ('Map', 'edu.poly.vistrails.parallel_flow', [
+                        ('InputList', [('List', input_list)]),
+                        ('InputPort', [('List', "['value1']")]),
+                        ('OutputPort', [('String', 'value')]),
+                        ('Backend', [('String', 'local')]),
+                    ]),
+                ],
+                [
+                    (0, 'self', 1, 'FunctionPort'),
+                ]))
+        self.assertEqual(len(results), 1)
+        return results[0]
+
+    def test_local(self):
+        """Runs a Map on the local process pool, twice.
+        """
+        self.assertEqual(self.run_map("[1.0, 2.0, 3.0]"), [11.0, 12.0, 13.0])
+        self.assertEqual(self.run_map("[2.0, 5.0]"), [12.0, 15.0])
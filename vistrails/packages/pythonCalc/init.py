@@ -37,7 +37,7 @@
 from __future__ import division
 
 from vistrails.core.modules.vistrails_module import Module, ModuleError
-from vistrails.core.modules.config import IPort, OPort
+from vistrails.core.modules.config import ModuleSettings, IPort, OPort
 
 ###############################################################################
 # PythonCalc
@@ -76,6 +76,12 @@ class PythonCalc(Module):
                           entry_type="enum", values=["+", "-", "*", "/"])]
     _output_ports = [OPort(name="value", signature="basic:Float")]
 
+    # Module-wide options are set through a ModuleSettings object. Here
+    # we report that compute() doesn't touch any shared state, so
+    # VisTrails may run several PythonCalc modules at the same time
+    # when executing on multiple threads.
+    _settings = ModuleSettings(thread_safe=True)
+
     # This constructor is strictly unnecessary. However, some modules
     # might want to initialize per-object data. When implementing your
     # own constructor, remember that it must not take any extra
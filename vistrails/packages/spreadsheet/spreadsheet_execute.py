@@ -154,7 +154,8 @@ def assignPipelineCellLocations(pipeline, sheetName,
         for c_id in conns_to_delete:
             pipeline.delete_connection(c_id)
 
-        m = pipeline.modules[mId]
+        # the pipeline is a copy sharing its modules with the caller's
+        m = pipeline.own_module(mId)
 
         # Remove all functions on 'configuration' input port
         funcs_to_delete = []
@@ -184,6 +185,8 @@ def assignPipelineCellLocations(pipeline, sheetName,
         config_function = create_function(id_scope, m,
                                           'configuration', [repr(config)])
         m.add_function(config_function)
+        # functions were changed behind the pipeline's back
+        pipeline.invalidate_module_signature(mId)
 
         # replace the getNewId method
         pipeline.tmp_id.__class__.getNewId = orig_getNewId
@@ -41,11 +41,21 @@ Uses SQLAlchemy to access a variety of database software.
 
 from __future__ import division
 
+from vistrails.core.configuration import ConfigurationObject
+
 identifier = 'org.vistrails.vistrails.sql'
 name = 'SQL'
 version = '0.1.0'
 old_identifiers = ['edu.utah.sci.vistrails.sql']
 
+# Settings of the connection pool kept for each database URL: number of
+# connections kept open, extra connections allowed under load, seconds to
+# wait for a connection, and seconds after which a connection is replaced
+configuration = ConfigurationObject(poolSize=5,
+                                    maxOverflow=10,
+                                    poolTimeout=30,
+                                    poolRecycle=3600)
+
 def package_dependencies():
     return ['org.vistrails.vistrails.tabledata']
 
@@ -39,6 +39,8 @@ from __future__ import division
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine.url import URL
 from sqlalchemy.exc import SQLAlchemyError
+from itertools import izip
+import threading
 import urllib
 
 from vistrails.core.db.action import create_action
@@ -53,11 +55,60 @@ from vistrails.core.utils import versions_increasing
 from vistrails.packages.tabledata.common import TableObject
 
 
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(url):
+    """Gets the engine for a database URL, creating it the first time.
+
+    Engines are shared by the whole process, so that every execution of a
+    DBConnection module with the same URL gets a connection from the same
+    pool instead of opening a new one. The pool settings come from the
+    package configuration; connections are checked before being handed out
+    (on SQLAlchemy versions that support it) and replaced once they are
+    poolRecycle seconds old, whether or not they were used in the meantime.
+    """
+    key = str(url)
+    with _engines_lock:
+        try:
+            return _engines[key]
+        except KeyError:
+            pass
+        if url.drivername == 'sqlite':
+            # SQLite uses its own pool classes, which take no pool options
+            kwargs = {}
+        else:
+            kwargs = dict(pool_size=configuration.poolSize,
+                          max_overflow=configuration.maxOverflow,
+                          pool_timeout=configuration.poolTimeout,
+                          pool_recycle=configuration.poolRecycle)
+        try:
+            engine = create_engine(url, pool_pre_ping=True, **kwargs)
+        except TypeError:
+            # pool_pre_ping was added in SQLAlchemy 1.2
+            engine = create_engine(url, **kwargs)
+        _engines[key] = engine
+        return engine
+
+
+def finalize():
+    with _engines_lock:
+        for engine in _engines.itervalues():
+            engine.dispose()
+        _engines.clear()
+
+
 class DBConnection(Module):
     """Connects to a database.
 
     If the URI you enter uses a driver which is not currently installed,
     VisTrails will try to set it up.
+
+    The output is the engine shared by all the modules connecting to the
+    same database (see get_engine()), not an open connection: modules using
+    it check a connection out of the pool for each query and return it when
+    done, so that cached DBConnection results don't hold on to connections.
     """
     _input_ports = [('protocol', '(basic:String)'),
                     ('user', '(basic:String)',
@@ -80,7 +131,7 @@ class DBConnection(Module):
                   database=self.get_input('db_name'))
 
         try:
-            engine = create_engine(url)
+            engine = get_engine(url)
         except ImportError, e:
             driver = url.drivername
             installed = False
@@ -122,7 +173,7 @@ class DBConnection(Module):
                 raise ModuleError(self,
                                   "Failed to install required driver")
             try:
-                engine = create_engine(url)
+                engine = get_engine(url)
             except Exception, e:
                 raise ModuleError(self,
                                   "Couldn't connect to the database: %s" %
@@ -135,17 +186,57 @@ class DBConnection(Module):
                     "SQLAlchemy has no support for protocol %r -- are you "
                     "sure you spelled that correctly?" % url.drivername)
 
-        self.set_output('connection', engine.connect())
+        self.set_output('connection', engine)
+
+
+def table_from_rows(chunks, keys):
+    """Builds a Table from an iterable of lists of row tuples.
+
+    Each chunk is transposed and appended to the columns, so no intermediate
+    list of all the rows (or dict per row) is built.
+    """
+    columns = [[] for key in keys]
+    nb_rows = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for column, values in izip(columns, izip(*chunk)):
+            column.extend(values)
+        nb_rows += len(chunk)
+    return TableObject(columns, nb_rows, list(keys))
 
 
 class SQLSource(Module):
+    """Runs a SQL query on a database.
+
+    The other input ports you add to this module are passed to the query as
+    bind parameters.
+
+    By default, all the rows are fetched at once and output both as a Table
+    and as a list of rows (resultSet). streamResults makes the driver use a
+    server-side cursor (for the drivers that support it) and fetch rows
+    fetchSize at a time instead:
+      * 'table' builds the result Table directly from these chunks;
+        resultSet is not set, since it would hold a second copy of the data;
+      * 'rows' doesn't build a table but streams each row, as a list, on
+        resultStream to the downstream modules.
+    """
     _settings = ModuleSettings(configure_widget=
             'vistrails.packages.sql.widgets:SQLSourceConfigurationWidget')
     _input_ports = [('connection', '(DBConnection)'),
                     ('cacheResults', '(basic:Boolean)'),
+                    ('streamResults', '(basic:String)',
+                     {'optional': True, 'entry_types': "['enum']",
+                      'values': "[['table', 'rows']]"}),
+                    ('fetchSize', '(basic:Integer)',
+                     {'optional': True, 'defaults': "['10000']"}),
                     ('source', '(basic:String)')]
     _output_ports = [('result', '(org.vistrails.vistrails.tabledata:Table)'),
-                     ('resultSet', '(basic:List)')]
+                     ('resultSet', '(basic:List)'),
+                     ('resultStream', '(basic:List)', {'optional': True})]
+
+    _special_ports = ('source', 'connection', 'cacheResults',
+                      'streamResults', 'fetchSize')
 
     def is_cacheable(self):
         return False
@@ -155,16 +246,37 @@ class SQLSource(Module):
         if self.has_input('cacheResults'):
             cached = self.get_input('cacheResults')
             self.is_cacheable = lambda: cached
-        connection = self.get_input('connection')
+        engine = self.get_input('connection')
         inputs = dict((k, self.get_input(k)) for k in self.inputPorts.iterkeys()
-                  if k not in ('source', 'connection', 'cacheResults'))
+                  if k not in self._special_ports)
         s = urllib.unquote(str(self.get_input('source')))
+        streaming = self.force_get_input('streamResults', None)
+        fetch_size = self.get_input('fetchSize')
+        if streaming is not None:
+            if streaming not in ('table', 'rows'):
+                raise ModuleError(self, "Invalid streamResults %r" % streaming)
+            if fetch_size <= 0:
+                raise ModuleError(self, "fetchSize should be positive")
 
         try:
+            connection = engine.connect()
+        except SQLAlchemyError, e:
+            raise ModuleError(self,
+                              "Couldn't connect to the database: %s" %
+                              debug.format_exception(e))
+        # The connection goes back to the pool once the query is done, or
+        # once the rows are read when streaming them
+        close_connection = True
+        try:
+            if streaming is not None:
+                connection = connection.execution_options(stream_results=True)
             transaction = connection.begin()
             results = connection.execute(s, inputs)
             try:
-                rows = results.fetchall()
+                if streaming is None:
+                    rows = results.fetchall()
+                else:
+                    first_chunk = results.fetchmany(fetch_size)
             except Exception:
                 self.set_output('result', None)
                 self.set_output('resultSet', None)
@@ -172,12 +284,56 @@ class SQLSource(Module):
                 # results.returns_rows is True
                 # We don't use 'if return_rows' because this attribute didn't
                 # use to exist
-                table = TableObject.from_dicts(rows, results.keys())
-                self.set_output('result', table)
-                self.set_output('resultSet', rows)
+                if streaming is None:
+                    table = table_from_rows([rows], results.keys())
+                    self.set_output('result', table)
+                    self.set_output('resultSet', rows)
+                elif streaming == 'table':
+                    table = table_from_rows(
+                            self.fetch_chunks(results, first_chunk,
+                                              fetch_size),
+                            results.keys())
+                    self.set_output('result', table)
+                    self.set_output('resultSet', None)
+                else:
+                    self.set_output('result', None)
+                    self.set_output('resultSet', None)
+                    self.set_streaming_output(
+                            'resultStream',
+                            self.stream_rows(connection, transaction,
+                                             results, first_chunk,
+                                             fetch_size))
+                    # The transaction is committed once the rows are read;
+                    # if the execution stops before that, the connection
+                    # is closed (rolling back) when the execution is over
+                    self.interpreter.add_finalizer(connection.close)
+                    close_connection = False
+                    return
+            transaction.commit()
+        except SQLAlchemyError, e:
+            raise ModuleError(self, debug.format_exception(e))
+        finally:
+            if close_connection:
+                connection.close()
+
+    @staticmethod
+    def fetch_chunks(results, first_chunk, fetch_size):
+        chunk = first_chunk
+        while chunk:
+            yield chunk
+            chunk = results.fetchmany(fetch_size)
+
+    def stream_rows(self, connection, transaction, results, first_chunk,
+                    fetch_size):
+        try:
+            for chunk in self.fetch_chunks(results, first_chunk, fetch_size):
+                for row in chunk:
+                    yield list(row)
             transaction.commit()
         except SQLAlchemyError, e:
             raise ModuleError(self, debug.format_exception(e))
+        finally:
+            connection.close()
 
 
 _modules = [DBConnection, SQLSource]
@@ -295,7 +451,6 @@ class TestSQL(unittest.TestCase):
                     ]))
 
             self.assertEqual(len(connection), 1)
-            connection[0].close()
             self.assertEqual(len(table), 1)
             self.assertIsNone(table[0])
 
@@ -321,7 +476,6 @@ class TestSQL(unittest.TestCase):
                     ]))
 
             self.assertEqual(len(connection), 1)
-            connection[0].close()
             self.assertEqual(len(table), 1)
             table, = table
             self.assertEqual(table.names, ['name', 'lastname', 'age'])
@@ -333,3 +487,215 @@ class TestSQL(unittest.TestCase):
                 os.remove(test_db)
             except OSError:
                 pass # Oops, we are leaking the file here...
+
+    def test_query_streaming(self):
+        """Queries a SQLite3 database, fetching the rows in chunks.
+        """
+        import os
+        import sqlite3
+        import tempfile
+        import urllib2
+        from vistrails.tests.utils import execute, intercept_results
+        identifier = 'org.vistrails.vistrails.sql'
+
+        test_db_fd, test_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(test_db_fd)
+        try:
+            conn = sqlite3.connect(test_db)
+            cur = conn.cursor()
+            cur.execute('''
+                    CREATE TABLE test(name VARCHAR(24) PRIMARY KEY,
+                                      age INTEGER NOT NULL)
+                    ''')
+            cur.executemany('''
+                    INSERT INTO test(name, age) VALUES(?, ?)
+                    ''',
+                    [('n%d' % i, i) for i in xrange(25)])
+            conn.commit()
+            conn.close()
+
+            source = "SELECT name, age FROM test WHERE age >= 5 ORDER BY age"
+
+            with intercept_results(DBConnection, 'connection',
+                                   SQLSource, 'result') as (connection, table):
+                self.assertFalse(execute([
+                        ('DBConnection', identifier, [
+                            ('protocol', [('String', 'sqlite')]),
+                            ('db_name', [('String', test_db)]),
+                        ]),
+                        ('SQLSource', identifier, [
+                            ('source', [('String', urllib2.quote(source))]),
+                            ('streamResults', [('String', 'table')]),
+                            ('fetchSize', [('Integer', '7')]),
+                        ]),
+                    ],
+                    [
+                        (0, 'connection', 1, 'connection'),
+                    ]))
+
+            self.assertEqual(len(connection), 1)
+            self.assertEqual(len(table), 1)
+            table, = table
+            self.assertEqual(table.names, ['name', 'age'])
+            self.assertEqual((table.rows, table.columns), (20, 2))
+            self.assertEqual(table.get_column(1), range(5, 25))
+        finally:
+            try:
+                os.remove(test_db)
+            except OSError:
+                pass
+
+
+class TestTableFromRows(unittest.TestCase):
+    def test_chunks(self):
+        table = table_from_rows([[(1, 'a'), (2, 'b')], [], [(3, 'c')]],
+                                ['num', 'letter'])
+        self.assertEqual((table.rows, table.columns), (3, 2))
+        self.assertEqual(table.names, ['num', 'letter'])
+        self.assertEqual(table.get_column(0), [1, 2, 3])
+        self.assertEqual(table.get_column(1), ['a', 'b', 'c'])
+
+    def test_empty(self):
+        table = table_from_rows([[]], ['a', 'b'])
+        self.assertEqual((table.rows, table.columns), (0, 2))
+        self.assertEqual(table.get_column(1), [])
+
+
+class TestEngines(unittest.TestCase):
+    def test_shared_engine(self):
+        """Checks that connections to the same database share an engine.
+        """
+        import os
+        import tempfile
+
+        test_db_fd, test_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(test_db_fd)
+        try:
+            engine = get_engine(URL(drivername='sqlite', database=test_db))
+            self.assertIs(get_engine(URL(drivername='sqlite',
+                                         database=test_db)),
+                          engine)
+            self.assertIsNot(get_engine(URL(drivername='sqlite',
+                                            database=test_db + '2')),
+                             engine)
+            connection = engine.connect()
+            self.assertEqual(connection.execute('SELECT 1').scalar(), 1)
+            connection.close()
+        finally:
+            finalize()
+            for filename in (test_db, test_db + '2'):
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+
+    def test_connections_returned(self):
+        """Checks that queries give their connection back to the pool.
+        """
+        import os
+        import tempfile
+        import urllib2
+        from sqlalchemy import event
+        from vistrails.tests.utils import execute, intercept_result
+        identifier = 'org.vistrails.vistrails.sql'
+
+        test_db_fd, test_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(test_db_fd)
+        try:
+            engine = get_engine(URL(drivername='sqlite', database=test_db))
+            checked_out = [0]
+            def checkout(*args):
+                checked_out[0] += 1
+            def checkin(*args):
+                checked_out[0] -= 1
+            event.listen(engine.pool, 'checkout', checkout)
+            event.listen(engine.pool, 'checkin', checkin)
+
+            for streaming in (None, 'table', 'rows'):
+                functions = [('source', [('String', urllib2.quote(
+                                 "SELECT 1 AS one"))])]
+                if streaming is not None:
+                    functions.append(('streamResults',
+                                      [('String', streaming)]))
+                with intercept_result(DBConnection, 'connection') as results:
+                    self.assertFalse(execute([
+                            ('DBConnection', identifier, [
+                                ('protocol', [('String', 'sqlite')]),
+                                ('db_name', [('String', test_db)]),
+                            ]),
+                            ('SQLSource', identifier, functions),
+                        ],
+                        [
+                            (0, 'connection', 1, 'connection'),
+                        ]))
+                self.assertEqual(results, [engine])
+                self.assertEqual(checked_out[0], 0)
+        finally:
+            finalize()
+            try:
+                os.remove(test_db)
+            except OSError:
+                pass
+
+    def test_stream_stopped(self):
+        """Checks that a stream read partway gives its connection back.
+        """
+        import os
+        import sqlite3
+        import tempfile
+        import urllib2
+        from sqlalchemy import event
+        from vistrails.tests.utils import execute
+        identifier = 'org.vistrails.vistrails.sql'
+
+        test_db_fd, test_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(test_db_fd)
+        try:
+            conn = sqlite3.connect(test_db)
+            conn.execute('CREATE TABLE test(num INTEGER NOT NULL)')
+            conn.executemany('INSERT INTO test(num) VALUES(?)',
+                             [(i,) for i in xrange(25)])
+            conn.commit()
+            conn.close()
+
+            engine = get_engine(URL(drivername='sqlite', database=test_db))
+            checked_out = [0]
+            def checkout(*args):
+                checked_out[0] += 1
+            def checkin(*args):
+                checked_out[0] -= 1
+            event.listen(engine.pool, 'checkout', checkout)
+            event.listen(engine.pool, 'checkin', checkin)
+
+            # The execution fails on the 5th row, the others are never read
+            self.assertTrue(execute([
+                    ('DBConnection', identifier, [
+                        ('protocol', [('String', 'sqlite')]),
+                        ('db_name', [('String', test_db)]),
+                    ]),
+                    ('SQLSource', identifier, [
+                        ('source', [('String', urllib2.quote(
+                            "SELECT num FROM test"))]),
+                        ('streamResults', [('String', 'rows')]),
+                        ('fetchSize', [('Integer', '3')]),
+                    ]),
+                    ('PythonSource', 'org.vistrails.vistrails.basic', [
+                        ('source', [('String', urllib2.quote(
+                            "assert row[0] < 5"))]),
+                    ]),
+                ],
+                [
+                    (0, 'connection', 1, 'connection'),
+                    (1, 'resultStream', 2, 'row'),
+                ],
+                add_port_specs=[
+                    (2, 'input', 'row',
+                     '(org.vistrails.vistrails.basic:Integer)'),
+                ]))
+            self.assertEqual(checked_out[0], 0)
+        finally:
+            finalize()
+            try:
+                os.remove(test_db)
+            except OSError:
+                pass
@@ -35,6 +35,7 @@
 
 from __future__ import division
 
+import operator
 import re
 
 from vistrails.core.modules.vistrails_module import ModuleError
@@ -54,6 +55,28 @@ def utf8(obj):
         return bytes(obj)
 
 
+def is_vector(column, kinds=None):
+    """Tests whether a column is a one-dimensional numpy array.
+
+    If `kinds` is set, the array's dtype also needs to be one of these kinds
+    (e.g. 'iu' for integers); the vectorized code paths below rely on this to
+    only handle types whose comparison semantics numpy preserves.
+    """
+    numpy = get_numpy(False)
+    return (numpy is not None and
+            isinstance(column, numpy.ndarray) and column.ndim == 1 and
+            (kinds is None or column.dtype.kind in kinds))
+
+
+def take_rows(column, rows):
+    """Gets the values at the given row indexes from a column.
+    """
+    if is_vector(column):
+        return column[rows]
+    else:
+        return [column[i] for i in rows]
+
+
 class JoinedTables(TableObject):
     def __init__(self, left_t, right_t, left_key_col, right_key_col,
                  case_sensitive=False, always_prefix=False):
@@ -67,7 +90,7 @@ class JoinedTables(TableObject):
         self.build_column_names()
         self.compute_row_map()
         self.column_cache = {}
-        self.rows = len(self.row_map)
+        self.rows = len(self.left_rows)
 
     def build_column_names(self):
         left_name = self.left_t.name
@@ -101,27 +124,45 @@ class JoinedTables(TableObject):
         if (index, numeric) in self.column_cache:
             return self.column_cache[(index, numeric)]
 
-        result = []
         if index < self.left_t.columns:
             column = self.left_t.get_column(index, numeric)
-            for i in xrange(self.left_t.rows):
-                if i in self.row_map:
-                    result.append(column[i])
+            result = take_rows(column, self.left_rows)
         else:
             column = self.right_t.get_column(index - self.left_t.columns,
                                              numeric)
-            for i in xrange(self.left_t.rows):
-                if i in self.row_map:
-                    j = self.row_map[i]
-                    result.append(column[j])
+            result = take_rows(column, self.right_rows)
 
         numpy = get_numpy(False)
         if numeric and numpy is not None:
-            result = numpy.array(result, dtype=numpy.float32)
+            result = numpy.asarray(result, dtype=numpy.float32)
         self.column_cache[(index, numeric)] = result
         return result
 
     def compute_row_map(self):
+        """Finds the pairs of rows to join.
+
+        Sets left_rows and right_rows: the i-th row of the result joins row
+        left_rows[i] of the left table with row right_rows[i] of the right
+        table. Each left row is matched with the last right row that has the
+        same key.
+        """
+        left_keys = self.left_t.get_column(self.left_key_col)
+        right_keys = self.right_t.get_column(self.right_key_col)
+        if (is_vector(left_keys, 'iub') and is_vector(right_keys, 'iub') and
+                left_keys.dtype.kind == right_keys.dtype.kind):
+            # Integers and booleans compare the same way as their string
+            # representations, so we can do a sort-merge join with numpy
+            numpy = get_numpy()
+            order = numpy.argsort(right_keys, kind='mergesort')
+            sorted_keys = right_keys[order]
+            # Position of the last right key that is <= each left key
+            pos = numpy.searchsorted(sorted_keys, left_keys, side='right') - 1
+            found = pos >= 0
+            found[found] = sorted_keys[pos[found]] == left_keys[found]
+            self.left_rows = numpy.nonzero(found)[0]
+            self.right_rows = order[pos[self.left_rows]]
+            return
+
         def build_key_dict(table, key_col):
             column = table.get_column(key_col)
             if self.case_sensitive:
@@ -134,14 +175,15 @@ class JoinedTables(TableObject):
 
         right_keys = build_key_dict(self.right_t, self.right_key_col)
 
-        self.row_map = {}
-        for left_row_idx, key in enumerate(
-                self.left_t.get_column(self.left_key_col)):
+        self.left_rows = []
+        self.right_rows = []
+        for left_row_idx, key in enumerate(left_keys):
             key = utf8(key).strip()
             if not self.case_sensitive:
                 key = key.upper()
             if key in right_keys:
-                self.row_map[left_row_idx] = right_keys[key]
+                self.left_rows.append(left_row_idx)
+                self.right_rows.append(right_keys[key])
 
 
 class JoinTables(Table):
@@ -270,6 +312,13 @@ class SelectFromTable(Table):
                       'values': "[[], ['==', '!=', '<', '>', '<=', '>='], []]"})]
     _output_ports = [('value', Table)]
 
+    _vector_comparers = {'==': operator.eq,
+                         '!=': operator.ne,
+                         '<': operator.lt,
+                         '>': operator.gt,
+                         '<=': operator.le,
+                         '>=': operator.ge}
+
     @staticmethod
     def make_condition(comparand, comparer):
         if isinstance(comparand, float):
@@ -317,18 +366,30 @@ class SelectFromTable(Table):
                                   "No column %d, table only has %d columns" % (
                                   idx, table.columns))
 
-        condition = self.make_condition(comparand, comparer)
+        self.set_output('value', self.select(table, idx, comparer, comparand))
+
+    @classmethod
+    def select(cls, table, idx, comparer, comparand):
+        """Builds the table of the rows where column idx matches.
+        """
+        condition = cls.make_condition(comparand, comparer)
         numeric = isinstance(comparand, float)
         column = table.get_column(idx, numeric)
-        matched_rows = [i
-                        for i, col_val in enumerate(column)
-                        if condition(col_val)]
+        if numeric and is_vector(column, 'biuf'):
+            # Boolean mask; compare as doubles like float(v) does below
+            numpy = get_numpy()
+            mask = cls._vector_comparers[comparer](
+                    column.astype(numpy.float64), comparand)
+            matched_rows = numpy.nonzero(mask)[0]
+        else:
+            matched_rows = [i
+                            for i, col_val in enumerate(column)
+                            if condition(col_val)]
         columns = []
         for col in xrange(table.columns):
             column = table.get_column(col)
-            columns.append([column[row] for row in matched_rows])
-        selected_table = TableObject(columns, len(matched_rows), table.names)
-        self.set_output('value', selected_table)
+            columns.append(take_rows(column, matched_rows))
+        return TableObject(columns, len(matched_rows), table.names)
 
 
 class AggregatedTable(TableObject):
@@ -341,21 +402,84 @@ class AggregatedTable(TableObject):
         self.build_map()
 
     def build_map(self):
-        agg_map = {}
-        for i, val in enumerate(self.table.get_column(self.group_col)):
-            if val in agg_map:
-                agg_map[val].append(i)
-            else:
-                agg_map[val] = [i]
-        self.agg_rows = [(min(rows), rows) for rows in agg_map.itervalues()]
-        self.agg_rows.sort()
-        self.rows = len(self.agg_rows)
+        """Finds the groups of rows, in order of first appearance.
+
+        If the group column is a numpy array, the groups are found by sorting
+        it and stored as group_first_rows (the first row of each group) and
+        group_ids (the group of each row), and the aggregates are computed
+        with grouped reductions. Otherwise, agg_rows holds the first row and
+        the list of rows of each group.
+        """
+        keys = self.table.get_column(self.group_col)
+        if is_vector(keys, 'biufSU'):
+            numpy = get_numpy()
+            # This is numpy.unique(keys, return_index=True,
+            # return_inverse=True) without the (much slower) stable sort
+            sorted_rows = numpy.argsort(keys)
+            sorted_keys = keys[sorted_rows]
+            new_group = numpy.empty(len(keys), dtype=bool)
+            new_group[:1] = True
+            # numpy.not_equal() has no loop for string arrays, != does
+            new_group[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            first = numpy.minimum.reduceat(sorted_rows,
+                                           numpy.nonzero(new_group)[0])
+            inverse = numpy.empty_like(sorted_rows)
+            inverse[sorted_rows] = numpy.cumsum(new_group) - 1
+            # Groups are numbered in sorted order, renumber them by first row
+            order = numpy.argsort(first)
+            rank = numpy.empty_like(order)
+            rank[order] = numpy.arange(len(order))
+            self.group_first_rows = first[order]
+            self.group_ids = rank[inverse]
+            self.agg_rows = None
+            self.rows = len(self.group_first_rows)
+        else:
+            agg_map = {}
+            for i, val in enumerate(keys):
+                if val in agg_map:
+                    agg_map[val].append(i)
+                else:
+                    agg_map[val] = [i]
+            self.agg_rows = [(min(rows), rows)
+                             for rows in agg_map.itervalues()]
+            self.agg_rows.sort()
+            self.rows = len(self.agg_rows)
         self.columns = 2
         if self.table.names is not None:
             self.names = [self.table.names[self.group_col],
                           self.table.names[self.col]]
 
+    def get_vector_column(self, index, numeric):
+        numpy = get_numpy()
+        if index == 0:
+            col = self.table.get_column(self.group_col, numeric)
+            return take_rows(col, self.group_first_rows)
+        counts = numpy.bincount(self.group_ids, minlength=self.rows)
+        if self.op == 'count':
+            return counts
+        elif self.op in ('sum', 'average'):
+            values = numpy.asarray(self.table.get_column(self.col, True))
+            sums = numpy.bincount(self.group_ids, weights=values,
+                                  minlength=self.rows)
+            if self.op == 'sum':
+                return sums
+            return sums / counts
+        elif self.op in ('min', 'max'):
+            values = numpy.asarray(self.table.get_column(self.col, True))
+            if self.rows == 0:
+                return values[:0]
+            ufunc = numpy.minimum if self.op == 'min' else numpy.maximum
+            # Sort the values by group, then reduce each run of values
+            by_group = numpy.argsort(self.group_ids, kind='mergesort')
+            starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+            return ufunc.reduceat(values[by_group], starts)
+        else:
+            raise ValueError('Unknown operation: "%s"' % self.op)
+
     def get_column(self, index, numeric=False):
+        if self.agg_rows is None:
+            return self.get_vector_column(index, numeric)
+
         def average(value_iter):
             # value_iter can only be used once
             sum = 0
@@ -734,3 +858,90 @@ class TestAggregate(unittest.TestCase):
                                    ('group_by_index', [('Integer', '2')])])
         self.assertEqual(table.get_column(0, False), ['T', 'F'])
         self.assertEqual(table.get_column(1, True), [-7, 21])
+
+
+class TestVectorized(unittest.TestCase):
+    """Checks that the numpy code paths give the same results as the others.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.numpy = get_numpy(False)
+        if cls.numpy is None:
+            raise unittest.SkipTest("numpy is not available")
+
+    def make_tables(self, columns, names):
+        numpy = self.numpy
+        vector = TableObject([numpy.array(c) for c in columns],
+                             len(columns[0]), names)
+        lists = TableObject([list(c) for c in columns],
+                            len(columns[0]), names)
+        return vector, lists
+
+    def assertColumnsEqual(self, table1, table2):
+        self.assertEqual(table1.rows, table2.rows)
+        for i in xrange(table1.columns):
+            self.assertEqual(list(table1.get_column(i)),
+                             list(table2.get_column(i)))
+            numpy = self.numpy
+            self.assertTrue(numpy.allclose(table1.get_column(i, True),
+                                           table2.get_column(i, True)))
+
+    def test_join(self):
+        left_v, left_l = self.make_tables([[3, 1, 4, 1, 5, 9, 2, 6],
+                                           [0, 1, 2, 3, 4, 5, 6, 7]],
+                                          ['key', 'a'])
+        right_v, right_l = self.make_tables([[5, 1, 7, 1, 9],
+                                             [10, 11, 12, 13, 14]],
+                                            ['id', 'b'])
+        joined_v = JoinedTables(left_v, right_v, 0, 0)
+        joined_l = JoinedTables(left_l, right_l, 0, 0)
+        self.assertTrue(is_vector(joined_v.left_rows))
+        self.assertColumnsEqual(joined_v, joined_l)
+        self.assertEqual(list(joined_v.get_column(3)), [13, 13, 10, 14])
+
+    def test_select(self):
+        vector, lists = self.make_tables([[1.5, -2.0, 7.0, 3.0, 0.1],
+                                          [1, 2, 3, 4, 5]],
+                                         ['x', 'y'])
+        values = lists.get_column(0, True)
+        for comparer in ('==', '!=', '<', '>', '<=', '>='):
+            for comparand in (3.0, 0.1):
+                condition = SelectFromTable.make_condition(comparand,
+                                                           comparer)
+                rows = [i for i, v in enumerate(values) if condition(v)]
+                expected = TableObject([[c[i] for i in rows]
+                                        for c in lists._columns],
+                                       len(rows), lists.names)
+                self.assertColumnsEqual(
+                        SelectFromTable.select(vector, 0, comparer, comparand),
+                        expected)
+
+    def test_aggregate(self):
+        vector, lists = self.make_tables([[4, 2, 4, 8, 2, 4],
+                                          [1.0, 2.0, 3.0, 4.0, 5.0, 6.5]],
+                                         ['group', 'value'])
+        for op in ('sum', 'count', 'average', 'min', 'max'):
+            agg_v = AggregatedTable(vector, op, 1, 0)
+            agg_l = AggregatedTable(lists, op, 1, 0)
+            self.assertIsNone(agg_v.agg_rows)
+            self.assertColumnsEqual(agg_v, agg_l)
+        self.assertEqual(list(AggregatedTable(vector, 'sum', 1, 0)
+                              .get_column(1)), [10.5, 7.0, 4.0])
+
+    def test_aggregate_strings(self):
+        for keys in (['b', 'a', 'b', 'c', 'a', 'b'],
+                     [u'b', u'a', u'b', u'c', u'a', u'b']):
+            vector, lists = self.make_tables(
+                    [keys, [1.0, 2.0, 3.0, 4.0, 5.0, 6.5]],
+                    ['group', 'value'])
+            for op in ('sum', 'count', 'average', 'min', 'max'):
+                agg_v = AggregatedTable(vector, op, 1, 0)
+                agg_l = AggregatedTable(lists, op, 1, 0)
+                self.assertIsNone(agg_v.agg_rows)
+                self.assertEqual(agg_v.rows, agg_l.rows)
+                self.assertEqual(list(agg_v.get_column(0)),
+                                 list(agg_l.get_column(0)))
+                self.assertEqual(list(agg_v.get_column(1)),
+                                 list(agg_l.get_column(1)))
+            self.assertEqual(list(AggregatedTable(vector, 'sum', 1, 0)
+                                  .get_column(0)), ['b', 'a', 'c'])
@@ -38,6 +38,7 @@ from __future__ import division
 from vistrails.core.modules.utils import make_modules_dict
 
 from .convert import _modules as convert_modules
+from .read_binary import _modules as binary_modules
 from .read_excel import _modules as excel_modules
 from .read_numpy import _modules as numpy_modules
 
@@ -45,5 +46,5 @@ from .read_csv import _modules as csv_modules
 from .read_json import _modules as json_modules
 
 _modules = make_modules_dict(convert_modules, numpy_modules, csv_modules,
-                             excel_modules, json_modules,
+                             excel_modules, json_modules, binary_modules,
                              namespace='read')
@@ -0,0 +1,202 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+from __future__ import division
+
+import json
+import struct
+
+from ..common import get_numpy, TableObject, Table, InternalModuleError
+
+
+# File layout: MAGIC, the length of the JSON header as a little-endian 64-bit
+# integer, the header, then each column as a contiguous array starting at an
+# offset (from the start of the data) that is a multiple of ALIGNMENT
+MAGIC = b'VTBTABLE'
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<8sQ')
+
+
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class BinaryTable(TableObject):
+    """A table stored in the binary format written by WriteBinaryTable.
+
+    Columns are memory-mapped from the file on first use: numeric columns are
+    returned as read-only numpy arrays backed by the file, without any
+    parsing or copy.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        try:
+            with open(filename, 'rb') as fp:
+                preamble = fp.read(PREAMBLE.size)
+                if len(preamble) != PREAMBLE.size:
+                    raise InternalModuleError("Not a binary table file")
+                magic, header_len = PREAMBLE.unpack(preamble)
+                if magic != MAGIC:
+                    raise InternalModuleError("Not a binary table file")
+                header = json.loads(fp.read(header_len))
+        except IOError:
+            raise InternalModuleError("File does not exist")
+        except ValueError:
+            raise InternalModuleError("Invalid binary table header")
+        if header.get('version', 0) > VERSION:
+            raise InternalModuleError("Binary table was written by a newer "
+                                      "version of this package")
+
+        self._data_offset = align(PREAMBLE.size + header_len)
+        self._columns = header['columns']
+        self.columns = len(self._columns)
+        self.rows = header['rows']
+        self.names = header['names']
+
+        self.column_cache = {}
+
+    def _map_column(self, index):
+        numpy = get_numpy()
+        column = self._columns[index]
+        dtype = numpy.dtype(str(column['dtype']))
+        if self.rows == 0:
+            return numpy.empty(0, dtype=dtype)
+        return numpy.memmap(self.filename, dtype=dtype, mode='r',
+                            offset=self._data_offset + column['offset'],
+                            shape=(self.rows,))
+
+    def get_column(self, index, numeric=False):
+        if (index, numeric) in self.column_cache:
+            return self.column_cache[(index, numeric)]
+
+        array = self._map_column(index)
+        if array.dtype.kind == 'f' or (array.dtype.kind in 'biu' and
+                                       not numeric):
+            # Zero-copy: numbers are returned as the mapped array
+            result = array
+        elif array.dtype.kind in 'biu':
+            # Numeric columns are floats; float64 holds any int32 exactly
+            result = get_numpy().asarray(array,
+                                         dtype=get_numpy().float64)
+        elif numeric:
+            result = array.astype(get_numpy().float32)
+        else:
+            # Strings have to become Python objects anyway
+            result = array.tolist()
+
+        self.column_cache[(index, numeric)] = result
+        return result
+
+
+class ReadBinaryTable(Table):
+    """Reads a table written by WriteBinaryTable.
+
+    The columns are memory-mapped rather than read: numeric columns are
+    passed downstream as numpy arrays backed by the file, so that large
+    intermediate tables can be reused across runs without re-parsing them.
+    """
+    _input_ports = [('file', '(org.vistrails.vistrails.basic:File)')]
+    _output_ports = [
+            ('column_count', '(org.vistrails.vistrails.basic:Integer)'),
+            ('column_names', '(org.vistrails.vistrails.basic:List)'),
+            ('value', Table)]
+
+    def compute(self):
+        try:
+            table = BinaryTable(self.get_input('file').name)
+        except InternalModuleError, e:
+            e.raise_module_error(self)
+
+        self.set_output('column_count', table.columns)
+        self.set_output('column_names', table.names)
+        self.set_output('value', table)
+
+
+_modules = [ReadBinaryTable]
+
+
+###############################################################################
+
+import unittest
+
+
+class BinaryTableTestCase(unittest.TestCase):
+    def test_memory_mapped(self):
+        """Writes a table and checks that numeric columns are mapped.
+        """
+        import os
+        import shutil
+        import tempfile
+        from ..write.write_binary import WriteBinaryTable
+
+        numpy = get_numpy()
+        tmpdir = tempfile.mkdtemp(prefix='vt_binarytable_')
+        try:
+            filename = os.path.join(tmpdir, 'table.vtbt')
+            WriteBinaryTable.write(filename, TableObject(
+                    [[1, 2, 3], [0.5, 1.5, 2.5], ['a', 'bc', 'd'],
+                     [True, False, True]],
+                    3, ['ints', 'floats', 'strings', 'bools']))
+            table = BinaryTable(filename)
+            self.assertEqual((table.columns, table.rows), (4, 3))
+            self.assertEqual(table.names,
+                             ['ints', 'floats', 'strings', 'bools'])
+            ints = table.get_column(0)
+            self.assertIsInstance(ints, numpy.memmap)
+            self.assertEqual(list(ints), [1, 2, 3])
+            numeric_ints = table.get_column(0, True)
+            self.assertEqual(numeric_ints.dtype.kind, 'f')
+            self.assertEqual(list(numeric_ints), [1.0, 2.0, 3.0])
+            self.assertEqual(list(table.get_column_by_name('floats', True)),
+                             [0.5, 1.5, 2.5])
+            self.assertEqual(table.get_column(2), ['a', 'bc', 'd'])
+            bools = table.get_column(3, True)
+            self.assertEqual(bools.dtype.kind, 'f')
+            self.assertEqual(list(bools), [1.0, 0.0, 1.0])
+            # Release the mappings so the file can be removed on Windows
+            del ints, numeric_ints
+            table.column_cache.clear()
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_invalid_file(self):
+        """Reads a file that is not a binary table.
+        """
+        import os
+        test_file = os.path.join(os.path.dirname(__file__), os.pardir,
+                                 'test_files', 'test.csv')
+        with self.assertRaises(InternalModuleError):
+            BinaryTable(test_file)
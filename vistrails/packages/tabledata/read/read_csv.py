@@ -36,7 +36,6 @@
 from __future__ import division
 
 import csv
-import operator
 
 from ..common import get_numpy, TableObject, Table, InternalModuleError
 
@@ -48,11 +47,22 @@ def count_lines(fp):
     return lines
 
 
-# FIXME : test coverage for CSVTable
 class CSVTable(TableObject):
+    """A table read from a CSV file.
+
+    The file is parsed once, the first time a column or the row count is
+    requested, and all the columns are kept for the following requests. If
+    use_columns (a list of column indexes or names) is set, only these
+    columns are read and kept; any other column is read with another pass
+    when it is requested.
+    """
     def __init__(self, csv_file, header_present, delimiter,
-                 skip_lines=0, dialect=None, use_sniffer=True):
+                 skip_lines=0, dialect=None, use_sniffer=True,
+                 use_columns=None):
         self._rows = None
+        self._use_columns = use_columns
+        self._column_errors = {}
+        self._read = False
 
         self.header_present = header_present
         self.delimiter = delimiter
@@ -67,8 +77,24 @@ class CSVTable(TableObject):
         if self.header_present:
             self.skip_lines += 1
 
+        if use_columns is not None:
+            self._use_columns = [self._column_index(col)
+                                 for col in use_columns]
+
         self.column_cache = {}
 
+    def _column_index(self, column):
+        if isinstance(column, basestring):
+            if self.names is None or column not in self.names:
+                raise InternalModuleError("Column name was not found: %r" %
+                                          column)
+            return self.names.index(column)
+        column = int(column)
+        if not 0 <= column < self.columns:
+            raise InternalModuleError("Column index out of range: %d" %
+                                      column)
+        return column
+
     @staticmethod
     def read_file(filename, delimiter=None, header_present=True,
                   skip_lines=0, dialect=None, use_sniffer=True):
@@ -121,53 +147,87 @@ class CSVTable(TableObject):
 
         return column_count, column_names, delimiter, header_present, dialect
 
+    def _open_reader(self, fp):
+        for i in xrange(self.skip_lines):
+            line = fp.readline()
+            if not line:
+                raise ValueError("skip_lines greater than the number "
+                                 "of lines in the file")
+        if self.dialect is not None:
+            return csv.reader(fp, dialect=self.dialect)
+        else:
+            return csv.reader(fp, delimiter=self.delimiter)
+
+    def _read_columns(self, indexes):
+        """Reads the given columns from the file in a single pass.
+
+        The columns are stored in column_cache; a column that is missing
+        from some row is recorded in _column_errors instead.
+        """
+        columns = [[] for i in indexes]
+        appenders = [(index, column.append)
+                     for index, column in zip(indexes, columns)]
+        min_length = max(indexes) + 1 if indexes else 0
+        errors = {}
+        rows = 0
+        with open(self.filename, 'rb') as fp:
+            reader = self._open_reader(fp)
+            for rows, row in enumerate(reader, 1):
+                if len(row) >= min_length:
+                    for index, append in appenders:
+                        append(row[index])
+                else:
+                    for index, append in appenders:
+                        if index < len(row):
+                            append(row[index])
+                        elif index not in errors:
+                            errors[index] = (len(row), rows)
+
+        for index, column in zip(indexes, columns):
+            if index in errors:
+                self._column_errors[index] = errors[index]
+            else:
+                self.column_cache[(index, False)] = column
+        self._rows = rows
+        self._read = True
+
     def get_column(self, index, numeric=False):
         if (index, numeric) in self.column_cache:
             return self.column_cache[(index, numeric)]
 
-        numpy = get_numpy(False)
-
-        if numeric and numpy is not None:
-            result = numpy.loadtxt(
-                    self.filename,
-                    dtype=numpy.float32,
-                    delimiter=self.delimiter,
-                    skiprows=self.skip_lines,
-                    usecols=[index])
-        else:
-            with open(self.filename, 'rb') as fp:
-                for i in xrange(self.skip_lines):
-                    line = fp.readline()
-                    if not line:
-                        raise ValueError("skip_lines greater than the number "
-                                         "of lines in the file")
-                if self.dialect is not None:
-                    reader = csv.reader(fp, dialect=self.dialect)
-                else:
-                    reader = csv.reader(fp, delimiter=self.delimiter)
-
-                getter = operator.itemgetter(index)
-                try:
-                    result = []
-                    for rownb, row in enumerate(reader, 1):
-                        result.append(getter(row))
-                except IndexError:
-                    raise ValueError("Invalid CSV file: only %d fields on "
-                                     "line %d (column %d requested)" % (
-                                         len(row), rownb, index))
-            if numeric:
+        if (index, False) not in self.column_cache:
+            if index not in self._column_errors:
+                indexes = set([index])
+                if self._use_columns is None:
+                    # Parse the whole file once, for every column
+                    indexes.update(xrange(self.columns))
+                elif not self._read:
+                    # First pass: read the columns we know we'll need
+                    indexes.update(self._use_columns)
+                self._read_columns(sorted(indexes))
+            if index in self._column_errors:
+                length, rownb = self._column_errors[index]
+                raise ValueError("Invalid CSV file: only %d fields on "
+                                 "line %d (column %d requested)" % (
+                                     length, rownb, index))
+        result = self.column_cache[(index, False)]
+
+        if numeric:
+            numpy = get_numpy(False)
+            if numpy is not None:
+                result = numpy.array(result, dtype=numpy.float32)
+            else:
                 result = [float(e) for e in result]
-
-        self.column_cache[(index, numeric)] = result
+            self.column_cache[(index, numeric)] = result
         return result
 
     @property
     def rows(self):
-        if self._rows is not None:
-            return self._rows
-        with open(self.filename, 'rb') as fp:
-            self._rows = count_lines(fp)
-        self._rows -= self.skip_lines
+        if self._rows is None:
+            if self._use_columns is None:
+                self._read_columns(range(self.columns))
+            else:
+                self._read_columns(sorted(self._use_columns))
         return self._rows
 
 
@@ -178,6 +238,10 @@ class CSVFile(Table):
     able to guess the actual format of the file in most cases, or you can use
     the 'delimiter', 'header_present' and 'skip_lines' ports to force how the
     file will be read.
+
+    The file is read once, the first time the table is used. If you only use
+    some of the columns, list their indexes or names on the 'use_columns'
+    port so that the other ones are not kept in memory.
     """
     _input_ports = [
             ('file', '(org.vistrails.vistrails.basic:File)'),
@@ -190,6 +254,8 @@ class CSVFile(Table):
             ('skip_lines', '(org.vistrails.vistrails.basic:Integer)',
              {'optional': True, 'defaults': "['0']"}),
             ('dialect', '(org.vistrails.vistrails.basic:String)',
+             {'optional': True}),
+            ('use_columns', '(org.vistrails.vistrails.basic:List)',
              {'optional': True})]
     _output_ports = [
             ('column_count', '(org.vistrails.vistrails.basic:Integer)'),
@@ -203,10 +269,11 @@ class CSVFile(Table):
         skip_lines = self.get_input('skip_lines')
         dialect = self.force_get_input('dialect', None)
         sniff_header = self.get_input('sniff_header')
+        use_columns = self.force_get_input('use_columns', None)
 
         try:
             table = CSVTable(csv_file, header_present, delimiter, skip_lines,
-                             dialect, sniff_header)
+                             dialect, sniff_header, use_columns)
         except InternalModuleError, e:
             e.raise_module_error(self)
 
@@ -268,6 +335,25 @@ class CSVTestCase(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(list(results[0]), [2.0, 3.0, 14.5])
 
+    def test_csv_use_columns(self):
+        """Uses CSVFile with use_columns and ExtractColumn.
+        """
+        with intercept_result(ExtractColumn, 'value') as results:
+            self.assertFalse(execute([
+                    ('read|CSVFile', identifier, [
+                        ('file', [('File', self._test_dir + '/test.csv')]),
+                        ('use_columns', [('List', "['col 2', 2]")]),
+                    ]),
+                    ('ExtractColumn', identifier, [
+                        ('column_name', [('String', 'col 2')]),
+                    ]),
+                ],
+                [
+                    (0, 'value', 1, 'table'),
+                ]))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0], ['2', '3', '14.5'])
+
     def test_csv_mismatch(self):
         """Uses CSVFile and ExtractColumn with mismatching columns.
         """
@@ -321,6 +407,74 @@ class CSVTestCase(unittest.TestCase):
                          ['col moutarde', '4', 'not a number', '7'])
 
 
+class TestCSVTable(unittest.TestCase):
+    def test_single_pass(self):
+        import os
+        filename = os.path.join(os.path.dirname(__file__), os.pardir,
+                                'test_files', 'test.csv')
+        table = CSVTable(filename, None, None)
+        passes = []
+        read_columns = table._read_columns
+        def count_passes(indexes):
+            passes.append(indexes)
+            read_columns(indexes)
+        table._read_columns = count_passes
+        self.assertEqual(table.get_column(1), ['2', '3', '14.5'])
+        # All the columns were read at once
+        self.assertEqual(sorted(table.column_cache),
+                         [(0, False), (1, False), (2, False)])
+        self.assertEqual(table.rows, 3)
+        self.assertEqual(list(table.get_column(0, True)), [-1.0, 2.0, 6.0])
+        self.assertEqual(table.get_column_by_name('col moutarde'),
+                         ['4', 'not a number', '7'])
+        self.assertEqual(passes, [[0, 1, 2]])
+
+        # The row count alone also reads everything
+        table = CSVTable(filename, None, None)
+        self.assertEqual(table.rows, 3)
+        self.assertEqual(sorted(table.column_cache),
+                         [(0, False), (1, False), (2, False)])
+
+    def test_use_columns(self):
+        import os
+        filename = os.path.join(os.path.dirname(__file__), os.pardir,
+                                'test_files', 'test.csv')
+        table = CSVTable(filename, None, None, use_columns=[0])
+        self.assertEqual(table.rows, 3)
+        self.assertEqual(sorted(table.column_cache), [(0, False)])
+        self.assertEqual(table.get_column(2), ['4', 'not a number', '7'])
+        self.assertEqual(sorted(table.column_cache),
+                         [(0, False), (2, False)])
+
+        # Columns can be given by name, and are read with the first one
+        # requested
+        table = CSVTable(filename, None, None,
+                         use_columns=['col moutarde', 0])
+        self.assertEqual(table.get_column(1), ['2', '3', '14.5'])
+        self.assertEqual(sorted(table.column_cache),
+                         [(0, False), (1, False), (2, False)])
+
+        with self.assertRaises(InternalModuleError):
+            CSVTable(filename, None, None, use_columns=['not a column'])
+
+    def test_short_row(self):
+        import os
+        import shutil
+        import tempfile
+        tmpdir = tempfile.mkdtemp(prefix='vt_csv_')
+        try:
+            filename = os.path.join(tmpdir, 'short.csv')
+            with open(filename, 'wb') as fp:
+                fp.write("a,b\n1,2\n3\n")
+            table = CSVTable(filename, True, ',', use_sniffer=False)
+            self.assertEqual(table.get_column(0), ['1', '3'])
+            with self.assertRaises(ValueError):
+                table.get_column(1)
+            self.assertEqual(table.rows, 2)
+        finally:
+            shutil.rmtree(tmpdir)
+
+
 class TestCountlines(unittest.TestCase):
     def test_countlines(self):
         # Simple
@@ -37,13 +37,14 @@ from __future__ import division
 
 from vistrails.core.modules.utils import make_modules_dict
 
+from .write_binary import _modules as binary_modules
 from .write_csv import _modules as csv_modules
 from .write_excel import _modules as excel_modules
 from .write_numpy import _modules as numpy_modules
 
 
 _modules = make_modules_dict(numpy_modules, csv_modules, excel_modules,
-                             namespace='write')
+                             binary_modules, namespace='write')
 
 
 ###############################################################################
@@ -128,3 +129,8 @@ class ExcelWriteTestCase(unittest.TestCase, BaseWriteTestCase):
 class CSVWriteTestCase(unittest.TestCase, BaseWriteTestCase):
     WRITER_MODULE = 'write|WriteCSV'
     READER_MODULE = 'read|CSVFile'
+
+
+class BinaryWriteTestCase(unittest.TestCase, BaseWriteTestCase):
+    WRITER_MODULE = 'write|WriteBinaryTable'
+    READER_MODULE = 'read|ReadBinaryTable'
@@ -0,0 +1,103 @@
+###############################################################################
+##
+## Copyright (C) 2014-2016, New York University.
+## Copyright (C) 2011-2014, NYU-Poly.
+## Copyright (C) 2006-2011, University of Utah.
+## All rights reserved.
+## Contact: contact@vistrails.org
+##
+## This file is part of VisTrails.
+##
+## "Redistribution and use in source and binary forms, with or without
+## modification, are permitted provided that the following conditions are met:
+##
+##  - Redistributions of source code must retain the above copyright notice,
+##    this list of conditions and the following disclaimer.
+##  - Redistributions in binary form must reproduce the above copyright
+##    notice, this list of conditions and the following disclaimer in the
+##    documentation and/or other materials provided with the distribution.
+##  - Neither the name of the New York University nor the names of its
+##    contributors may be used to endorse or promote products derived from
+##    this software without specific prior written permission.
+##
+## THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+## AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+## THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+## PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+## CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+## EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+## PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+## OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+## WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+## OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF
+## ADVISED OF THE POSSIBILITY OF SUCH DAMAGE."
+##
+###############################################################################
+from __future__ import division
+
+import json
+
+from vistrails.core.modules.vistrails_module import Module, ModuleError
+
+from ..common import get_numpy, Table
+from ..read.read_binary import MAGIC, VERSION, PREAMBLE, align
+
+
+class WriteBinaryTable(Module):
+    """Writes a table to a binary file that can be memory-mapped.
+
+    Each column is stored as a contiguous array after a small header holding
+    the column names and types, so that ReadBinaryTable can get the columns
+    back without parsing or copying them. Columns of strings are stored as
+    fixed-width strings (trailing NUL characters are lost); columns of other
+    Python objects can't be written.
+    """
+    _input_ports = [('table', Table)]
+    _output_ports = [('file', '(org.vistrails.vistrails.basic:File)')]
+
+    @staticmethod
+    def write(fname, table):
+        numpy = get_numpy()
+
+        arrays = []
+        columns = []
+        offset = 0
+        for i in xrange(table.columns):
+            array = numpy.ascontiguousarray(table.get_column(i))
+            if array.ndim != 1 or array.dtype.kind not in 'biufSU':
+                raise ValueError("Column %d can't be stored in a binary "
+                                 "table" % i)
+            if len(array) != table.rows:
+                raise ValueError("Column %d has %d rows instead of %d" % (
+                                 i, len(array), table.rows))
+            arrays.append(array)
+            columns.append({'dtype': array.dtype.str, 'offset': offset})
+            offset = align(offset + array.nbytes)
+
+        header = json.dumps({'version': VERSION,
+                             'rows': table.rows,
+                             'names': table.names,
+                             'columns': columns})
+        data_offset = align(PREAMBLE.size + len(header))
+        with open(fname, 'wb') as fp:
+            fp.write(PREAMBLE.pack(MAGIC, len(header)))
+            fp.write(header)
+            for array, column in zip(arrays, columns):
+                fp.seek(data_offset + column['offset'])
+                array.tofile(fp)
+
+    def compute(self):
+        table = self.get_input('table')
+        if not table.columns:
+            raise ModuleError(self, "Table has no columns")
+
+        fileobj = self.interpreter.filePool.create_file(suffix='.vtbt')
+        try:
+            self.write(fileobj.name, table)
+        except ValueError, e:
+            raise ModuleError(self, e.message)
+
+        self.set_output('file', fileobj)
+
+
+_modules = [WriteBinaryTable]
@@ -67,3 +67,18 @@ def package_requirements():
     except MissingRequirement:
         debug.warning('PyQt4 is not available. There will be no interaction '
                       'between VTK and the spreadsheet.')
+
+def snapshot_key():
+    """Modules are generated from the installed VTK library, so the registry
+    snapshot is only valid while it is unchanged. VTK is not imported here,
+    which would take about as long as initializing the package.
+    """
+    import imp
+    import os
+    try:
+        (fp, path, description) = imp.find_module('vtk')
+    except ImportError:
+        return None
+    if fp is not None:
+        fp.close()
+    return [path, os.stat(path).st_mtime]